@@ -88,6 +88,13 @@ class GraphExecutionError(BaseServiceError):
     default_status = 500
 
 
+class EnvServerError(BaseServiceError):
+    """Raised when the environment server rejects or fails a request."""
+
+    default_code = "ENV_SERVER_ERROR"
+    default_status = 502
+
+
 class UtilsValidationError(BaseServiceError):
     """Raised when validation of inputs or state fails."""
 
@@ -117,4 +124,5 @@ __all__ = (
     "LLMError",
     "RateLimitExceededError",
     "GraphInitializeError",
+    "EnvServerError",
 )
@@ -0,0 +1,227 @@
+"""Deterministic stand-in for a chat model, for benchmarks and offline runs.
+
+``FakeChatModel`` answers every call with JSON that validates against the
+output schema the node asked for:
+
+- In ``prompt`` mode the schema is read from the format instructions
+  (the last fenced block, as written by ``PydanticOutputParser``) and
+  matched against ``schemas`` to find the Pydantic class.
+- ``with_structured_output`` gets the class directly and returns the same
+  ``raw``/``parsed``/``parsing_error`` shape as the provider models.
+
+``responses`` maps a class name to a canned payload, or to a callable that
+gets the prompt text and returns one. Classes without one get a minimal
+instance generated from the JSON schema. Each call sleeps ``latency``
+seconds plus up to ``jitter`` seconds, drawn from a seeded generator. It
+reports token usage and rate-limit headers shaped like OpenAI's, so header
+extraction runs as usual.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Type
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+Payload = Any
+
+# Rough characters-per-token ratio for the reported usage.
+_CHARS_PER_TOKEN = 4
+_FENCE = "```"
+
+
+def sample_from_schema(
+    schema: Mapping[str, Any], defs: Mapping[str, Any] | None = None
+) -> Any:
+    """Return a minimal JSON value that validates against ``schema``."""
+    defs = schema.get("$defs", defs) or {}
+    if "$ref" in schema:
+        return sample_from_schema(defs[schema["$ref"].split("/")[-1]], defs)
+    if "default" in schema:
+        return schema["default"]
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            return sample_from_schema(schema[key][0], defs)
+    kind = schema.get("type", "object")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return {
+            name: sample_from_schema(properties[name], defs)
+            for name in schema.get("required", properties)
+        }
+    if kind == "array":
+        count = max(1, schema.get("minItems", 1))
+        return [sample_from_schema(schema.get("items", {}), defs)] * count
+    return {"string": "sample", "integer": 0, "number": 0.0, "boolean": True}.get(
+        kind
+    )
+
+
+def _prompt_schema(schema: Type[BaseModel]) -> Dict[str, Any]:
+    # PydanticOutputParser.get_format_instructions drops these two keys.
+    reduced = dict(schema.model_json_schema())
+    reduced.pop("title", None)
+    reduced.pop("type", None)
+    return reduced
+
+
+def _schema_in_prompt(text: str) -> Dict[str, Any] | None:
+    end = text.rfind(_FENCE)
+    start = text.rfind(_FENCE, 0, end)
+    if start < 0:
+        return None
+    try:
+        schema = json.loads(text[start + len(_FENCE) : end])
+    except ValueError:
+        return None
+    return schema if isinstance(schema, dict) else None
+
+
+def _messages_text(messages: Sequence[BaseMessage]) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+class FakeChatModel(BaseChatModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    model_name: str = "fake"
+    latency: float = 0.0
+    jitter: float = 0.0
+    seed: int = 0
+    schemas: List[Type[BaseModel]] = Field(default_factory=list)
+    responses: Dict[str, Any] = Field(default_factory=dict)
+    calls: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _by_schema: Dict[str, Type[BaseModel]] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._by_schema = {
+            json.dumps(_prompt_schema(schema), sort_keys=True): schema
+            for schema in self.schemas
+        }
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            jitter = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+        return self.latency + jitter
+
+    def payload(self, text: str, schema: Type[BaseModel] | None = None) -> Payload:
+        """The answer to a prompt; ``schema`` skips the prompt lookup."""
+        json_schema: Mapping[str, Any] | None = None
+        if schema is None:
+            json_schema = _schema_in_prompt(text)
+            if json_schema is not None:
+                schema = self._by_schema.get(json.dumps(json_schema, sort_keys=True))
+        if schema is not None:
+            response = self.responses.get(schema.__name__)
+            if response is None:
+                return sample_from_schema(schema.model_json_schema())
+            return response(text) if callable(response) else response
+        if json_schema is not None:
+            return sample_from_schema(json_schema)
+        response = self.responses.get("text", "OK")
+        return response(text) if callable(response) else response
+
+    def _message(self, text: str, schema: Type[BaseModel] | None = None) -> AIMessage:
+        payload = self.payload(text, schema)
+        content = (
+            payload
+            if isinstance(payload, str)
+            else json.dumps(payload, ensure_ascii=False)
+        )
+        prompt_tokens = len(text) // _CHARS_PER_TOKEN + 1
+        completion_tokens = len(content) // _CHARS_PER_TOKEN + 1
+        total_tokens = prompt_tokens + completion_tokens
+        return AIMessage(
+            content=content,
+            response_metadata={
+                "model_name": self.model_name,
+                "token_usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": total_tokens,
+                },
+                "headers": {
+                    "x-ratelimit-limit-requests": "10000",
+                    "x-ratelimit-limit-tokens": "10000000",
+                    "x-ratelimit-remaining-requests": "9999",
+                    "x-ratelimit-remaining-tokens": str(10000000 - total_tokens),
+                },
+            },
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": total_tokens,
+            },
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        message = self._message(_messages_text(messages), kwargs.get("schema"))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        message = self._message(_messages_text(messages), kwargs.get("schema"))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def with_structured_output(
+        self,
+        schema: Type[BaseModel],
+        *,
+        include_raw: bool = False,
+        **kwargs: Any,
+    ) -> Runnable:
+        bound = self.bind(schema=schema)
+
+        def parse(raw: AIMessage) -> Any:
+            parsed = schema.model_validate_json(raw.content)
+            if include_raw:
+                return {"raw": raw, "parsed": parsed, "parsing_error": None}
+            return parsed
+
+        return bound | RunnableLambda(parse)
+
+
+__all__ = ["FakeChatModel", "sample_from_schema"]
@@ -0,0 +1,350 @@
+"""Per-node, per-phase latency of the LLM node factories.
+
+Each call of an LLM node is split into phases::
+
+    inputs  make_inputs(state) and format instructions
+    queue   waiting for an LLM scheduler slot (planner nodes only)
+    render  prompt template -> model input
+    llm     the model call
+    parse   output parsing, JSON repair and model_dump
+    apply   building the state update (make_outputs / modify_state)
+
+and each phase, plus the node ``total``, goes into a log-bucketed
+``Histogram`` (a lock and an increment per sample). Two opt-in extras are
+set with ``configure_node_metrics``:
+
+- ``spans_path``: an OpenTelemetry span per node call with a child span per
+  phase, written as JSON lines to a local file. Needs ``opentelemetry-sdk``.
+- ``profile_sample_rate``: that share of node calls (optionally only
+  ``profile_nodes``) runs under cProfile or pyinstrument, one file per
+  call in ``profile_dir``.
+
+Summaries come from ``get_node_phase_stats``.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+Profiler = Literal["cprofile", "pyinstrument"]
+PHASES = ("inputs", "queue", "render", "llm", "parse", "apply")
+
+# Buckets grow by 2**(1/8) (about 9%) from 1us; the last one holds > ~2.4h.
+_MIN_S = 1e-6
+_STEPS = 8
+_RATIO = 2 ** (1 / _STEPS)
+_BUCKETS = _STEPS * 34
+
+
+class Histogram:
+    """Latency histogram with fixed log-spaced buckets."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        index = 0
+        if seconds > _MIN_S:
+            index = int(math.log2(seconds / _MIN_S) * _STEPS) + 1
+            if index >= _BUCKETS:
+                index = _BUCKETS - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile, in seconds."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(_MIN_S * _RATIO**index, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": self.quantile(0.5) * 1e3,
+            "p95_ms": self.quantile(0.95) * 1e3,
+            "p99_ms": self.quantile(0.99) * 1e3,
+            "max_ms": self.max * 1e3,
+        }
+
+
+_HISTOGRAMS: Dict[str, Dict[str, Histogram]] = {}
+_LOCK = threading.Lock()
+
+
+def record_phases(node_name: str, samples: Sequence[tuple]) -> None:
+    """Add ``(phase, seconds)`` samples of one node call."""
+    with _LOCK:
+        phases = _HISTOGRAMS.get(node_name)
+        if phases is None:
+            phases = _HISTOGRAMS[node_name] = {}
+        for phase, seconds in samples:
+            histogram = phases.get(phase)
+            if histogram is None:
+                histogram = phases[phase] = Histogram()
+            histogram.record(seconds)
+
+
+def get_node_phase_stats() -> Dict[str, Dict[str, Dict[str, float]]]:
+    """``{node: {phase: summary}}``, phases in pipeline order."""
+    with _LOCK:
+        order = {phase: index for index, phase in enumerate(PHASES)}
+        return {
+            node: {
+                phase: phases[phase].summary()
+                for phase in sorted(phases, key=lambda name: order.get(name, -1))
+            }
+            for node, phases in _HISTOGRAMS.items()
+        }
+
+
+def reset_node_phase_stats() -> None:
+    with _LOCK:
+        _HISTOGRAMS.clear()
+
+
+class _Settings:
+    enabled = True
+    tracer: Any = None
+    profile_sample_rate = 0.0
+    profile_nodes: frozenset = frozenset()
+    profiler: Profiler = "cprofile"
+    profile_dir = Path("profiles")
+    # Arguments of the last configure_node_metrics call; None before one.
+    key: Optional[tuple] = None
+    # Owned by the tracer; closed when it is replaced.
+    provider: Any = None
+    spans_file: Any = None
+
+
+_settings = _Settings()
+_rng = random.Random()
+
+
+def _open_tracer(spans_path: Path) -> None:
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+    )
+
+    spans_path.parent.mkdir(parents=True, exist_ok=True)
+    spans_file = open(spans_path, "a", encoding="utf-8")
+    exporter = ConsoleSpanExporter(
+        out=spans_file,
+        formatter=lambda span: span.to_json(indent=None) + "\n",
+    )
+    # A private provider: spans stay local and the global one is untouched.
+    provider = TracerProvider(resource=Resource.create({"service.name": "planner"}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    _settings.provider, _settings.spans_file = provider, spans_file
+    _settings.tracer = provider.get_tracer(__name__)
+
+
+def _close_tracer() -> None:
+    if _settings.provider is not None:
+        # Exports what is queued and stops the batch processor's thread; the
+        # exporter leaves its file open.
+        _settings.provider.shutdown()
+        _settings.spans_file.close()
+    _settings.tracer = _settings.provider = _settings.spans_file = None
+
+
+def configure_node_metrics(
+    *,
+    enabled: bool = True,
+    spans_path: str | Path | None = None,
+    profile_sample_rate: float = 0.0,
+    profile_nodes: Sequence[str] = (),
+    profiler: Profiler = "cprofile",
+    profile_dir: str | Path = "profiles",
+) -> None:
+    """Set what every instrumented node records; ``spans_path`` turns on tracing.
+
+    The same settings again are a no-op; new ones shut down the previous
+    tracer and close its file.
+    """
+    key = (
+        enabled,
+        str(spans_path) if spans_path else None,
+        profile_sample_rate,
+        tuple(profile_nodes),
+        profiler,
+        str(profile_dir),
+    )
+    if key == _settings.key:
+        return
+    if profiler == "pyinstrument" and profile_sample_rate > 0:
+        import pyinstrument  # noqa: F401  (fail at configuration, not per call)
+    _close_tracer()
+    if spans_path:
+        _open_tracer(Path(spans_path))
+    _settings.enabled = enabled
+    _settings.profile_sample_rate = profile_sample_rate
+    _settings.profile_nodes = frozenset(profile_nodes)
+    _settings.profiler = profiler
+    _settings.profile_dir = Path(profile_dir)
+    _settings.key = key
+
+
+def node_metrics_configured() -> bool:
+    """Whether ``configure_node_metrics`` has been called in this process."""
+    return _settings.key is not None
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer: "NodeTimer", name: str) -> None:
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc: Any) -> None:
+        end = time.perf_counter_ns()
+        self.timer._phases.append((self.name, self.start, end))
+
+
+class NodeTimer:
+    """Times one node call; ``with timer.phase("llm"): ...`` per phase."""
+
+    __slots__ = ("node_name", "_phases", "_start", "_wall_start", "_profiler")
+
+    def __init__(self, node_name: str) -> None:
+        self.node_name = node_name
+        self._phases: List[tuple] = []
+        self._profiler: Any = None
+
+    def phase(self, name: str):
+        if _settings.enabled or _settings.tracer is not None:
+            return _Phase(self, name)
+        return _NULL_PHASE
+
+    def __enter__(self) -> "NodeTimer":
+        rate = _settings.profile_sample_rate
+        if rate and (
+            not _settings.profile_nodes or self.node_name in _settings.profile_nodes
+        ):
+            if rate >= 1 or _rng.random() < rate:
+                self._profiler = _start_profiler()
+        self._wall_start = time.time_ns()
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter_ns()
+        if self._profiler is not None:
+            _stop_profiler(self._profiler, self.node_name)
+        if _settings.enabled:
+            # A phase entered twice in one call (e.g. parse) is one sample.
+            samples = {"total": end - self._start}
+            for name, start, stop in self._phases:
+                samples[name] = samples.get(name, 0) + stop - start
+            record_phases(
+                self.node_name, [(name, ns / 1e9) for name, ns in samples.items()]
+            )
+        if _settings.tracer is not None:
+            self._export_spans(end, exc)
+
+    def _export_spans(self, end: int, exc: Optional[BaseException]) -> None:
+        from opentelemetry.trace import Status, StatusCode, set_span_in_context
+
+        # perf_counter offsets mapped onto the wall clock at node start.
+        def wall(ns: int) -> int:
+            return self._wall_start + ns - self._start
+
+        tracer = _settings.tracer
+        span = tracer.start_span(self.node_name, start_time=self._wall_start)
+        context = set_span_in_context(span)
+        for name, start, stop in self._phases:
+            tracer.start_span(name, context=context, start_time=wall(start)).end(
+                end_time=wall(stop)
+            )
+        if exc is not None:
+            span.set_status(Status(StatusCode.ERROR, str(exc)))
+        span.end(end_time=wall(end))
+
+
+def _start_profiler():
+    if _settings.profiler == "pyinstrument":
+        from pyinstrument import Profiler as SamplingProfiler
+
+        profiler = SamplingProfiler(async_mode="disabled")
+        start = profiler.start
+    else:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        start = profiler.enable
+    try:
+        start()
+    except (RuntimeError, ValueError) as err:
+        # Another profiler already owns this thread; skip this sample.
+        logger.warning("Not profiling: %s", err)
+        return None
+    return profiler
+
+
+def _stop_profiler(profiler: Any, node_name: str) -> None:
+    directory = _settings.profile_dir
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = directory / f"{node_name}-{time.time_ns()}"
+    if _settings.profiler == "pyinstrument":
+        profiler.stop()
+        path = stem.with_suffix(".html")
+        path.write_text(profiler.output_html(), encoding="utf-8")
+    else:
+        profiler.disable()
+        path = stem.with_suffix(".prof")
+        profiler.dump_stats(path)
+    logger.info("Profiled %s to %s", node_name, path)
+
+
+__all__ = [
+    "PHASES",
+    "Histogram",
+    "NodeTimer",
+    "configure_node_metrics",
+    "get_node_phase_stats",
+    "node_metrics_configured",
+    "record_phases",
+    "reset_node_phase_stats",
+]
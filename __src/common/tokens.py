@@ -0,0 +1,49 @@
+"""Approximate token counting for prompt budgets."""
+
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import Any
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(name: str) -> Any | None:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception as error:  # missing package or encoding not downloadable
+        logger.warning("tiktoken unavailable (%s); using byte estimate.", error)
+        return None
+
+
+def count_tokens(text: str, encoding: str = DEFAULT_ENCODING) -> int:
+    """Count tokens with tiktoken, falling back to ~4 UTF-8 bytes per token."""
+    if not text:
+        return 0
+    encoder = _get_encoding(encoding)
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return math.ceil(len(text.encode("utf-8")) / 4)
+
+
+def truncate_to_tokens(
+    text: str, max_tokens: int, encoding: str = DEFAULT_ENCODING
+) -> str:
+    """Keep the head of ``text`` so that it fits in ``max_tokens``."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, encoding) <= max_tokens:
+        return text
+    encoder = _get_encoding(encoding)
+    if encoder is not None:
+        return encoder.decode(encoder.encode(text)[:max_tokens])
+    kept = text.encode("utf-8")[: max_tokens * 4]
+    return kept.decode("utf-8", errors="ignore")
@@ -1,11 +1,19 @@
 from asyncio import tasks
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import yaml
-from pydantic import BaseModel, ConfigDict, ValidationError
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    ValidationError,
+    model_validator,
+)
 
 from ..common.errors import UtilsConfigurationError, UtilsValidationError
+from ..planning.actions import ActionTemplate, compile_task_templates
 
 
 class PathsConfig(BaseModel):
@@ -18,6 +26,9 @@ class NodeConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
     model_name: str
     prompt_cache_key: str | None = None
+    # "prompt" injects the JSON schema into the prompt text; the other modes
+    # pass it through the provider's structured-output API.
+    output_mode: Literal["prompt", "json_schema", "function_calling"] = "prompt"
 
 
 class RunnerConfig(BaseModel):
@@ -29,6 +40,200 @@ class RunnerConfig(BaseModel):
     goal_decomp_node: NodeConfig
     task_decomp_node: NodeConfig
     question_answer_node: NodeConfig
+    # Targeted repair of a subgoal that failed plan validation; falls back
+    # to task_decomp_node when not set.
+    task_repair_node: NodeConfig | None = None
+    # Scoped patch of the previous plan for small follow-up edits; falls
+    # back to task_decomp_node when not set.
+    task_patch_node: NodeConfig | None = None
+
+
+class MemoryConfig(BaseModel):
+    """Conversation memory budget for the supervisor feedback loop."""
+
+    model_config = ConfigDict(extra="forbid")
+    max_raw_turns: int = Field(default=4, ge=1)
+    max_query_tokens: int = Field(default=512, ge=1)
+    max_summary_tokens: int = Field(default=256, ge=1)
+
+
+class PlanValidationConfig(BaseModel):
+    """Symbolic check of task_decomp output before it leaves the planner."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = True
+    max_repairs: int = Field(default=2, ge=0)
+
+
+class TemplatePlannerConfig(BaseModel):
+    """Rule-based planning of canonical missions before the LLM planners."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = True
+
+
+class ReplanConfig(BaseModel):
+    """Incremental replanning of follow-up edits to the last plan."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = True
+    # Edits changing at most this share of the mission's words get a scoped
+    # LLM patch when no deterministic patch applies.
+    llm_patch_max_change_ratio: float = Field(default=0.5, ge=0.0, le=1.0)
+
+
+class SubgoalMemoConfig(BaseModel):
+    """Reuse of learned subgoal expansions across missions."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = True
+    # JSON file; relative paths are resolved under paths.output_dir and
+    # None keeps the library in memory only.
+    path: str | None = "subgoal_memo.json"
+    max_entries: int = Field(default=512, ge=1)
+    # Minimum word-sequence similarity for a fuzzy hit; 1.0 disables it.
+    fuzzy_threshold: float = Field(default=0.85, ge=0.0, le=1.0)
+
+
+class PlanOptimizerConfig(BaseModel):
+    """Travel-aware reordering and move clean-up of task plans."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = True
+    # Subgoal orders up to this size are searched exhaustively (Held-Karp).
+    exact_max_subgoals: int = Field(default=8, ge=0, le=16)
+
+
+class SchedulerConfig(BaseModel):
+    """Multi-robot allocation and parallel scheduling of subgoals."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = True
+    # Instances up to this many subgoals are solved exactly.
+    exact_max_subgoals: int = Field(default=6, ge=0)
+    # Nominal duration per skill; unlisted skills count as 1.0.
+    skill_durations: dict[str, float] = {}
+
+
+class ExecutionConfig(BaseModel):
+    """Dispatch of compiled actions to the environment server."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = False
+    # "local" simulates execution in-process with the planner's skill models.
+    client: Literal["http", "local"] = "http"
+    url: str = "http://127.0.0.1:8800"
+    step_timeout_s: float = Field(default=30.0, gt=0)
+    # Failed steps re-plan only the unfinished subgoals, at most this often.
+    max_suffix_replans: int = Field(default=2, ge=0)
+
+
+class CheckpointConfig(BaseModel):
+    """Persistence of session state between turns and across restarts."""
+
+    model_config = ConfigDict(extra="forbid")
+    # "memory" keeps sessions in this process only.
+    backend: Literal["memory", "sqlite"] = "memory"
+    # SQLite file; relative paths are resolved under paths.output_dir.
+    path: str = "checkpoints.sqlite"
+    # Writes are committed in batches of this many rows or after this delay.
+    batch_size: int = Field(default=64, ge=1)
+    flush_interval_s: float = Field(default=0.05, ge=0)
+    # Sessions idle this long, or beyond the newest max_threads, are pruned;
+    # None disables either rule.
+    ttl_s: float | None = Field(default=7 * 24 * 3600.0, gt=0)
+    max_threads: int | None = Field(default=10000, ge=1)
+    prune_interval_s: float = Field(default=60.0, gt=0)
+
+
+class SessionStoreConfig(BaseModel):
+    """Memory bound for hot sessions; the rest are kept on disk."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = True
+    max_sessions: int = Field(default=1000, ge=1)
+    max_bytes: int = Field(default=64 * 1024 * 1024, ge=1)
+    # Sessions idle this long leave memory; None keeps them until evicted.
+    idle_ttl_s: float | None = Field(default=600.0, gt=0)
+    # Spill file used when checkpoint.backend is "memory"; relative paths
+    # are resolved under paths.output_dir.
+    spill_path: str = "sessions_spill.sqlite"
+
+
+class ServerConfig(BaseModel):
+    """HTTP service (``python -m __src.server``)."""
+
+    model_config = ConfigDict(extra="forbid")
+    host: str = "127.0.0.1"
+    port: int = Field(default=8000, ge=1, le=65535)
+    # Graph runs in flight; more requests queue up to max_queue and wait at
+    # most queue_timeout_s before a 429.
+    max_concurrency: int = Field(default=32, ge=1)
+    max_queue: int = Field(default=256, ge=0)
+    queue_timeout_s: float = Field(default=10.0, gt=0)
+
+
+class LLMPriorityClassConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    # Share of the model while several classes are waiting.
+    weight: float = Field(default=1.0, gt=0)
+    max_concurrency: int = Field(default=16, ge=1)
+    # Waiting calls before new ones are shed with a 429.
+    max_queue: int = Field(default=256, ge=0)
+
+
+class LLMSchedulerConfig(BaseModel):
+    """Weighted fair queuing of LLM calls by priority class."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = True
+    # LLM calls in flight across all classes (the model quota).
+    max_concurrency: int = Field(default=16, ge=1)
+    queue_timeout_s: float = Field(default=60.0, gt=0)
+    classes: dict[str, LLMPriorityClassConfig] = {
+        "interactive": LLMPriorityClassConfig(weight=8.0),
+        "batch": LLMPriorityClassConfig(
+            weight=1.0, max_concurrency=8, max_queue=10000
+        ),
+    }
+
+
+class FakeLLMConfig(BaseModel):
+    """Deterministic fake model instead of the provider (benchmarks, offline)."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = False
+    # Seconds per call, plus up to jitter_s drawn from a seeded generator.
+    latency_s: float = Field(default=0.0, ge=0)
+    jitter_s: float = Field(default=0.0, ge=0)
+    seed: int = 0
+
+
+class CassetteConfig(BaseModel):
+    """Record LLM and environment calls to a file, or replay them from it."""
+
+    model_config = ConfigDict(extra="forbid")
+    mode: Literal["off", "record", "replay"] = "off"
+    # Under paths.output_dir; a .gz suffix compresses it.
+    path: str = "cassette.jsonl"
+    # Replay waits recorded latency / speed; 0 answers at once.
+    speed: float = Field(default=1.0, ge=0)
+
+
+class NodeMetricsConfig(BaseModel):
+    """Per-phase latency of the LLM nodes, plus opt-in tracing and profiling."""
+
+    model_config = ConfigDict(extra="forbid")
+    enabled: bool = True
+    # OpenTelemetry spans as JSON lines under paths.output_dir; needs
+    # opentelemetry-sdk.
+    tracing: bool = False
+    spans_path: str = "spans.jsonl"
+    # Share of node calls run under the profiler, optionally only these nodes.
+    profile_sample_rate: float = Field(default=0.0, ge=0, le=1)
+    profile_nodes: list[str] = []
+    profiler: Literal["cprofile", "pyinstrument"] = "cprofile"
+    profile_dir: str = "profiles"
 
 
 class RobotSkillConfig(BaseModel):
@@ -42,6 +247,33 @@ class Config(BaseModel):
     runner: RunnerConfig
     skills: list[RobotSkillConfig]
     tasks: dict[str, dict[str, Any]]
+    memory: MemoryConfig = MemoryConfig()
+    plan_validation: PlanValidationConfig = PlanValidationConfig()
+    template_planner: TemplatePlannerConfig = TemplatePlannerConfig()
+    replan: ReplanConfig = ReplanConfig()
+    subgoal_memo: SubgoalMemoConfig = SubgoalMemoConfig()
+    plan_optimizer: PlanOptimizerConfig = PlanOptimizerConfig()
+    scheduler: SchedulerConfig = SchedulerConfig()
+    execution: ExecutionConfig = ExecutionConfig()
+    checkpoint: CheckpointConfig = CheckpointConfig()
+    session_store: SessionStoreConfig = SessionStoreConfig()
+    server: ServerConfig = ServerConfig()
+    llm_scheduler: LLMSchedulerConfig = LLMSchedulerConfig()
+    fake_llm: FakeLLMConfig = FakeLLMConfig()
+    cassette: CassetteConfig = CassetteConfig()
+    node_metrics: NodeMetricsConfig = NodeMetricsConfig()
+
+    _task_templates: dict[str, ActionTemplate] = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="after")
+    def _compile_task_templates(self) -> "Config":
+        # Parsed once here so action compilation never re-parses templates.
+        self._task_templates = compile_task_templates(self.tasks)
+        return self
+
+    @property
+    def task_templates(self) -> dict[str, ActionTemplate]:
+        return self._task_templates
 
 
 def load_config(config_path: str | Path | None = None) -> Config:
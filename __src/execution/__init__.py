@@ -0,0 +1,20 @@
+from .client import EnvClient, HttpEnvClient, LocalEnvClient, StepResult
+from .monitor import (
+    ExecutionMonitor,
+    ExecutionReport,
+    StepStatus,
+    get_execution_stats,
+    remaining_plan,
+)
+
+__all__ = [
+    "EnvClient",
+    "ExecutionMonitor",
+    "ExecutionReport",
+    "HttpEnvClient",
+    "LocalEnvClient",
+    "StepResult",
+    "StepStatus",
+    "get_execution_stats",
+    "remaining_plan",
+]
@@ -0,0 +1,155 @@
+"""Clients that execute primitive actions on the environment server.
+
+``HttpEnvClient`` talks to the simulator next to ``/env_entire``:
+
+- ``POST {url}/execute`` with the action fields and its rendered
+  ``command`` returns ``{"success": bool, "message": str}``;
+- ``GET {url}/env_entire`` returns the current scene.
+
+``LocalEnvClient`` is an in-process stand-in that applies the planner's
+own skill models to a ``WorldState``. It is used by tests, benchmarks and
+the ``execution.client: local`` setting, and can inject failures.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Mapping, Protocol, Tuple
+
+import httpx
+
+from ..common.cassette import get_cassette
+from ..common.errors import EnvServerError
+from ..planning.actions import Action
+from ..planning.validator import SKILL_MODELS
+from ..planning.world import WorldModel
+
+
+@dataclass(frozen=True)
+class StepResult:
+    ok: bool
+    message: str = ""
+
+
+class EnvClient(Protocol):
+    async def execute(self, action: Action) -> StepResult: ...
+
+    async def fetch_env(self) -> Dict[str, Any]: ...
+
+    async def aclose(self) -> None: ...
+
+
+class HttpEnvClient:
+    def __init__(self, url: str, *, timeout: float = 30.0) -> None:
+        self.url = url.rstrip("/")
+        self._client = httpx.AsyncClient(base_url=self.url, timeout=timeout)
+
+    async def execute(self, action: Action) -> StepResult:
+        payload = {"command": action.command(), **action._asdict()}
+        cassette = get_cassette()
+        if cassette is None:
+            return StepResult(*await self._execute(payload))
+        ok, message = await cassette.acall(
+            "execute",
+            {"url": f"{self.url}/execute", "payload": payload},
+            lambda: self._execute(payload),
+        )
+        return StepResult(ok, message)
+
+    async def _execute(self, payload: Dict[str, Any]) -> Tuple[bool, str]:
+        response = await self._client.post("/execute", json=payload)
+        if response.status_code >= 500:
+            raise EnvServerError(
+                f"Environment server failed to execute {payload['command']!r}.",
+                details={"status": response.status_code, "body": response.text},
+            )
+        body = response.json() if response.content else {}
+        ok = response.is_success and bool(body.get("success", body.get("ok")))
+        return ok, body.get("message", body.get("error", ""))
+
+    async def fetch_env(self) -> Dict[str, Any]:
+        cassette = get_cassette()
+        if cassette is None:
+            return await self._fetch_env()
+        return await cassette.acall(
+            "env", {"url": f"{self.url}/env_entire"}, self._fetch_env
+        )
+
+    async def _fetch_env(self) -> Dict[str, Any]:
+        response = await self._client.get("/env_entire")
+        if not response.is_success:
+            raise EnvServerError(
+                "Could not fetch /env_entire.",
+                details={"status": response.status_code, "body": response.text},
+            )
+        return response.json()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class LocalEnvClient:
+    """Simulated environment; ``failures`` fail once per (skill, target)."""
+
+    def __init__(
+        self,
+        world: WorldModel,
+        robots: Iterable[str],
+        *,
+        latency: float | Mapping[str, float] = 0.0,
+        failures: Iterable[Tuple[str, str]] = (),
+    ) -> None:
+        self.world = world
+        self.state = world.initial_state(robots)
+        self.latency = latency
+        self.failures = set(failures)
+
+    def _latency(self, skill: str) -> float:
+        if isinstance(self.latency, Mapping):
+            return self.latency.get(skill, 0.0)
+        return self.latency
+
+    async def execute(self, action: Action) -> StepResult:
+        delay = self._latency(action.skill)
+        if delay:
+            await asyncio.sleep(delay)
+        # PlaceObject targets the receptacle; everything else the object.
+        target = action.receptacle or action.object
+        if (action.skill, target) in self.failures:
+            self.failures.discard((action.skill, target))
+            return StepResult(False, f"injected failure: {action.command()}")
+        model = SKILL_MODELS.get(action.skill)
+        if model is None:
+            return StepResult(False, f"unknown skill {action.skill!r}")
+        issue = model(self.world, self.state, action.robot, target)
+        if issue is not None:
+            return StepResult(False, issue[1])
+        return StepResult(True)
+
+    async def fetch_env(self) -> Dict[str, Any]:
+        objects_by_group: Dict[str, list] = {
+            group: [] for group in self.world.groups_in_order
+        }
+        for obj in self.world.object_groups:
+            # Held objects are reported where their robot stands.
+            group = self.state.group_of(obj) or self.world.object_groups[obj]
+            objects_by_group.setdefault(group, []).append(obj)
+        return {
+            "objects_by_group": objects_by_group,
+            "ungrouped_objects": [],
+            "openable_objects": sorted(self.world.openable),
+            "open_objects": sorted(self.state.open_objects),
+            "group_positions": {
+                group: list(position)
+                for group, position in self.world.group_positions.items()
+            },
+            "holding": dict(self.state.holding),
+            "robot_locations": dict(self.state.robot_location),
+        }
+
+    async def aclose(self) -> None:
+        return None
+
+
+__all__ = ["EnvClient", "HttpEnvClient", "LocalEnvClient", "StepResult"]
@@ -0,0 +1,236 @@
+"""Stream compiled actions to the environment and track every step.
+
+Each robot's actions run in plan order on their own coroutine, so robots
+scheduled in parallel really do run concurrently. A step waits for the
+subgoals its subgoal depends on (``Schedule.dependencies``). On the first
+failure the other robots finish the step they are on and stop. The report
+then lists the subgoals still to be done, and only that suffix is planned
+again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence
+
+from ..planning.actions import Action, ActionTable
+from ..planning.validator import plan_subgoals
+from .client import EnvClient, StepResult
+
+
+class StepStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+    skipped = "skipped"
+
+
+@dataclass
+class StepRecord:
+    index: int
+    action: Action
+    status: StepStatus = StepStatus.pending
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    message: str = ""
+
+    @property
+    def latency(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "command": self.action.command(),
+            "robot": self.action.robot,
+            "subgoal_index": self.action.subgoal_index,
+            "status": self.status.value,
+            "latency_ms": (
+                round(self.latency * 1e3, 3) if self.latency is not None else None
+            ),
+            "message": self.message,
+        }
+
+
+@dataclass
+class ExecutionReport:
+    steps: List[StepRecord]
+    elapsed: float = 0.0
+    failed_step: Optional[int] = None
+    remaining_subgoals: List[int] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.failed_step is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "elapsed_ms": round(self.elapsed * 1e3, 3),
+            "failed_step": self.failed_step,
+            "remaining_subgoals": list(self.remaining_subgoals),
+            "steps": [step.to_dict() for step in self.steps],
+        }
+
+
+# ! per-skill latency
+_LATENCY_WINDOW = 1024
+_LATENCIES: Dict[str, Deque[float]] = {}
+_FAILURES: Counter = Counter()
+_STATS_LOCK = threading.Lock()
+
+
+def record_step(skill: str, latency: float, ok: bool) -> None:
+    with _STATS_LOCK:
+        _LATENCIES.setdefault(skill, deque(maxlen=_LATENCY_WINDOW)).append(latency)
+        if not ok:
+            _FAILURES[skill] += 1
+
+
+def get_execution_stats() -> Dict[str, Dict[str, float]]:
+    """Per-skill step latency (ms, last 1024 steps) and failure counts."""
+    with _STATS_LOCK:
+        samples = {skill: sorted(values) for skill, values in _LATENCIES.items()}
+        failures = dict(_FAILURES)
+    stats = {}
+    for skill, values in samples.items():
+        count = len(values)
+        stats[skill] = {
+            "count": count,
+            "failures": failures.get(skill, 0),
+            "mean_ms": sum(values) / count * 1e3,
+            "p50_ms": values[count // 2] * 1e3,
+            "p95_ms": values[min(count - 1, int(count * 0.95))] * 1e3,
+            "max_ms": values[-1] * 1e3,
+        }
+    return stats
+
+
+def reset_execution_stats() -> None:
+    with _STATS_LOCK:
+        _LATENCIES.clear()
+        _FAILURES.clear()
+
+
+StatusCallback = Callable[[StepRecord], None]
+
+
+class ExecutionMonitor:
+    def __init__(
+        self,
+        client: EnvClient,
+        *,
+        step_timeout: float = 30.0,
+        on_status: StatusCallback | None = None,
+    ) -> None:
+        self.client = client
+        self.step_timeout = step_timeout
+        self.on_status = on_status
+
+    def _set(self, record: StepRecord, status: StepStatus, message: str = "") -> None:
+        record.status = status
+        record.message = message
+        if self.on_status is not None:
+            self.on_status(record)
+
+    async def _execute(self, record: StepRecord) -> StepResult:
+        try:
+            return await asyncio.wait_for(
+                self.client.execute(record.action), self.step_timeout
+            )
+        except asyncio.TimeoutError:
+            return StepResult(False, f"timed out after {self.step_timeout:g}s")
+        except Exception as err:  # noqa: BLE001 - reported as a failed step
+            return StepResult(False, f"{type(err).__name__}: {err}")
+
+    async def run(
+        self,
+        table: ActionTable,
+        dependencies: Mapping[int, Sequence[int]] | None = None,
+    ) -> ExecutionReport:
+        dependencies = dependencies or {}
+        records = [StepRecord(index, action) for index, action in enumerate(table)]
+        by_robot: Dict[str, List[StepRecord]] = {}
+        steps_left: Counter = Counter()
+        for record in records:
+            by_robot.setdefault(record.action.robot, []).append(record)
+            steps_left[record.action.subgoal_index] += 1
+        subgoal_done = {index: asyncio.Event() for index in steps_left}
+        failed = asyncio.Event()
+        report = ExecutionReport(records)
+
+        async def wait_for_dependencies(subgoal_index: int) -> bool:
+            for dep in dependencies.get(subgoal_index, ()):
+                if dep not in subgoal_done or subgoal_done[dep].is_set():
+                    continue
+                waiters = [
+                    asyncio.ensure_future(subgoal_done[dep].wait()),
+                    asyncio.ensure_future(failed.wait()),
+                ]
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in waiters:
+                    waiter.cancel()
+                if failed.is_set():
+                    return False
+            return True
+
+        async def run_robot(steps: List[StepRecord]) -> None:
+            for record in steps:
+                subgoal_index = record.action.subgoal_index
+                if failed.is_set() or not await wait_for_dependencies(subgoal_index):
+                    return
+                record.started = time.perf_counter()
+                self._set(record, StepStatus.running)
+                result = await self._execute(record)
+                record.finished = time.perf_counter()
+                record_step(record.action.skill, record.latency, result.ok)
+                if not result.ok:
+                    if report.failed_step is None:
+                        report.failed_step = record.index
+                    self._set(record, StepStatus.failed, result.message)
+                    failed.set()
+                    return
+                self._set(record, StepStatus.done, result.message)
+                steps_left[subgoal_index] -= 1
+                if not steps_left[subgoal_index]:
+                    subgoal_done[subgoal_index].set()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_robot(steps) for steps in by_robot.values()))
+        report.elapsed = time.perf_counter() - start
+        for record in records:
+            if record.status is StepStatus.pending:
+                self._set(record, StepStatus.skipped)
+        report.remaining_subgoals = sorted(
+            index for index, left in steps_left.items() if left
+        )
+        return report
+
+
+def remaining_plan(tasks_result: Any, report: ExecutionReport) -> List[str]:
+    """Subgoal texts of the unfinished suffix, in plan order."""
+    subgoals = plan_subgoals(tasks_result)
+    return [
+        subgoals[index].get("subgoal", "")
+        for index in report.remaining_subgoals
+        if index < len(subgoals)
+    ]
+
+
+__all__ = [
+    "ExecutionMonitor",
+    "ExecutionReport",
+    "StepRecord",
+    "StepStatus",
+    "get_execution_stats",
+    "remaining_plan",
+    "reset_execution_stats",
+]
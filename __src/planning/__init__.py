@@ -0,0 +1,30 @@
+from .actions import ActionCompiler, ActionTable, decode_actions
+from .memo import SubgoalLibrary, get_memo_stats
+from .optimizer import PlanOptimizer
+from .replan import IncrementalReplanner, get_replan_stats
+from .scheduler import Schedule, Scheduler
+from .template_planner import TemplatePlanner, get_fast_path_stats
+from .validator import PlanIssue, PlanSimulator, PlanStep, PlanValidation
+from .world import WorldModel, WorldState, world_from_inputs
+
+__all__ = [
+    "IncrementalReplanner",
+    "ActionCompiler",
+    "ActionTable",
+    "PlanIssue",
+    "PlanOptimizer",
+    "PlanSimulator",
+    "PlanStep",
+    "PlanValidation",
+    "Schedule",
+    "Scheduler",
+    "SubgoalLibrary",
+    "TemplatePlanner",
+    "WorldModel",
+    "WorldState",
+    "decode_actions",
+    "get_memo_stats",
+    "get_replan_stats",
+    "get_fast_path_stats",
+    "world_from_inputs",
+]
@@ -0,0 +1,241 @@
+"""Compile task plans into robot-bound primitive actions.
+
+``config.yaml`` ``tasks`` templates such as
+``PlaceObject <robot><object><receptacleObject>`` are parsed once into
+``ActionTemplate``s (see ``Config.task_templates``). Compiled actions are
+kept as fixed-width integer records over an interned symbol table, which
+is what goes into planner state and what the executor streams.
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from .validator import flatten_plan
+
+_SLOT_RE = re.compile(r"<(\w+)>")
+
+# Fixed record layout; -1 marks an unused slot.
+ACTION_FIELDS: Tuple[str, ...] = (
+    "skill",
+    "robot",
+    "object",
+    "receptacle",
+    "subgoal_index",
+    "task_index",
+)
+_SYMBOL_FIELDS = 4
+_NO_SYMBOL = -1
+
+# Template slot name -> record field.
+_SLOT_FIELDS = {
+    "robot": "robot",
+    "object": "object",
+    "receptacleObject": "receptacle",
+}
+
+
+class ActionCompileError(ValueError):
+    """Raised when a plan step cannot be bound to a task template."""
+
+
+@dataclass(frozen=True)
+class ActionTemplate:
+    skill: str
+    slots: Tuple[str, ...]
+    description: str = ""
+
+    @classmethod
+    def parse(cls, skill: str, spec: Mapping[str, Any]) -> "ActionTemplate":
+        template = spec.get("template", skill)
+        name, _, _ = template.partition(" ")
+        if name != skill:
+            raise ActionCompileError(
+                f"Template for {skill!r} starts with {name!r}: {template!r}"
+            )
+        slots = tuple(_SLOT_RE.findall(template))
+        unknown = [slot for slot in slots if slot not in _SLOT_FIELDS]
+        if unknown:
+            raise ActionCompileError(f"Unknown slots {unknown} in {template!r}")
+        return cls(skill=skill, slots=slots, description=spec.get("description", ""))
+
+    @property
+    def takes_receptacle(self) -> bool:
+        return "receptacleObject" in self.slots
+
+
+def compile_task_templates(
+    tasks: Mapping[str, Mapping[str, Any]],
+) -> Dict[str, ActionTemplate]:
+    return {skill: ActionTemplate.parse(skill, spec) for skill, spec in tasks.items()}
+
+
+class Action(NamedTuple):
+    skill: str
+    robot: str
+    object: Optional[str]
+    receptacle: Optional[str]
+    subgoal_index: int
+    task_index: int
+
+    def command(self, template: ActionTemplate | None = None) -> str:
+        """Render like the config template, e.g. ``PlaceObject robot1 a b``."""
+        slots = template.slots if template else ("robot", "object", "receptacleObject")
+        values = (getattr(self, _SLOT_FIELDS[slot]) for slot in slots)
+        return " ".join([self.skill, *(value for value in values if value)])
+
+
+class ActionTable:
+    """Append-only action records: one ``array('i')`` row per action."""
+
+    __slots__ = ("symbols", "_symbol_ids", "records")
+
+    def __init__(self, symbols: List[str] | None = None) -> None:
+        self.symbols: List[str] = list(symbols or [])
+        self._symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.records = array("i")
+
+    def intern(self, symbol: Optional[str]) -> int:
+        if symbol is None:
+            return _NO_SYMBOL
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return symbol_id
+
+    def append(
+        self,
+        skill: str,
+        robot: str,
+        obj: Optional[str],
+        receptacle: Optional[str],
+        subgoal_index: int,
+        task_index: int,
+    ) -> None:
+        self.records.extend(
+            (
+                self.intern(skill),
+                self.intern(robot),
+                self.intern(obj),
+                self.intern(receptacle),
+                subgoal_index,
+                task_index,
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.records) // len(ACTION_FIELDS)
+
+    def row(self, index: int) -> Tuple[int, ...]:
+        width = len(ACTION_FIELDS)
+        return tuple(self.records[index * width : (index + 1) * width])
+
+    def _decode(self, row: Tuple[int, ...]) -> Action:
+        symbols = self.symbols
+        values = [
+            symbols[value] if value != _NO_SYMBOL else None
+            for value in row[:_SYMBOL_FIELDS]
+        ]
+        return Action(*values, *row[_SYMBOL_FIELDS:])
+
+    def __getitem__(self, index: int) -> Action:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._decode(self.row(index))
+
+    def __iter__(self) -> Iterator[Action]:
+        for index in range(len(self)):
+            yield self._decode(self.row(index))
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON/msgpack-friendly form stored under ``state["actions"]``."""
+        return {
+            "fields": list(ACTION_FIELDS),
+            "symbols": list(self.symbols),
+            "records": self.records.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, payload: Mapping[str, Any]) -> "ActionTable":
+        if tuple(payload.get("fields", ACTION_FIELDS)) != ACTION_FIELDS:
+            raise ActionCompileError(f"Unsupported action fields: {payload['fields']}")
+        table = cls(payload.get("symbols", []))
+        table.records.extend(payload.get("records", []))
+        return table
+
+    def to_bytes(self) -> bytes:
+        """Symbols (newline-separated, UTF-8), a NUL byte, then raw records."""
+        return "\n".join(self.symbols).encode("utf-8") + b"\0" + self.records.tobytes()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "ActionTable":
+        head, _, body = payload.partition(b"\0")
+        table = cls(head.decode("utf-8").split("\n") if head else [])
+        table.records.frombytes(body)
+        return table
+
+
+class ActionCompiler:
+    """Binds ``TaskDecompNodeParser`` output to precompiled task templates."""
+
+    def __init__(
+        self,
+        templates: Mapping[str, ActionTemplate],
+        default_robot: str,
+    ) -> None:
+        self.templates = dict(templates)
+        self.default_robot = default_robot
+
+    @classmethod
+    def from_config(cls, config) -> "ActionCompiler":
+        return cls(config.task_templates, default_robot=config.skills[0].name)
+
+    def compile(self, tasks_result: Any) -> ActionTable:
+        table = ActionTable()
+        holding: Dict[str, Optional[str]] = {}
+        for step in flatten_plan(tasks_result, self.default_robot):
+            template = self.templates.get(step.skill)
+            if template is None:
+                raise ActionCompileError(
+                    f"No task template for skill {step.skill!r} (step {step.index})."
+                )
+            obj, receptacle = step.target, None
+            if template.takes_receptacle:
+                # PlaceObject: <object> is what the robot holds, the plan
+                # target is the receptacle.
+                obj, receptacle = holding.get(step.robot), step.target
+                holding[step.robot] = None
+            elif step.skill == "PickObject":
+                holding[step.robot] = step.target
+            table.append(
+                step.skill,
+                step.robot,
+                obj if "object" in template.slots else None,
+                receptacle,
+                step.subgoal_index,
+                step.task_index,
+            )
+        return table
+
+
+def decode_actions(payload: Mapping[str, Any]) -> List[Action]:
+    """Readable actions from a ``state["actions"]`` payload."""
+    return list(ActionTable.from_state(payload))
+
+
+__all__ = [
+    "ACTION_FIELDS",
+    "Action",
+    "ActionCompileError",
+    "ActionCompiler",
+    "ActionTable",
+    "ActionTemplate",
+    "compile_task_templates",
+    "decode_actions",
+]
@@ -0,0 +1,314 @@
+"""Subgoal memoization: reuse task expansions learned from ``task_decomp``.
+
+Subgoals from ``goal_decomp`` often differ only in the objects they name
+("pick up the fork and put it in the bowl" vs. "... the cup ... the
+plate"). Each learned subgoal is canonicalized by replacing scene mentions
+with typed slots:
+
+    "put the fork in the bowl"  ->  "put <object0> in <object1>"
+    [GoToObject object_fork_0, ...] -> [GoToObject <object0>, ...]
+
+A lookup canonicalizes the new subgoal the same way and binds the slots to
+the objects it mentions. Exact keys are tried first, then the closest key
+with the same slot signature that differs only in filler words (articles,
+conjunctions, Korean case particles), never in a verb, skill word or
+preposition. The library is an LRU bounded by
+``max_entries`` and persists as JSON. Only learning marks it for saving;
+the order lookups leave is written with the next save or at exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import difflib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .template_planner import _IGNORED_WORDS, NOUN_ALIASES, _object_words
+from .world import WorldModel
+
+MEMO_FORMAT_VERSION = 1
+
+# Longest mention considered, in words ("counter 1 left").
+_MAX_MENTION_WORDS = 4
+_SLOT_RE = re.compile(r"^<(object|group)(\d+)>$")
+# Words a fuzzy match may add, drop or swap. Directional particles ("에",
+# "로", "에서") are left out: they tell "to" from "from".
+_FILLER_WORDS = frozenset(
+    {"and", "then", "please", "it", "now", "그리고", "다음", "좀"}
+    | {"을", "를", "은", "는", "이", "가"}
+)
+
+
+def _tokens(text: str) -> List[str]:
+    # Unlike the template planner, Korean words are kept: particles and
+    # verbs ("집어", "놓기") are what tells two subgoals apart.
+    text = text.lower()
+    for alias, word in NOUN_ALIASES.items():
+        text = text.replace(alias, f" {word} ")
+    return [w for w in re.findall(r"\w+", text) if w not in _IGNORED_WORDS]
+
+
+class _MentionIndex:
+    """Exact word-sequence lookup of scene objects and groups."""
+
+    def __init__(self, world: WorldModel) -> None:
+        self.world = world
+        by_words: Dict[Tuple[str, ...], List[str]] = {}
+        for name in world.object_groups:
+            by_words.setdefault(tuple(_object_words(name)), []).append(name)
+        # Duplicated names (two apples) cannot be bound from text alone.
+        self.objects = {
+            words: names[0] for words, names in by_words.items() if len(names) == 1
+        }
+        self.groups = [(g, set(g.lower().split("_"))) for g in world.groups_in_order]
+
+    def match(self, words: Sequence[str]) -> Optional[str]:
+        if not all(word.isascii() for word in words):
+            return None
+        target = self.objects.get(tuple(words))
+        if target is not None:
+            return target
+        groups = [
+            group
+            for group, group_words in self.groups
+            if all(word in group_words for word in words)
+        ]
+        # "island" alone names two groups and cannot be bound either.
+        return groups[0] if len(groups) == 1 else None
+
+
+@dataclass(frozen=True)
+class CanonicalSubgoal:
+    key: str
+    slot_types: Tuple[str, ...]
+    bindings: Tuple[str, ...]
+
+    @property
+    def slots(self) -> Dict[str, str]:
+        """Target -> slot name, e.g. ``object_fork_0 -> <object0>``."""
+        pairs = enumerate(zip(self.slot_types, self.bindings))
+        return {target: _slot_name(kind, index) for index, (kind, target) in pairs}
+
+
+def _slot_name(kind: str, index: int) -> str:
+    return f"<{kind}{index}>"
+
+
+def canonicalize(subgoal: str, world: WorldModel) -> CanonicalSubgoal:
+    index = _MentionIndex(world)
+    words = _tokens(subgoal)
+    out: List[str] = []
+    slot_types: List[str] = []
+    bindings: List[str] = []
+    i = 0
+    while i < len(words):
+        # Longest mention first: "island left" beats "island".
+        for j in range(min(len(words), i + _MAX_MENTION_WORDS), i, -1):
+            target = index.match(words[i:j])
+            if target is not None:
+                break
+        else:
+            out.append(words[i])
+            i += 1
+            continue
+        if target not in bindings:
+            bindings.append(target)
+            slot_types.append("object" if world.is_object(target) else "group")
+        slot = bindings.index(target)
+        out.append(_slot_name(slot_types[slot], slot))
+        i = j
+    return CanonicalSubgoal(" ".join(out), tuple(slot_types), tuple(bindings))
+
+
+_STATS: Counter = Counter()
+_STATS_LOCK = threading.Lock()
+
+
+def _record(outcome: str, count: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[outcome] += count
+
+
+def get_memo_stats() -> Dict[str, int]:
+    """Counts of ``exact``/``fuzzy`` hits, misses, learned and evicted entries."""
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+def reset_memo_stats() -> None:
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+def _differs_in_filler_only(matcher: difflib.SequenceMatcher) -> bool:
+    a, b = matcher.a, matcher.b
+    return all(
+        _FILLER_WORDS.issuperset(a[i1:i2] + b[j1:j2])
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    )
+
+
+class SubgoalLibrary:
+    """LRU of canonical subgoal -> slotted task list, optionally on disk."""
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        max_entries: int = 512,
+        fuzzy_threshold: float = 0.85,
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.max_entries = max_entries
+        self.fuzzy_threshold = fuzzy_threshold
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # slot signature -> {key: key words}, so fuzzy search only scans
+        # compatible keys and never re-splits them.
+        self._by_signature: Dict[Tuple[str, ...], Dict[str, List[str]]] = {}
+        self._lock = threading.Lock()
+        # _dirty: entries changed; _touched: only the LRU order did.
+        self._dirty = False
+        self._touched = False
+        if self.path is not None:
+            if self.path.exists():
+                self.load()
+            atexit.register(self.save, order=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ! storage
+    def _insert(self, key: str, entry: Dict[str, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._by_signature.setdefault(tuple(entry["slots"]), {})[key] = key.split()
+        while len(self._entries) > self.max_entries:
+            old_key, old = self._entries.popitem(last=False)
+            self._by_signature[tuple(old["slots"])].pop(old_key, None)
+            _record("evicted")
+
+    def load(self) -> None:
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            # A corrupt or unreadable cache only costs LLM calls; start over.
+            return
+        if payload.get("version") != MEMO_FORMAT_VERSION:
+            return
+        with self._lock:
+            self._entries.clear()
+            self._by_signature.clear()
+            for key, entry in payload.get("entries", []):
+                self._insert(key, entry)
+
+    def save(self, *, order: bool = False) -> None:
+        """Write the library if it changed; atomic via rename.
+
+        ``order=True`` also writes when lookups only reordered the LRU.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            if not (self._dirty or (order and self._touched)):
+                return
+            payload = {
+                "version": MEMO_FORMAT_VERSION,
+                "entries": [[key, entry] for key, entry in self._entries.items()],
+            }
+            self._dirty = self._touched = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    # ! learning
+    def learn(
+        self, subgoal: str, tasks: Sequence[Mapping[str, Any]], world: WorldModel
+    ) -> bool:
+        """Store ``tasks`` for ``subgoal``; False if a target is not in the text."""
+        canonical = canonicalize(subgoal, world)
+        slots = canonical.slots
+        slotted = []
+        for task in tasks:
+            target = task.get("target")
+            if target not in slots:
+                # The LLM picked something the subgoal never names; that
+                # choice cannot be replayed for other objects.
+                return False
+            slotted.append({"skill": task.get("skill"), "target": slots[target]})
+        if not slotted:
+            return False
+        entry = {"slots": list(canonical.slot_types), "tasks": slotted}
+        with self._lock:
+            self._insert(canonical.key, entry)
+            self._dirty = True
+        _record("learned")
+        return True
+
+    # ! lookup
+    def _fuzzy_key(self, key: str, signature: Tuple[str, ...]) -> Optional[str]:
+        candidates = self._by_signature.get(signature)
+        if not candidates:
+            return None
+        words = key.split()
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(words)
+        best, best_ratio = None, self.fuzzy_threshold
+        for candidate, candidate_words in candidates.items():
+            matcher.set_seq1(candidate_words)
+            if matcher.real_quick_ratio() < best_ratio:
+                continue
+            if matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio and _differs_in_filler_only(matcher):
+                best, best_ratio = candidate, ratio
+        return best
+
+    def lookup(
+        self, subgoal: str, world: WorldModel
+    ) -> Optional[List[Dict[str, str]]]:
+        """Tasks for ``subgoal`` bound to its objects, or ``None`` on a miss."""
+        canonical = canonicalize(subgoal, world)
+        with self._lock:
+            key, outcome = canonical.key, "exact"
+            if key not in self._entries:
+                key, outcome = self._fuzzy_key(key, canonical.slot_types), "fuzzy"
+            if key is None:
+                outcome = "miss"
+            else:
+                self._entries.move_to_end(key)
+                self._touched = True
+                entry = self._entries[key]
+        _record(outcome)
+        if key is None:
+            return None
+        tasks = []
+        for task in entry["tasks"]:
+            match = _SLOT_RE.match(task["target"])
+            target = canonical.bindings[int(match.group(2))]
+            tasks.append({"skill": task["skill"], "target": target})
+        return tasks
+
+
+__all__ = [
+    "CanonicalSubgoal",
+    "SubgoalLibrary",
+    "canonicalize",
+    "get_memo_stats",
+    "reset_memo_stats",
+]
@@ -0,0 +1,239 @@
+"""Travel-aware clean-up of task plans.
+
+Two passes over a ``TaskDecompNodeParser``-shaped plan:
+
+1. Inside each subgoal, drop ``GoToObject`` steps that are immediately
+   followed by another ``GoToObject`` or that target where the robot
+   already is.
+2. Reorder independent subgoals so consecutive subgoals start near where
+   the previous one ended. Subgoals that touch the same object keep their
+   relative order (the scheduler's dependency rule), so every pick still
+   precedes the place that needs it.
+
+Travel cost uses ``group_positions`` from the env payload when available
+and a name-based group adjacency model otherwise.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .scheduler import build_jobs
+from .validator import plan_subgoals
+from .world import WorldModel
+
+GOTO_SKILL = "GoToObject"
+
+# Adjacency costs when no positions are known.
+SAME_GROUP_COST = 0.0
+SAME_FIXTURE_COST = 1.0  # island_left_group <-> island_right_group
+SAME_AREA_COST = 2.0  # counter_1_* <-> counter_2_*
+OTHER_AREA_COST = 4.0  # island_* <-> counter_*
+
+_GROUP_NAME_RE = re.compile(r"^(?P<area>[a-z]+)(?:_(?P<index>\d+))?")
+
+
+class TravelCostModel:
+    """Estimated travel between targets (objects resolve to their group)."""
+
+    def __init__(self, world: WorldModel) -> None:
+        self.world = world
+        self._cache: Dict[Tuple[str, str], float] = {}
+
+    def _group(self, target: str) -> str:
+        return self.world.object_groups.get(target, target)
+
+    def _adjacency_cost(self, a: str, b: str) -> float:
+        match_a, match_b = _GROUP_NAME_RE.match(a), _GROUP_NAME_RE.match(b)
+        if not match_a or not match_b or match_a["area"] != match_b["area"]:
+            return OTHER_AREA_COST
+        if match_a["index"] == match_b["index"]:
+            return SAME_FIXTURE_COST
+        return SAME_AREA_COST
+
+    def cost(self, source: Optional[str], target: Optional[str]) -> float:
+        # The start position is unknown, so the first move is free; a
+        # subgoal without moves (target None) costs nothing to enter.
+        if source is None or target is None:
+            return 0.0
+        a, b = self._group(source), self._group(target)
+        if a == b:
+            return SAME_GROUP_COST
+        key = (a, b) if a < b else (b, a)
+        cost = self._cache.get(key)
+        if cost is None:
+            positions = self.world.group_positions
+            if a in positions and b in positions:
+                cost = math.dist(positions[a], positions[b])
+            else:
+                cost = self._adjacency_cost(a, b)
+            self._cache[key] = cost
+        return cost
+
+
+@dataclass
+class OptimizationReport:
+    travel_before: float
+    travel_after: float
+    dropped_moves: int
+    order: List[int]
+    method: str
+
+    @property
+    def travel_saved(self) -> float:
+        return self.travel_before - self.travel_after
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "travel_before": round(self.travel_before, 3),
+            "travel_after": round(self.travel_after, 3),
+            "travel_saved": round(self.travel_saved, 3),
+            "dropped_moves": self.dropped_moves,
+            "order": self.order,
+            "method": self.method,
+        }
+
+
+def _gotos(subgoal: Mapping[str, Any]) -> List[str]:
+    return [
+        task.get("target", "")
+        for task in subgoal.get("tasks", [])
+        if task.get("skill") == GOTO_SKILL
+    ]
+
+
+def drop_redundant_moves(tasks: Sequence[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    kept: List[Dict[str, Any]] = []
+    location: Optional[str] = None
+    for index, task in enumerate(tasks):
+        if task.get("skill") == GOTO_SKILL:
+            following = tasks[index + 1] if index + 1 < len(tasks) else None
+            if following is not None and following.get("skill") == GOTO_SKILL:
+                continue
+            if task.get("target") == location:
+                continue
+            location = task.get("target")
+        kept.append(dict(task))
+    return kept
+
+
+class PlanOptimizer:
+    def __init__(self, world: WorldModel, *, exact_max_subgoals: int = 8) -> None:
+        self.world = world
+        self.costs = TravelCostModel(world)
+        self.exact_max_subgoals = exact_max_subgoals
+
+    def travel(self, subgoals: Sequence[Mapping[str, Any]]) -> float:
+        """Travel of the plan executed in order by a single robot."""
+        total = 0.0
+        location: Optional[str] = None
+        for subgoal in subgoals:
+            for target in _gotos(subgoal):
+                total += self.costs.cost(location, target)
+                location = target
+        return total
+
+    def _order_exact(self, entry, exit_, internal, deps) -> List[int]:
+        # Held-Karp over subsets, only extending with subgoals whose
+        # dependencies are already in the subset.
+        count = len(entry)
+        best: Dict[Tuple[int, int], Tuple[float, int]] = {}
+        for i in range(count):
+            if not deps[i]:
+                best[(1 << i, i)] = (internal[i], -1)
+        for mask in range(1, 1 << count):
+            for last in range(count):
+                state = best.get((mask, last))
+                if state is None:
+                    continue
+                for nxt in range(count):
+                    if mask & (1 << nxt) or (deps[nxt] & ~mask):
+                        continue
+                    cost = (
+                        state[0]
+                        + self.costs.cost(exit_[last], entry[nxt])
+                        + internal[nxt]
+                    )
+                    key = (mask | (1 << nxt), nxt)
+                    if key not in best or cost < best[key][0] - 1e-9:
+                        best[key] = (cost, last)
+        full = (1 << count) - 1
+        last = min(
+            (i for i in range(count) if (full, i) in best),
+            key=lambda i: (best[(full, i)][0], i),
+        )
+        order, mask = [], full
+        while last != -1:
+            order.append(last)
+            _, previous = best[(mask, last)]
+            mask &= ~(1 << last)
+            last = previous
+        return order[::-1]
+
+    def _order_greedy(self, entry, exit_, internal, deps) -> List[int]:
+        order: List[int] = []
+        done = 0
+        location: Optional[str] = None
+        while len(order) < len(entry):
+            ready = [
+                i
+                for i in range(len(entry))
+                if not done & (1 << i) and not deps[i] & ~done
+            ]
+            nxt = min(ready, key=lambda i: (self.costs.cost(location, entry[i]), i))
+            order.append(nxt)
+            done |= 1 << nxt
+            location = exit_[nxt] or location
+        return order
+
+    def optimize(self, tasks_result: Any) -> Tuple[Dict[str, List], OptimizationReport]:
+        subgoals = plan_subgoals(tasks_result)
+        travel_before = self.travel(subgoals)
+        cleaned = []
+        dropped = 0
+        for subgoal in subgoals:
+            tasks = subgoal.get("tasks", [])
+            kept = drop_redundant_moves(tasks)
+            dropped += len(tasks) - len(kept)
+            cleaned.append({**subgoal, "tasks": kept})
+
+        jobs = build_jobs({"tasks": cleaned}, {}, self.world)
+        deps = [sum(1 << dep for dep in job.depends_on) for job in jobs]
+        entry, exit_, internal = [], [], []
+        for subgoal in cleaned:
+            gotos = _gotos(subgoal)
+            entry.append(gotos[0] if gotos else None)
+            exit_.append(gotos[-1] if gotos else None)
+            internal.append(self.travel([subgoal]))
+
+        method = "none"
+        order = list(range(len(cleaned)))
+        if len(cleaned) > 1:
+            exact = len(cleaned) <= self.exact_max_subgoals
+            solve = self._order_exact if exact else self._order_greedy
+            order = solve(entry, exit_, internal, deps)
+            method = "exact" if exact else "greedy"
+            # Never return something worse than the original order.
+            if self.travel([cleaned[i] for i in order]) > self.travel(cleaned):
+                order, method = list(range(len(cleaned))), "original"
+
+        optimized = [cleaned[i] for i in order]
+        report = OptimizationReport(
+            travel_before=travel_before,
+            travel_after=self.travel(optimized),
+            dropped_moves=dropped,
+            order=order,
+            method=method,
+        )
+        return {"tasks": optimized}, report
+
+
+__all__ = [
+    "OptimizationReport",
+    "PlanOptimizer",
+    "TravelCostModel",
+    "drop_redundant_moves",
+]
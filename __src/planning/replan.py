@@ -0,0 +1,169 @@
+"""Incremental replanning: patch the last plan instead of re-decomposing.
+
+The previous ``user_final_query`` and its plan are kept in state. A
+follow-up such as "사과말고 레몬" makes the supervisor emit a new merged
+mission, and the two missions are diffed:
+
+- clause by clause: new clauses that match a template are appended;
+- word by word inside a changed clause: a replaced span that resolves to a
+  scene target on both sides becomes a target substitution
+  (``object_apple_0 -> object_lemon_0``) applied to the old plan.
+
+Anything else (removed clauses, unresolvable edits) is reported as
+unsupported, and the caller chooses between a small LLM patch and a full
+re-plan.
+"""
+
+from __future__ import annotations
+
+import difflib
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .template_planner import FastPathMiss, TemplatePlanner
+from .validator import plan_subgoals
+from .world import WorldModel
+
+
+@dataclass
+class PlanDiff:
+    kind: str  # "unchanged" | "patch" | "unsupported"
+    substitutions: List[Tuple[str, str]] = field(default_factory=list)
+    text_substitutions: List[Tuple[str, str]] = field(default_factory=list)
+    added_clauses: List[str] = field(default_factory=list)
+    reason: str = ""
+    # Share of the new mission's words that changed; small diffs are worth
+    # a scoped LLM patch when no deterministic patch exists.
+    change_ratio: float = 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "substitutions": [list(pair) for pair in self.substitutions],
+            "added_clauses": list(self.added_clauses),
+            "reason": self.reason,
+            "change_ratio": round(self.change_ratio, 3),
+        }
+
+
+_STATS: Counter = Counter()
+_STATS_LOCK = threading.Lock()
+
+
+def record_replan(outcome: str) -> None:
+    with _STATS_LOCK:
+        _STATS[outcome] += 1
+
+
+def get_replan_stats() -> Dict[str, int]:
+    """Counts of ``unchanged``/``patched``/``llm_patch``/``full`` replans."""
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+def reset_replan_stats() -> None:
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+def _word_change_ratio(old: str, new: str) -> float:
+    matcher = difflib.SequenceMatcher(a=old.split(), b=new.split(), autojunk=False)
+    return 1.0 - matcher.ratio()
+
+
+class IncrementalReplanner:
+    def __init__(self, planner: TemplatePlanner) -> None:
+        self.planner = planner
+
+    def _clause_substitutions(
+        self, old: str, new: str, world: WorldModel
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        old_words, new_words = old.split(), new.split()
+        matcher = difflib.SequenceMatcher(a=old_words, b=new_words, autojunk=False)
+        targets: List[Tuple[str, str]] = []
+        texts: List[Tuple[str, str]] = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            if tag != "replace":
+                raise FastPathMiss("word_insert_or_delete")
+            old_span = " ".join(old_words[i1:i2])
+            new_span = " ".join(new_words[j1:j2])
+            old_target = self.planner.resolve(old_span, world)
+            new_target = self.planner.resolve(new_span, world)
+            if old_target != new_target:
+                targets.append((old_target, new_target))
+            texts.append((old_span, new_span))
+        return targets, texts
+
+    def diff(self, old_query: str, new_query: str, world: WorldModel) -> PlanDiff:
+        ratio = _word_change_ratio(old_query, new_query)
+        old_clauses = self.planner.split_clauses(old_query)
+        new_clauses = self.planner.split_clauses(new_query)
+        if old_clauses == new_clauses:
+            return PlanDiff("unchanged", change_ratio=0.0)
+
+        result = PlanDiff("patch", change_ratio=ratio)
+        matcher = difflib.SequenceMatcher(a=old_clauses, b=new_clauses, autojunk=False)
+        try:
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == "equal":
+                    continue
+                if tag == "insert" and i1 == len(old_clauses):
+                    result.added_clauses.extend(new_clauses[j1:j2])
+                elif tag == "replace" and i2 - i1 == j2 - j1:
+                    for old, new in zip(old_clauses[i1:i2], new_clauses[j1:j2]):
+                        targets, texts = self._clause_substitutions(old, new, world)
+                        result.substitutions.extend(targets)
+                        result.text_substitutions.extend(texts)
+                else:
+                    raise FastPathMiss(f"clause_{tag}")
+        except FastPathMiss as miss:
+            return PlanDiff("unsupported", reason=miss.reason, change_ratio=ratio)
+        return result
+
+    def patch(
+        self, old_plan: Any, plan_diff: PlanDiff, world: WorldModel
+    ) -> Optional[Dict[str, List[Dict]]]:
+        """Apply ``plan_diff`` to ``old_plan``; ``None`` if it does not fit."""
+        if plan_diff.kind == "unchanged":
+            return {"tasks": plan_subgoals(old_plan)}
+        if plan_diff.kind != "patch":
+            return None
+        mapping = dict(plan_diff.substitutions)
+        used = set()
+        subgoals = []
+        for subgoal in plan_subgoals(old_plan):
+            tasks = []
+            for task in subgoal.get("tasks", []):
+                target = task.get("target")
+                if target in mapping:
+                    used.add(target)
+                    task = {**task, "target": mapping[target]}
+                # Robots are re-assigned by the scheduler.
+                tasks.append({k: v for k, v in task.items() if k != "robot"})
+            text = subgoal.get("subgoal", "")
+            for old_text, new_text in plan_diff.text_substitutions:
+                text = text.replace(old_text, new_text)
+            subgoals.append({**subgoal, "subgoal": text, "tasks": tasks})
+        if used != set(mapping):
+            # The plan never mentions the replaced target; a deterministic
+            # patch would silently do nothing.
+            return None
+        for clause in plan_diff.added_clauses:
+            try:
+                tasks = self.planner.expand_clause(clause, world)
+            except FastPathMiss:
+                return None
+            subgoals.append({"subgoal": clause, "tasks": tasks})
+        return {"tasks": subgoals}
+
+
+__all__ = [
+    "IncrementalReplanner",
+    "PlanDiff",
+    "get_replan_stats",
+    "reset_replan_stats",
+]
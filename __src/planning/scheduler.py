@@ -0,0 +1,247 @@
+"""Allocate subgoals to robots and build a parallel schedule.
+
+A subgoal is the unit of allocation: its pick and place must be done by
+the same hand. Subgoals that touch the same object (picked, placed, used as
+a receptacle, opened/closed) keep their plan order; everything else may run
+concurrently on different robots. Small instances are solved exactly by
+branch and bound over active schedules; larger ones use a deterministic
+critical-path list-scheduling heuristic.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+from .validator import plan_subgoals
+from .world import WorldModel
+
+DEFAULT_SKILL_DURATION = 1.0
+
+
+@dataclass(frozen=True)
+class Job:
+    index: int
+    skills: FrozenSet[str]
+    objects: FrozenSet[str]
+    duration: float
+    depends_on: Tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class ScheduledJob:
+    subgoal_index: int
+    robot: str
+    start: float
+    end: float
+
+
+@dataclass
+class Schedule:
+    jobs: List[ScheduledJob]
+    makespan: float
+    sequential_makespan: float
+    method: str
+    dependencies: Dict[int, Tuple[int, ...]] = field(default_factory=dict)
+
+    @property
+    def assignments(self) -> Dict[int, str]:
+        return {job.subgoal_index: job.robot for job in self.jobs}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "makespan": self.makespan,
+            "sequential_makespan": self.sequential_makespan,
+            "jobs": [
+                {
+                    "subgoal_index": job.subgoal_index,
+                    "robot": job.robot,
+                    "start": job.start,
+                    "end": job.end,
+                }
+                for job in self.jobs
+            ],
+            "dependencies": {str(k): list(v) for k, v in self.dependencies.items()},
+        }
+
+
+def build_jobs(
+    tasks_result: Any,
+    skill_durations: Mapping[str, float],
+    world: WorldModel | None = None,
+) -> List[Job]:
+    """One job per subgoal, with dependencies from shared objects."""
+    jobs: List[Job] = []
+    for index, subgoal in enumerate(plan_subgoals(tasks_result)):
+        tasks = subgoal.get("tasks", [])
+        skills = frozenset(task.get("skill", "") for task in tasks)
+        targets = {task.get("target", "") for task in tasks}
+        # Groups are shared surfaces, not exclusive resources.
+        if world is not None:
+            objects = frozenset(filter(world.is_object, targets))
+        else:
+            objects = frozenset(t for t in targets if not t.endswith("_group"))
+        duration = sum(
+            skill_durations.get(task.get("skill", ""), DEFAULT_SKILL_DURATION)
+            for task in tasks
+        )
+        depends_on = tuple(job.index for job in jobs if job.objects & objects)
+        jobs.append(Job(index, skills, objects, duration, depends_on))
+    return jobs
+
+
+def _capable_robots(
+    job: Job, robot_skills: Mapping[str, FrozenSet[str]]
+) -> List[str]:
+    robots = [robot for robot, skills in robot_skills.items() if job.skills <= skills]
+    # Nobody can do it: keep it on the first robot and let validation report it.
+    return robots or [next(iter(robot_skills))]
+
+
+def _tails(jobs: Sequence[Job]) -> List[float]:
+    """Longest remaining path (incl. the job itself) for each job."""
+    successors: Dict[int, List[int]] = {job.index: [] for job in jobs}
+    for job in jobs:
+        for dep in job.depends_on:
+            successors[dep].append(job.index)
+    tails = [0.0] * len(jobs)
+    for job in reversed(jobs):
+        tails[job.index] = job.duration + max(
+            (tails[succ] for succ in successors[job.index]), default=0.0
+        )
+    return tails
+
+
+class Scheduler:
+    def __init__(
+        self,
+        robot_skills: Mapping[str, Sequence[str]],
+        *,
+        skill_durations: Mapping[str, float] | None = None,
+        exact_max_subgoals: int = 6,
+    ) -> None:
+        if not robot_skills:
+            raise ValueError("robot_skills must name at least one robot.")
+        self.robot_skills = {robot: frozenset(s) for robot, s in robot_skills.items()}
+        self.skill_durations = dict(skill_durations or {})
+        self.exact_max_subgoals = exact_max_subgoals
+
+    # ! heuristic
+    def _list_schedule(self, jobs: Sequence[Job]) -> List[ScheduledJob]:
+        tails = _tails(jobs)
+        robot_free = {robot: 0.0 for robot in self.robot_skills}
+        finish: Dict[int, float] = {}
+        placed: List[ScheduledJob] = []
+        pending = list(jobs)
+        while pending:
+            ready = [
+                job for job in pending if all(dep in finish for dep in job.depends_on)
+            ]
+            # Critical path first; plan order breaks ties.
+            job = max(ready, key=lambda j: (tails[j.index], -j.index))
+            release = max((finish[dep] for dep in job.depends_on), default=0.0)
+            best: Optional[Tuple[float, int, str]] = None
+            for order, robot in enumerate(_capable_robots(job, self.robot_skills)):
+                start = max(robot_free[robot], release)
+                candidate = (start + job.duration, order, robot)
+                if best is None or candidate < best:
+                    best = candidate
+            end, _, robot = best
+            robot_free[robot] = end
+            finish[job.index] = end
+            placed.append(ScheduledJob(job.index, robot, end - job.duration, end))
+            pending.remove(job)
+        return placed
+
+    # ! exact
+    def _branch_and_bound(
+        self, jobs: Sequence[Job], upper_bound: float
+    ) -> Optional[List[ScheduledJob]]:
+        tails = _tails(jobs)
+        capable = {job.index: _capable_robots(job, self.robot_skills) for job in jobs}
+        robots = list(self.robot_skills)
+        best: Dict[str, Any] = {"makespan": upper_bound, "jobs": None}
+        finish: Dict[int, float] = {}
+        robot_free = {robot: 0.0 for robot in robots}
+        placed: List[ScheduledJob] = []
+        remaining_work = sum(job.duration for job in jobs)
+
+        def search(makespan: float, remaining_work: float) -> None:
+            if len(placed) == len(jobs):
+                if makespan < best["makespan"] - 1e-9:
+                    best["makespan"] = makespan
+                    best["jobs"] = list(placed)
+                return
+            load_bound = (sum(robot_free.values()) + remaining_work) / len(robots)
+            if max(makespan, load_bound) >= best["makespan"] - 1e-9:
+                return
+            for job in jobs:
+                if job.index in finish or any(
+                    dep not in finish for dep in job.depends_on
+                ):
+                    continue
+                release = max((finish[dep] for dep in job.depends_on), default=0.0)
+                tried = set()
+                for robot in capable[job.index]:
+                    # Interchangeable robots (same skills, same free time)
+                    # lead to symmetric subtrees.
+                    signature = (self.robot_skills[robot], robot_free[robot])
+                    if signature in tried:
+                        continue
+                    tried.add(signature)
+                    start = max(robot_free[robot], release)
+                    if start + tails[job.index] >= best["makespan"] - 1e-9:
+                        continue
+                    end = start + job.duration
+                    previous_free = robot_free[robot]
+                    robot_free[robot] = end
+                    finish[job.index] = end
+                    placed.append(ScheduledJob(job.index, robot, start, end))
+                    search(max(makespan, end), remaining_work - job.duration)
+                    placed.pop()
+                    del finish[job.index]
+                    robot_free[robot] = previous_free
+
+        search(0.0, remaining_work)
+        return best["jobs"]
+
+    def schedule(self, tasks_result: Any, world: WorldModel | None = None) -> Schedule:
+        jobs = build_jobs(tasks_result, self.skill_durations, world)
+        dependencies = {job.index: job.depends_on for job in jobs if job.depends_on}
+        sequential = sum(job.duration for job in jobs)
+        placed = self._list_schedule(jobs)
+        method = "heuristic"
+        makespan = max((job.end for job in placed), default=0.0)
+        if 1 < len(jobs) <= self.exact_max_subgoals and len(self.robot_skills) > 1:
+            exact = self._branch_and_bound(jobs, makespan)
+            method = "exact"
+            if exact is not None:
+                placed = exact
+                makespan = max(job.end for job in placed)
+        placed.sort(key=lambda job: (job.start, job.subgoal_index))
+        return Schedule(placed, makespan, sequential, method, dependencies)
+
+
+def apply_schedule(tasks_result: Any, schedule: Schedule) -> Dict[str, List[Dict]]:
+    """Copy of the plan with every task bound to its subgoal's robot."""
+    assignments = schedule.assignments
+    subgoals = []
+    for index, subgoal in enumerate(plan_subgoals(tasks_result)):
+        robot = assignments.get(index)
+        tasks = [
+            {**task, "robot": robot} if robot else dict(task)
+            for task in subgoal.get("tasks", [])
+        ]
+        subgoals.append({**subgoal, "tasks": tasks})
+    return {"tasks": subgoals}
+
+
+__all__ = [
+    "Job",
+    "Schedule",
+    "ScheduledJob",
+    "Scheduler",
+    "apply_schedule",
+    "build_jobs",
+]
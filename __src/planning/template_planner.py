@@ -0,0 +1,277 @@
+"""Rule-based fast path for canonical missions.
+
+``user_final_query`` from the supervisor is already a single, resolved
+instruction ("레몬을 아일랜드 식탁에 옮겨줘.", "Bring the lemon to the island
+table."). When every clause matches a known mission pattern and every
+mention resolves to exactly one object or group in the scene, the plan is
+expanded from ``MISSION_PATTERNS`` without calling the LLM. Anything else
+returns ``None`` and the caller falls back to goal/task decomposition.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .validator import PlanSimulator
+from .world import WorldModel
+
+# mission -> (skill, slot) steps; slots are filled from the parsed clause.
+MISSION_PATTERNS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "move": (
+        ("GoToObject", "object"),
+        ("PickObject", "object"),
+        ("GoToObject", "destination"),
+        ("PlaceObject", "destination"),
+    ),
+    "open": (("GoToObject", "object"), ("OpenObject", "object")),
+    "close": (("GoToObject", "object"), ("CloseObject", "object")),
+}
+
+# Korean nouns and English synonyms mapped to scene vocabulary.
+NOUN_ALIASES: Dict[str, str] = {
+    "사과": "apple",
+    "레몬": "lemon",
+    "포크": "fork",
+    "숟가락": "spoon",
+    "스푼": "spoon",
+    "나이프": "knife",
+    "칼": "knife",
+    "그릇": "bowl",
+    "볼": "bowl",
+    "접시": "plate",
+    "컵": "cup",
+    "머그": "mug",
+    "아일랜드": "island",
+    "카운터": "counter",
+    "식탁": "table",
+    "테이블": "table",
+    "냉장고": "fridge",
+    "서랍": "drawer",
+    "캐비닛": "cabinet",
+    "찬장": "cabinet",
+    "전자레인지": "microwave",
+    "왼쪽": "left",
+    "오른쪽": "right",
+    "refrigerator": "fridge",
+    "dish": "plate",
+}
+_IGNORED_WORDS = frozenset({"the", "a", "an", "table", "top", "of", "group", "area"})
+
+_CLAUSE_SPLIT_RE = re.compile(
+    r"\s*(?:그리고|;|\band then\b|\bthen\b|\band\b)\s*|(?<=고)\s+(?=\S+(?:을|를)\s)"
+)
+_CLAUSE_PATTERNS: Tuple[Tuple[str, re.Pattern], ...] = (
+    (
+        "move",
+        re.compile(
+            r"^(?:please\s+)?(?:move|put|place|bring|take|carry)\s+(?P<object>.+?)\s+"
+            r"(?:to|onto|on|into|in)\s+(?P<destination>.+?)$",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "move",
+        re.compile(
+            r"^(?P<object>.+?)(?:을|를)\s+(?P<destination>.+?)"
+            r"(?:\s*(?:위|안|옆))?(?:에다|에|으로|로)\s*"
+            r"(?:옮|놓|놔|가져|넣|올려|올리|두)"
+        ),
+    ),
+    ("open", re.compile(r"^(?:please\s+)?open\s+(?P<object>.+?)$", re.IGNORECASE)),
+    ("close", re.compile(r"^(?:please\s+)?close\s+(?P<object>.+?)$", re.IGNORECASE)),
+    ("open", re.compile(r"^(?P<object>.+?)(?:을|를)\s*열")),
+    ("close", re.compile(r"^(?P<object>.+?)(?:을|를)\s*닫")),
+)
+_NAME_SUFFIX_RE = re.compile(r"_\d+$")
+
+
+class FastPathMiss(Exception):
+    """Internal signal that the mission must go to the LLM planner."""
+
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+        super().__init__(reason)
+
+
+@dataclass
+class FastPathStats:
+    hits: int = 0
+    misses: Counter = field(default_factory=Counter)
+
+    @property
+    def total(self) -> int:
+        return self.hits + sum(self.misses.values())
+
+    @property
+    def coverage(self) -> float:
+        return self.hits / self.total if self.total else 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "hits": self.hits,
+            "total": self.total,
+            "coverage": round(self.coverage, 4),
+            "misses": dict(self.misses),
+        }
+
+
+_STATS = FastPathStats()
+_STATS_LOCK = threading.Lock()
+
+
+def get_fast_path_stats() -> Dict[str, object]:
+    """Fast-path coverage since start-up (or the last reset)."""
+    with _STATS_LOCK:
+        return _STATS.to_dict()
+
+
+def reset_fast_path_stats() -> None:
+    global _STATS
+    with _STATS_LOCK:
+        _STATS = FastPathStats()
+
+
+def _words(text: str) -> List[str]:
+    text = text.lower()
+    for alias, word in NOUN_ALIASES.items():
+        text = text.replace(alias, f" {word} ")
+    return [w for w in re.split(r"[^a-z0-9]+", text) if w and w not in _IGNORED_WORDS]
+
+
+def _object_words(name: str) -> List[str]:
+    base = _NAME_SUFFIX_RE.sub("", name)
+    if base.startswith("object_"):
+        base = base[len("object_") :]
+    return base.split("_")
+
+
+class TemplatePlanner:
+    """Expands canonical missions into ``TaskDecompNodeParser``-shaped plans."""
+
+    def __init__(
+        self,
+        available_skills: Iterable[str],
+        *,
+        patterns: Mapping[str, Sequence[Tuple[str, str]]] | None = None,
+    ) -> None:
+        self.available_skills = frozenset(available_skills)
+        self.patterns = dict(patterns or MISSION_PATTERNS)
+
+    # ! parsing
+    @staticmethod
+    def split_clauses(query: str) -> List[str]:
+        query = query.strip().rstrip(".!。 ")
+        clauses = (clause.strip(" ,.") for clause in _CLAUSE_SPLIT_RE.split(query))
+        return [clause for clause in clauses if clause]
+
+    @staticmethod
+    def parse_clause(clause: str) -> Tuple[str, Dict[str, str]]:
+        for mission, pattern in _CLAUSE_PATTERNS:
+            match = pattern.match(clause)
+            if match:
+                return mission, match.groupdict()
+        raise FastPathMiss("no_pattern")
+
+    # ! resolution
+    @staticmethod
+    def resolve(mention: str, world: WorldModel, *, objects_only=False) -> str:
+        words = _words(mention)
+        if not words:
+            raise FastPathMiss("unresolved_target")
+        # "the red apple" still resolves through its head noun.
+        objects = [
+            name
+            for name in world.object_groups
+            if _object_words(name) in (words, words[-1:])
+        ]
+        if len(objects) == 1:
+            return objects[0]
+        if len(objects) > 1:
+            raise FastPathMiss("ambiguous_target")
+        if objects_only:
+            raise FastPathMiss("unresolved_target")
+        # Groups: every mentioned word must appear in the group name, and
+        # like objects only one group may match ("island table" names two).
+        groups = [
+            group
+            for group in world.groups_in_order
+            if all(word in group.lower().split("_") for word in words)
+        ]
+        if len(groups) == 1:
+            return groups[0]
+        if len(groups) > 1:
+            raise FastPathMiss("ambiguous_target")
+        raise FastPathMiss("unresolved_target")
+
+    # ! planning
+    def _expand(self, mission: str, slots: Dict[str, str], world: WorldModel):
+        resolved = {
+            "object": self.resolve(
+                slots["object"], world, objects_only=mission == "move"
+            )
+        }
+        if "destination" in slots:
+            resolved["destination"] = self.resolve(slots["destination"], world)
+        tasks = []
+        for skill, slot in self.patterns[mission]:
+            if skill not in self.available_skills:
+                raise FastPathMiss("missing_skill")
+            tasks.append({"skill": skill, "target": resolved[slot]})
+        return tasks
+
+    def expand_clause(self, clause: str, world: WorldModel) -> List[Dict[str, str]]:
+        """Tasks for one clause; raises ``FastPathMiss`` if it does not fit."""
+        mission, slots = self.parse_clause(clause)
+        return self._expand(mission, slots, world)
+
+    def _plan(self, query: str, world: WorldModel) -> Dict[str, List[Dict]]:
+        subgoals = []
+        for clause in self.split_clauses(query):
+            tasks = self.expand_clause(clause, world)
+            subgoals.append({"subgoal": clause, "tasks": tasks})
+        if not subgoals:
+            raise FastPathMiss("no_pattern")
+        return {"tasks": subgoals}
+
+    def plan(
+        self,
+        query: str,
+        world: WorldModel,
+        simulator: PlanSimulator | None = None,
+    ) -> Optional[Dict[str, List[Dict]]]:
+        """Return a plan for ``query`` or ``None`` to fall back to the LLM.
+
+        With a ``simulator`` the expanded plan must also pass validation
+        (e.g. a closed receptacle falls back to the LLM).
+        """
+        try:
+            plan = self._plan(query, world)
+            if simulator is not None and not simulator.validate(plan).ok:
+                raise FastPathMiss("invalid_plan")
+        except FastPathMiss as miss:
+            with _STATS_LOCK:
+                _STATS.misses[miss.reason] += 1
+            return None
+        with _STATS_LOCK:
+            _STATS.hits += 1
+        return plan
+
+
+def make_subgoals_result(plan: Dict[str, List[Dict]]) -> Dict[str, List[str]]:
+    """``GoalDecompNodeParser``-shaped subgoals for a template plan."""
+    return {"subgoals": [subgoal["subgoal"] for subgoal in plan["tasks"]]}
+
+
+__all__ = [
+    "MISSION_PATTERNS",
+    "NOUN_ALIASES",
+    "FastPathStats",
+    "TemplatePlanner",
+    "get_fast_path_stats",
+    "make_subgoals_result",
+    "reset_fast_path_stats",
+]
@@ -0,0 +1,267 @@
+"""Symbolic simulation of ``task_decomp`` plans.
+
+Each skill has preconditions and effects over ``WorldState``. A plan is
+replayed step by step and validation stops at the first step whose
+preconditions fail, so the caller can repair just that subgoal.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .world import WorldModel, WorldState
+
+Issue = Tuple[str, str]  # (code, message)
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    index: int
+    subgoal_index: int
+    task_index: int
+    skill: str
+    target: str
+    robot: str
+
+
+@dataclass(frozen=True)
+class PlanIssue:
+    step: PlanStep
+    code: str
+    message: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "step": self.step.index,
+            "subgoal_index": self.step.subgoal_index,
+            "task_index": self.step.task_index,
+            "skill": self.step.skill,
+            "target": self.step.target,
+            "robot": self.step.robot,
+            "code": self.code,
+            "message": self.message,
+        }
+
+
+@dataclass
+class PlanValidation:
+    ok: bool
+    steps_checked: int
+    issue: Optional[PlanIssue] = None
+    # World state at the start of the failing subgoal (for targeted repair).
+    state_before_subgoal: Optional[Dict[str, Any]] = None
+    final_state: Optional[WorldState] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "steps_checked": self.steps_checked,
+            "issue": self.issue.to_dict() if self.issue else None,
+            "state_before_subgoal": self.state_before_subgoal,
+        }
+
+
+def plan_subgoals(tasks_result: Any) -> List[Dict[str, Any]]:
+    """Return the subgoal list from a ``tasks`` state value.
+
+    Accepts the dumped ``TaskDecompNodeParser`` (``{"tasks": [...]}``) or the
+    bare list.
+    """
+    if isinstance(tasks_result, Mapping):
+        tasks_result = tasks_result.get("tasks", [])
+    return list(tasks_result or [])
+
+
+def flatten_plan(tasks_result: Any, default_robot: str) -> List[PlanStep]:
+    steps: List[PlanStep] = []
+    for subgoal_index, subgoal in enumerate(plan_subgoals(tasks_result)):
+        for task_index, task in enumerate(subgoal.get("tasks", [])):
+            steps.append(
+                PlanStep(
+                    index=len(steps),
+                    subgoal_index=subgoal_index,
+                    task_index=task_index,
+                    skill=task.get("skill", ""),
+                    target=task.get("target", ""),
+                    robot=task.get("robot") or default_robot,
+                )
+            )
+    return steps
+
+
+# ! skill models
+def _require_near(state: WorldState, robot: str, target: str) -> Optional[Issue]:
+    location = state.robot_location[robot]
+    if location == target:
+        return None
+    if location is not None and state.group_of(location) == state.group_of(target):
+        return None
+    return (
+        "not_at_target",
+        f"{robot} is at {location or 'its start position'}, not at {target}; "
+        f"GoToObject {target} first.",
+    )
+
+
+def _go_to(world, state, robot, target) -> Optional[Issue]:
+    if state.object_location.get(target) == f"@{robot}":
+        return ("target_held", f"{robot} is already holding {target}.")
+    state.robot_location[robot] = target
+    return None
+
+
+def _pick(world, state, robot, target) -> Optional[Issue]:
+    if not world.is_object(target):
+        return ("not_graspable", f"{target} is a group, not an object to pick.")
+    held = state.holding[robot]
+    if held is not None:
+        return (
+            "hand_full",
+            f"{robot} is already holding {held}; place it before picking {target}.",
+        )
+    location = state.object_location[target]
+    if location.startswith("@"):
+        return ("target_held", f"{target} is held by {location[1:]}.")
+    if location in world.openable and location not in state.open_objects:
+        return ("target_closed", f"{target} is inside closed {location}.")
+    issue = _require_near(state, robot, target)
+    if issue:
+        return issue
+    state.holding[robot] = target
+    state.object_location[target] = f"@{robot}"
+    return None
+
+
+def _place(world, state, robot, target) -> Optional[Issue]:
+    held = state.holding[robot]
+    if held is None:
+        return ("hand_empty", f"{robot} holds nothing to place on {target}.")
+    if target == held:
+        return ("invalid_target", f"Cannot place {held} onto itself.")
+    if target in world.openable and target not in state.open_objects:
+        return ("target_closed", f"{target} is closed; OpenObject {target} first.")
+    issue = _require_near(state, robot, target)
+    if issue:
+        return issue
+    state.holding[robot] = None
+    # An openable receptacle contains what is put in it; otherwise the object
+    # lands in the target's group.
+    state.object_location[held] = (
+        target if target in world.openable else state.group_of(target)
+    )
+    return None
+
+
+def _open(world, state, robot, target) -> Optional[Issue]:
+    if target not in world.openable and world.openable_known:
+        return ("not_openable", f"{target} cannot be opened.")
+    if target in state.open_objects:
+        return ("already_open", f"{target} is already open.")
+    issue = _require_near(state, robot, target)
+    if issue:
+        return issue
+    state.open_objects.add(target)
+    return None
+
+
+def _close(world, state, robot, target) -> Optional[Issue]:
+    if target not in world.openable and world.openable_known:
+        return ("not_openable", f"{target} cannot be closed.")
+    if target not in state.open_objects:
+        return ("already_closed", f"{target} is already closed.")
+    issue = _require_near(state, robot, target)
+    if issue:
+        return issue
+    state.open_objects.discard(target)
+    return None
+
+
+SkillModel = Callable[[WorldModel, WorldState, str, str], Optional[Issue]]
+
+SKILL_MODELS: Dict[str, SkillModel] = {
+    "GoToObject": _go_to,
+    "PickObject": _pick,
+    "PlaceObject": _place,
+    "OpenObject": _open,
+    "CloseObject": _close,
+}
+
+
+class PlanSimulator:
+    """Replays plans against a world model for a fixed set of robot skills."""
+
+    def __init__(
+        self,
+        world: WorldModel,
+        robot_skills: Mapping[str, Sequence[str]],
+        *,
+        skill_models: Mapping[str, SkillModel] | None = None,
+    ) -> None:
+        if not robot_skills:
+            raise ValueError("robot_skills must name at least one robot.")
+        self.world = world
+        self.robot_skills = {robot: frozenset(s) for robot, s in robot_skills.items()}
+        self.default_robot = next(iter(self.robot_skills))
+        self.skill_models = dict(skill_models or SKILL_MODELS)
+
+    @classmethod
+    def from_config(cls, world: WorldModel, config_skills) -> "PlanSimulator":
+        """Build from ``Config.skills`` (a list of ``RobotSkillConfig``)."""
+        return cls(world, {robot.name: robot.skills for robot in config_skills})
+
+    def initial_state(self) -> WorldState:
+        return self.world.initial_state(self.robot_skills)
+
+    def check_step(self, state: WorldState, step: PlanStep) -> Optional[Issue]:
+        """Apply ``step`` to ``state`` in place; return an issue if it fails."""
+        model = self.skill_models.get(step.skill)
+        if model is None:
+            return ("unknown_skill", f"{step.skill!r} is not a known skill.")
+        skills = self.robot_skills.get(step.robot)
+        if skills is None:
+            return ("unknown_robot", f"{step.robot!r} is not a configured robot.")
+        if step.skill not in skills:
+            return (
+                "skill_not_available",
+                f"{step.robot} does not have the {step.skill} skill.",
+            )
+        if not self.world.has_target(step.target):
+            return (
+                "unknown_target",
+                f"{step.target!r} is not an object or group in the scene.",
+            )
+        return model(self.world, state, step.robot, step.target)
+
+    def validate(
+        self, tasks_result: Any, state: WorldState | None = None
+    ) -> PlanValidation:
+        state = self.initial_state() if state is None else state.copy()
+        subgoal_state = state
+        current_subgoal = -1
+        steps = flatten_plan(tasks_result, self.default_robot)
+        for step in steps:
+            if step.subgoal_index != current_subgoal:
+                current_subgoal = step.subgoal_index
+                subgoal_state = state.copy()
+            issue = self.check_step(state, step)
+            if issue is not None:
+                return PlanValidation(
+                    ok=False,
+                    steps_checked=step.index + 1,
+                    issue=PlanIssue(step=step, code=issue[0], message=issue[1]),
+                    state_before_subgoal=subgoal_state.describe(),
+                    final_state=state,
+                )
+        return PlanValidation(ok=True, steps_checked=len(steps), final_state=state)
+
+
+__all__ = [
+    "PlanIssue",
+    "PlanSimulator",
+    "PlanStep",
+    "PlanValidation",
+    "SKILL_MODELS",
+    "flatten_plan",
+    "plan_subgoals",
+]
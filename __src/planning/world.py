@@ -0,0 +1,207 @@
+"""World model used for symbolic plan checks.
+
+Built once per planning request from the environment server's
+``/env_entire`` payload (or, for older states, from ``object_text``), and
+copied into a small mutable ``WorldState`` for each simulation.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from ..common.logger import get_logger
+
+logger = get_logger(__name__)
+
+_OBJECT_LINE_RE = re.compile(
+    r'"object_name":\s*"(?P<object>[^"]+)",\s*"object_in_group":\s*"(?P<group>[^"]+)"'
+)
+
+_openable_assumption_logged = False
+
+
+def _log_openable_assumption() -> None:
+    global _openable_assumption_logged
+    if not _openable_assumption_logged:
+        _openable_assumption_logged = True
+        logger.info(
+            "Scene does not list openable_objects; treating every object as "
+            "not openable (nothing has to be opened first)."
+        )
+
+
+@dataclass(frozen=True)
+class WorldModel:
+    """Static facts about the scene: which objects and groups exist."""
+
+    object_groups: Mapping[str, str]
+    groups: FrozenSet[str]
+    openable: FrozenSet[str] = frozenset()
+    # False when the scene did not say what opens: ``openable`` is then
+    # empty, and explicit Open/CloseObject steps are taken at face value.
+    openable_known: bool = True
+    initially_open: FrozenSet[str] = frozenset()
+    # Scene order of ``groups``, for deterministic tie-breaking.
+    groups_in_order: Tuple[str, ...] = ()
+    # Optional (x, y) per group from the env payload's ``group_positions``.
+    group_positions: Mapping[str, Tuple[float, float]] = field(default_factory=dict)
+    # Mid-execution snapshots: robot -> held object / current target.
+    initial_holding: Mapping[str, str] = field(default_factory=dict)
+    initial_robot_location: Mapping[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, Any]) -> "WorldModel":
+        """Build from an ``/env_entire`` payload.
+
+        ``openable_objects``/``open_objects``, ``group_positions`` and the
+        ``holding``/``robot_locations`` of a running mission are used when
+        the server sends them. Without ``openable_objects`` nothing has to
+        be opened first.
+        """
+        objects_by_group = env.get("objects_by_group", {}) or {}
+        object_groups = {
+            obj: group for group, objects in objects_by_group.items() for obj in objects
+        }
+        return cls._build(
+            object_groups,
+            groups=objects_by_group.keys(),
+            openable=env.get("openable_objects"),
+            initially_open=env.get("open_objects", ()),
+            group_positions=env.get("group_positions"),
+            initial_holding=env.get("holding"),
+            initial_robot_location=env.get("robot_locations"),
+        )
+
+    @classmethod
+    def from_object_text(cls, object_text: str) -> "WorldModel":
+        object_groups = {
+            match["object"]: match["group"]
+            for match in _OBJECT_LINE_RE.finditer(object_text)
+        }
+        return cls._build(object_groups, groups=object_groups.values())
+
+    @classmethod
+    def _build(
+        cls,
+        object_groups: Dict[str, str],
+        *,
+        groups: Iterable[str],
+        openable: Optional[Iterable[str]] = None,
+        initially_open: Iterable[str] = (),
+        group_positions: Optional[Mapping[str, Sequence[float]]] = None,
+        initial_holding: Optional[Mapping[str, Optional[str]]] = None,
+        initial_robot_location: Optional[Mapping[str, Optional[str]]] = None,
+    ) -> "WorldModel":
+        group_order = tuple(dict.fromkeys(groups))
+        group_set = frozenset(group_order)
+        openable_known = openable is not None
+        if not openable_known:
+            # Guessing from names ("box", "door") made a cereal box something
+            # to open, so valid plans failed validation.
+            _log_openable_assumption()
+        return cls(
+            object_groups=dict(object_groups),
+            groups=group_set,
+            openable=frozenset(openable or ()),
+            openable_known=openable_known,
+            initially_open=frozenset(initially_open),
+            groups_in_order=group_order,
+            group_positions={
+                group: (float(position[0]), float(position[1]))
+                for group, position in (group_positions or {}).items()
+            },
+            initial_holding={
+                robot: obj for robot, obj in (initial_holding or {}).items() if obj
+            },
+            initial_robot_location={
+                robot: target
+                for robot, target in (initial_robot_location or {}).items()
+                if target
+            },
+        )
+
+    def has_target(self, name: str) -> bool:
+        return name in self.object_groups or name in self.groups
+
+    def is_object(self, name: str) -> bool:
+        return name in self.object_groups
+
+    def initial_state(self, robots: Iterable[str]) -> "WorldState":
+        robots = list(robots)
+        object_location = dict(self.object_groups)
+        holding = {robot: self.initial_holding.get(robot) for robot in robots}
+        for robot, obj in holding.items():
+            if obj is not None:
+                object_location[obj] = f"@{robot}"
+        return WorldState(
+            robot_location={
+                robot: self.initial_robot_location.get(robot) for robot in robots
+            },
+            holding=holding,
+            object_location=object_location,
+            open_objects=set(self.initially_open),
+        )
+
+
+@dataclass
+class WorldState:
+    """Mutable fluents: robot locations, held objects, open receptacles.
+
+    ``object_location`` maps an object to its group, or to ``"@<robot>"``
+    while it is being held.
+    """
+
+    robot_location: Dict[str, Optional[str]]
+    holding: Dict[str, Optional[str]]
+    object_location: Dict[str, str]
+    open_objects: Set[str] = field(default_factory=set)
+
+    def copy(self) -> "WorldState":
+        return WorldState(
+            robot_location=dict(self.robot_location),
+            holding=dict(self.holding),
+            object_location=dict(self.object_location),
+            open_objects=set(self.open_objects),
+        )
+
+    def group_of(self, name: Optional[str]) -> Optional[str]:
+        """Group a target currently sits in (a group is its own group)."""
+        if name is None:
+            return None
+        location = self.object_location.get(name, name)
+        if location.startswith("@"):
+            return self.group_of(self.robot_location.get(location[1:]))
+        if location != name and location in self.object_location:
+            # Inside a receptacle object, e.g. a drawer.
+            return self.group_of(location)
+        return location
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "robot_location": dict(self.robot_location),
+            "holding": dict(self.holding),
+            "open_objects": sorted(self.open_objects),
+        }
+
+
+def world_from_inputs(inputs: Mapping[str, Any]) -> WorldModel:
+    """World model for a planner state's ``inputs`` (``env`` preferred)."""
+    env = inputs.get("env")
+    if env:
+        return WorldModel.from_env(env)
+    return WorldModel.from_object_text(inputs.get("object_text", ""))
+
+
+__all__ = ["WorldModel", "WorldState", "world_from_inputs"]
@@ -1,7 +1,10 @@
+import json
 from typing import Callable, List
 
 from pydantic import BaseModel, Field
 
+from ..planning.validator import plan_subgoals
+
 
 def make_goal_decomp_node_inputs(state):
     return {
@@ -51,13 +54,18 @@ class GoalDecompNodeParser(BaseModel):
 def make_task_decomp_node_inputs(
     state,
 ):
-    def make_subgoals_text(subgoals):
+    def make_subgoals_text(subgoals, cached):
         subgoals = subgoals.get("subgoals", [])
+        # Subgoals answered by the subgoal memo are left out.
+        if cached and len(cached) == len(subgoals):
+            subgoals = [s for s, tasks in zip(subgoals, cached) if tasks is None]
 
         return "\n".join([f"{i+1}. {subgoal}" for i, subgoal in enumerate(subgoals)])
 
     inputs = state.get("inputs", {})
-    subgoals_text = make_subgoals_text(state.get("subgoals", []))
+    subgoals_text = make_subgoals_text(
+        state.get("subgoals", {}), state.get("memo_tasks", {}).get("tasks")
+    )
     print(f"Subgoals Text:\n{subgoals_text}\n")
 
     return {
@@ -190,6 +198,186 @@ class TaskDecompNodeParser(BaseModel):
     )
 
 
+def make_task_repair_node_inputs(state):
+    inputs = state.get("inputs", {})
+    validation = state.get("plan_validation", {})
+    issue = validation.get("issue") or {}
+    subgoals = plan_subgoals(state.get("tasks", {}))
+    subgoal = subgoals[issue.get("subgoal_index", 0)] if subgoals else {}
+
+    return {
+        "skill_text": inputs.get("skill_text", ""),
+        "object_text": inputs.get("object_text", ""),
+        "subgoal_text": subgoal.get("subgoal", ""),
+        "plan_text": json.dumps(subgoal.get("tasks", []), ensure_ascii=False),
+        "world_state_text": json.dumps(
+            validation.get("state_before_subgoal") or {}, ensure_ascii=False
+        ),
+        "failed_step_text": (
+            f"step {issue.get('task_index', 0) + 1}: "
+            f"{issue.get('skill')} {issue.get('target')}"
+        ),
+        "error_text": f"[{issue.get('code')}] {issue.get('message')}",
+    }
+
+
+TASK_REPAIR_NODE_PROMPT = """
+# Role
+You are the Task-Level Plan Repairer in the MLDT pipeline.
+One subgoal's task sequence failed a symbolic check. Fix ONLY that sequence.
+
+# Rules
+- Keep every step before the failed step unless it causes the failure.
+- Use only skills in <skill_text> and targets in <object_text>.
+- Respect the world state at the start of the subgoal (robot location, held object, open receptacles).
+- A robot must GoToObject a target before picking, placing, opening or closing it,
+  can hold one object at a time, and must OpenObject a closed receptacle before using it.
+
+<skill_text>
+{skill_text}
+</skill_text>
+
+<object_text>
+{object_text}
+</object_text>
+
+<subgoal>
+{subgoal_text}
+</subgoal>
+
+<world_state_at_subgoal_start>
+{world_state_text}
+</world_state_at_subgoal_start>
+
+<current_tasks>
+{plan_text}
+</current_tasks>
+
+<failed_step>
+{failed_step_text}
+</failed_step>
+
+<error>
+{error_text}
+</error>
+
+# Output Format
+Return ONLY the structured output that matches the JSON schema below.
+{format_instructions}
+"""
+
+
+def modify_goal_decomp_state(state, result):
+    """A new plan starts with a fresh repair budget."""
+    return {"plan_repair_count": 0}
+
+
+def modify_task_repair_state(state, result):
+    """Splice the repaired subgoal back into ``tasks``."""
+    issue = state.get("plan_validation", {}).get("issue") or {}
+    subgoals = plan_subgoals(state.get("tasks", {}))
+    index = issue.get("subgoal_index", 0)
+    if index < len(subgoals):
+        subgoals[index] = result
+    return {
+        "tasks": {"tasks": subgoals},
+        "plan_repair_count": state.get("plan_repair_count", 0) + 1,
+    }
+
+
+def make_task_patch_node_inputs(state):
+    inputs = state.get("inputs", {})
+    last_plan = state.get("last_plan", {})
+    previous_tasks = [
+        {
+            "subgoal": subgoal.get("subgoal", ""),
+            "tasks": [
+                {"skill": task.get("skill"), "target": task.get("target")}
+                for task in subgoal.get("tasks", [])
+            ],
+        }
+        for subgoal in plan_subgoals(last_plan.get("tasks", {}))
+    ]
+    return {
+        "skill_text": inputs.get("skill_text", ""),
+        "object_text": inputs.get("object_text", ""),
+        "previous_query": last_plan.get("query", ""),
+        "current_query": state.get("supervisor_result", {}).get(
+            "user_final_query", ""
+        ),
+        "previous_plan_text": json.dumps(previous_tasks, ensure_ascii=False),
+    }
+
+
+TASK_PATCH_NODE_PROMPT = """
+# Role
+You are the Task-Level Plan Patcher in the MLDT pipeline.
+The user slightly changed their mission after a plan was made.
+Edit the previous plan so it achieves the current mission.
+
+# Rules
+- Change only the subgoals and targets affected by the difference between the two missions.
+- Keep every unaffected subgoal and step exactly as it is, in the same order.
+- Use only skills in <skill_text> and targets in <object_text>.
+
+<skill_text>
+{skill_text}
+</skill_text>
+
+<object_text>
+{object_text}
+</object_text>
+
+<previous_mission>
+{previous_query}
+</previous_mission>
+
+<current_mission>
+{current_query}
+</current_mission>
+
+<previous_plan>
+{previous_plan_text}
+</previous_plan>
+
+# Output Format
+Return ONLY the structured output that matches the JSON schema below.
+{format_instructions}
+"""
+
+
+def route_plan_patch(state):
+    source = state.get("plan_source")
+    if source == "patch":
+        return "patched"
+    if source == "llm_patch":
+        return "llm_patch"
+    return "full"
+
+
+def route_subgoal_memo(state):
+    return "planned" if state.get("plan_source") == "memo" else "decompose"
+
+
+def route_template_plan(state):
+    return "planned" if state.get("plan_source") == "template" else "fallback"
+
+
+def route_execution(state):
+    execution = state.get("execution", {})
+    if execution.get("ok", True):
+        return "done"
+    return "replan" if execution.get("replanning") else "failed"
+
+
+def route_plan_validation(state, max_repairs: int = 2):
+    if state.get("plan_validation", {}).get("ok", True):
+        return "valid"
+    if state.get("plan_repair_count", 0) < max_repairs:
+        return "repair"
+    return "invalid"
+
+
 # 3. groups
 # Information about object groupings in the environment.
 # <groups_text>
@@ -2,6 +2,9 @@ from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
+from ..config.config import MemoryConfig
+from ..runner.memory import make_bounded_queries_text, make_summary_update
+
 
 def make_intent_node_inputs(state):
     user_queries = state.get("user_queries", [])
@@ -90,11 +93,15 @@ def create_user_queries_text(
     return "\n".join([f"{i+1}. {query}" for i, query in enumerate(user_queries)])
 
 
-def make_supervisor_node_inputs(state):
+def make_supervisor_node_inputs(state, memory: MemoryConfig | None = None):
+    """Build supervisor inputs; with ``memory`` only recent turns are sent."""
     inputs = state.get("inputs", {})
-    user_queries = state.get("user_queries", [])
+    if memory is None:
+        user_queries_text = create_user_queries_text(state.get("user_queries", []))
+    else:
+        user_queries_text = make_bounded_queries_text(state, memory)
     return {
-        "user_queries_text": create_user_queries_text(user_queries),
+        "user_queries_text": user_queries_text,
         "object_text": inputs.get("object_text", ""),
         "group_list_text": inputs.get("group_list_text", ""),
         "skill_text": inputs.get("skill_text", ""),
@@ -131,6 +138,7 @@ Combine information from all user_queries:
 
 ### 2) Handle overrides
 If later queries modify earlier ones (e.g., "사과 말고 레몬"), use the updated content.
+An entry marked "(이전 대화 요약)" is the mission you merged from earlier turns; treat it as the oldest query.
 
 ### 3) Output ONE mission string
 Do not output alternatives.
@@ -221,10 +229,11 @@ class SupervisorParser(BaseModel):
 
 
 def modify_supervisor_state(state, result):
-    is_feasible = state.get("supervisor_result", {}).get("is_feasible")
-    if is_feasible is False:
-        state["feedback_loop_count"] = state.get("feedback_loop_count", 0) + 1
-    return state
+    """Return extra state updates derived from the new supervisor result."""
+    update = make_summary_update(result)
+    if result.get("is_feasible") is False:
+        update["feedback_loop_count"] = state.get("feedback_loop_count", 0) + 1
+    return update
 
 
 def route_supervisor(state):
@@ -0,0 +1,328 @@
+"""Plan a JSONL file of missions with bounded concurrency and memory.
+
+Each input line is a JSON object with a ``query`` and optionally an
+``env`` (or ``context``) ``/env_entire`` snapshot. Every record runs one
+turn of the headless planner graph (``Runner.headless_graph``), which ends
+at feedback, a question answer or a plan and keeps no checkpoint.
+
+Results are appended to the output JSONL one line per record, tagged with
+its input ``index``, either in input order or as they complete. Input is
+read lazily and at most ``window`` records are between read and written,
+so memory does not grow with the file. A run that was interrupted resumes
+after the records already in the output (``resume_point``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    Literal,
+    Mapping,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+from ..common.errors import BaseServiceError, UtilsValidationError
+from .graph import HeadlessEnd
+from .llm_scheduler import BATCH, llm_priority
+from .state import StateMaker
+from .text import fetch_env
+
+Order = Literal["input", "completion"]
+MakeState = Callable[[Mapping[str, Any]], Mapping[str, Any]]
+
+# State keys copied into each output line.
+RESULT_KEYS = (
+    "intent_result",
+    "supervisor_result",
+    "feedback_result",
+    "question_answers",
+    "subgoals",
+    "tasks",
+    "plan_source",
+    "plan_validation",
+    "schedule",
+    "actions",
+    "execution",
+)
+
+_LATENCY_WINDOW = 1024
+
+
+def read_records(path: str | Path, start: int = 0) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(index, record)`` for the non-blank lines from ``start`` on.
+
+    A line that is not valid JSON yields its ``ValueError`` as the record.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            if index >= start:
+                try:
+                    yield index, json.loads(line)
+                except ValueError as err:
+                    yield index, err
+            index += 1
+
+
+def resume_point(path: str | Path) -> Tuple[int, Set[int]]:
+    """Return where an interrupted run writing ``path`` should continue.
+
+    The result is the first index missing from the output and the indices
+    above it that are already done (completion order writes out of order).
+    A partial last line left by the interruption is truncated.
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0, set()
+    done: Set[int] = set()
+    offset = 0
+    with open(path, "r+b") as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            valid_end += len(line)
+            done.add(json.loads(line)["index"])
+            while offset in done:
+                done.discard(offset)
+                offset += 1
+        f.truncate(valid_end)
+    return offset, done
+
+
+@dataclass
+class BatchStats:
+    started: float = field(default_factory=time.perf_counter)
+    done: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    latencies: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=_LATENCY_WINDOW)
+    )
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.done += 1
+        self.failed += not ok
+        self.latencies.append(latency)
+
+    def summary(self) -> Dict[str, float]:
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "done": self.done,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "elapsed_s": elapsed,
+            "per_s": self.done / elapsed if elapsed else 0.0,
+            "p50_ms": statistics.median(latencies) * 1e3 if count else 0.0,
+            "p95_ms": (
+                latencies[min(count - 1, int(count * 0.95))] * 1e3 if count else 0.0
+            ),
+        }
+
+    def line(self) -> str:
+        s = self.summary()
+        return (
+            f"done {s['done']} (failed {s['failed']}, in flight {s['in_flight']}) "
+            f"| {s['per_s']:.1f}/s | p50 {s['p50_ms']:.0f} ms "
+            f"p95 {s['p95_ms']:.0f} ms | {s['elapsed_s']:.0f} s"
+        )
+
+
+def record_state_maker(
+    state_maker: StateMaker, env: Mapping[str, Any] | None = None
+) -> MakeState:
+    """State factory for records; those without a snapshot share ``env``.
+
+    Without ``env`` the environment server is queried once, on the first
+    record that needs it.
+    """
+    shared: Dict[str, Any] = {"env": env}
+    lock = threading.Lock()
+
+    def make_state(record: Mapping[str, Any]) -> Mapping[str, Any]:
+        snapshot = record.get("env") or record.get("context")
+        if snapshot is None:
+            with lock:
+                if shared["env"] is None:
+                    shared["env"] = fetch_env(state_maker.url)
+            snapshot = shared["env"]
+        return state_maker.make(env=snapshot)
+
+    return make_state
+
+
+def _error_payload(err: Exception) -> Dict[str, Any]:
+    if isinstance(err, BaseServiceError):
+        return err.to_dict()
+    return {"error_code": type(err).__name__, "error_message": str(err)}
+
+
+class BatchRunner:
+    def __init__(
+        self,
+        graph,
+        make_state: MakeState,
+        *,
+        concurrency: int = 8,
+        order: Order = "input",
+        window: int | None = None,
+    ) -> None:
+        self.graph = graph
+        self.make_state = make_state
+        self.concurrency = concurrency
+        self.order = order
+        # Records read but not yet written; in input order a slow record
+        # holds back the ones after it only this far.
+        self.window = window or 4 * concurrency
+
+    @classmethod
+    def from_runner(
+        cls,
+        runner,
+        make_state: MakeState,
+        *,
+        end_at: HeadlessEnd = "plan",
+        **kwargs,
+    ) -> "BatchRunner":
+        return cls(runner.headless_graph(end_at), make_state, **kwargs)
+
+    async def plan(self, index: int, record: Any) -> Dict[str, Any]:
+        """Run one record; failures become an ``error`` line, not an exception."""
+        start = time.perf_counter()
+        output: Dict[str, Any] = {"index": index}
+        try:
+            if isinstance(record, Exception):
+                raise UtilsValidationError(
+                    f"Invalid JSON: {record}", details={"index": index}
+                )
+            if not isinstance(record, Mapping) or not record.get("query"):
+                raise UtilsValidationError(
+                    "Record needs a non-empty 'query'.", details={"index": index}
+                )
+            output["query"] = record["query"]
+            if "id" in record:
+                output["id"] = record["id"]
+            state = await asyncio.to_thread(self.make_state, record)
+            result = await self.graph.ainvoke(
+                {**state, "user_queries": [record["query"]]}
+            )
+            output["status"] = "ok"
+            output.update({key: result[key] for key in RESULT_KEYS if key in result})
+        except Exception as err:  # noqa: BLE001 - one bad record must not stop the run
+            output["status"] = "error"
+            output["error"] = _error_payload(err)
+        output["latency_ms"] = round((time.perf_counter() - start) * 1e3, 1)
+        return output
+
+    async def run(
+        self,
+        input_path: str | Path,
+        output: TextIO,
+        *,
+        offset: int = 0,
+        skip: Set[int] | None = None,
+        progress_interval: float | None = 5.0,
+        progress: TextIO = sys.stderr,
+    ) -> BatchStats:
+        """Plan the records of ``input_path`` from ``offset`` into ``output``.
+
+        ``skip`` lists indices at or after ``offset`` that are already done
+        (see ``resume_point``).
+        """
+        skip = set(skip or ())
+        stats = BatchStats()
+        slots = asyncio.Semaphore(self.concurrency)
+        window = asyncio.Semaphore(self.window)
+        pending: Dict[int, Dict[str, Any]] = {}
+        next_index = offset
+        tasks: Set[asyncio.Task] = set()
+
+        def write(line: Dict[str, Any]) -> None:
+            output.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+            window.release()
+
+        def deliver(line: Dict[str, Any]) -> None:
+            nonlocal next_index
+            if self.order == "completion":
+                write(line)
+                return
+            pending[line["index"]] = line
+            while next_index in pending or next_index in skip:
+                if next_index in pending:
+                    write(pending.pop(next_index))
+                skip.discard(next_index)
+                next_index += 1
+
+        async def one(index: int, record: Any) -> None:
+            try:
+                line = await self.plan(index, record)
+            finally:
+                stats.in_flight -= 1
+                slots.release()
+            stats.record(line["latency_ms"] / 1e3, line["status"] == "ok")
+            deliver(line)
+
+        async def report() -> None:
+            while True:
+                await asyncio.sleep(progress_interval)
+                print(stats.line(), file=progress, flush=True)
+
+        reporter = (
+            asyncio.create_task(report()) if progress_interval is not None else None
+        )
+        try:
+            with llm_priority(BATCH):
+                for index, record in read_records(input_path, offset):
+                    if index in skip:
+                        if self.order == "completion":
+                            skip.discard(index)
+                        continue
+                    await window.acquire()
+                    await slots.acquire()
+                    stats.in_flight += 1
+                    task = asyncio.create_task(one(index, record))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*tasks)
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+            # A cancelled run (Ctrl-C) must not leave plans behind that
+            # write to an output the caller has already closed.
+            for task in list(tasks):
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        if progress_interval is not None:
+            print(stats.line(), file=progress, flush=True)
+        return stats
+
+
+__all__ = [
+    "BatchRunner",
+    "BatchStats",
+    "read_records",
+    "record_state_maker",
+    "resume_point",
+]
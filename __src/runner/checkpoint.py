@@ -0,0 +1,673 @@
+"""Durable LangGraph checkpointer on SQLite with write-behind batching.
+
+Layout follows the per-channel scheme of LangGraph's own savers:
+
+- ``checkpoints`` holds each step's checkpoint without its values
+  (channel versions, seen versions, metadata, parent id);
+- ``blobs`` holds one row per (thread, channel, version). A step writes
+  rows only for the channels in ``new_versions``, i.e. the state keys that
+  changed in that step; unchanged keys keep pointing at older rows;
+- ``writes`` holds pending task writes and interrupts;
+- ``threads`` records when each thread was last written, for pruning.
+
+Everything is encoded with ``JsonPlusSerializer(pickle_fallback=False)``,
+which is msgpack (ormsgpack) with a JSON fallback for non-UTF-8 strings and
+never pickle.
+
+``put``/``put_writes`` only encode and enqueue; a background thread commits
+the queue in one transaction per batch (``batch_size`` rows or
+``flush_interval`` seconds, whichever comes first). Reading a thread that
+still has queued rows flushes the queue first, so reads always see every
+write. A batch whose commit fails (locked or full database) goes back to
+the head of the queue and the writer retries it with backoff. ``close``
+flushes what is left. Threads idle for ``ttl`` seconds, or older than the
+newest ``max_threads``, are deleted every ``prune_interval`` seconds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+)
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from ..common.errors import GraphExecutionError
+from ..common.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+"""
+
+_INSERT_CHECKPOINT = (
+    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_BLOB = "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?, ?, ?)"
+_INSERT_WRITE = "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_REPLACE_WRITE = "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_TOUCH_THREAD = "INSERT OR REPLACE INTO threads VALUES (?, ?)"
+_TABLES = ("checkpoints", "blobs", "writes", "threads")
+# The writer retries a failed batch after flush_interval, doubling up to this.
+_MAX_RETRY_S = 5.0
+
+
+# ! stats
+_STATS: Counter = Counter()
+_STATS_LOCK = threading.Lock()
+
+
+def _record(**values: float) -> None:
+    with _STATS_LOCK:
+        _STATS.update(values)
+
+
+def get_checkpoint_stats() -> Dict[str, float]:
+    """Checkpoint puts, encoded bytes, batches and time spent on each side."""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    puts = stats.get("puts", 0)
+    batches = stats.get("batches", 0)
+    stats["put_mean_ms"] = stats.get("put_s", 0.0) / puts * 1e3 if puts else 0.0
+    stats["bytes_per_put"] = stats.get("put_bytes", 0) / puts if puts else 0.0
+    stats["flush_mean_ms"] = (
+        stats.get("flush_s", 0.0) / batches * 1e3 if batches else 0.0
+    )
+    return stats
+
+
+def reset_checkpoint_stats() -> None:
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+Row = Tuple[str, Tuple[Any, ...]]
+
+
+# ! row encoding
+# Rows are (insert statement, parameters) pairs whose first parameter is the
+# thread id. SessionStore keeps sessions in memory in this same form.
+def _encode_put(
+    serde: SerializerProtocol,
+    config: RunnableConfig,
+    checkpoint: Checkpoint,
+    metadata: CheckpointMetadata,
+    new_versions: ChannelVersions,
+) -> List[Row]:
+    thread_id = config["configurable"]["thread_id"]
+    checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+    c = checkpoint.copy()
+    values: Dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+    rows: List[Row] = []
+    # Only channels written in this step get a new blob.
+    for channel, version in new_versions.items():
+        type_, blob = (
+            serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")
+        )
+        rows.append(
+            (
+                _INSERT_BLOB,
+                (thread_id, checkpoint_ns, channel, str(version), type_, blob),
+            )
+        )
+    type_, payload = serde.dumps_typed(c)
+    metadata_type, metadata_blob = serde.dumps_typed(
+        get_checkpoint_metadata(config, metadata)
+    )
+    rows.append(
+        (
+            _INSERT_CHECKPOINT,
+            (
+                thread_id,
+                checkpoint_ns,
+                checkpoint["id"],
+                config["configurable"].get("checkpoint_id"),
+                type_,
+                payload,
+                metadata_type,
+                metadata_blob,
+            ),
+        )
+    )
+    return rows
+
+
+def _encode_writes(
+    serde: SerializerProtocol,
+    config: RunnableConfig,
+    writes: Sequence[Tuple[str, Any]],
+    task_id: str,
+    task_path: str,
+) -> List[Row]:
+    thread_id = config["configurable"]["thread_id"]
+    checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+    checkpoint_id = config["configurable"]["checkpoint_id"]
+    rows: List[Row] = []
+    for idx, (channel, value) in enumerate(writes):
+        type_, blob = serde.dumps_typed(value)
+        # Special writes (errors, interrupts, resumes) replace earlier ones;
+        # a task's regular writes are stored once.
+        rows.append(
+            (
+                _REPLACE_WRITE if channel in WRITES_IDX_MAP else _INSERT_WRITE,
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint_id,
+                    task_id,
+                    WRITES_IDX_MAP.get(channel, idx),
+                    channel,
+                    type_,
+                    blob,
+                    task_path,
+                ),
+            )
+        )
+    return rows
+
+
+def _row_bytes(rows: Sequence[Row]) -> int:
+    return sum(
+        len(value)
+        for _, params in rows
+        for value in params
+        if isinstance(value, (bytes, str))
+    )
+
+
+def _saved_config(config: RunnableConfig, checkpoint: Checkpoint) -> RunnableConfig:
+    return {
+        "configurable": {
+            "thread_id": config["configurable"]["thread_id"],
+            "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+            "checkpoint_id": checkpoint["id"],
+        }
+    }
+
+
+def _decode_tuple(
+    serde: SerializerProtocol,
+    row: Sequence[Any],
+    checkpoint: Checkpoint,
+    blob_rows: Iterable[Sequence[Any]],
+    write_rows: Iterable[Sequence[Any]],
+) -> CheckpointTuple:
+    """Build a tuple from a checkpoint row, its decoded checkpoint, the
+    (channel, type, blob) rows of its versions and its (task_id, channel,
+    type, blob) writes."""
+    thread_id, checkpoint_ns, checkpoint_id, parent_id = row[:4]
+    return CheckpointTuple(
+        config={
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        },
+        checkpoint={
+            **checkpoint,
+            "channel_values": {
+                channel: serde.loads_typed((type_, blob))
+                for channel, type_, blob in blob_rows
+                if type_ != "empty"
+            },
+        },
+        metadata=serde.loads_typed((row[6], row[7])),
+        parent_config=(
+            {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_id,
+                }
+            }
+            if parent_id
+            else None
+        ),
+        pending_writes=[
+            (task_id, channel, serde.loads_typed((type_, blob)))
+            for task_id, channel, type_, blob in write_rows
+        ],
+    )
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[int]):
+    def __init__(
+        self,
+        path: str | Path = ":memory:",
+        *,
+        batch_size: int = 64,
+        flush_interval: float = 0.05,
+        ttl: float | None = None,
+        max_threads: int | None = None,
+        prune_interval: float = 60.0,
+        serde: SerializerProtocol | None = None,
+    ) -> None:
+        super().__init__(serde=serde or JsonPlusSerializer(pickle_fallback=False))
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self.max_threads = max_threads
+        self.prune_interval = prune_interval
+
+        self._conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # _db_lock serializes connection use and keeps batches in queue order;
+        # _cond guards the queue and the per-thread pending counts.
+        self._db_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._queue: List[Row] = []
+        self._pending: Counter = Counter()
+        self._closed = False
+        self._last_prune = time.monotonic()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="checkpoint-writer", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    # * lifecycle ----------------------------------------------------------
+    def __enter__(self) -> "SqliteCheckpointSaver":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Flush queued rows, stop the writer and close the database."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+        atexit.unregister(self.close)
+
+    # * write-behind queue -------------------------------------------------
+    def _enqueue(self, thread_id: str, rows: List[Row]) -> None:
+        rows.append((_TOUCH_THREAD, (thread_id, time.time())))
+        with self._cond:
+            if self._closed:
+                raise GraphExecutionError(
+                    "Checkpointer is closed.", details={"path": self.path}
+                )
+            self._queue.extend(rows)
+            self._pending[thread_id] += len(rows)
+            if len(self._queue) == len(rows) or len(self._queue) >= self.batch_size:
+                self._cond.notify()
+
+    def _write_loop(self) -> None:
+        retry_s = 0.0
+        while True:
+            with self._cond:
+                if retry_s:
+                    # The failed batch is back in the queue; back off first.
+                    self._cond.wait_for(lambda: self._closed, timeout=retry_s)
+                self._cond.wait_for(
+                    lambda: self._queue or self._closed, timeout=self.prune_interval
+                )
+                if self._closed:
+                    return
+                # Give concurrent steps a moment to join this batch.
+                self._cond.wait_for(
+                    lambda: len(self._queue) >= self.batch_size or self._closed,
+                    timeout=self.flush_interval,
+                )
+            try:
+                self.flush()
+                if time.monotonic() - self._last_prune >= self.prune_interval:
+                    self.prune()
+            except Exception as err:
+                # Locked or full database: keep the thread, retry later.
+                retry_s = min(max(retry_s * 2, self.flush_interval), _MAX_RETRY_S)
+                _record(flush_errors=1)
+                logger.warning(
+                    "Checkpoint flush failed, retrying in %.2fs: %s", retry_s, err
+                )
+            else:
+                retry_s = 0.0
+
+    def flush(self) -> int:
+        """Commit every queued row now; returns the number of rows written.
+
+        If the commit fails the rows go back to the head of the queue, still
+        pending, and the error is raised.
+        """
+        with self._db_lock:
+            with self._cond:
+                rows, self._queue = self._queue, []
+            if not rows:
+                return 0
+            start = time.perf_counter()
+            grouped: Dict[str, List[Tuple[Any, ...]]] = {}
+            for sql, params in rows:
+                grouped.setdefault(sql, []).append(params)
+            try:
+                self._conn.execute("BEGIN")
+                for sql, params_list in grouped.items():
+                    self._conn.executemany(sql, params_list)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                # A failed COMMIT may already have ended the transaction.
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                with self._cond:
+                    self._queue[:0] = rows
+                raise
+            with self._cond:
+                # Every row's first parameter is its thread id.
+                for _, params in rows:
+                    self._pending[params[0]] -= 1
+                self._pending = +self._pending
+            _record(batches=1, rows=len(rows), flush_s=time.perf_counter() - start)
+            return len(rows)
+
+    def _ensure_flushed(self, thread_id: str | None) -> None:
+        with self._cond:
+            dirty = self._pending[thread_id] if thread_id else bool(self._pending)
+        if dirty:
+            self.flush()
+
+    # * pruning ------------------------------------------------------------
+    def prune(self) -> int:
+        """Delete expired threads and those beyond ``max_threads``."""
+        self._last_prune = time.monotonic()
+        if self.ttl is None and self.max_threads is None:
+            return 0
+        with self._db_lock:
+            stale = set()
+            if self.ttl is not None:
+                cursor = self._conn.execute(
+                    "SELECT thread_id FROM threads WHERE updated_at < ?",
+                    (time.time() - self.ttl,),
+                )
+                stale.update(row[0] for row in cursor)
+            if self.max_threads is not None:
+                cursor = self._conn.execute(
+                    "SELECT thread_id FROM threads ORDER BY updated_at DESC "
+                    "LIMIT -1 OFFSET ?",
+                    (self.max_threads,),
+                )
+                stale.update(row[0] for row in cursor)
+            with self._cond:
+                # A thread written since its last flush is in use.
+                stale.difference_update(self._pending)
+            if stale:
+                self._delete(stale)
+        _record(pruned_threads=len(stale))
+        return len(stale)
+
+    def _delete(self, thread_ids) -> None:
+        params = [(thread_id,) for thread_id in thread_ids]
+        self._conn.execute("BEGIN")
+        try:
+            for table in _TABLES:
+                self._conn.executemany(
+                    f"DELETE FROM {table} WHERE thread_id = ?", params
+                )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._ensure_flushed(thread_id)
+        with self._db_lock:
+            self._delete([thread_id])
+
+    # * writes -------------------------------------------------------------
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        start = time.perf_counter()
+        rows = _encode_put(self.serde, config, checkpoint, metadata, new_versions)
+        self._enqueue(config["configurable"]["thread_id"], rows)
+        _record(
+            puts=1,
+            blobs=len(new_versions),
+            put_bytes=_row_bytes(rows),
+            put_s=time.perf_counter() - start,
+        )
+        return _saved_config(config, checkpoint)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        rows = _encode_writes(self.serde, config, writes, task_id, task_path)
+        self._enqueue(config["configurable"]["thread_id"], rows)
+        _record(writes=len(rows))
+
+    def put_rows(self, thread_id: str, rows: List[Row]) -> None:
+        """Queue already encoded rows, e.g. a session spilled from memory."""
+        self._enqueue(thread_id, list(rows))
+
+    def thread_rows(self, thread_id: str) -> List[Row]:
+        """Every encoded row of ``thread_id``, in ``put_rows`` form."""
+        self._ensure_flushed(thread_id)
+        rows: List[Row] = []
+        with self._db_lock:
+            for sql, table in (
+                (_INSERT_BLOB, "blobs"),
+                (_INSERT_CHECKPOINT, "checkpoints"),
+                (_REPLACE_WRITE, "writes"),
+            ):
+                cursor = self._conn.execute(
+                    f"SELECT * FROM {table} WHERE thread_id = ?", (thread_id,)
+                )
+                rows.extend((sql, tuple(row)) for row in cursor)
+        return rows
+
+    # * reads --------------------------------------------------------------
+    def _to_tuple(self, row: Tuple[Any, ...]) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id = row[:3]
+        checkpoint = self.serde.loads_typed((row[4], row[5]))
+        versions = checkpoint["channel_versions"]
+        blob_rows: List[Tuple[Any, ...]] = []
+        if versions:
+            keys = [(channel, str(version)) for channel, version in versions.items()]
+            placeholders = ", ".join("(?, ?)" for _ in keys)
+            blob_rows = self._conn.execute(
+                "SELECT channel, type, blob FROM blobs "
+                "WHERE thread_id = ? AND checkpoint_ns = ? "
+                f"AND (channel, version) IN (VALUES {placeholders})",
+                (thread_id, checkpoint_ns, *(item for key in keys for item in key)),
+            ).fetchall()
+        write_rows = self._conn.execute(
+            "SELECT task_id, channel, type, blob FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return _decode_tuple(self.serde, row, checkpoint, blob_rows, write_rows)
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        self._ensure_flushed(thread_id)
+        with self._db_lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                cursor = self._conn.execute(
+                    "SELECT * FROM checkpoints WHERE thread_id = ? "
+                    "AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                )
+            else:
+                cursor = self._conn.execute(
+                    "SELECT * FROM checkpoints WHERE thread_id = ? "
+                    "AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                )
+            row = cursor.fetchone()
+            return self._to_tuple(row) if row is not None else None
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: Dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        thread_id = None
+        if config is not None:
+            thread_id = config["configurable"]["thread_id"]
+            clauses.append("thread_id = ?")
+            params.append(thread_id)
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        self._ensure_flushed(thread_id)
+        results: List[CheckpointTuple] = []
+        with self._db_lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM checkpoints {where} "
+                "ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC",
+                params,
+            ).fetchall()
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row[6], row[7]))
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                results.append(self._to_tuple(row))
+        yield from results
+
+    # * async --------------------------------------------------------------
+    # Writes only encode and enqueue, so they run inline on the event loop;
+    # reads may hit the database and run in a worker thread.
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: Dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in results:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+__all__ = [
+    "SqliteCheckpointSaver",
+    "get_checkpoint_stats",
+    "reset_checkpoint_stats",
+]
@@ -0,0 +1,81 @@
+"""Canned planner answers for ``FakeChatModel`` (``fake_llm.enabled``).
+
+Every node gets a schema-valid answer that keeps a mission on the planning
+path: the intent is ``new``, the supervisor finds it feasible and the
+decomposition moves the apple to the right island table, which validates
+against the sample environment used by the benchmarks. Feedback,
+question-answer and repair nodes get fixed answers.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping
+
+from ..common.fake_llm import FakeChatModel
+from ..prompts import planning_prompt, process_prompt
+
+MISSION = "사과를 오른쪽 아일랜드 식탁에 옮겨줘."
+SUBGOAL = {
+    "subgoal": "사과를 오른쪽 아일랜드 식탁에 옮긴다",
+    "tasks": [
+        {"skill": "GoToObject", "target": "object_apple_0"},
+        {"skill": "PickObject", "target": "object_apple_0"},
+        {"skill": "GoToObject", "target": "island_right_group"},
+        {"skill": "PlaceObject", "target": "island_right_group"},
+    ],
+}
+
+PLANNER_SCHEMAS = [
+    process_prompt.IntentParser,
+    process_prompt.SupervisorParser,
+    process_prompt.FeedbackParser,
+    process_prompt.QuestionAnswerParser,
+    planning_prompt.GoalDecompNodeParser,
+    planning_prompt.TaskDecompNodeParser,
+    planning_prompt.SubGoal,
+]
+
+PLANNER_RESPONSES: Dict[str, Any] = {
+    "IntentParser": {"intent": "new"},
+    "SupervisorParser": {
+        "is_feasible": True,
+        "reasons": [],
+        "user_final_query": MISSION,
+    },
+    "FeedbackParser": {
+        "suggestion": MISSION,
+        "reason": ["목표 위치가 지정되지 않았습니다."],
+    },
+    "QuestionAnswerParser": {"answer": "사과는 아일랜드 왼쪽에 있습니다."},
+    "GoalDecompNodeParser": {"subgoals": [SUBGOAL["subgoal"]]},
+    "TaskDecompNodeParser": {"tasks": [SUBGOAL]},
+    "SubGoal": SUBGOAL,
+}
+
+
+def create_fake_llm(
+    model_name: str,
+    *,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    seed: int = 0,
+    responses: Mapping[str, Any] | None = None,
+) -> FakeChatModel:
+    """Fake model answering the planner's parsers; ``responses`` overrides."""
+    return FakeChatModel(
+        model_name=model_name,
+        latency=latency,
+        jitter=jitter,
+        seed=seed,
+        schemas=PLANNER_SCHEMAS,
+        responses={**PLANNER_RESPONSES, **(responses or {})},
+    )
+
+
+__all__ = [
+    "MISSION",
+    "PLANNER_RESPONSES",
+    "PLANNER_SCHEMAS",
+    "SUBGOAL",
+    "create_fake_llm",
+]
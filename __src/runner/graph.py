@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Literal, Tuple
 
@@ -9,18 +12,47 @@ from typing import Any, Callable, Dict, List, Literal, Tuple
 from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
 from langchain_core.prompt_values import PromptValue
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import END, START, StateGraph
-from openai import APIStatusError, RateLimitError
+from langgraph.types import interrupt
 
+from ..common.cassette import get_cassette, wrap_llm
 from ..common.enums import ModelNames
-from ..common.errors import LLMError, RateLimitExceededError
+from ..common.errors import LLMError, ParsingError, RateLimitExceededError
+from ..common.json_repair import JSONRepairError, parse_with_repair
 from ..common.logger import get_logger
+from ..common.node_metrics import NodeTimer
+from ..config.config import FakeLLMConfig
+from ..execution import EnvClient, ExecutionMonitor, remaining_plan
+from ..planning import (
+    ActionCompiler,
+    ActionTable,
+    PlanOptimizer,
+    PlanSimulator,
+    Scheduler,
+    TemplatePlanner,
+    world_from_inputs,
+)
+from ..planning.memo import SubgoalLibrary
+from ..planning.replan import IncrementalReplanner, record_replan
+from ..planning.scheduler import apply_schedule
+from ..planning.template_planner import make_subgoals_result
+from ..planning.validator import plan_subgoals
+from .llm_scheduler import llm_slot
+from .text import make_group_list_text, make_object_text
 
 # from .state import StateSchema
 
 StateCallable = Callable[[Any], Any]
 RouterCallable = Callable[[Any], str]
+OutputMode = Literal["prompt", "json_schema", "function_calling"]
+
+# Replaces the full JSON schema in {format_instructions} when the schema is
+# passed through the provider's structured-output API instead.
+STRUCTURED_OUTPUT_INSTRUCTIONS = (
+    "Respond only with the structured output defined by the response schema."
+)
 
 _DEFAULT_TEMPERATURE_ONLY_MODELS: set[ModelNames] = {
     ModelNames.gpt5,
@@ -137,17 +169,27 @@ class LLMChainResources:
     llm: Any
     parser: Any | None = None
     format_instructions: str = ""
+    structured_llm: Any | None = None
+    name: str = "NODE"
 
     @property
     def returns_pydantic(self) -> bool:
         return isinstance(self.parser, PydanticOutputParser)
 
-    def run(self, inputs: Dict[str, Any]) -> tuple[Any, Dict[str, Any]]:
-        prompt_value = self.prompt.invoke(inputs)
-        llm_input = _prompt_value_to_input(prompt_value)
+    def run(
+        self, inputs: Dict[str, Any], timer: NodeTimer | None = None
+    ) -> tuple[Any, Dict[str, Any]]:
+        from openai import APIStatusError, RateLimitError
+
+        timer = timer or NodeTimer(self.name)
+        with timer.phase("render"):
+            prompt_value = self.prompt.invoke(inputs)
+            llm_input = _prompt_value_to_input(prompt_value)
         model_name = _resolve_llm_model_name(self.llm)
+        runnable = self.structured_llm or self.llm
         try:
-            raw_output = self.llm.invoke(llm_input)
+            with timer.phase("llm"):
+                raw_output = runnable.invoke(llm_input)
         except RateLimitError as err:
             response = getattr(err, "response", None)
             retry_after = None
@@ -200,10 +242,47 @@ class LLMChainResources:
                     "error": str(err),
                 },
             ) from err
-        parsed_output = (
-            self.parser.invoke(raw_output) if self.parser is not None else raw_output
-        )
-        headers = extract_headers(raw_output, model_name=model_name)
+        with timer.phase("parse"):
+            if self.structured_llm is not None:
+                return self._unpack_structured(raw_output, model_name)
+            if self.returns_pydantic:
+                parsed_output = self._parse_pydantic(raw_output, model_name)
+            elif self.parser is not None:
+                parsed_output = self.parser.invoke(raw_output)
+            else:
+                parsed_output = raw_output
+            headers = extract_headers(raw_output, model_name=model_name)
+        return parsed_output, headers
+
+    def _parse_pydantic(self, raw_output: Any, model_name: str) -> Any:
+        # Local JSON repair first; a "fix only the JSON" call is the last resort.
+        try:
+            return parse_with_repair(
+                raw_output,
+                self.parser.pydantic_object,
+                node_name=self.name,
+                reprompt=self.llm.invoke,
+            )
+        except JSONRepairError as err:
+            raise ParsingError(
+                f"Output from model {model_name} could not be parsed.",
+                details={"model_name": model_name, "node": self.name, "error": str(err)},
+            ) from err
+
+    def _unpack_structured(
+        self, raw_output: Dict[str, Any], model_name: str
+    ) -> tuple[Any, Dict[str, Any]]:
+        # with_structured_output(include_raw=True) returns raw/parsed/parsing_error.
+        raw_message = raw_output.get("raw")
+        headers = extract_headers(raw_message, model_name=model_name)
+        parsed_output = raw_output.get("parsed")
+        if raw_output.get("parsing_error") is not None or parsed_output is None:
+            logger.warning(
+                "%s: structured output failed to parse (%s); trying repair.",
+                self.name,
+                raw_output.get("parsing_error"),
+            )
+            parsed_output = self._parse_pydantic(raw_message, model_name)
         return parsed_output, headers
 
 
@@ -213,22 +292,38 @@ def _build_llm_chain(
     parser: Any | None = None,
     *,
     skip_parser: bool = False,
+    output_mode: OutputMode = "prompt",
+    name: str = "NODE",
 ) -> LLMChainResources:
     prompt = PromptTemplate.from_template(prompt_text)
     if skip_parser:
-        return LLMChainResources(prompt=prompt, llm=llm)
+        return LLMChainResources(prompt=prompt, llm=llm, name=name)
 
     parser = parser or StrOutputParser()
-    format_instructions = (
-        parser.get_format_instructions()  # type: ignore[attr-defined]
-        if isinstance(parser, PydanticOutputParser)
-        else ""
+    if not isinstance(parser, PydanticOutputParser):
+        return LLMChainResources(prompt=prompt, llm=llm, parser=parser, name=name)
+
+    if output_mode == "prompt":
+        return LLMChainResources(
+            prompt=prompt,
+            llm=llm,
+            parser=parser,
+            format_instructions=parser.get_format_instructions(),
+            name=name,
+        )
+
+    # The schema travels through the provider API, so the prompt only needs a
+    # one-line reminder instead of the full JSON schema.
+    structured_llm = llm.with_structured_output(
+        parser.pydantic_object, method=output_mode, include_raw=True
     )
     return LLMChainResources(
         prompt=prompt,
         llm=llm,
         parser=parser,
-        format_instructions=format_instructions,
+        format_instructions=STRUCTURED_OUTPUT_INSTRUCTIONS,
+        structured_llm=structured_llm,
+        name=name,
     )
 
 
@@ -237,8 +332,31 @@ def create_llm(
     temperature: float = 0.0,
     prompt_cache_key: str | None = None,
     bind_tools: bool = False,
+    *,
+    fake: FakeLLMConfig | None = None,
 ):
     model_name_str = model_name.value
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        # Answers come from the cassette; no provider client (or key) needed.
+        llm = wrap_llm(None, model_name_str, cassette)
+        _tag_llm_model(llm, model_name_str)
+        return llm
+    if fake is not None and fake.enabled:
+        from .fake_llm import create_fake_llm
+
+        llm = wrap_llm(
+            create_fake_llm(
+                model_name_str,
+                latency=fake.latency_s,
+                jitter=fake.jitter_s,
+                seed=fake.seed,
+            ),
+            model_name_str,
+            cassette,
+        )
+        _tag_llm_model(llm, model_name_str)
+        return llm
     extra_body: Dict[str, Any] | None = None
     if prompt_cache_key:
         extra_body = {"prompt_cache_key": prompt_cache_key}
@@ -253,7 +371,9 @@ def create_llm(
         llm_kwargs["temperature"] = resolved_temperature
     if extra_body:
         llm_kwargs["extra_body"] = extra_body
-    llm = ChatOpenAI(**llm_kwargs)
+    from langchain_openai import ChatOpenAI
+
+    llm = wrap_llm(ChatOpenAI(**llm_kwargs), model_name_str, cassette)
     # if bind_tools:
     # logger.info("Binding tools to LLM model with %s", prompt_cache_key)
     # llm = llm.bind_tools(tools)
@@ -275,6 +395,7 @@ def make_normal_node(
     modify_state: Callable | None = None,
     printout=True,
     skip_parser: bool = False,
+    output_mode: OutputMode = "prompt",
 ) -> StateCallable:
 
     parser = (
@@ -287,33 +408,43 @@ def make_normal_node(
         prompt_text,
         parser=parser,
         skip_parser=skip_parser,
+        output_mode=output_mode,
+        name=node_name,
     )
 
     def node(state):
         logger.info(f"============= {node_name} ==============")
-        inputs = make_inputs(state)
-        if chain_resources.returns_pydantic:
-            inputs["format_instructions"] = chain_resources.format_instructions
+        with NodeTimer(node_name) as timer:
+            with timer.phase("inputs"):
+                inputs = make_inputs(state)
+                if chain_resources.returns_pydantic:
+                    inputs["format_instructions"] = (
+                        chain_resources.format_instructions
+                    )
 
-        result, _ = chain_resources.run(inputs)
-        if make_outputs is not None:
-            result = make_outputs(result)
+            with ExitStack() as slot:
+                with timer.phase("queue"):
+                    slot.enter_context(llm_slot())
+                result, _ = chain_resources.run(inputs, timer)
 
-        if chain_resources.returns_pydantic:
-            result = result.model_dump()
+            with timer.phase("parse"):
+                if make_outputs is not None:
+                    result = make_outputs(result)
+                if chain_resources.returns_pydantic:
+                    result = result.model_dump()
 
-        if modify_state is not None:
-            state = modify_state(state, result)
-
-        if state_append:
-            state[state_key].append(result)
-        else:
-            state[state_key] = result
+            # Nodes return partial updates; list keys are merged by the
+            # operator.add reducers declared on StateSchema.
+            with timer.phase("apply"):
+                update: Dict[str, Any] = {}
+                if modify_state is not None:
+                    update.update(modify_state(state, result) or {})
+                update[state_key] = [result] if state_append else result
 
         if printout:
             logger.info(f"AI Answer:\n{result}\n")
 
-        return state
+        return update
 
     return node
 
@@ -323,18 +454,23 @@ def make_user_input_node(
     state_key="user_queries",
     state_append=True,
     node_name="USER_INPUT_NODE",
+    prompt="Please enter your query: ",
 ):
+    """Pause the graph until the session's next message arrives.
+
+    The node raises a LangGraph interrupt; the checkpointer persists the
+    state and ``Command(resume=message)`` on the same ``thread_id`` resumes
+    here with ``message`` as the user query. No thread is blocked while a
+    session waits.
+    """
+
     def node(state):
         logger.info(f"============= {node_name} ==============")
-        # Here you would implement the logic to get user input.
-        # For demonstration, we'll just log the existing user queries.
-        current_user_query = input("Please enter your query: ")
-        if state_append:
-            state[state_key].append(current_user_query)
-        else:
-            state[state_key] = current_user_query
+        current_user_query = interrupt({"prompt": prompt, "node": node_name})
         logger.info(f"User Query: {current_user_query}\n")
-        return state
+        if state_append:
+            return {state_key: [current_user_query]}
+        return {state_key: current_user_query}
 
     return node
 
@@ -353,35 +489,509 @@ def make_rag_node(
         query = state.get("user_queries", [])[-1] if state.get("user_queries") else ""
         documents = retriever.invoke(query)
         rag_texts = [doc.page_content for doc in documents]
-        if state_append:
-            state[state_key].extend(rag_texts)
-        else:
-            state[state_key] = rag_texts
         logger.info(f"RAG Texts Retrieved: {rag_texts}\n")
-        return state
+        # With state_append the state key needs an operator.add reducer.
+        return {state_key: rag_texts}
+
+    return node
+
+
+# ! plan patch node
+def make_plan_patch_node(
+    robot_skills: Dict[str, List[str]],
+    *,
+    llm_patch_max_change_ratio: float = 0.5,
+    query_key="supervisor_result",
+    last_plan_key="last_plan",
+    node_name="PLAN_PATCH_NODE",
+):
+    """Patch ``state[last_plan_key]`` for a follow-up mission if possible.
+
+    Sets ``plan_source`` to ``"patch"`` (deterministic patch applied),
+    ``"llm_patch"`` (small diff, ask the LLM to patch) or ``"full"``.
+    """
+    replanner = IncrementalReplanner(
+        TemplatePlanner({skill for skills in robot_skills.values() for skill in skills})
+    )
+
+    def node(state):
+        logger.info(f"============= {node_name} ==============")
+        # Every planning pass starts with a fresh repair budget; the full
+        # plan path resets it in template_plan or goal_decomp.
+        update: Dict[str, Any] = {"plan_repair_count": 0}
+        last_plan = state.get(last_plan_key) or {}
+        query = state.get(query_key, {}).get("user_final_query", "")
+        if not last_plan.get("tasks") or not query:
+            record_replan("full")
+            update["plan_source"] = "full"
+            return update
+
+        world = world_from_inputs(state.get("inputs", {}))
+        plan_diff = replanner.diff(last_plan.get("query", ""), query, world)
+        plan = replanner.patch(last_plan["tasks"], plan_diff, world)
+        update["plan_patch"] = plan_diff.to_dict()
+        if plan is not None:
+            logger.info(f"Patched previous plan: {plan_diff.to_dict()}")
+            record_replan("unchanged" if plan_diff.kind == "unchanged" else "patched")
+            update.update(
+                {
+                    "subgoals": make_subgoals_result(plan),
+                    "tasks": plan,
+                    "plan_source": "patch",
+                }
+            )
+        elif plan_diff.change_ratio <= llm_patch_max_change_ratio:
+            record_replan("llm_patch")
+            update["plan_source"] = "llm_patch"
+        else:
+            record_replan("full")
+            update["plan_source"] = "full"
+        return update
+
+    return node
+
+
+# ! plan validation node
+def make_plan_validation_node(
+    robot_skills: Dict[str, List[str]],
+    *,
+    plan_key="tasks",
+    state_key="plan_validation",
+    node_name="PLAN_VALIDATION_NODE",
+):
+    """Symbolically replay ``state[plan_key]``; no LLM call."""
+
+    def node(state):
+        logger.info(f"============= {node_name} ==============")
+        world = world_from_inputs(state.get("inputs", {}))
+        validation = PlanSimulator(world, robot_skills).validate(
+            state.get(plan_key, {})
+        )
+        if validation.ok:
+            logger.info(f"Plan valid ({validation.steps_checked} steps).")
+        else:
+            logger.warning(f"Plan invalid: {validation.issue.to_dict()}")
+        return {state_key: validation.to_dict()}
+
+    return node
+
+
+# ! template plan node
+def make_template_plan_node(
+    robot_skills: Dict[str, List[str]],
+    *,
+    query_key="supervisor_result",
+    node_name="TEMPLATE_PLAN_NODE",
+):
+    """Plan canonical missions without the LLM; sets ``plan_source``."""
+    planner = TemplatePlanner(
+        {skill for skills in robot_skills.values() for skill in skills}
+    )
+
+    def node(state):
+        logger.info(f"============= {node_name} ==============")
+        query = state.get(query_key, {}).get("user_final_query", "")
+        world = world_from_inputs(state.get("inputs", {}))
+        plan = planner.plan(query, world, PlanSimulator(world, robot_skills))
+        if plan is None:
+            logger.info("No template matched; falling back to LLM planning.")
+            return {"plan_source": "llm"}
+        logger.info(f"Template plan:\n{plan}\n")
+        return {
+            "subgoals": make_subgoals_result(plan),
+            "tasks": plan,
+            "plan_source": "template",
+            "plan_repair_count": 0,
+        }
 
     return node
 
 
+# ! subgoal memo nodes
+def make_subgoal_memo_node(
+    library: SubgoalLibrary,
+    robot_skills: Dict[str, List[str]],
+    *,
+    subgoals_key="subgoals",
+    state_key="memo_tasks",
+    node_name="SUBGOAL_MEMO_NODE",
+):
+    """Reuse learned expansions for ``goal_decomp`` subgoals.
+
+    ``state[state_key]`` holds one entry per subgoal: the cached tasks or
+    ``None``. Sets ``plan_source`` to ``"memo"`` when every subgoal hit and
+    the assembled plan validates, ``"llm"`` otherwise.
+    """
+
+    def node(state):
+        logger.info(f"============= {node_name} ==============")
+        world = world_from_inputs(state.get("inputs", {}))
+        subgoals = state.get(subgoals_key, {}).get("subgoals", [])
+        cached = [library.lookup(subgoal, world) for subgoal in subgoals]
+        hits = sum(tasks is not None for tasks in cached)
+        logger.info(f"Subgoal memo: {hits}/{len(subgoals)} hits.")
+        update: Dict[str, Any] = {
+            state_key: {"tasks": cached},
+            "plan_source": "llm",
+        }
+        if subgoals and hits == len(subgoals):
+            plan = {
+                "tasks": [
+                    {"subgoal": subgoal, "tasks": tasks}
+                    for subgoal, tasks in zip(subgoals, cached)
+                ]
+            }
+            if PlanSimulator(world, robot_skills).validate(plan).ok:
+                update.update({"tasks": plan, "plan_source": "memo"})
+            else:
+                # Cached steps do not fit this scene (e.g. a closed
+                # receptacle); decompose everything again.
+                update[state_key] = {"tasks": [None] * len(subgoals)}
+        return update
+
+    return node
+
+
+def make_subgoal_learn_node(
+    library: SubgoalLibrary,
+    robot_skills: Dict[str, List[str]],
+    *,
+    subgoals_key="subgoals",
+    memo_key="memo_tasks",
+    plan_key="tasks",
+    node_name="SUBGOAL_LEARN_NODE",
+):
+    """Merge cached and ``task_decomp`` subgoals and learn the new ones.
+
+    ``task_decomp`` only sees the subgoals that missed, so its output fills
+    the ``None`` entries of ``state[memo_key]`` in order. Expansions are
+    learned only if the merged plan validates.
+    """
+
+    def node(state):
+        logger.info(f"============= {node_name} ==============")
+        world = world_from_inputs(state.get("inputs", {}))
+        subgoals = state.get(subgoals_key, {}).get("subgoals", [])
+        cached = state.get(memo_key, {}).get("tasks") or [None] * len(subgoals)
+        decomposed = plan_subgoals(state.get(plan_key, {}))
+        missed = [i for i, tasks in enumerate(cached) if tasks is None]
+        if len(decomposed) != len(missed) or len(cached) != len(subgoals):
+            logger.warning(
+                f"task_decomp returned {len(decomposed)} subgoals for "
+                f"{len(missed)} misses; not merging."
+            )
+            return {}
+
+        merged = [
+            {"subgoal": subgoal, "tasks": tasks}
+            for subgoal, tasks in zip(subgoals, cached)
+        ]
+        for index, subgoal in zip(missed, decomposed):
+            merged[index] = subgoal
+        plan = {"tasks": merged}
+        if PlanSimulator(world, robot_skills).validate(plan).ok:
+            learned = sum(
+                library.learn(subgoals[i], merged[i].get("tasks", []), world)
+                for i in missed
+            )
+            logger.info(f"Learned {learned}/{len(missed)} subgoal expansions.")
+            library.save()
+        return {plan_key: plan}
+
+    return node
+
+
+# ! plan optimize node
+def make_plan_optimize_node(
+    *,
+    exact_max_subgoals: int = 8,
+    plan_key="tasks",
+    state_key="plan_optimization",
+    node_name="PLAN_OPTIMIZE_NODE",
+):
+    """Drop redundant moves and reorder independent subgoals by travel."""
+
+    def node(state):
+        logger.info(f"============= {node_name} ==============")
+        world = world_from_inputs(state.get("inputs", {}))
+        optimizer = PlanOptimizer(world, exact_max_subgoals=exact_max_subgoals)
+        plan, report = optimizer.optimize(state.get(plan_key, {}))
+        logger.info(
+            f"Estimated travel {report.travel_before:g} -> {report.travel_after:g} "
+            f"({report.dropped_moves} redundant moves dropped)."
+        )
+        return {plan_key: plan, state_key: report.to_dict()}
+
+    return node
+
+
+# ! schedule node
+def make_schedule_node(
+    scheduler: Scheduler,
+    *,
+    plan_key="tasks",
+    state_key="schedule",
+    node_name="SCHEDULE_NODE",
+):
+    """Assign subgoals to robots and bind every task to its robot."""
+
+    def node(state):
+        logger.info(f"============= {node_name} ==============")
+        world = world_from_inputs(state.get("inputs", {}))
+        plan = state.get(plan_key, {})
+        schedule = scheduler.schedule(plan, world)
+        logger.info(
+            f"Schedule ({schedule.method}): makespan {schedule.makespan:g} "
+            f"vs. {schedule.sequential_makespan:g} sequential."
+        )
+        return {
+            plan_key: apply_schedule(plan, schedule),
+            state_key: schedule.to_dict(),
+        }
+
+    return node
+
+
+# ! action compile node
+def make_action_compile_node(
+    compiler: ActionCompiler,
+    *,
+    plan_key="tasks",
+    state_key="actions",
+    query_key="supervisor_result",
+    last_plan_key: str | None = "last_plan",
+    node_name="ACTION_COMPILE_NODE",
+):
+    """Expand the task plan into compact primitive action records.
+
+    The compiled plan and its mission are also kept under ``last_plan_key``
+    so that follow-up edits can be patched incrementally.
+    """
+
+    def node(state):
+        logger.info(f"============= {node_name} ==============")
+        plan = state.get(plan_key, {})
+        table = compiler.compile(plan)
+        logger.info(f"Compiled {len(table)} primitive actions.")
+        update: Dict[str, Any] = {state_key: table.to_state()}
+        # A re-planned suffix is not the whole mission; keep it out of
+        # last_plan.
+        suffix = state.get("execution_replan_count", 0) > 0
+        if last_plan_key is not None and not suffix:
+            update[last_plan_key] = {
+                "query": state.get(query_key, {}).get("user_final_query", ""),
+                "tasks": plan,
+            }
+        return update
+
+    return node
+
+
+# ! execute node
+def _run_coroutine(coroutine):
+    """Run ``coroutine`` to completion from sync graph code."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # Already inside an event loop (async caller): use a worker thread.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def make_execute_node(
+    make_client: Callable[[Any], EnvClient],
+    *,
+    url: str | None = None,
+    step_timeout: float = 30.0,
+    max_replans: int = 2,
+    plan_key="tasks",
+    actions_key="actions",
+    schedule_key="schedule",
+    state_key="execution",
+    node_name="EXECUTE_NODE",
+):
+    """Execute ``state[actions_key]`` and hand a failed suffix back to planning.
+
+    On failure, up to ``max_replans`` times per mission, the remaining
+    subgoals become the new ``subgoals``, the scene is refreshed from the
+    environment and ``state[state_key]["replanning"]`` is set.
+    """
+
+    async def execute(state):
+        client = make_client(state)
+        try:
+            monitor = ExecutionMonitor(client, step_timeout=step_timeout)
+            dependencies = {
+                int(index): deps
+                for index, deps in state.get(schedule_key, {})
+                .get("dependencies", {})
+                .items()
+            }
+            table = ActionTable.from_state(state.get(actions_key, {}))
+            report = await monitor.run(table, dependencies)
+            env = None if report.ok else await client.fetch_env()
+            return report, env
+        finally:
+            await client.aclose()
+
+    def node(state):
+        logger.info(f"============= {node_name} ==============")
+        report, env = _run_coroutine(execute(state))
+        replans = state.get("execution_replan_count", 0)
+        replanning = not report.ok and replans < max_replans
+        update: Dict[str, Any] = {
+            state_key: {**report.to_dict(), "replanning": replanning},
+            "execution_replan_count": 0,
+        }
+        if report.ok:
+            logger.info(f"Executed {len(report.steps)} actions.")
+            return update
+
+        failed = report.steps[report.failed_step]
+        logger.warning(
+            f"Step {failed.index} ({failed.action.command()}) failed: "
+            f"{failed.message}"
+        )
+        if not replanning:
+            logger.warning(f"Giving up after {replans} suffix re-plans.")
+            update["last_plan"] = {}
+            return update
+
+        logger.info(f"Re-planning {len(report.remaining_subgoals)} remaining subgoals.")
+        inputs = dict(state.get("inputs", {}))
+        inputs["env"] = env
+        inputs["object_text"] = make_object_text(url, env=env)
+        inputs["group_list_text"] = make_group_list_text(url, env=env)
+        update.update(
+            {
+                "inputs": inputs,
+                "subgoals": {"subgoals": remaining_plan(state.get(plan_key), report)},
+                "plan_source": "suffix",
+                "plan_repair_count": 0,
+                "execution_replan_count": replans + 1,
+                # A partly executed plan cannot be patched on the next turn.
+                "last_plan": {},
+            }
+        )
+        return update
+
+    return node
+
+
+HeadlessEnd = Literal["plan", "task_decomp"]
+
+
 def make_supervised_plan_graph(
     state_schema,
     nodes: Dict[str, Any],
     routers: Dict[str, Any],
     thread_id: str = "supervised_planning",
+    checkpointer: BaseCheckpointSaver | None = None,
 ):
+    """Interactive planner: every turn starts at ``user_input``.
+
+    Feedback and question answers loop back to ``user_input``.
+    """
     workflow = StateGraph(state_schema=state_schema)
-    # * ============================================================
     workflow.add_node("user_input", nodes["user_input"])
+    workflow.add_edge(START, "user_input")
+    workflow.add_edge("user_input", "intent")
+    _add_plan_topology(workflow, nodes, routers, turn_end="user_input")
+
+    # user_input interrupts, so the graph always needs a checkpointer;
+    # sessions are told apart by the ``thread_id`` in the run config.
+    graph = workflow.compile(
+        checkpointer=checkpointer if checkpointer is not None else InMemorySaver()
+    )
+    config = {"configurable": {"thread_id": thread_id}}
+    return graph, config
+
+
+def make_headless_plan_graph(
+    state_schema,
+    nodes: Dict[str, Any],
+    routers: Dict[str, Any],
+    *,
+    end_at: HeadlessEnd = "plan",
+):
+    """One non-interactive turn over ``state["user_queries"][-1]``.
+
+    The graph starts at ``intent`` and ends at END after feedback, a
+    question answer, or planning, so it never waits for input and needs no
+    checkpointer. ``end_at="plan"`` keeps the configured plan tail up to
+    ``action_compile``; ``"task_decomp"`` stops once the task plan exists.
+    Execution is left out, since its re-plans loop back into planning; the
+    only cycle left is the plan repair, bounded by ``max_repairs``.
+    """
+    workflow = StateGraph(state_schema=state_schema)
+    workflow.add_edge(START, "intent")
+    _add_plan_topology(
+        workflow,
+        {key: node for key, node in nodes.items() if key != "execute"},
+        routers,
+        turn_end=END,
+        plan_tail=end_at == "plan",
+    )
+    return workflow.compile(), {"configurable": {}}
+
+
+def _add_plan_topology(
+    workflow: StateGraph,
+    nodes: Dict[str, Any],
+    routers: Dict[str, Any],
+    *,
+    turn_end: str,
+    plan_tail: bool = True,
+) -> None:
+    """Add the nodes from ``intent`` on; feedback and QA go to ``turn_end``.
+
+    Without ``plan_tail`` planning ends after task_decomp (or a template or
+    memo plan) instead of running the optional plan tail.
+    """
     workflow.add_node("intent", nodes["intent"])
     workflow.add_node("supervisor", nodes["supervisor"])
     workflow.add_node("feedback", nodes["feedback"])
     workflow.add_node("goal_decomp", nodes["goal_decomp"])
     workflow.add_node("task_decomp", nodes["task_decomp"])
     workflow.add_node("question_answer", nodes["question_answer"])
+    template_plan = "template_plan" in nodes
+    if template_plan:
+        workflow.add_node("template_plan", nodes["template_plan"])
+    patch_plan = "plan_patch" in nodes
+    if patch_plan:
+        workflow.add_node("plan_patch", nodes["plan_patch"])
+        workflow.add_node("task_patch", nodes["task_patch"])
+    full_plan = "template_plan" if template_plan else "goal_decomp"
+    memo_plan = "subgoal_memo" in nodes
+    if memo_plan:
+        workflow.add_node("subgoal_memo", nodes["subgoal_memo"])
+        workflow.add_node("subgoal_learn", nodes["subgoal_learn"])
+    validate_plan = plan_tail and "plan_validation" in nodes
+    if validate_plan:
+        workflow.add_node("plan_validation", nodes["plan_validation"])
+        workflow.add_node("task_repair", nodes["task_repair"])
+    compile_actions = plan_tail and "action_compile" in nodes
+    if compile_actions:
+        workflow.add_node("action_compile", nodes["action_compile"])
+    execute_plan = compile_actions and "execute" in nodes
+    if execute_plan:
+        workflow.add_node("execute", nodes["execute"])
+    schedule_plan = plan_tail and "schedule" in nodes
+    if schedule_plan:
+        workflow.add_node("schedule", nodes["schedule"])
+    optimize_plan = plan_tail and "plan_optimize" in nodes
+    if optimize_plan:
+        workflow.add_node("plan_optimize", nodes["plan_optimize"])
+    # Optional plan tail:
+    # [plan_optimize] -> [schedule] -> [plan_validation] -> [action_compile]
+    # -> [execute] -> END (a failed execution re-plans the remaining suffix)
+    after_valid_plan = "action_compile" if compile_actions else END
+    after_schedule = "plan_validation" if validate_plan else after_valid_plan
+    after_optimize = "schedule" if schedule_plan else after_schedule
+    after_plan = "plan_optimize" if optimize_plan else after_optimize
 
     # * ============================================================
-    workflow.add_edge(START, "user_input")
-    workflow.add_edge("user_input", "intent")
     workflow.add_conditional_edges(
         "intent",
         routers["intent"],
@@ -397,17 +1007,61 @@ def make_supervised_plan_graph(
         "supervisor",
         routers["supervisor"],
         {
-            "feasible": "goal_decomp",
+            "feasible": "plan_patch" if patch_plan else full_plan,
             "not_feasible": "feedback",
         },
     )
-    workflow.add_edge("question_answer", "user_input")
-    workflow.add_edge("feedback", "user_input")
-    workflow.add_edge("goal_decomp", "task_decomp")
-    workflow.add_edge("task_decomp", END)
-
-    # memory = MemorySaver()
-    # graph = workflow.compile(checkpointer=memory)
-    graph = workflow.compile(checkpointer=None)
-    config = {"configurable": {"thread_id": thread_id}}
-    return graph, config
+    if template_plan:
+        workflow.add_conditional_edges(
+            "template_plan",
+            routers["template_plan"],
+            {
+                "planned": after_plan,
+                "fallback": "goal_decomp",
+            },
+        )
+    workflow.add_edge("question_answer", turn_end)
+    workflow.add_edge("feedback", turn_end)
+    if memo_plan:
+        workflow.add_edge("goal_decomp", "subgoal_memo")
+        workflow.add_conditional_edges(
+            "subgoal_memo",
+            routers["subgoal_memo"],
+            {"planned": after_plan, "decompose": "task_decomp"},
+        )
+        workflow.add_edge("task_decomp", "subgoal_learn")
+        workflow.add_edge("subgoal_learn", after_plan)
+    else:
+        workflow.add_edge("goal_decomp", "task_decomp")
+        workflow.add_edge("task_decomp", after_plan)
+    if patch_plan:
+        workflow.add_conditional_edges(
+            "plan_patch",
+            routers["plan_patch"],
+            {"patched": after_plan, "llm_patch": "task_patch", "full": full_plan},
+        )
+        workflow.add_edge("task_patch", after_plan)
+    if validate_plan:
+        workflow.add_conditional_edges(
+            "plan_validation",
+            routers["plan_validation"],
+            {"valid": after_valid_plan, "repair": "task_repair", "invalid": END},
+        )
+        workflow.add_edge("task_repair", after_plan)
+    if optimize_plan:
+        workflow.add_edge("plan_optimize", after_optimize)
+    if schedule_plan:
+        workflow.add_edge("schedule", after_schedule)
+    if execute_plan:
+        workflow.add_edge("action_compile", "execute")
+        workflow.add_conditional_edges(
+            "execute",
+            routers["execute"],
+            {
+                "done": END,
+                "replan": "subgoal_memo" if memo_plan else "task_decomp",
+                "failed": END,
+            },
+        )
+    elif compile_actions:
+        workflow.add_edge("action_compile", END)
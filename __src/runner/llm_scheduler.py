@@ -0,0 +1,266 @@
+"""Priority scheduling of LLM calls across sessions and batch jobs.
+
+Every LLM node takes a slot from the process-wide ``LLMScheduler`` before
+calling the model. Calls are tagged with a priority class through
+``llm_priority`` (a context variable, so it follows a run into LangGraph's
+worker threads); untagged calls are ``interactive``. ``Runner.batch`` tags
+its runs ``batch``.
+
+Slots are handed out by weighted fair queuing: each queued call gets a
+virtual finish time ``max(virtual time, last finish of its class) +
+1 / weight`` and the smallest finish time among classes under their own
+concurrency limit goes next. A flood of batch calls therefore only gets
+its weight's share of the model while interactive calls are waiting, and
+all of it when none are.
+
+A class whose queue holds ``max_queue`` calls, or a call that waited
+``queue_timeout`` seconds, is shed with ``RateLimitExceededError``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, Mapping
+
+from ..common.errors import RateLimitExceededError, UtilsValidationError
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+_WAIT_WINDOW = 1024
+
+_priority: ContextVar[str] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@dataclass(frozen=True)
+class PriorityClass:
+    # Share of the model while several classes are waiting.
+    weight: float = 1.0
+    # Calls of this class in flight at once.
+    max_concurrency: int = 16
+    # Waiting calls before new ones are shed.
+    max_queue: int = 256
+
+
+@dataclass
+class _Waiter:
+    start: float
+    finish: float
+    granted: bool = False
+
+
+@dataclass
+class _ClassState:
+    spec: PriorityClass
+    queue: Deque[_Waiter] = field(default_factory=deque)
+    in_flight: int = 0
+    last_finish: float = 0.0
+    admitted: int = 0
+    shed: int = 0
+    waits: Deque[float] = field(default_factory=lambda: deque(maxlen=_WAIT_WINDOW))
+
+
+def _percentile_ms(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1e3
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        classes: Mapping[str, PriorityClass] | None = None,
+        *,
+        max_concurrency: int = 16,
+        queue_timeout: float = 60.0,
+    ) -> None:
+        classes = classes or {
+            INTERACTIVE: PriorityClass(weight=8.0),
+            BATCH: PriorityClass(weight=1.0, max_concurrency=8, max_queue=10000),
+        }
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._classes = {name: _ClassState(spec) for name, spec in classes.items()}
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        # Start tag of the last dispatched call (start-time fair queuing).
+        self._virtual = 0.0
+
+    @classmethod
+    def from_config(cls, config: Any) -> "LLMScheduler":
+        return cls(
+            {
+                name: PriorityClass(
+                    weight=spec.weight,
+                    max_concurrency=spec.max_concurrency,
+                    max_queue=spec.max_queue,
+                )
+                for name, spec in config.classes.items()
+            },
+            max_concurrency=config.max_concurrency,
+            queue_timeout=config.queue_timeout_s,
+        )
+
+    def _state(self, priority: str) -> _ClassState:
+        state = self._classes.get(priority)
+        if state is None:
+            raise UtilsValidationError(
+                f"Unknown LLM priority class: {priority!r}",
+                details={"priority": priority, "classes": list(self._classes)},
+            )
+        return state
+
+    def _shed(self, priority: str, state: _ClassState, reason: str):
+        state.shed += 1
+        return RateLimitExceededError(
+            f"LLM is busy ({priority} {reason}); retry later.",
+            domain="llm_scheduler",
+            details={
+                "priority": priority,
+                "in_flight": state.in_flight,
+                "queued": len(state.queue),
+                "retry_after_s": max(1, round(self.queue_timeout)),
+            },
+        )
+
+    def _dispatch(self) -> None:
+        granted = False
+        while self._in_flight < self.max_concurrency:
+            ready = [
+                state
+                for state in self._classes.values()
+                if state.queue and state.in_flight < state.spec.max_concurrency
+            ]
+            if not ready:
+                break
+            state = min(ready, key=lambda item: item.queue[0].finish)
+            waiter = state.queue.popleft()
+            waiter.granted = True
+            state.in_flight += 1
+            self._in_flight += 1
+            self._virtual = waiter.start
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def acquire(self, priority: str | None = None) -> str:
+        """Block until a slot is free; returns the class to ``release``."""
+        priority = priority or _priority.get()
+        begin = time.perf_counter()
+        with self._cond:
+            state = self._state(priority)
+            if len(state.queue) >= state.spec.max_queue:
+                raise self._shed(priority, state, "queue full")
+            start = max(self._virtual, state.last_finish)
+            waiter = _Waiter(start, start + 1.0 / state.spec.weight)
+            state.last_finish = waiter.finish
+            state.queue.append(waiter)
+            self._dispatch()
+            if not self._cond.wait_for(lambda: waiter.granted, self.queue_timeout):
+                state.queue.remove(waiter)
+                raise self._shed(priority, state, "queue timeout")
+            state.admitted += 1
+            state.waits.append(time.perf_counter() - begin)
+        return priority
+
+    def release(self, priority: str) -> None:
+        with self._cond:
+            self._classes[priority].in_flight -= 1
+            self._in_flight -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority: str | None = None) -> Iterator[None]:
+        priority = self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            classes = {}
+            for name, state in self._classes.items():
+                waits = sorted(state.waits)
+                classes[name] = {
+                    "in_flight": state.in_flight,
+                    "queued": len(state.queue),
+                    "admitted": state.admitted,
+                    "shed": state.shed,
+                    "queue_wait_p50_ms": _percentile_ms(waits, 0.5),
+                    "queue_wait_p95_ms": _percentile_ms(waits, 0.95),
+                    "queue_wait_max_ms": waits[-1] * 1e3 if waits else 0.0,
+                }
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "classes": classes,
+            }
+
+    def reset_stats(self) -> None:
+        with self._cond:
+            for state in self._classes.values():
+                state.admitted = state.shed = 0
+                state.waits.clear()
+
+
+_scheduler: LLMScheduler | None = None
+
+
+def set_llm_scheduler(scheduler: LLMScheduler | None) -> None:
+    """Install the process-wide scheduler; None lets LLM calls run unqueued."""
+    global _scheduler
+    _scheduler = scheduler
+
+
+def get_llm_scheduler() -> LLMScheduler | None:
+    return _scheduler
+
+
+@contextmanager
+def llm_priority(priority: str) -> Iterator[None]:
+    """Run the LLM calls made inside the block as ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def llm_slot() -> Iterator[None]:
+    """Hold a slot of the installed scheduler, if any, around one LLM call."""
+    scheduler = _scheduler
+    if scheduler is None:
+        yield
+        return
+    with scheduler.slot():
+        yield
+
+
+def get_llm_scheduler_stats() -> Dict[str, Any]:
+    return _scheduler.stats() if _scheduler is not None else {}
+
+
+def reset_llm_scheduler_stats() -> None:
+    if _scheduler is not None:
+        _scheduler.reset_stats()
+
+
+__all__ = [
+    "BATCH",
+    "INTERACTIVE",
+    "LLMScheduler",
+    "PriorityClass",
+    "get_llm_scheduler",
+    "get_llm_scheduler_stats",
+    "llm_priority",
+    "llm_slot",
+    "reset_llm_scheduler_stats",
+    "set_llm_scheduler",
+]
@@ -0,0 +1,73 @@
+"""Bounded conversation memory for the supervisor feedback loop.
+
+The supervisor already merges every earlier query into ``user_final_query``.
+That merged mission is kept as a rolling summary, so only the last few raw
+turns need to be re-sent on each loop. ``user_queries`` is capped by
+``keep_last``, so lines are numbered by their position in the prompt, not
+by the turn they came from.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from ..common.tokens import count_tokens, truncate_to_tokens
+from ..config.config import MemoryConfig
+
+SUMMARY_MARKER = "(이전 대화 요약)"
+
+
+def select_recent_queries(
+    user_queries: List[str],
+    memory: MemoryConfig,
+) -> List[str]:
+    """Return the newest queries within budget, oldest first.
+
+    The newest query is always kept (truncated if it alone exceeds the
+    budget); older ones are added newest-first while they still fit.
+    """
+    window = user_queries[-memory.max_raw_turns :] if memory.max_raw_turns else []
+    selected: List[str] = []
+    budget = memory.max_query_tokens
+    for offset in range(len(window) - 1, -1, -1):
+        query = window[offset]
+        tokens = count_tokens(query)
+        if not selected:
+            if tokens > budget:
+                query = truncate_to_tokens(query, budget)
+                tokens = budget
+        elif tokens > budget:
+            break
+        selected.append(query)
+        budget -= tokens
+    selected.reverse()
+    return selected
+
+
+def make_bounded_queries_text(state: Dict[str, Any], memory: MemoryConfig) -> str:
+    """Render the supervisor's query list as summary + last N raw turns."""
+    user_queries = state.get("user_queries", [])
+    recent = select_recent_queries(user_queries, memory)
+    lines: List[str] = []
+    summary = state.get("conversation_summary", "")
+    omitted_turns = len(user_queries) - len(recent)
+    if summary and omitted_turns > 0:
+        summary = truncate_to_tokens(summary, memory.max_summary_tokens)
+        lines.append(f"{SUMMARY_MARKER} {summary}")
+    lines.extend(f"{i + 1}. {query}" for i, query in enumerate(recent))
+    return "\n".join(lines)
+
+
+def make_summary_update(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Roll the summary forward to the supervisor's latest merged mission."""
+    user_final_query = result.get("user_final_query")
+    if not user_final_query:
+        return {}
+    return {"conversation_summary": user_final_query}
+
+
+__all__ = [
+    "select_recent_queries",
+    "make_bounded_queries_text",
+    "make_summary_update",
+]
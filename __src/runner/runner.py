@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
+from functools import partial
+from pathlib import Path
 from typing import Any, Callable, Dict, List, Tuple
 
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.types import Command
+
+from ..common.cassette import Cassette, get_cassette, set_cassette
 from ..common.enums import ModelNames
-from ..common.errors import GraphInitializeError
+from ..common.errors import GraphExecutionError, GraphInitializeError
 from ..common.logger import get_logger
+from ..common.node_metrics import configure_node_metrics, node_metrics_configured
 from ..config.config import Config
+from ..execution import HttpEnvClient, LocalEnvClient
+from ..planning import ActionCompiler, Scheduler, SubgoalLibrary, world_from_inputs
 
 # from ..prompts.planning_prompt import (
 #     GOAL_NODE_PROMPT,
@@ -19,10 +28,22 @@ from ..config.config import Config
 # )
 from ..prompts import planning_prompt, process_prompt
 from . import graph as graph_module
+from .checkpoint import SqliteCheckpointSaver
+from .llm_scheduler import (
+    BATCH,
+    LLMScheduler,
+    get_llm_scheduler,
+    llm_priority,
+    set_llm_scheduler,
+)
+from .session_store import SessionStore, new_session_id
 from .state import StateSchema
 
 logger = get_logger(__name__)
 
+# Runner.batch workers per LLM slot of the batch's priority class.
+_BATCH_WORKERS_PER_LLM_SLOT = 2
+
 
 class Runner:
     def __init__(
@@ -33,22 +54,127 @@ class Runner:
         self.config = config
         self.graph: Any | None = None
         self.graph_config: Dict[str, Any] | None = None
+        # Node callables shared by the interactive graph and the headless
+        # variants; each variant is compiled once.
+        self._nodes: Tuple[Dict[str, Any], Dict[str, Any]] | None = None
+        self._headless_graphs: Dict[str, Any] = {}
+        self._subgoal_library: SubgoalLibrary | None = None
+        # Shared by every session of this runner; None compiles the graph
+        # with an in-memory saver.
+        self.checkpointer = self._make_checkpointer()
+        # Session of the last invoke(); resume() defaults to it.
+        self.session_id: str | None = None
         self.retriever = None
 
         self._llm_cache: Dict[Tuple[str, float, str | None, bool], Any] = {}
+        # LLM calls of every runner in the process share one scheduler, so
+        # the first runner's settings apply.
+        if self.config.llm_scheduler.enabled and get_llm_scheduler() is None:
+            set_llm_scheduler(LLMScheduler.from_config(self.config.llm_scheduler))
+        output_dir = Path(self.config.paths.output_dir)
+        # Likewise one cassette records or replays the whole process.
+        cassette = self.config.cassette
+        if cassette.mode != "off" and get_cassette() is None:
+            set_cassette(
+                Cassette(
+                    output_dir / cassette.path,
+                    cassette.mode,
+                    speed=cassette.speed,
+                )
+            )
+        # Node phase metrics are process-wide too; the first runner's settings apply.
+        metrics = self.config.node_metrics
+        if not node_metrics_configured():
+            configure_node_metrics(
+                enabled=metrics.enabled,
+                spans_path=output_dir / metrics.spans_path if metrics.tracing else None,
+                profile_sample_rate=metrics.profile_sample_rate,
+                profile_nodes=metrics.profile_nodes,
+                profiler=metrics.profiler,
+                profile_dir=output_dir / metrics.profile_dir,
+            )
 
         if token_information_changed_callback is not None:
             self.token_information_changed_callback = token_information_changed_callback
         else:
             self.token_information_changed_callback = None
 
+    def _make_checkpointer(self) -> BaseCheckpointSaver | None:
+        checkpoint = self.config.checkpoint
+        store = self.config.session_store
+        durable = checkpoint.backend == "sqlite"
+        if not durable and not store.enabled:
+            return None
+        output_dir = Path(self.config.paths.output_dir)
+        saver = SqliteCheckpointSaver(
+            output_dir / (checkpoint.path if durable else store.spill_path),
+            batch_size=checkpoint.batch_size,
+            flush_interval=checkpoint.flush_interval_s,
+            ttl=checkpoint.ttl_s,
+            max_threads=checkpoint.max_threads,
+            prune_interval=checkpoint.prune_interval_s,
+        )
+        if not store.enabled:
+            return saver
+        return SessionStore(
+            saver,
+            max_sessions=store.max_sessions,
+            max_bytes=store.max_bytes,
+            idle_ttl=store.idle_ttl_s,
+            # Durable sessions are written to disk as they change; spilled
+            # ones only when they leave memory.
+            write_through=durable,
+        )
+
+    def close(self) -> None:
+        """Flush and close the checkpointer and save the subgoal memo;
+        sessions stay resumable."""
+        if self.checkpointer is not None:
+            self.checkpointer.close()
+        if self._subgoal_library is not None:
+            self._subgoal_library.save(order=True)
+
     def set_retriever(self, retriever):
         self.retriever = retriever
         self.graph = None
         self.graph_config = None
+        self._nodes = None
+        self._headless_graphs = {}
+
+    def build_nodes(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Return the graph's ``(nodes, routers)``."""
+        raise NotImplementedError("Subclasses must implement build_nodes().")
 
     def build_graph(self):
-        raise NotImplementedError("Subclasses must implement build_graph().")
+        nodes, routers = self._ensure_nodes()
+        return graph_module.make_supervised_plan_graph(
+            state_schema=StateSchema,
+            nodes=nodes,
+            routers=routers,
+            thread_id="supervised_planning",
+            checkpointer=self.checkpointer,
+        )
+
+    def _ensure_nodes(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        if self._nodes is None:
+            self._nodes = self.build_nodes()
+        return self._nodes
+
+    def headless_graph(self, end_at: graph_module.HeadlessEnd = "plan"):
+        """Compiled non-interactive variant (see ``make_headless_plan_graph``).
+
+        It runs one turn over ``state["user_queries"][-1]`` without
+        ``user_input`` or a checkpointer, so ``graph.batch`` needs no
+        sessions.
+        """
+        graph = self._headless_graphs.get(end_at)
+        if graph is None:
+            nodes, routers = self._ensure_nodes()
+            graph, _ = graph_module.make_headless_plan_graph(
+                StateSchema, nodes, routers, end_at=end_at
+            )
+            self._headless_graphs[end_at] = graph
+        return graph
 
     def _get_llm(
         self,
@@ -75,6 +201,7 @@ class Runner:
                 model_name=model_enum,
                 temperature=temperature,
                 prompt_cache_key=prompt_cache_key,
+                fake=self.config.fake_llm,
             )
             self._llm_cache[cache_key] = llm
         return llm
@@ -88,19 +215,75 @@ class Runner:
             )
         return self.graph, self.graph_config
 
-    def invoke(self, state):
-        graph, graph_config = self._ensure_graph()
-        final_state = graph.invoke(state, graph_config)
+    def new_session(self) -> str:
+        """Allocate the thread id of a new conversation."""
+        return new_session_id()
+
+    def session_config(self, session_id: str | None = None) -> Dict[str, Any]:
+        """Run config for ``session_id`` (one checkpointer thread per session)."""
+        _, graph_config = self._ensure_graph()
+        if session_id is None:
+            return graph_config
+        configurable = {**graph_config.get("configurable", {}), "thread_id": session_id}
+        return {**graph_config, "configurable": configurable}
+
+    def invoke(self, state, *, session_id: str | None = None):
+        """Start a run; it returns when the graph ends or waits for input.
+
+        Without ``session_id`` the run gets a new session, kept in
+        ``self.session_id`` for ``resume``.
+        """
+        graph, _ = self._ensure_graph()
+        self.session_id = session_id or self.new_session()
+        final_state = graph.invoke(state, self.session_config(self.session_id))
         return final_state
 
-    def batch(self, states):
-        graph, graph_config = self._ensure_graph()
-        final_states = graph.batch(states, graph_config)
+    def resume(self, message: str, *, session_id: str | None = None):
+        """Answer the pending ``user_input`` interrupt of ``session_id``."""
+        graph, _ = self._ensure_graph()
+        session_id = session_id or self.session_id
+        if session_id is None:
+            raise GraphExecutionError("No session to resume; call invoke() first.")
+        return graph.invoke(Command(resume=message), self.session_config(session_id))
+
+    def batch(
+        self,
+        states,
+        *,
+        priority: str = BATCH,
+        end_at: graph_module.HeadlessEnd = "plan",
+        concurrency: int | None = None,
+    ):
+        """Plan ``states`` (one query each) on the headless graph.
+
+        Their LLM calls queue as ``priority``; the default batch class
+        yields to interactive sessions, so a large batch does not hold up
+        users sharing the model. At most ``concurrency`` states run at
+        once; by default twice the class's LLM concurrency, so a worker
+        thread is not started per state just to wait in the scheduler.
+        """
+        graph = self.headless_graph(end_at)
+        states = list(states)
+        if concurrency is None:
+            concurrency = self._batch_concurrency(priority)
+        with llm_priority(priority):
+            final_states = graph.batch(
+                states, {"max_concurrency": max(1, min(len(states), concurrency))}
+            )
         return final_states
 
+    def _batch_concurrency(self, priority: str) -> int:
+        scheduler = self.config.llm_scheduler
+        priority_class = scheduler.classes.get(priority)
+        slots = scheduler.max_concurrency
+        if priority_class is not None:
+            slots = min(slots, priority_class.max_concurrency)
+        # Spare workers run the nodes without LLM calls meanwhile.
+        return slots * _BATCH_WORKERS_PER_LLM_SLOT
+
 
 class SupervisedPlanRunner(Runner):
-    def build_graph(self):
+    def build_nodes(self):
         nodes = {}
         routers = {}
         nodes["user_input"] = graph_module.make_user_input_node(
@@ -111,6 +294,7 @@ class SupervisedPlanRunner(Runner):
                 model_name=self.config.runner.intent_node.model_name,
                 prompt_cache_key=self.config.runner.intent_node.prompt_cache_key,
             ),
+            output_mode=self.config.runner.intent_node.output_mode,
             prompt_text=process_prompt.INTENT_NODE_PROMPT,
             make_inputs=process_prompt.make_intent_node_inputs,
             parser_output=process_prompt.IntentParser,
@@ -125,8 +309,12 @@ class SupervisedPlanRunner(Runner):
                 model_name=self.config.runner.supervisor_node.model_name,
                 prompt_cache_key=self.config.runner.supervisor_node.prompt_cache_key,
             ),
+            output_mode=self.config.runner.supervisor_node.output_mode,
             prompt_text=process_prompt.SUPERVISOR_NODE_PROMPT,
-            make_inputs=process_prompt.make_supervisor_node_inputs,
+            make_inputs=partial(
+                process_prompt.make_supervisor_node_inputs,
+                memory=self.config.memory,
+            ),
             parser_output=process_prompt.SupervisorParser,
             state_key="supervisor_result",
             state_append=False,
@@ -140,6 +328,7 @@ class SupervisedPlanRunner(Runner):
                 model_name=self.config.runner.feedback_node.model_name,
                 prompt_cache_key=self.config.runner.feedback_node.prompt_cache_key,
             ),
+            output_mode=self.config.runner.feedback_node.output_mode,
             prompt_text=process_prompt.FEEDBACK_NODE_PROMPT,
             make_inputs=process_prompt.make_feedback_node_inputs,
             parser_output=process_prompt.FeedbackParser,
@@ -153,11 +342,13 @@ class SupervisedPlanRunner(Runner):
                 model_name=self.config.runner.goal_decomp_node.model_name,
                 prompt_cache_key=self.config.runner.goal_decomp_node.prompt_cache_key,
             ),
+            output_mode=self.config.runner.goal_decomp_node.output_mode,
             prompt_text=planning_prompt.GOAL_DECOMP_NODE_PROMPT,
             make_inputs=planning_prompt.make_goal_decomp_node_inputs,
             parser_output=planning_prompt.GoalDecompNodeParser,
             state_key="subgoals",
             state_append=False,
+            modify_state=planning_prompt.modify_goal_decomp_state,
             node_name="GOAL_DECOMP_NODE",
         )
         nodes["task_decomp"] = graph_module.make_normal_node(
@@ -165,6 +356,7 @@ class SupervisedPlanRunner(Runner):
                 model_name=self.config.runner.task_decomp_node.model_name,
                 prompt_cache_key=self.config.runner.task_decomp_node.prompt_cache_key,
             ),
+            output_mode=self.config.runner.task_decomp_node.output_mode,
             prompt_text=planning_prompt.TASK_DECOMP_NODE_PROMPT,
             make_inputs=planning_prompt.make_task_decomp_node_inputs,
             parser_output=planning_prompt.TaskDecompNodeParser,
@@ -178,6 +370,7 @@ class SupervisedPlanRunner(Runner):
                 model_name=self.config.runner.question_answer_node.model_name,
                 prompt_cache_key=self.config.runner.question_answer_node.prompt_cache_key,
             ),
+            output_mode=self.config.runner.question_answer_node.output_mode,
             prompt_text=process_prompt.QUESTION_ANSWER_NODE_PROMPT,
             make_inputs=process_prompt.make_question_answer_node_inputs,
             parser_output=process_prompt.QuestionAnswerParser,
@@ -186,9 +379,120 @@ class SupervisedPlanRunner(Runner):
             node_name="QUESTION_ANSWER_NODE",
         )
 
-        return graph_module.make_supervised_plan_graph(
-            state_schema=StateSchema,
-            nodes=nodes,
-            routers=routers,
-            thread_id="supervised_planning",
+        robot_skills = {robot.name: robot.skills for robot in self.config.skills}
+        if self.config.template_planner.enabled:
+            nodes["template_plan"] = graph_module.make_template_plan_node(
+                robot_skills
+            )
+            routers["template_plan"] = planning_prompt.route_template_plan
+
+        replan = self.config.replan
+        if replan.enabled:
+            nodes["plan_patch"] = graph_module.make_plan_patch_node(
+                robot_skills,
+                llm_patch_max_change_ratio=replan.llm_patch_max_change_ratio,
+            )
+            patch_config = (
+                self.config.runner.task_patch_node
+                or self.config.runner.task_decomp_node
+            )
+            nodes["task_patch"] = graph_module.make_normal_node(
+                llm=self._get_llm(
+                    model_name=patch_config.model_name,
+                    prompt_cache_key=patch_config.prompt_cache_key,
+                ),
+                output_mode=patch_config.output_mode,
+                prompt_text=planning_prompt.TASK_PATCH_NODE_PROMPT,
+                make_inputs=planning_prompt.make_task_patch_node_inputs,
+                parser_output=planning_prompt.TaskDecompNodeParser,
+                state_key="tasks",
+                state_append=False,
+                node_name="TASK_PATCH_NODE",
+            )
+            routers["plan_patch"] = planning_prompt.route_plan_patch
+
+        memo = self.config.subgoal_memo
+        if memo.enabled:
+            library = SubgoalLibrary(
+                Path(self.config.paths.output_dir) / memo.path if memo.path else None,
+                max_entries=memo.max_entries,
+                fuzzy_threshold=memo.fuzzy_threshold,
+            )
+            self._subgoal_library = library
+            nodes["subgoal_memo"] = graph_module.make_subgoal_memo_node(
+                library, robot_skills
+            )
+            nodes["subgoal_learn"] = graph_module.make_subgoal_learn_node(
+                library, robot_skills
+            )
+            routers["subgoal_memo"] = planning_prompt.route_subgoal_memo
+
+        if self.config.plan_validation.enabled:
+            nodes["plan_validation"] = graph_module.make_plan_validation_node(
+                robot_skills
+            )
+            repair_config = (
+                self.config.runner.task_repair_node
+                or self.config.runner.task_decomp_node
+            )
+            nodes["task_repair"] = graph_module.make_normal_node(
+                llm=self._get_llm(
+                    model_name=repair_config.model_name,
+                    prompt_cache_key=repair_config.prompt_cache_key,
+                ),
+                output_mode=repair_config.output_mode,
+                prompt_text=planning_prompt.TASK_REPAIR_NODE_PROMPT,
+                make_inputs=planning_prompt.make_task_repair_node_inputs,
+                parser_output=planning_prompt.SubGoal,
+                state_key="plan_repair_result",
+                state_append=False,
+                node_name="TASK_REPAIR_NODE",
+                modify_state=planning_prompt.modify_task_repair_state,
+            )
+            routers["plan_validation"] = partial(
+                planning_prompt.route_plan_validation,
+                max_repairs=self.config.plan_validation.max_repairs,
+            )
+
+        if self.config.plan_optimizer.enabled:
+            nodes["plan_optimize"] = graph_module.make_plan_optimize_node(
+                exact_max_subgoals=self.config.plan_optimizer.exact_max_subgoals
+            )
+
+        if self.config.scheduler.enabled:
+            nodes["schedule"] = graph_module.make_schedule_node(
+                Scheduler(
+                    robot_skills,
+                    skill_durations=self.config.scheduler.skill_durations,
+                    exact_max_subgoals=self.config.scheduler.exact_max_subgoals,
+                )
+            )
+
+        nodes["action_compile"] = graph_module.make_action_compile_node(
+            ActionCompiler.from_config(self.config)
         )
+
+        execution = self.config.execution
+        if execution.enabled:
+            if execution.client == "local":
+
+                def make_client(state):
+                    world = world_from_inputs(state.get("inputs", {}))
+                    return LocalEnvClient(world, robot_skills)
+
+            else:
+
+                def make_client(state):
+                    return HttpEnvClient(
+                        execution.url, timeout=execution.step_timeout_s
+                    )
+
+            nodes["execute"] = graph_module.make_execute_node(
+                make_client,
+                url=execution.url,
+                step_timeout=execution.step_timeout_s,
+                max_replans=execution.max_suffix_replans,
+            )
+            routers["execute"] = planning_prompt.route_execution
+
+        return nodes, routers
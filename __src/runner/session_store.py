@@ -0,0 +1,415 @@
+"""Memory-bounded session checkpointer that spills idle sessions to disk.
+
+``SessionStore`` is a LangGraph checkpointer with two tiers. Hot sessions
+live in memory as encoded rows (the row format of ``checkpoint.py``), in
+LRU order. After every operation the least recently used sessions are
+evicted while
+
+- more than ``max_sessions`` sessions are hot,
+- the hot rows take more than ``max_bytes``, or
+- a session has been idle longer than ``idle_ttl`` seconds.
+
+Evicted sessions live on in the cold tier, a ``SqliteCheckpointSaver``,
+and are loaded back on their next read or write. With ``write_through``
+every write also goes to the cold tier right away (durable sessions) and
+eviction only frees memory; otherwise a session's rows are written to the
+cold tier when it is evicted. The most recently used session is never
+evicted for size alone.
+
+Byte counts cover the encoded blobs plus a fixed per-row estimate of the
+Python objects around them, so they track but do not equal RSS.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+
+from .checkpoint import (
+    _INSERT_BLOB,
+    _INSERT_CHECKPOINT,
+    _INSERT_WRITE,
+    _REPLACE_WRITE,
+    Row,
+    SqliteCheckpointSaver,
+    _decode_tuple,
+    _encode_put,
+    _encode_writes,
+    _row_bytes,
+    _saved_config,
+)
+
+# Rough size of the tuple, dict entry and small objects around each row.
+_ROW_OVERHEAD = 200
+
+
+def new_session_id(prefix: str = "session") -> str:
+    """A fresh thread id for one conversation."""
+    return f"{prefix}-{uuid.uuid4().hex}"
+
+
+# ! stats
+_STATS: Counter = Counter()
+_STATS_LOCK = threading.Lock()
+
+
+def _record(**values: int) -> None:
+    with _STATS_LOCK:
+        _STATS.update(values)
+
+
+def get_session_store_stats() -> Dict[str, int]:
+    """Hits, cold loads and evictions by reason across all stores."""
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+def reset_session_store_stats() -> None:
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+class _Session:
+    __slots__ = ("checkpoints", "blobs", "writes", "nbytes", "last_used", "dirty")
+
+    def __init__(self) -> None:
+        # (ns, checkpoint_id) -> checkpoint row
+        self.checkpoints: Dict[Tuple[str, str], Tuple[Any, ...]] = {}
+        # (ns, channel, version) -> blob row
+        self.blobs: Dict[Tuple[str, str, str], Tuple[Any, ...]] = {}
+        # (ns, checkpoint_id) -> {(task_id, idx): write row}
+        self.writes: Dict[Tuple[str, str], Dict[Tuple[str, int], Tuple[Any, ...]]] = {}
+        self.nbytes = 0
+        self.last_used = time.monotonic()
+        # True while some rows exist only in memory.
+        self.dirty = False
+
+    def apply(self, rows: Sequence[Row]) -> int:
+        """Add encoded rows; returns the bytes added."""
+        added = 0
+        for sql, params in rows:
+            if sql == _INSERT_BLOB:
+                key = (params[1], params[2], params[3])
+                if key in self.blobs:
+                    continue
+                self.blobs[key] = params
+            elif sql == _INSERT_CHECKPOINT:
+                self.checkpoints[(params[1], params[2])] = params
+            elif sql in (_INSERT_WRITE, _REPLACE_WRITE):
+                writes = self.writes.setdefault((params[1], params[2]), {})
+                key = (params[3], params[4])
+                if sql == _INSERT_WRITE and key in writes:
+                    continue
+                writes[key] = params
+            else:
+                continue
+            added += _row_bytes([(sql, params)]) + _ROW_OVERHEAD
+        self.nbytes += added
+        return added
+
+    def rows(self) -> List[Row]:
+        rows: List[Row] = [(_INSERT_BLOB, params) for params in self.blobs.values()]
+        rows.extend(
+            (_INSERT_CHECKPOINT, params) for params in self.checkpoints.values()
+        )
+        rows.extend(
+            (_REPLACE_WRITE, params)
+            for writes in self.writes.values()
+            for params in writes.values()
+        )
+        return rows
+
+
+class SessionStore(BaseCheckpointSaver[int]):
+    def __init__(
+        self,
+        cold: SqliteCheckpointSaver,
+        *,
+        max_sessions: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        idle_ttl: float | None = 600.0,
+        write_through: bool = False,
+    ) -> None:
+        super().__init__(serde=cold.serde)
+        self.cold = cold
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.write_through = write_through
+        self._hot: "OrderedDict[str, _Session]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.RLock()
+
+    def allocate(self, prefix: str = "session") -> str:
+        return new_session_id(prefix)
+
+    # * tiers --------------------------------------------------------------
+    def _session(self, thread_id: str, *, create: bool) -> _Session | None:
+        with self._lock:
+            session = self._hot.get(thread_id)
+            if session is not None:
+                self._hot.move_to_end(thread_id)
+                session.last_used = time.monotonic()
+                _record(hits=1)
+                return session
+        # Cold reads run without the lock so hot sessions are not blocked.
+        rows = self.cold.thread_rows(thread_id)
+        with self._lock:
+            session = self._hot.get(thread_id)
+            if session is not None:
+                return session
+            if not rows and not create:
+                _record(misses=1)
+                return None
+            session = _Session()
+            self._nbytes += session.apply(rows)
+            self._hot[thread_id] = session
+            if rows:
+                _record(reloads=1)
+            else:
+                _record(created=1)
+            return session
+
+    def _add(self, thread_id: str, rows: List[Row]) -> None:
+        while True:
+            session = self._session(thread_id, create=True)
+            with self._lock:
+                # Evicted again before the lock was taken: load it again.
+                if self._hot.get(thread_id) is not session:
+                    continue
+                assert session is not None
+                self._nbytes += session.apply(rows)
+                if self.write_through:
+                    self.cold.put_rows(thread_id, rows)
+                else:
+                    session.dirty = True
+                self.sweep()
+                return
+
+    def _spill(self, thread_id: str, session: _Session) -> None:
+        if session.dirty:
+            self.cold.put_rows(thread_id, session.rows())
+            session.dirty = False
+            _record(spilled=1)
+
+    def sweep(self) -> int:
+        """Evict idle and over-budget sessions; returns how many."""
+        evicted = 0
+        with self._lock:
+            idle_before = (
+                time.monotonic() - self.idle_ttl if self.idle_ttl is not None else None
+            )
+            while self._hot:
+                thread_id, session = next(iter(self._hot.items()))
+                if idle_before is not None and session.last_used < idle_before:
+                    reason = "evicted_idle"
+                elif len(self._hot) > 1 and len(self._hot) > self.max_sessions:
+                    reason = "evicted_count"
+                elif len(self._hot) > 1 and self._nbytes > self.max_bytes:
+                    reason = "evicted_bytes"
+                else:
+                    break
+                self._evict(thread_id)
+                _record(**{reason: 1})
+                evicted += 1
+        return evicted
+
+    def _evict(self, thread_id: str) -> None:
+        session = self._hot.pop(thread_id)
+        self._nbytes -= session.nbytes
+        self._spill(thread_id, session)
+
+    def spill_all(self) -> None:
+        """Write every hot session to the cold tier and flush it."""
+        with self._lock:
+            for thread_id, session in self._hot.items():
+                self._spill(thread_id, session)
+        self.cold.flush()
+
+    def close(self) -> None:
+        self.spill_all()
+        self.cold.close()
+
+    def usage(self) -> Dict[str, int]:
+        """Current hot-tier size against its limits."""
+        with self._lock:
+            return {
+                "hot_sessions": len(self._hot),
+                "hot_bytes": self._nbytes,
+                "dirty_sessions": sum(s.dirty for s in self._hot.values()),
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+            }
+
+    # * checkpointer API ---------------------------------------------------
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        rows = _encode_put(self.serde, config, checkpoint, metadata, new_versions)
+        self._add(config["configurable"]["thread_id"], rows)
+        return _saved_config(config, checkpoint)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        rows = _encode_writes(self.serde, config, writes, task_id, task_path)
+        self._add(config["configurable"]["thread_id"], rows)
+
+    def _to_tuple(self, session: _Session, row: Tuple[Any, ...]) -> CheckpointTuple:
+        checkpoint_ns, checkpoint_id = row[1], row[2]
+        checkpoint = self.serde.loads_typed((row[4], row[5]))
+        blob_rows = []
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = session.blobs.get((checkpoint_ns, channel, str(version)))
+            if blob is not None:
+                blob_rows.append((channel, blob[4], blob[5]))
+        writes = session.writes.get((checkpoint_ns, checkpoint_id), {})
+        write_rows = [
+            (params[3], params[5], params[6], params[7])
+            for _, params in sorted(writes.items())
+        ]
+        return _decode_tuple(self.serde, row, checkpoint, blob_rows, write_rows)
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        session = self._session(thread_id, create=False)
+        if session is None:
+            return None
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = session.checkpoints.get((checkpoint_ns, checkpoint_id))
+            else:
+                ids = [cid for ns, cid in session.checkpoints if ns == checkpoint_ns]
+                row = session.checkpoints[(checkpoint_ns, max(ids))] if ids else None
+            result = self._to_tuple(session, row) if row is not None else None
+            self.sweep()
+            return result
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: Dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        if config is None:
+            # Listing every thread is served by the cold tier.
+            self.spill_all()
+            yield from self.cold.list(None, filter=filter, before=before, limit=limit)
+            return
+        configurable = config["configurable"]
+        checkpoint_ns = configurable.get("checkpoint_ns")
+        checkpoint_id = get_checkpoint_id(config)
+        before_id = get_checkpoint_id(before) if before else None
+        results: List[CheckpointTuple] = []
+        session = self._session(configurable["thread_id"], create=False)
+        with self._lock:
+            rows = sorted(
+                session.checkpoints.values() if session else (),
+                key=lambda row: (row[1], row[2]),
+                reverse=True,
+            )
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                if checkpoint_ns is not None and row[1] != checkpoint_ns:
+                    continue
+                if checkpoint_id and row[2] != checkpoint_id:
+                    continue
+                if before_id and row[2] >= before_id:
+                    continue
+                if filter:
+                    metadata = self.serde.loads_typed((row[6], row[7]))
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                results.append(self._to_tuple(session, row))
+            self.sweep()
+        yield from results
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            session = self._hot.pop(thread_id, None)
+            if session is not None:
+                self._nbytes -= session.nbytes
+        self.cold.delete_thread(thread_id)
+
+    # * async --------------------------------------------------------------
+    # Hot sessions are served inline; anything that may touch SQLite runs in
+    # a worker thread.
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        if config["configurable"]["thread_id"] in self._hot:
+            return self.get_tuple(config)
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: Dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in results:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        if config["configurable"]["thread_id"] in self._hot:
+            return self.put(config, checkpoint, metadata, new_versions)
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        if config["configurable"]["thread_id"] in self._hot:
+            return self.put_writes(config, writes, task_id, task_path)
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+__all__ = [
+    "SessionStore",
+    "get_session_store_stats",
+    "new_session_id",
+    "reset_session_store_stats",
+]
@@ -0,0 +1,162 @@
+"""Multiplex many conversations over one compiled planner graph.
+
+Every session is a checkpointer thread (``thread_id = session_id``). A
+session waiting for its user holds no thread or task: the graph is paused
+at the ``user_input`` interrupt and only its checkpoint exists. ``send``
+resumes that session with the next message and returns when the graph ends
+or asks for input again. Messages of one session are processed in order;
+different sessions run concurrently.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from langgraph.types import Command
+
+from .session_store import new_session_id
+
+MakeState = Callable[[str], Mapping[str, Any]]
+
+
+@dataclass
+class TurnResult:
+    session_id: str
+    state: Dict[str, Any]
+    # True when the graph is paused at user_input for this session.
+    waiting: bool
+    prompt: Optional[str] = None
+
+
+class SessionDispatcher:
+    def __init__(
+        self,
+        graph,
+        graph_config: Mapping[str, Any],
+        make_state: MakeState,
+        *,
+        max_concurrency: int | None = None,
+    ) -> None:
+        self.graph = graph
+        self.graph_config = dict(graph_config)
+        self.make_state = make_state
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._waiters: Dict[str, int] = {}
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        )
+        self.turns = 0
+
+    @classmethod
+    def from_runner(
+        cls, runner, make_state: MakeState, **kwargs
+    ) -> "SessionDispatcher":
+        graph, graph_config = runner._ensure_graph()
+        return cls(graph, graph_config, make_state, **kwargs)
+
+    def new_session(self) -> str:
+        """Allocate the id of a new session."""
+        return new_session_id()
+
+    @property
+    def active_sessions(self) -> int:
+        """Sessions with a message in flight."""
+        return len(self._locks)
+
+    def config(self, session_id: str) -> Dict[str, Any]:
+        configurable = {
+            **self.graph_config.get("configurable", {}),
+            "thread_id": session_id,
+        }
+        return {**self.graph_config, "configurable": configurable}
+
+    @asynccontextmanager
+    async def _session(self, session_id: str) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._waiters[session_id] = self._waiters.get(session_id, 0) + 1
+        try:
+            async with lock:
+                if self._semaphore is None:
+                    yield
+                else:
+                    async with self._semaphore:
+                        yield
+        finally:
+            self._waiters[session_id] -= 1
+            if not self._waiters[session_id]:
+                # Idle sessions keep only their checkpoint.
+                del self._waiters[session_id]
+                del self._locks[session_id]
+
+    async def _start(self, session_id: str, config: Dict[str, Any]) -> None:
+        snapshot = await self.graph.aget_state(config)
+        if snapshot.next:
+            return
+        # New session, or the last run reached END: start a run, which
+        # pauses at user_input right away.
+        if snapshot.values:
+            start: Mapping[str, Any] = {}
+        else:
+            start = await asyncio.to_thread(self.make_state, session_id)
+        await self.graph.ainvoke(start, config)
+
+    def _result(
+        self, session_id: str, state: Dict[str, Any], interrupts: Sequence[Any]
+    ) -> TurnResult:
+        prompt = None
+        if interrupts and isinstance(interrupts[0].value, Mapping):
+            prompt = interrupts[0].value.get("prompt")
+        return TurnResult(session_id, state, bool(interrupts), prompt)
+
+    async def send(self, session_id: str, message: str) -> TurnResult:
+        """Deliver ``message`` to ``session_id`` and run its next turn."""
+        async with self._session(session_id):
+            config = self.config(session_id)
+            await self._start(session_id, config)
+            result = await self.graph.ainvoke(Command(resume=message), config)
+            self.turns += 1
+        interrupts = result.pop("__interrupt__", None) or []
+        return self._result(session_id, result, interrupts)
+
+    async def stream(
+        self, session_id: str, message: str
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Like ``send``, but yield ``(node, update)`` as each node finishes.
+
+        The last item is ``("__turn__", TurnResult)``.
+        """
+        async with self._session(session_id):
+            config = self.config(session_id)
+            await self._start(session_id, config)
+            interrupts: List[Any] = []
+            async for chunk in self.graph.astream(
+                Command(resume=message), config, stream_mode="updates"
+            ):
+                for node, update in chunk.items():
+                    if node == "__interrupt__":
+                        interrupts.extend(update)
+                    else:
+                        yield node, update
+            snapshot = await self.graph.aget_state(config)
+            self.turns += 1
+        yield "__turn__", self._result(session_id, dict(snapshot.values), interrupts)
+
+    async def get_state(self, session_id: str) -> Dict[str, Any]:
+        snapshot = await self.graph.aget_state(self.config(session_id))
+        return dict(snapshot.values)
+
+
+__all__ = ["SessionDispatcher", "TurnResult"]
@@ -2,21 +2,36 @@
 
 from __future__ import annotations
 
-import copy
-from typing import Any, Dict, List
+import operator
+from typing import Any, Callable, Dict, List
 
-from typing_extensions import TypedDict
+from typing_extensions import Annotated, TypedDict
 
 from ..config.config import Config
-from .text import make_group_list_text, make_object_text, make_skill_text
+from .text import fetch_env, make_group_list_text, make_object_text, make_skill_text
 
 # from robosuite.robosuite.environments.base import make
 
 
+# Raw history kept in state. Prompts only see a budgeted window of it (see
+# runner/memory.py); this cap just stops long-lived sessions from growing.
+MAX_STORED_TURNS = 64
+
+
+def keep_last(limit: int) -> Callable[[List[Any], List[Any]], List[Any]]:
+    """Reducer that appends like ``operator.add`` but keeps the newest items."""
+
+    def reducer(current: List[Any], update: List[Any]) -> List[Any]:
+        merged = operator.add(current, update)
+        return merged[-limit:] if len(merged) > limit else merged
+
+    return reducer
+
+
 class StateSchema(TypedDict, total=False):
     """State contract for the planner LangGraph workflow."""
 
-    user_queries: List[str]
+    user_queries: Annotated[List[str], keep_last(MAX_STORED_TURNS)]
     inputs: Dict[str, Any]
     intent_result: Dict[str, Any]
     supervisor_result: Dict[str, Any]
@@ -24,7 +39,52 @@ class StateSchema(TypedDict, total=False):
     feedback_loop_count: int
     subgoals: List[str]
     tasks: List[Dict[str, Any]]
-    question_answers: List[Dict[str, Any]]
+    question_answers: Annotated[List[Dict[str, Any]], keep_last(MAX_STORED_TURNS)]
+    conversation_summary: str
+    plan_source: str
+    plan_validation: Dict[str, Any]
+    plan_repair_result: Dict[str, Any]
+    plan_repair_count: int
+    plan_optimization: Dict[str, Any]
+    schedule: Dict[str, Any]
+    actions: Dict[str, Any]
+    # Last compiled plan and its mission, kept for incremental replanning.
+    last_plan: Dict[str, Any]
+    plan_patch: Dict[str, Any]
+    # Per-subgoal cached expansions (None for misses) from the subgoal memo.
+    memo_tasks: Dict[str, Any]
+    execution: Dict[str, Any]
+    # Suffix re-plans after failed steps in the current mission.
+    execution_replan_count: int
+
+
+def _make_base_state() -> StateSchema:
+    # Built from literals on every call; much cheaper than deep-copying a
+    # template state for each new session.
+    return {
+        "user_queries": [],
+        "inputs": {},
+        "intent_result": {},
+        "supervisor_result": {},
+        "feedback_result": {},
+        "feedback_loop_count": 0,
+        "subgoals": [],
+        "tasks": [],
+        "question_answers": [],
+        "conversation_summary": "",
+        "plan_source": "",
+        "plan_validation": {},
+        "plan_repair_result": {},
+        "plan_repair_count": 0,
+        "plan_optimization": {},
+        "schedule": {},
+        "actions": {},
+        "last_plan": {},
+        "plan_patch": {},
+        "memo_tasks": {},
+        "execution": {},
+        "execution_replan_count": 0,
+    }
 
 
 class StateMaker:
@@ -36,33 +96,37 @@ class StateMaker:
             self.url = url
         else:
             self.url = "http://127.0.0.1:8800"
-        self._base_state: StateSchema = {
-            "user_queries": [],
-            "inputs": {},
-            "intent_result": {},
-            "supervisor_result": {},
-            "feedback_result": {},
-            "feedback_loop_count": 0,
-            "subgoals": [],
-            "tasks": [],
-            "question_answers": [],
-        }
-
-    def make_inputs(self):
+
+    def make_inputs(self, env: Dict[str, Any] | None = None):
         inputs = {}
         print("Making inputs for state...")
-        object_text = make_object_text(self.url)
-        inputs["object_text"] = object_text
+        # One /env_entire round trip unless a snapshot is given; the raw
+        # payload is kept for the plan validator's world model.
+        if env is None:
+            env = fetch_env(self.url)
+        inputs["env"] = env
+        inputs["object_text"] = make_object_text(self.url, env=env)
         inputs["skill_text"] = make_skill_text(self.config.skills)
         print(f"url: {self.url}")
-        inputs["group_list_text"] = make_group_list_text(self.url)
+        inputs["group_list_text"] = make_group_list_text(self.url, env=env)
         return inputs
 
-    def make(self, *, user_query: str) -> StateSchema:
-        """Create a fresh state with defaults."""
-        state: StateSchema = copy.deepcopy(self._base_state)
-        state["user_queries"] = [user_query]
-        state["inputs"] = self.make_inputs()
+    def make(
+        self,
+        *,
+        user_query: str | None = None,
+        env: Dict[str, Any] | None = None,
+    ) -> StateSchema:
+        """Create a fresh state with defaults.
+
+        Without ``user_query`` the state is ready for a session whose first
+        message arrives through the ``user_input`` interrupt. ``env`` is an
+        ``/env_entire`` snapshot used instead of querying the server.
+        """
+        state = _make_base_state()
+        if user_query is not None:
+            state["user_queries"] = [user_query]
+        state["inputs"] = self.make_inputs(env)
         return state
 
 
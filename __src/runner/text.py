@@ -1,10 +1,24 @@
 import requests
 from __src.config.config import RobotSkillConfig
 
+from ..common.cassette import get_cassette
 
-def make_group_list_text(url):
+
+def fetch_env(url):
+    """Fetch the environment server's ``/env_entire`` payload."""
+    cassette = get_cassette()
+    if cassette is None:
+        return _get_env(url)
+    return cassette.call("env", {"url": f"{url}/env_entire"}, lambda: _get_env(url))
+
+
+def _get_env(url):
     response = requests.get(f"{url}/env_entire")
-    all = response.json()
+    return response.json()
+
+
+def make_group_list_text(url, env=None):
+    all = env if env is not None else fetch_env(url)
 
     groups = all["objects_by_group"].keys()
     print(f"Groups found: {groups}")
@@ -15,9 +29,8 @@ def make_group_list_text(url):
     return group_list_text
 
 
-def make_object_text(url, object_name=None):
-    response = requests.get(f"{url}/env_entire")
-    all = response.json()
+def make_object_text(url, object_name=None, env=None):
+    all = env if env is not None else fetch_env(url)
 
     objects_by_group = all["objects_by_group"]
     ungrouped_objects = all["ungrouped_objects"]
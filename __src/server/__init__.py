@@ -0,0 +1,4 @@
+from .admission import AdmissionController
+from .app import create_app
+
+__all__ = ["AdmissionController", "create_app"]
@@ -0,0 +1,31 @@
+"""Run the HTTP service: ``python -m __src.server``."""
+
+from __future__ import annotations
+
+import argparse
+
+import uvicorn
+
+from ..config import load_config
+from .app import create_app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the robot planner.")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config()
+    uvicorn.run(
+        create_app(config),
+        host=args.host or config.server.host,
+        port=args.port or config.server.port,
+    )
+
+
+if __name__ == "__main__":
+    main()
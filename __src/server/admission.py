@@ -0,0 +1,110 @@
+"""Request admission for the HTTP server.
+
+At most ``max_concurrency`` requests run graphs at once. Further requests
+wait in a FIFO queue of at most ``max_queue`` entries for up to
+``queue_timeout`` seconds. A request that finds the queue full, or whose
+wait times out, is rejected with ``RateLimitExceededError`` (HTTP 429)
+instead of piling up behind the model quota.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict
+
+from ..common.errors import RateLimitExceededError
+
+_WAIT_WINDOW = 1024
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        max_queue: int = 256,
+        queue_timeout: float = 10.0,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waits: Deque[float] = deque(maxlen=_WAIT_WINDOW)
+
+    def _reject(self, reason: str) -> RateLimitExceededError:
+        self.rejected += 1
+        return RateLimitExceededError(
+            f"Server is busy ({reason}); retry later.",
+            domain="server",
+            details={
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "retry_after_s": max(1, round(self.queue_timeout)),
+            },
+        )
+
+    async def acquire(self) -> None:
+        """Wait for a slot; pair every successful call with ``release``."""
+        if self._semaphore.locked() and self.queued >= self.max_queue:
+            raise self._reject("queue full")
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("queue timeout") from None
+        finally:
+            self.queued -= 1
+        self._waits.append(time.perf_counter() - start)
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def release_once(self) -> Callable[[], None]:
+        """``release`` for one admitted request; calls after the first are
+        no-ops, so every place a response can end may call it."""
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.release()
+
+        return release
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, float]:
+        waits = sorted(self._waits)
+        count = len(waits)
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queue_wait_p50_ms": waits[count // 2] * 1e3 if count else 0.0,
+            "queue_wait_p95_ms": (
+                waits[min(count - 1, int(count * 0.95))] * 1e3 if count else 0.0
+            ),
+        }
+
+
+__all__ = ["AdmissionController"]
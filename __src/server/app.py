@@ -0,0 +1,371 @@
+"""FastAPI application serving the planner and the ``src/modules`` graphs.
+
+Endpoints:
+
+- ``GET /healthz``: the process is up.
+- ``GET /readyz``: 200 once every graph is built, 503 while warming up or
+  when a graph failed to build; the body lists each graph's status.
+- ``POST /sessions``: allocate a session id.
+- ``POST /sessions/{id}/messages``: run one planner turn (``SessionDispatcher``).
+- ``POST /sessions/{id}/messages/stream``: the same turn as server-sent
+  events, one ``node`` event per finished node and a final ``turn`` event.
+- ``GET``/``DELETE /sessions/{id}``: read or drop a session's state.
+- ``GET /graphs``; ``POST /graphs/{name}/invoke`` and
+  ``/graphs/{name}/stream``: single-shot runs of the module graphs.
+- ``GET /metrics``: admission, LLM scheduler, session store and checkpoint
+  counters, and per-phase node latency of the planner and module graphs.
+
+Graph runs pass through ``AdmissionController``; rejected requests get a
+429 with ``Retry-After``. ``BaseServiceError``s are returned as their
+``to_dict()`` with their status code.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from ..common.errors import (
+    BaseServiceError,
+    GraphInitializeError,
+    RateLimitExceededError,
+    UtilsValidationError,
+)
+from ..common.logger import get_logger
+from ..common.node_metrics import get_node_phase_stats
+from ..config import load_config
+from ..config.config import Config
+from ..runner.checkpoint import get_checkpoint_stats
+from ..runner.llm_scheduler import get_llm_scheduler_stats
+from ..runner.runner import SupervisedPlanRunner
+from ..runner.session_store import SessionStore, get_session_store_stats
+from ..runner.sessions import SessionDispatcher, TurnResult
+from ..runner.state import StateMaker
+from .admission import AdmissionController
+
+logger = get_logger(__name__)
+
+# Large or internal state keys left out of responses.
+_HIDDEN_KEYS = ("inputs",)
+
+
+class MessageRequest(BaseModel):
+    message: str
+
+
+class GraphRequest(BaseModel):
+    input: Dict[str, Any] = {}
+
+
+def make_planner_dispatcher(config: Config) -> SessionDispatcher:
+    """Build the supervised planner and a dispatcher over its sessions."""
+    runner = SupervisedPlanRunner(config)
+    state_maker = StateMaker(config)
+    return SessionDispatcher.from_runner(
+        runner, lambda session_id: state_maker.make()
+    )
+
+
+def _public(state: Mapping[str, Any]) -> Dict[str, Any]:
+    return jsonable_encoder(
+        {key: value for key, value in state.items() if key not in _HIDDEN_KEYS}
+    )
+
+
+def _turn_payload(turn: TurnResult) -> Dict[str, Any]:
+    return {
+        "session_id": turn.session_id,
+        "waiting": turn.waiting,
+        "prompt": turn.prompt,
+        "state": _public(turn.state),
+    }
+
+
+def _node_event(node: str, update: Mapping[str, Any] | None) -> str:
+    return _sse("node", {"node": node, "update": _public(update or {})})
+
+
+def _sse(event: str, data: Any) -> str:
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class _EventStream(StreamingResponse):
+    """SSE response that gives back its admission slot however it ends.
+
+    Starlette never starts the body generator when sending the headers
+    fails or the client disconnects first, so the generator's ``finally``
+    alone can leak the slot.
+    """
+
+    def __init__(self, events: AsyncIterator[str], release: Callable[[], None]):
+        super().__init__(events, media_type="text/event-stream")
+        self._release = release
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+class Services:
+    """Graphs behind the app and their warm-up status."""
+
+    def __init__(
+        self,
+        make_dispatcher: Callable[[], SessionDispatcher],
+        graph_names: List[str],
+        get_module_graph: Callable[[str], Any],
+        admission: AdmissionController,
+    ) -> None:
+        self.make_dispatcher = make_dispatcher
+        self.get_module_graph = get_module_graph
+        self.admission = admission
+        self.dispatcher: SessionDispatcher | None = None
+        self.graphs: Dict[str, Any] = {}
+        self.status: Dict[str, str] = {"planner": "warming"}
+        self.status.update({name: "warming" for name in graph_names})
+
+    @property
+    def ready(self) -> bool:
+        return all(status == "ready" for status in self.status.values())
+
+    async def warm_up(self) -> None:
+        for name in list(self.status):
+            try:
+                if name == "planner":
+                    self.dispatcher = await asyncio.to_thread(self.make_dispatcher)
+                else:
+                    self.graphs[name] = await asyncio.to_thread(
+                        self.get_module_graph, name
+                    )
+                self.status[name] = "ready"
+            except Exception as err:  # noqa: BLE001 - reported by /readyz
+                logger.exception("Warm-up of %s failed", name)
+                self.status[name] = f"failed: {type(err).__name__}: {err}"
+
+    def planner(self) -> SessionDispatcher:
+        if self.dispatcher is None:
+            raise GraphInitializeError(
+                "Planner graph is not ready.",
+                status=503,
+                details={"status": self.status["planner"]},
+            )
+        return self.dispatcher
+
+    def module_graph(self, name: str) -> Any:
+        if name not in self.status or name == "planner":
+            raise UtilsValidationError(
+                f"Unknown graph name: {name!r}", status=404, details={"name": name}
+            )
+        if name not in self.graphs:
+            raise GraphInitializeError(
+                f"Graph {name!r} is not ready.",
+                status=503,
+                details={"status": self.status[name]},
+            )
+        return self.graphs[name]
+
+    def close(self) -> None:
+        if self.dispatcher is None:
+            return
+        close = getattr(self.dispatcher.graph.checkpointer, "close", None)
+        if close is not None:
+            close()
+
+
+def create_app(
+    config: Config | None = None,
+    *,
+    make_dispatcher: Callable[[], SessionDispatcher] | None = None,
+    graph_names: List[str] | None = None,
+    get_module_graph: Callable[[str], Any] | None = None,
+    admission: AdmissionController | None = None,
+) -> FastAPI:
+    """Create the app; graphs are built in the background on startup.
+
+    The keyword arguments replace the planner, the module graph list and
+    loader, or the admission policy (used by tests and the load test).
+    """
+    config = config or load_config()
+    if graph_names is None or get_module_graph is None:
+        from src.modules import get_graph, list_graphs
+
+        graph_names = list_graphs() if graph_names is None else graph_names
+        get_module_graph = get_module_graph or get_graph
+    services = Services(
+        make_dispatcher or (lambda: make_planner_dispatcher(config)),
+        graph_names,
+        get_module_graph,
+        admission
+        or AdmissionController(
+            max_concurrency=config.server.max_concurrency,
+            max_queue=config.server.max_queue,
+            queue_timeout=config.server.queue_timeout_s,
+        ),
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        warm_up = asyncio.create_task(services.warm_up())
+        try:
+            yield
+        finally:
+            warm_up.cancel()
+            services.close()
+
+    app = FastAPI(title="Robot planner", lifespan=lifespan)
+    app.state.services = services
+    admission_ = services.admission
+
+    @app.exception_handler(BaseServiceError)
+    async def service_error(request: Request, err: BaseServiceError) -> JSONResponse:
+        headers = {}
+        if isinstance(err, RateLimitExceededError):
+            headers["Retry-After"] = str(err.details.get("retry_after_s", 1))
+        return JSONResponse(err.to_dict(), status_code=err.status, headers=headers)
+
+    # * health ---------------------------------------------------------------
+    @app.get("/healthz")
+    async def healthz() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/readyz")
+    async def readyz() -> JSONResponse:
+        return JSONResponse(
+            {"ready": services.ready, "graphs": services.status},
+            status_code=200 if services.ready else 503,
+        )
+
+    @app.get("/metrics")
+    async def metrics() -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "admission": admission_.stats(),
+            "checkpoint": get_checkpoint_stats(),
+            "llm_scheduler": get_llm_scheduler_stats(),
+            "node_phases": get_node_phase_stats(),
+            "session_store": get_session_store_stats(),
+        }
+        if services.graphs:
+            # The module graphs time their nodes in src's own node_metrics.
+            from src.common.node_metrics import get_node_phase_stats as module_stats
+
+            payload["module_node_phases"] = module_stats()
+        if services.dispatcher is not None:
+            payload["active_sessions"] = services.dispatcher.active_sessions
+            payload["turns"] = services.dispatcher.turns
+            checkpointer = services.dispatcher.graph.checkpointer
+            if isinstance(checkpointer, SessionStore):
+                payload["session_store"].update(checkpointer.usage())
+        return payload
+
+    # * planner sessions -----------------------------------------------------
+    @app.post("/sessions", status_code=201)
+    async def create_session() -> Dict[str, str]:
+        return {"session_id": services.planner().new_session()}
+
+    @app.post("/sessions/{session_id}/messages")
+    async def send_message(session_id: str, body: MessageRequest) -> Dict[str, Any]:
+        dispatcher = services.planner()
+        async with admission_.admit():
+            turn = await dispatcher.send(session_id, body.message)
+        return _turn_payload(turn)
+
+    @app.post("/sessions/{session_id}/messages/stream")
+    async def stream_message(session_id: str, body: MessageRequest):
+        dispatcher = services.planner()
+        # Admit before the response starts so a rejection is a plain 429.
+        await admission_.acquire()
+        release = admission_.release_once()
+
+        async def events() -> AsyncIterator[str]:
+            try:
+                async for node, update in dispatcher.stream(session_id, body.message):
+                    if node == "__turn__":
+                        yield _sse("turn", _turn_payload(update))
+                    else:
+                        yield _node_event(node, update)
+            except BaseServiceError as err:
+                yield _sse("error", err.to_dict())
+            finally:
+                release()
+
+        return _EventStream(events(), release)
+
+    @app.get("/sessions/{session_id}")
+    async def get_session(session_id: str) -> Dict[str, Any]:
+        state = await services.planner().get_state(session_id)
+        if not state:
+            raise UtilsValidationError(
+                f"Unknown session: {session_id!r}",
+                status=404,
+                details={"session_id": session_id},
+            )
+        return {"session_id": session_id, "state": _public(state)}
+
+    @app.delete("/sessions/{session_id}", status_code=204)
+    async def delete_session(session_id: str) -> None:
+        dispatcher = services.planner()
+        await dispatcher.graph.checkpointer.adelete_thread(session_id)
+
+    # * module graphs --------------------------------------------------------
+    @app.get("/graphs")
+    async def graphs() -> Dict[str, Any]:
+        return {
+            "graphs": {
+                name: status
+                for name, status in services.status.items()
+                if name != "planner"
+            }
+        }
+
+    def _module_state(name: str, body: GraphRequest) -> Any:
+        from src.modules import get_make_state
+
+        return get_make_state(name)(body.input)
+
+    @app.post("/graphs/{name}/invoke")
+    async def invoke_graph(name: str, body: GraphRequest) -> Dict[str, Any]:
+        graph = services.module_graph(name)
+        async with admission_.admit():
+            result = await graph.ainvoke(_module_state(name, body))
+        return {"graph": name, "state": _public(result)}
+
+    @app.post("/graphs/{name}/stream")
+    async def stream_graph(name: str, body: GraphRequest):
+        graph = services.module_graph(name)
+        state = _module_state(name, body)
+        await admission_.acquire()
+        release = admission_.release_once()
+
+        async def events() -> AsyncIterator[str]:
+            final: Mapping[str, Any] = {}
+            try:
+                async for mode, chunk in graph.astream(
+                    state, stream_mode=["updates", "values"]
+                ):
+                    if mode == "values":
+                        final = chunk
+                        continue
+                    for node, update in chunk.items():
+                        yield _node_event(node, update)
+                yield _sse("done", {"graph": name, "state": _public(final)})
+            except BaseServiceError as err:
+                yield _sse("error", err.to_dict())
+            finally:
+                release()
+
+        return _EventStream(events(), release)
+
+    return app
+
+
+__all__ = ["MessageRequest", "GraphRequest", "Services", "create_app"]
@@ -6,7 +6,6 @@ from pathlib import Path
 from pprint import pprint
 from typing import Any, Dict
 
-import pandas as pd
 import yaml
 
 from ..common.errors import UtilsValidationError
@@ -22,6 +21,8 @@ def load(path) -> Any:
             with open(path, "r", encoding="utf-8") as f:
                 loaded_file = f.read()
         elif extension == "csv":
+            import pandas as pd
+
             with open(path, "r", encoding="utf-8") as f:
                 loaded_file = pd.read_csv(f, encoding="utf-8")
         elif extension == "json":
@@ -58,6 +59,8 @@ def save(data: Any, path: str):
             with open(path, "w", encoding="utf-8-sig") as f:
                 f.write(data)
         elif extension == "csv":
+            import pandas as pd
+
             if isinstance(data, pd.DataFrame):
                 with open(path, "w", encoding="utf-8-sig") as f:
                     data.to_csv(f, index=False, encoding="utf-8-sig")
@@ -0,0 +1,89 @@
+"""Shared helpers for comparing benchmark results against committed baselines."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+DEFAULT_TOLERANCE = 0.5
+# Absolute slack per unit so tiny metrics do not flap on scheduler noise. A
+# metric's unit is its key suffix ("_us", "_x" for ratios); keys without
+# one are seconds.
+UNIT_SLACK = {"s": 0.005, "ms": 0.5, "us": 5.0, "x": 0.05}
+
+
+def load_baselines(section: str) -> Dict[str, float]:
+    if not BASELINE_PATH.exists():
+        return {}
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f).get(section, {})
+
+
+def update_baselines(section: str, results: Dict[str, float]) -> None:
+    payload = {}
+    if BASELINE_PATH.exists():
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    payload[section] = {key: round(value, 6) for key, value in results.items()}
+    with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def metric_unit(key: str) -> str:
+    unit = key.rpartition("_")[2]
+    return unit if unit in UNIT_SLACK else "s"
+
+
+def check_regressions(
+    section: str,
+    results: Dict[str, float],
+    tolerance: float = DEFAULT_TOLERANCE,
+    slack: float | None = None,
+) -> List[str]:
+    """Return one message per metric above ``baseline * (1 + tolerance) + slack``.
+
+    ``slack`` defaults to ``UNIT_SLACK`` of each metric's unit.
+    """
+    baselines = load_baselines(section)
+    failures = []
+    for key, value in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        margin = UNIT_SLACK[metric_unit(key)] if slack is None else slack
+        limit = baseline * (1 + tolerance) + margin
+        if value > limit:
+            failures.append(
+                f"{section}.{key}: {value:.4f} > {limit:.4f} "
+                f"(baseline {baseline:.4f}, tolerance {tolerance:.0%})"
+            )
+    return failures
+
+
+def ratios(
+    results: Dict[str, float], reference: str = "reference_us"
+) -> Dict[str, float]:
+    """Every ``*_us`` timing as a multiple of ``results[reference]``.
+
+    A reference workload timed in the same run cancels out how fast the
+    machine happens to be, so the ratios can be gated tightly.
+    """
+    base = results[reference]
+    return {
+        key[: -len("_us")] + "_x": value / base
+        for key, value in results.items()
+        if key != reference
+    }
+
+
+def print_report(section: str, results: Dict[str, float], unit: str = "s") -> None:
+    baselines = load_baselines(section)
+    width = max((len(key) for key in results), default=0)
+    print(f"== {section} ==")
+    for key, value in results.items():
+        baseline = baselines.get(key)
+        suffix = f"  (baseline {baseline:.4f}{unit})" if baseline is not None else ""
+        print(f"{key.ljust(width)}  {value:.4f}{unit}{suffix}")
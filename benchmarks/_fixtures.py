@@ -0,0 +1,54 @@
+"""Sample environment and state shared by the benchmark scripts."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+# Shaped like the environment server's /env_entire response.
+SAMPLE_ENV: Dict[str, Any] = {
+    "objects_by_group": {
+        "island_left_group": ["object_apple_0", "object_bowl_0"],
+        "island_right_group": ["object_fork_0"],
+        "counter_1_left_group": ["object_lemon_0", "object_plate_0"],
+        "counter_1_right_group": ["object_cup_0"],
+        "counter_2_left_group": [],
+    },
+    "ungrouped_objects": [],
+}
+
+SAMPLE_INPUTS: Dict[str, str] = {
+    "object_text": "{{{{\n"
+    + "".join(
+        f'"object_name": "{obj}", "object_in_group": "{group}"\n'
+        for group, objects in SAMPLE_ENV["objects_by_group"].items()
+        for obj in objects
+    )
+    + "}}}}",
+    "group_list_text": "[\n"
+    + "".join(f'    "{group}",\n' for group in SAMPLE_ENV["objects_by_group"])
+    + "]",
+    "skill_text": (
+        "from robot1.skills import GoToObject, OpenObject, CloseObject, "
+        "PickObject, PlaceObject"
+    ),
+}
+
+
+def make_sample_state(*user_queries: str) -> Dict[str, Any]:
+    """Return a planner state with the sample inputs and given queries."""
+    return {
+        "user_queries": list(user_queries) or ["사과를 아일랜드 식탁에 옮겨줘"],
+        "inputs": dict(SAMPLE_INPUTS),
+        "intent_result": {"intent": "new"},
+        "supervisor_result": {
+            "is_feasible": True,
+            "reasons": [],
+            "user_final_query": "사과를 아일랜드 식탁에 옮겨줘.",
+        },
+        "feedback_result": {},
+        "feedback_loop_count": 0,
+        "subgoals": {"subgoals": ["사과를 아일랜드 식탁에 옮겨줘"]},
+        "tasks": [],
+        "question_answers": [],
+        "conversation_summary": "",
+    }
@@ -0,0 +1,107 @@
+"""Throughput and memory of the JSONL batch mode (``main.py --input``).
+
+Writes ``--records`` missions to a temporary JSONL and plans them with
+``BatchRunner`` over the headless ``benchmarks/sessions.py`` graph, whose
+LLM nodes sleep ``--llm-latency`` seconds. The run is stopped after half of the
+records and resumed from the output file, as after an interruption. The
+report gives records per second, latency percentiles, RSS growth between
+the first and second half, and whether every index was written once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+from __src.runner.batch import BatchRunner, resume_point
+from benchmarks import sessions as sessions_benchmark
+from benchmarks.session_store import _rss_mb
+
+
+def _write_input(path: Path, records: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for index in range(records):
+            query = sessions_benchmark.TURNS[index % 2]
+            f.write(json.dumps({"id": f"mission-{index}", "query": query}) + "\n")
+
+
+async def _run(batch: BatchRunner, input_path: Path, output_path: Path, stop: int):
+    """Plan until ``stop`` records are written, then cancel like a Ctrl-C."""
+    offset, skip = resume_point(output_path)
+    with open(output_path, "a", encoding="utf-8") as output:
+        task = asyncio.create_task(
+            batch.run(
+                input_path, output, offset=offset, skip=skip, progress_interval=None
+            )
+        )
+        while not task.done():
+            await asyncio.sleep(0.01)
+            output.flush()
+            if sum(1 for _ in open(output_path, "rb")) >= stop:
+                task.cancel()
+        try:
+            return await task
+        except asyncio.CancelledError:
+            return None
+
+
+def run(records: int, concurrency: int, latency: float, order: str) -> Dict:
+    batch = BatchRunner(
+        sessions_benchmark.build_headless_graph(latency),
+        lambda record: sessions_benchmark._make_state(""),
+        concurrency=concurrency,
+        order=order,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / "missions.jsonl"
+        output_path = Path(tmp) / "plans.jsonl"
+        _write_input(input_path, records)
+        start_mb = _rss_mb()
+        asyncio.run(_run(batch, input_path, output_path, records // 2))
+        half_mb = _rss_mb()
+        stats = asyncio.run(_run(batch, input_path, output_path, records + 1))
+        end_mb = _rss_mb()
+        with open(output_path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+    indices = [line["index"] for line in lines]
+    summary = stats.summary()
+    return {
+        "order": order,
+        "records_per_s": summary["per_s"],
+        "p50_ms": summary["p50_ms"],
+        "p95_ms": summary["p95_ms"],
+        "resumed_at": records - summary["done"],
+        "rss_first_half_mb": half_mb - start_mb,
+        "rss_second_half_mb": end_mb - half_mb,
+        "complete": sorted(indices) == list(range(records)),
+        "in_input_order": indices == sorted(indices),
+        "ok": sum(line["status"] == "ok" for line in lines),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure the JSONL batch mode.")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--llm-latency", type=float, default=0.02)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.disable(logging.INFO)
+    for order in ("input", "completion"):
+        result = run(args.records, args.concurrency, args.llm_latency, order)
+        print(result.pop("order"))
+        for key, value in result.items():
+            shown = f"{value:,.2f}" if isinstance(value, float) else value
+            print(f"  {key:<20} {shown}")
+
+
+if __name__ == "__main__":
+    main()
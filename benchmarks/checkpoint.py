@@ -0,0 +1,101 @@
+"""Checkpoint overhead per graph step, in-memory vs. SQLite.
+
+Runs the dialogue of ``benchmarks/sessions.py`` (deterministic planning
+nodes, zero-latency LLM stand-ins) for ``--sessions`` concurrent sessions,
+once per checkpointer. Every step stores a checkpoint, so the difference
+in wall time divided by the number of checkpoint puts is the overhead the
+durable saver adds per step. Bytes per put are compared with the size of
+the whole encoded state, which is what a saver without per-channel blobs
+would write every step.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from __src.runner.checkpoint import (
+    SqliteCheckpointSaver,
+    get_checkpoint_stats,
+    reset_checkpoint_stats,
+)
+from __src.runner.sessions import SessionDispatcher
+from benchmarks import sessions as sessions_benchmark
+
+TURNS = sessions_benchmark.TURNS
+
+
+async def _run(saver, sessions: int) -> float:
+    graph, graph_config = sessions_benchmark.build_graph(0.0, checkpointer=saver)
+    dispatcher = SessionDispatcher(graph, graph_config, sessions_benchmark._make_state)
+
+    async def dialogue(session_id: str) -> None:
+        for message in TURNS:
+            await dispatcher.send(session_id, message)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(dialogue(f"session-{i}") for i in range(sessions)))
+    return time.perf_counter() - start
+
+
+def _state_bytes(saver: SqliteCheckpointSaver) -> float:
+    serde = JsonPlusSerializer(pickle_fallback=False)
+    checkpoint = saver.get_tuple({"configurable": {"thread_id": "session-0"}})
+    values = checkpoint.checkpoint["channel_values"]
+    return sum(len(serde.dumps_typed(value)[1]) for value in values.values())
+
+
+def run(sessions: int, batch_size: int, path: Path) -> Dict[str, float]:
+    memory_s = asyncio.run(_run(InMemorySaver(), sessions))
+    reset_checkpoint_stats()
+    saver = SqliteCheckpointSaver(path, batch_size=batch_size)
+    sqlite_s = asyncio.run(_run(saver, sessions))
+    saver.flush()
+    state_bytes = _state_bytes(saver)
+    saver.close()
+    stats = get_checkpoint_stats()
+    puts = stats["puts"]
+    return {
+        "sessions": sessions,
+        "puts": puts,
+        "memory_s": memory_s,
+        "sqlite_s": sqlite_s,
+        "overhead_ms_per_step": (sqlite_s - memory_s) / puts * 1e3,
+        "encode_ms_per_put": stats["put_mean_ms"],
+        "blobs_per_put": stats["blobs"] / puts,
+        "bytes_per_put": stats["bytes_per_put"],
+        "full_state_bytes": state_bytes,
+        "batches": stats["batches"],
+        "rows_per_batch": stats["rows"] / stats["batches"],
+        "flush_mean_ms": stats["flush_mean_ms"],
+        "db_kb": path.stat().st_size / 1024,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure checkpoint overhead.")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=64)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args.sessions, args.batch_size, Path(tmp) / "bench.sqlite")
+    for key, value in results.items():
+        shown = f"{value:,.3f}" if isinstance(value, float) else value
+        print(f"{key:<22} {shown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Scenario-driven multi-turn load on the supervised planning graph.
+
+``--users`` simulated users share one ``SupervisedPlanRunner`` through a
+``SessionDispatcher``. Each user repeatedly opens a session, picks a
+scenario by weight and sends its scripted turns as the ``user_input``
+interrupt answers, until ``--sessions`` sessions have started. Scenarios
+mix plain missions, questions, infeasible requests that go through
+feedback, accepts and stops. They come from ``SCENARIOS`` or a JSON file
+(``--scenarios``) shaped like ``[{"name", "weight", "turns": [{"message",
+"intent", "feasible"}]}]``.
+
+Backends:
+
+- ``fake``: ``FakeChatModel`` after ``--llm-latency`` seconds (plus half
+  as much seeded jitter). Intent and supervisor answers follow the
+  scripted turn, so the graph takes the scenario's path. Scenes come from
+  the sample environment.
+- ``record``: the configured provider models and environment server,
+  with every call written to ``--cassette``.
+- ``replay``: ``--cassette`` served at ``--speed`` times recorded timing.
+
+The report gives sessions and turns per second, turn latency
+percentiles, model calls per planned mission and RSS growth. Model calls
+are counted per session by a callback handler bound to the session's task,
+so missions that a template or the subgoal memo planned without the model
+count what they actually used, and stopped or abandoned sessions are left
+out. ``node_phases`` is each LLM node's own latency (``NodeTimer``, see
+``get_node_phase_stats``). ``node_gaps`` is the time between a node's
+streamed update and the previous one: it includes event-loop queueing
+behind other sessions, and for ``user_input`` starting a new session.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+from __src.common.cassette import get_cassette, set_cassette
+from __src.common.node_metrics import get_node_phase_stats, reset_node_phase_stats
+from __src.config import load_config
+from __src.runner.fake_llm import MISSION
+from __src.runner.runner import SupervisedPlanRunner
+from __src.runner.sessions import SessionDispatcher
+from __src.runner.state import StateMaker
+from benchmarks._fixtures import SAMPLE_ENV
+from benchmarks.session_store import _rss_mb
+
+
+class ModelCallCounter(BaseCallbackHandler):
+    """Counts chat model runs of one class (the outermost model wrapper)."""
+
+    def __init__(self, model_class: str) -> None:
+        self.model_class = model_class
+        self.calls = 0
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        # A recording cassette calls its inner model too; count it once.
+        if (serialized or {}).get("id", [""])[-1] == self.model_class:
+            self.calls += 1
+
+
+# Every LangChain run started in a session's task (and the executor threads
+# its nodes run on) reports to that session's counter.
+_session_calls: contextvars.ContextVar[Optional[ModelCallCounter]] = (
+    contextvars.ContextVar("session_model_calls", default=None)
+)
+register_configure_hook(_session_calls, inheritable=True)
+
+
+@dataclass(frozen=True)
+class Turn:
+    message: str
+    # What the fake intent and supervisor nodes answer for this message.
+    intent: str = "new"
+    feasible: bool = True
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    turns: Tuple[Turn, ...]
+    weight: float = 1.0
+
+
+SCENARIOS = (
+    Scenario("mission", (Turn(MISSION),), weight=4),
+    Scenario(
+        "question_then_mission",
+        (Turn("사과는 지금 어디 있어?", "question"), Turn("레몬을 아일랜드 식탁에 옮겨줘.")),
+        weight=2,
+    ),
+    Scenario(
+        "infeasible_then_accept",
+        (
+            Turn("바나나를 냉장고에 넣어줘.", feasible=False),
+            Turn("좋아, 제안대로 진행해줘.", "accept"),
+        ),
+        weight=2,
+    ),
+    Scenario(
+        "infeasible_then_stop",
+        (
+            Turn("수박을 잘라서 접시에 담아줘.", feasible=False),
+            Turn("그만할게, 나중에 다시 할게.", "stop"),
+        ),
+        weight=1,
+    ),
+)
+
+
+def load_scenarios(path: str) -> Tuple[Scenario, ...]:
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    return tuple(
+        Scenario(
+            item["name"],
+            tuple(Turn(**turn) for turn in item["turns"]),
+            item.get("weight", 1.0),
+        )
+        for item in payload
+    )
+
+
+def _scripted_turn(text: str, turns: Sequence[Turn]) -> Turn:
+    # The user's latest message is the scripted one quoted last in the prompt.
+    found = max(turns, key=lambda turn: text.rfind(turn.message))
+    return found if text.rfind(found.message) >= 0 else Turn(MISSION)
+
+
+def scenario_responses(scenarios: Sequence[Scenario]) -> Dict[str, Any]:
+    """Fake answers that steer the graph along each scenario's turns."""
+    turns = [turn for scenario in scenarios for turn in scenario.turns]
+
+    def intent(text: str) -> Dict[str, Any]:
+        return {"intent": _scripted_turn(text, turns).intent}
+
+    def supervisor(text: str) -> Dict[str, Any]:
+        turn = _scripted_turn(text, turns)
+        return {
+            "is_feasible": turn.feasible,
+            "reasons": [] if turn.feasible else ["요청한 물체가 환경에 없습니다."],
+            # An accepted suggestion is the fake feedback node's mission.
+            "user_final_query": turn.message if turn.intent == "new" else MISSION,
+        }
+
+    return {"IntentParser": intent, "SupervisorParser": supervisor}
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    if not values:
+        return {"n": 0}
+    return {
+        "n": len(values),
+        "p50_ms": values[len(values) // 2] * 1e3,
+        "p95_ms": values[int(len(values) * 0.95)] * 1e3,
+        "p99_ms": values[int(len(values) * 0.99)] * 1e3,
+    }
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        dispatcher: SessionDispatcher,
+        scenarios: Sequence[Scenario],
+        *,
+        seed: int = 0,
+        think_time: float = 0.0,
+    ) -> None:
+        self.dispatcher = dispatcher
+        self.scenarios = list(scenarios)
+        self.rng = random.Random(seed)
+        self.think_time = think_time
+        self.node_gaps: Dict[str, List[float]] = defaultdict(list)
+        self.turn_latency: List[float] = []
+        self.outcomes: Counter = Counter()
+        self.planned_calls: List[int] = []
+        self.started = 0
+        self.model_class = (
+            "CassetteChatModel" if get_cassette() is not None else "FakeChatModel"
+        )
+
+    async def _turn(self, session_id: str, message: str):
+        start = last = time.perf_counter()
+        async for node, update in self.dispatcher.stream(session_id, message):
+            now = time.perf_counter()
+            if node == "__turn__":
+                self.turn_latency.append(now - start)
+                return update
+            self.node_gaps[node].append(now - last)
+            last = now
+        raise RuntimeError("stream ended without a turn result")
+
+    async def _session(self) -> None:
+        weights = [scenario.weight for scenario in self.scenarios]
+        scenario = self.rng.choices(self.scenarios, weights)[0]
+        session_id = self.dispatcher.new_session()
+        # Each session runs in its own task, so this binding is its own.
+        counter = ModelCallCounter(self.model_class)
+        _session_calls.set(counter)
+        result = None
+        for turn in scenario.turns:
+            if self.think_time:
+                await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+            result = await self._turn(session_id, turn.message)
+            if not result.waiting:
+                break
+        if result.waiting:
+            self.outcomes["abandoned"] += 1
+        elif result.state.get("tasks"):
+            self.outcomes["planned"] += 1
+            self.planned_calls.append(counter.calls)
+        else:
+            self.outcomes["stopped"] += 1
+
+    async def run(self, users: int, sessions: int) -> Dict[str, Any]:
+        async def user() -> None:
+            while self.started < sessions:
+                self.started += 1
+                # A task per session keeps its call counter binding apart.
+                await asyncio.create_task(self._session())
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(users)))
+        elapsed = time.perf_counter() - start
+        planned = self.planned_calls
+        return {
+            "sessions_per_s": sessions / elapsed,
+            "turns_per_s": len(self.turn_latency) / elapsed,
+            "outcomes": dict(self.outcomes),
+            "model_calls_per_planned_mission": (
+                sum(planned) / len(planned) if planned else 0.0
+            ),
+            "turn": _percentiles(self.turn_latency),
+            "node_gaps": {
+                node: _percentiles(values)
+                for node, values in sorted(self.node_gaps.items())
+            },
+        }
+
+
+def build(args: argparse.Namespace, output_dir: str):
+    set_cassette(None)
+    config = load_config()
+    config.paths.output_dir = output_dir
+    config.checkpoint.backend = "memory"
+    config.subgoal_memo.path = None
+    config.fake_llm.enabled = args.backend == "fake"
+    config.fake_llm.latency_s = args.llm_latency
+    config.fake_llm.jitter_s = args.llm_latency / 2
+    if args.backend != "fake":
+        config.cassette.mode = args.backend
+        config.cassette.path = os.path.abspath(args.cassette)
+        config.cassette.speed = args.speed
+    runner = SupervisedPlanRunner(config)
+    graph, graph_config = runner._ensure_graph()
+    if args.backend == "fake":
+        responses = scenario_responses(args.scenarios)
+        for llm in runner._llm_cache.values():
+            llm.responses.update(responses)
+    maker = StateMaker(config)
+    # Fake runs have no environment server; the cassette backends do.
+    env = SAMPLE_ENV if args.backend == "fake" else None
+    return SessionDispatcher(
+        graph, graph_config, lambda session_id: maker.make(env=env)
+    )
+
+
+async def _measure(args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        dispatcher = build(args, tmp)
+        # One session per scenario first, so imports and caches are warm.
+        await LoadGenerator(dispatcher, args.scenarios, seed=args.seed).run(
+            1, len(args.scenarios)
+        )
+        start_mb = _rss_mb()
+        reset_node_phase_stats()
+        load = LoadGenerator(
+            dispatcher, args.scenarios, seed=args.seed, think_time=args.think_time
+        )
+        report = await load.run(args.users, args.sessions)
+        growth = _rss_mb() - start_mb
+        report["node_phases"] = {
+            node: phases["total"]
+            for node, phases in sorted(get_node_phase_stats().items())
+        }
+    report["rss_growth_mb"] = growth
+    report["rss_per_1k_sessions_mb"] = growth / args.sessions * 1000
+    if get_cassette() is not None:
+        report["cassette"] = get_cassette().stats()
+        get_cassette().close()
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simulate multi-turn users.")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument(
+        "--backend", choices=["fake", "record", "replay"], default="fake"
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--cassette", default="cassette.jsonl")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--scenarios", type=load_scenarios, default=SCENARIOS)
+    parser.add_argument("--think-time", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def _print(report: Dict[str, Any], indent: str = "") -> None:
+    for key, value in report.items():
+        if isinstance(value, dict) and any(isinstance(v, dict) for v in value.values()):
+            print(f"{indent}{key}")
+            _print(value, indent + "  ")
+        elif isinstance(value, dict):
+            shown = "  ".join(
+                f"{k}={v:,.1f}" if isinstance(v, float) else f"{k}={v}"
+                for k, v in value.items()
+            )
+            print(f"{indent}{key:<32} {shown}")
+        else:
+            shown = f"{value:,.2f}" if isinstance(value, float) else value
+            print(f"{indent}{key:<32} {shown}")
+
+
+def main() -> None:
+    args = parse_args()
+    logging.disable(logging.WARNING)
+    # Prompt helpers print their inputs; keep that out of the report.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        report = asyncio.run(_measure(args))
+    _print(report)
+
+
+if __name__ == "__main__":
+    main()
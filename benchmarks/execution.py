@@ -0,0 +1,105 @@
+"""Suffix re-planning vs. whole-mission restart after a failed step.
+
+A mission of moves runs on the local stand-in environment with per-skill
+latencies (config ``scheduler.skill_durations`` scaled by ``--scale``). One
+pick fails partway through. The restart strategy re-plans and re-executes
+every subgoal. The suffix strategy re-plans and re-executes only the
+unfinished ones, from the environment's updated state. Re-planning itself
+is counted as subgoals sent to task_decomp.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from __src.config import load_config
+from __src.execution import ExecutionMonitor, LocalEnvClient, get_execution_stats
+from __src.execution.monitor import reset_execution_stats
+from __src.planning import ActionCompiler, WorldModel
+from benchmarks._fixtures import SAMPLE_ENV
+
+MOVES = [
+    ("object_apple_0", "counter_2_left_group"),
+    ("object_fork_0", "counter_2_left_group"),
+    ("object_bowl_0", "counter_1_right_group"),
+    ("object_lemon_0", "island_right_group"),
+    ("object_cup_0", "island_left_group"),
+    ("object_plate_0", "island_right_group"),
+]
+
+
+def _plan(moves) -> Dict[str, List[Dict]]:
+    return {
+        "tasks": [
+            {
+                "subgoal": f"move {obj} to {destination}",
+                "tasks": [
+                    {"skill": "GoToObject", "target": obj},
+                    {"skill": "PickObject", "target": obj},
+                    {"skill": "GoToObject", "target": destination},
+                    {"skill": "PlaceObject", "target": destination},
+                ],
+            }
+            for obj, destination in moves
+        ]
+    }
+
+
+async def _run(strategy: str, fail_at: int, latency, compiler, robots):
+    world = WorldModel.from_env(SAMPLE_ENV)
+    failures = [("PickObject", MOVES[fail_at][0])]
+    client = LocalEnvClient(world, robots, latency=latency, failures=failures)
+    monitor = ExecutionMonitor(client)
+    moves, steps, planned = list(MOVES), 0, len(MOVES)
+    start = time.perf_counter()
+    while True:
+        plan = _plan(moves)
+        report = await monitor.run(compiler.compile(plan))
+        steps += sum(step.status.value in ("done", "failed") for step in report.steps)
+        if report.ok:
+            break
+        if strategy == "suffix":
+            moves = [moves[i] for i in report.remaining_subgoals]
+        else:
+            # A restart from scratch starts from the original scene again.
+            client.state = world.initial_state(robots)
+        planned += len(moves)
+    return time.perf_counter() - start, steps, planned
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare failure recovery.")
+    parser.add_argument("--scale", type=float, default=0.002)
+    parser.add_argument("--fail-at", type=int, default=4)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config()
+    compiler = ActionCompiler.from_config(config)
+    robots = [config.skills[0].name]
+    latency = {
+        skill: seconds * args.scale
+        for skill, seconds in config.scheduler.skill_durations.items()
+    }
+    reset_execution_stats()
+    print(f"{'strategy':<10}{'wall ms':>9}{'steps':>7}{'subgoals planned':>18}")
+    for strategy in ("restart", "suffix"):
+        seconds, steps, planned = asyncio.run(
+            _run(strategy, args.fail_at, latency, compiler, robots)
+        )
+        print(f"{strategy:<10}{seconds * 1e3:>9.1f}{steps:>7}{planned:>18}")
+    print("per-skill latency:")
+    for skill, stats in sorted(get_execution_stats().items()):
+        print(
+            f"  {skill:<12} n={stats['count']:<4} p50={stats['p50_ms']:.2f}ms "
+            f"p95={stats['p95_ms']:.2f}ms failures={stats['failures']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
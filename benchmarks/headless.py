@@ -0,0 +1,77 @@
+"""One-shot planning, interactive sessions vs. the headless graph.
+
+Plans ``--missions`` queries with the ``benchmarks/sessions.py`` nodes,
+whose LLM nodes sleep ``--llm-latency`` seconds, in two ways:
+
+- ``sessions``: the interactive graph through ``SessionDispatcher``. Each
+  mission is a session that pauses at ``user_input``, is resumed with its
+  query and leaves a checkpoint behind.
+- ``headless``: ``make_headless_plan_graph`` over the same nodes, all
+  missions in one ``abatch`` at full parallelism, without checkpoints.
+
+The report gives missions per second and whether both produced actions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict
+
+from __src.runner.sessions import SessionDispatcher
+from benchmarks import sessions as sessions_benchmark
+
+
+async def _sessions(missions: int, latency: float) -> Dict:
+    graph, graph_config = sessions_benchmark.build_graph(latency)
+    dispatcher = SessionDispatcher(graph, graph_config, sessions_benchmark._make_state)
+    query = sessions_benchmark.TURNS[0]
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(dispatcher.send(f"mission-{i}", query) for i in range(missions))
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        "missions_per_s": missions / elapsed,
+        "planned": sum(bool(turn.state.get("actions")) for turn in results),
+    }
+
+
+async def _headless(missions: int, latency: float) -> Dict:
+    graph = sessions_benchmark.build_headless_graph(latency)
+    query = sessions_benchmark.TURNS[0]
+    states = [
+        {**sessions_benchmark._make_state(""), "user_queries": [query]}
+        for _ in range(missions)
+    ]
+    start = time.perf_counter()
+    results = await graph.abatch(states, {"max_concurrency": missions})
+    elapsed = time.perf_counter() - start
+    return {
+        "missions_per_s": missions / elapsed,
+        "planned": sum(bool(state.get("actions")) for state in results),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare one-shot planning paths.")
+    parser.add_argument("--missions", type=int, default=1000)
+    parser.add_argument("--llm-latency", type=float, default=0.02)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.disable(logging.INFO)
+    for name, run in (("sessions", _sessions), ("headless", _headless)):
+        result = asyncio.run(run(args.missions, args.llm_latency))
+        print(name)
+        for key, value in result.items():
+            shown = f"{value:,.2f}" if isinstance(value, float) else value
+            print(f"  {key:<16} {shown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Interactive latency while a batch job floods the LLM, FIFO vs. WFQ.
+
+A two-node graph stands in for the planner: each node holds an LLM slot
+from the installed ``LLMScheduler`` and sleeps ``--llm-latency`` seconds.
+``Runner.batch``'s path is reproduced with ``graph.batch`` under the batch
+priority, ``--batch`` states at once. While it runs, ``--interactive``
+single runs arrive every ``--interval`` seconds. ``fifo`` puts both in one
+class (a plain shared quota); ``wfq`` uses the configured interactive and
+batch classes. The report gives interactive latency, batch wall time and
+the scheduler's queueing metrics.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import statistics
+import threading
+import time
+from typing import Dict, List, TypedDict
+
+from langgraph.graph import END, START, StateGraph
+
+from __src.config import load_config
+from __src.runner.llm_scheduler import (
+    BATCH,
+    INTERACTIVE,
+    LLMScheduler,
+    PriorityClass,
+    llm_priority,
+    llm_slot,
+    set_llm_scheduler,
+)
+
+
+class _State(TypedDict):
+    steps: int
+
+
+def build_graph(latency: float):
+    def llm_node(state):
+        with llm_slot():
+            time.sleep(latency)
+        return {"steps": state["steps"] + 1}
+
+    builder = StateGraph(_State)
+    builder.add_node("first", llm_node)
+    builder.add_node("second", llm_node)
+    builder.add_edge(START, "first")
+    builder.add_edge("first", "second")
+    builder.add_edge("second", END)
+    return builder.compile()
+
+
+def _scheduler(variant: str) -> LLMScheduler:
+    config = load_config().llm_scheduler
+    if variant == "wfq":
+        return LLMScheduler.from_config(config)
+    shared = PriorityClass(
+        max_concurrency=config.max_concurrency, max_queue=1_000_000
+    )
+    return LLMScheduler(
+        {"shared": shared},
+        max_concurrency=config.max_concurrency,
+        queue_timeout=config.queue_timeout_s,
+    )
+
+
+def run(variant: str, args: argparse.Namespace) -> Dict:
+    scheduler = _scheduler(variant)
+    set_llm_scheduler(scheduler)
+    graph = build_graph(args.llm_latency)
+    batch_class, interactive_class = (
+        (BATCH, INTERACTIVE) if variant == "wfq" else ("shared", "shared")
+    )
+    batch_elapsed: List[float] = []
+
+    def batch_job() -> None:
+        start = time.perf_counter()
+        with llm_priority(batch_class):
+            graph.batch(
+                [{"steps": 0}] * args.batch, {"max_concurrency": args.batch}
+            )
+        batch_elapsed.append(time.perf_counter() - start)
+
+    latencies: List[float] = []
+
+    def interactive_run() -> None:
+        start = time.perf_counter()
+        with llm_priority(interactive_class):
+            graph.invoke({"steps": 0})
+        latencies.append(time.perf_counter() - start)
+
+    batch_thread = threading.Thread(target=batch_job)
+    batch_thread.start()
+    # Let the batch fill the queue first.
+    time.sleep(args.interval)
+    users = []
+    for _ in range(args.interactive):
+        user = threading.Thread(target=interactive_run)
+        user.start()
+        users.append(user)
+        time.sleep(args.interval)
+    for user in users:
+        user.join()
+    batch_thread.join()
+    set_llm_scheduler(None)
+
+    latencies.sort()
+    stats = scheduler.stats()["classes"]
+    return {
+        "interactive_p50_ms": statistics.median(latencies) * 1e3,
+        "interactive_p95_ms": latencies[int(len(latencies) * 0.95)] * 1e3,
+        "batch_elapsed_s": batch_elapsed[0],
+        "queue_wait_p95_ms": {
+            name: round(item["queue_wait_p95_ms"], 1) for name, item in stats.items()
+        },
+        "shed": {name: item["shed"] for name, item in stats.items()},
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare LLM queueing policies.")
+    parser.add_argument("--batch", type=int, default=400)
+    parser.add_argument("--interactive", type=int, default=40)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.02)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.disable(logging.INFO)
+    for variant in ("fifo", "wfq"):
+        print(variant)
+        for key, value in run(variant, args).items():
+            shown = f"{value:,.2f}" if isinstance(value, float) else value
+            print(f"  {key:<20} {shown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Check that bounded supervisor memory keeps the merged mission unchanged.
+
+Each scripted dialogue is replayed turn by turn twice: once with the full
+query history (the old behaviour) and once with the memory policy from
+``config.yaml``. The report shows how often the final ``user_final_query``
+matches and how many prompt tokens the supervisor input costs per turn.
+``--dry-run`` skips the LLM and reports token sizes only, using each turn's
+query as a stand-in for the merged mission.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+from typing import Dict, List
+
+from langchain_core.output_parsers import PydanticOutputParser
+
+from __src.common.tokens import count_tokens
+from __src.config import load_config
+from __src.config.config import MemoryConfig
+from __src.prompts import process_prompt
+from __src.runner.graph import _build_llm_chain
+from __src.runner.runner import Runner
+from benchmarks._fixtures import SAMPLE_INPUTS
+
+# (user turns, expected merged mission after the last turn)
+DIALOGUES: List[tuple[List[str], str]] = [
+    (
+        ["사과를 옮겨줘", "아일랜드 식탁에 옮겨줘", "사과말고 레몬"],
+        "레몬을 아일랜드 식탁에 옮겨줘.",
+    ),
+    (
+        [
+            "포크를 옮겨줘",
+            "어디로 옮길까?",
+            "그릇 옆으로",
+            "아니 아일랜드 식탁으로",
+            "포크 말고 숟가락",
+            "아니다 다시 포크로 해줘",
+            "좋아",
+        ],
+        "포크를 아일랜드 식탁에 옮겨줘.",
+    ),
+    (
+        ["bring the apple", "to the island table", "actually the lemon", "yes"],
+        "Bring the lemon to the island table.",
+    ),
+    (
+        ["사과를 옮겨줘"]
+        + [
+            "아일랜드 식탁에 옮겨줘" if i % 2 else "아니 카운터에 옮겨줘"
+            for i in range(20)
+        ]
+        + ["사과말고 레몬"],
+        "레몬을 아일랜드 식탁에 옮겨줘.",
+    ),
+]
+
+def _normalize(text: str) -> str:
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+def _replay(chain, turns: List[str], memory: MemoryConfig | None, dry_run: bool):
+    state: Dict = {"user_queries": [], "inputs": SAMPLE_INPUTS, "conversation_summary": ""}
+    tokens: List[int] = []
+    final_query = ""
+    for turn in turns:
+        state["user_queries"].append(turn)
+        inputs = process_prompt.make_supervisor_node_inputs(state, memory=memory)
+        tokens.append(count_tokens(inputs["user_queries_text"]))
+        if dry_run:
+            result = {"user_final_query": turn}
+        else:
+            inputs["format_instructions"] = chain.format_instructions
+            parsed, _ = chain.run(inputs)
+            result = parsed.model_dump()
+        final_query = result["user_final_query"]
+        state["conversation_summary"] = final_query
+    return final_query, tokens
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Evaluate bounded supervisor memory.")
+    parser.add_argument("--model", default=None, help="Defaults to supervisor_node.")
+    parser.add_argument("--max-raw-turns", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config()
+    memory = config.memory
+    if args.max_raw_turns is not None:
+        memory = memory.model_copy(update={"max_raw_turns": args.max_raw_turns})
+
+    chain = None
+    if not args.dry_run:
+        node_config = config.runner.supervisor_node
+        llm = Runner(config)._get_llm(
+            args.model or node_config.model_name,
+            prompt_cache_key=node_config.prompt_cache_key,
+        )
+        chain = _build_llm_chain(
+            llm,
+            process_prompt.SUPERVISOR_NODE_PROMPT,
+            parser=PydanticOutputParser(
+                pydantic_object=process_prompt.SupervisorParser
+            ),
+        )
+
+    matches = 0
+    full_tokens: List[int] = []
+    bounded_tokens: List[int] = []
+    for turns, expected in DIALOGUES:
+        full_query, full_turn_tokens = _replay(chain, turns, None, args.dry_run)
+        bounded_query, bounded_turn_tokens = _replay(
+            chain, turns, memory, args.dry_run
+        )
+        same = _normalize(full_query) == _normalize(bounded_query)
+        matches += same
+        full_tokens.extend(full_turn_tokens)
+        bounded_tokens.extend(bounded_turn_tokens)
+        if not args.dry_run:
+            print(f"- turns={len(turns)} match={same}")
+            print(f"  full:     {full_query}")
+            print(f"  bounded:  {bounded_query}")
+            print(f"  expected: {expected}")
+
+    if not args.dry_run:
+        print(f"merged mission match: {matches}/{len(DIALOGUES)}")
+    print(
+        "supervisor query tokens per turn: "
+        f"full mean={statistics.mean(full_tokens):.1f} max={max(full_tokens)}, "
+        f"bounded mean={statistics.mean(bounded_tokens):.1f} max={max(bounded_tokens)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
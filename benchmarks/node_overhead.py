@@ -0,0 +1,192 @@
+"""Overhead of our own node code, with the LLM replaced by ``FakeChatModel``.
+
+The planner is built by ``SupervisedPlanRunner.build_nodes`` with
+``fake_llm.enabled`` and zero latency. What remains is our own code and
+LangGraph: prompt rendering, ``_prompt_value_to_input``, parsing and JSON
+repair, ``extract_headers``, state updates and graph stepping. Measured:
+
+- ``chain.*``: the single steps of an LLM node, on the task_decomp chain.
+- ``node.*``: one call of each node the runner builds, on a sample state.
+- ``graph.*``: one mission through the headless graph (LLM path and
+  template fast path) and one interactive session turn (invoke + resume).
+
+All timings are the best of several rounds, in microseconds per call.
+The gate compares ratios instead (``*_x``): each timing divided by a fixed
+reference workload (JSON round trips of the sample scene) timed in the
+same run, so ``baselines.json`` holds no per-machine timings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import timeit
+from typing import Any, Callable, Dict
+
+from __src.config import load_config
+from __src.prompts import planning_prompt
+from __src.runner import graph as graph_module
+from __src.runner.fake_llm import MISSION, SUBGOAL
+from __src.runner.runner import SupervisedPlanRunner
+from __src.runner.state import _make_base_state
+from benchmarks._baseline import (
+    DEFAULT_TOLERANCE,
+    check_regressions,
+    print_report,
+    ratios,
+    update_baselines,
+)
+from benchmarks._fixtures import SAMPLE_ENV, make_sample_state
+
+SECTION = "node_overhead"
+# Nodes that need an earlier node's output are timed on a state holding it.
+PLAN = {"tasks": [dict(SUBGOAL, tasks=[dict(task) for task in SUBGOAL["tasks"]])]}
+
+
+def _runner(template_planner: bool) -> SupervisedPlanRunner:
+    config = load_config()
+    config.fake_llm.enabled = True
+    config.fake_llm.latency_s = 0.0
+    config.llm_scheduler.enabled = False
+    config.checkpoint.backend = "memory"
+    config.session_store.enabled = False
+    config.template_planner.enabled = template_planner
+    config.subgoal_memo.path = None
+    return SupervisedPlanRunner(config)
+
+
+def _state() -> Dict[str, Any]:
+    state = {**_make_base_state(), **make_sample_state(MISSION)}
+    state["inputs"] = {**state["inputs"], "env": SAMPLE_ENV}
+    state["tasks"] = PLAN
+    state["plan_validation"] = {
+        "ok": False,
+        "issue": {"subgoal_index": 0, "task_index": 0, "reason": "sample"},
+    }
+    return state
+
+
+def _best_us(func: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    # Best of several runs keeps scheduler noise out of the gate.
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def measure_chain(runner: SupervisedPlanRunner, number: int) -> Dict[str, float]:
+    from langchain_core.output_parsers import PydanticOutputParser
+
+    llm = runner._get_llm(runner.config.runner.task_decomp_node.model_name)
+    parser = PydanticOutputParser(pydantic_object=planning_prompt.TaskDecompNodeParser)
+    chain = graph_module._build_llm_chain(
+        llm, planning_prompt.TASK_DECOMP_NODE_PROMPT, parser=parser
+    )
+    inputs = planning_prompt.make_task_decomp_node_inputs(_state())
+    inputs["format_instructions"] = chain.format_instructions
+    prompt_value = chain.prompt.invoke(inputs)
+    llm_input = graph_module._prompt_value_to_input(prompt_value)
+    message = llm.invoke(llm_input)
+    return {
+        "chain.render_us": _best_us(lambda: chain.prompt.invoke(inputs), number),
+        "chain.to_input_us": _best_us(
+            lambda: graph_module._prompt_value_to_input(prompt_value), number
+        ),
+        "chain.fake_llm_us": _best_us(lambda: llm.invoke(llm_input), number),
+        "chain.parse_us": _best_us(
+            lambda: chain._parse_pydantic(message, "fake"), number
+        ),
+        "chain.extract_headers_us": _best_us(
+            lambda: graph_module.extract_headers(message, model_name="fake"), number
+        ),
+        "chain.run_us": _best_us(lambda: chain.run(dict(inputs)), number),
+    }
+
+
+def measure_nodes(runner: SupervisedPlanRunner, number: int) -> Dict[str, float]:
+    nodes, _ = runner.build_nodes()
+    state = _state()
+    skipped = {"user_input", "execute"}
+    return {
+        f"node.{name}_us": _best_us(lambda node=node: node(dict(state)), number)
+        for name, node in nodes.items()
+        if name not in skipped
+    }
+
+
+def measure_graphs(number: int) -> Dict[str, float]:
+    llm_path = _runner(template_planner=False)
+    template_path = _runner(template_planner=True)
+    state = {**_make_base_state(), **make_sample_state(MISSION)}
+    state["inputs"] = {**state["inputs"], "env": SAMPLE_ENV}
+    headless = llm_path.headless_graph()
+
+    def session_turn() -> None:
+        llm_path.invoke(dict(state, user_queries=[]))
+        llm_path.resume(MISSION)
+
+    results = {
+        "graph.headless_llm_path_us": _best_us(
+            lambda: headless.invoke(dict(state)), number
+        ),
+        "graph.headless_template_us": _best_us(
+            lambda: template_path.headless_graph().invoke(dict(state)), number
+        ),
+        "graph.session_turn_us": _best_us(session_turn, number),
+    }
+    final = headless.invoke(dict(state))
+    if not final.get("actions", {}).get("records"):
+        raise RuntimeError("fake LLM mission produced no actions")
+    return results
+
+
+def measure_reference(number: int) -> float:
+    """Interpreter work of the same kind as our node code (dicts, strings)."""
+    return _best_us(lambda: json.loads(json.dumps(SAMPLE_ENV)), number * 10)
+
+
+def measure(number: int) -> Dict[str, float]:
+    runner = _runner(template_planner=False)
+    # Prompt helpers print their inputs; keep that out of the report.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # Untimed pass first: lazy imports and caches would land on chain.*.
+        measure_chain(runner, max(1, number // 10))
+        reference = measure_reference(number)
+        results = measure_chain(runner, number)
+        results.update(measure_nodes(runner, number))
+        results.update(measure_graphs(max(1, number // 10)))
+        # Timed on both sides so a drift in machine speed hits both.
+        reference = min(reference, measure_reference(number))
+    results["reference_us"] = reference
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure our per-node overhead.")
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.disable(logging.WARNING)
+    results = measure(args.number)
+    for key, value in results.items():
+        print(f"{key:<28} {value:,.1f}us")
+    gated = ratios(results)
+    print_report(SECTION, gated, unit="x")
+    if args.update_baseline:
+        update_baselines(SECTION, gated)
+        return
+    failures = check_regressions(SECTION, gated, tolerance=args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
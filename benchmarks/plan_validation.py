@@ -0,0 +1,114 @@
+"""Cost of symbolically validating a task_decomp plan.
+
+A valid plan of ``--subgoals`` pick-and-place subgoals is replayed against
+the sample scene, together with a plan that fails on its last step (the
+worst case for the failing path, which also snapshots the world state).
+
+Absolute microseconds are printed, but the gate compares ratios (``*_x``)
+to a reference workload timed in the same run, as ``node_overhead`` does,
+so a busy or slower machine does not fail it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import sys
+import timeit
+from functools import partial
+from typing import Callable, Dict
+
+from __src.config import load_config
+from __src.planning import PlanSimulator, WorldModel
+from benchmarks._baseline import (
+    DEFAULT_TOLERANCE,
+    check_regressions,
+    print_report,
+    ratios,
+    update_baselines,
+)
+from benchmarks._fixtures import SAMPLE_ENV
+
+SECTION = "plan_validation"
+
+
+def _pick_and_place(obj: str, destination: str) -> Dict:
+    return {
+        "subgoal": f"put {obj} on {destination}",
+        "tasks": [
+            {"skill": "GoToObject", "target": obj},
+            {"skill": "PickObject", "target": obj},
+            {"skill": "GoToObject", "target": destination},
+            {"skill": "PlaceObject", "target": destination},
+        ],
+    }
+
+
+def make_plans(subgoals: int) -> Dict[str, Dict]:
+    objects = [obj for objs in SAMPLE_ENV["objects_by_group"].values() for obj in objs]
+    groups = list(SAMPLE_ENV["objects_by_group"])
+    valid = [
+        _pick_and_place(objects[i % len(objects)], groups[i % len(groups)])
+        for i in range(subgoals)
+    ]
+    invalid = valid[:-1] + [
+        {"subgoal": "broken", "tasks": [{"skill": "PlaceObject", "target": groups[0]}]}
+    ]
+    return {"valid": {"tasks": valid}, "invalid": {"tasks": invalid}}
+
+
+def measure(subgoals: int, number: int, repeat: int = 7) -> Dict[str, float]:
+    config = load_config()
+    simulator = PlanSimulator.from_config(WorldModel.from_env(SAMPLE_ENV), config.skills)
+    workloads: Dict[str, Callable[[], object]] = {
+        f"{name}.validate_us": partial(simulator.validate, plan)
+        for name, plan in make_plans(subgoals).items()
+    }
+    workloads["world.from_env_us"] = partial(WorldModel.from_env, SAMPLE_ENV)
+    workloads["reference_us"] = reference_workload
+    # Rounds interleave every workload with the reference, so a burst of
+    # machine noise lands on both sides of a ratio instead of on one.
+    best = dict.fromkeys(workloads, float("inf"))
+    for _ in range(repeat):
+        for key, func in workloads.items():
+            best[key] = min(best[key], timeit.timeit(func, number=number))
+    return {key: seconds / number * 1e6 for key, seconds in best.items()}
+
+
+def reference_workload() -> None:
+    """Pure-Python dict and list walking, like the simulator's own work.
+
+    A C-level reference (``json`` round trip) varied more from process to
+    process than the simulator did, which defeats the ratio.
+    """
+    copy.deepcopy(SAMPLE_ENV)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure plan validation cost.")
+    parser.add_argument("--subgoals", type=int, default=5)
+    parser.add_argument("--number", type=int, default=5000)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    results = measure(args.subgoals, args.number)
+    for key, value in results.items():
+        print(f"{key:<22} {value:,.1f}us")
+    gated = ratios(results)
+    print_report(SECTION, gated, unit="x")
+    if args.update_baseline:
+        update_baselines(SECTION, gated)
+        return
+    failures = check_regressions(SECTION, gated, tolerance=args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
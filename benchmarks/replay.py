@@ -0,0 +1,113 @@
+"""Recording a cassette and replaying it at recorded and accelerated timing.
+
+Plans ``--missions`` queries through ``SupervisedPlanRunner.batch`` three
+times with the same config:
+
+- ``record``: the fake LLM answers after ``--llm-latency`` seconds plus
+  seeded jitter, and every LLM and ``/env_entire`` response is written to
+  a temporary cassette (the env server is stubbed with the sample scene).
+- ``replay`` at ``speed=1``: no fake model and no env server; each call
+  waits its recorded latency.
+- ``replay`` at ``speed=0``: the same, without waits.
+
+The report gives missions per second, cassette hits and misses, and
+whether every replay produced the recorded actions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from __src.config import load_config
+from __src.runner import text
+from __src.runner.runner import SupervisedPlanRunner
+from __src.runner.state import StateMaker
+from benchmarks._fixtures import SAMPLE_ENV
+from __src.common.cassette import get_cassette, set_cassette
+
+MISSIONS = [
+    "사과를 아일랜드 식탁에 옮겨줘.",
+    "레몬을 아일랜드 식탁에 옮겨줘.",
+    "컵을 아일랜드 식탁에 옮겨줘.",
+    "포크를 아일랜드 식탁에 옮겨줘.",
+]
+
+
+def _run(
+    output_dir: str, mode: str, speed: float, missions: int, latency: float
+) -> Dict[str, Any]:
+    set_cassette(None)
+    config = load_config()
+    config.paths.output_dir = output_dir
+    config.fake_llm.enabled = mode == "record"
+    config.fake_llm.latency_s = latency
+    config.fake_llm.jitter_s = latency / 2
+    config.template_planner.enabled = False
+    config.subgoal_memo.enabled = False
+    config.session_store.enabled = False
+    config.cassette.mode = mode
+    config.cassette.speed = speed
+    runner = SupervisedPlanRunner(config)
+    maker = StateMaker(config)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        states = [
+            maker.make(user_query=MISSIONS[index % len(MISSIONS)])
+            for index in range(missions)
+        ]
+        start = time.perf_counter()
+        results = runner.batch(states)
+        elapsed = time.perf_counter() - start
+    get_cassette().close()
+    return {
+        "missions_per_s": missions / elapsed,
+        "actions": [state.get("actions") for state in results],
+        **get_cassette().stats(),
+    }
+
+
+def run(missions: int, latency: float) -> Dict[str, Dict[str, Any]]:
+    # Every StateMaker.make() queries /env_entire; serve the sample scene.
+    text._get_env = lambda url: SAMPLE_ENV
+    reports = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        recorded: List[Any] = []
+        for name, mode, speed in (
+            ("record", "record", 1.0),
+            ("replay x1", "replay", 1.0),
+            ("replay x0", "replay", 0.0),
+        ):
+            report = _run(tmp, mode, speed, missions, latency)
+            actions = report.pop("actions")
+            if mode == "record":
+                recorded = actions
+            report["identical"] = actions == recorded
+            reports[name] = report
+    set_cassette(None)
+    return reports
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record and replay a cassette.")
+    parser.add_argument("--missions", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.disable(logging.INFO)
+    for name, report in run(args.missions, args.llm_latency).items():
+        print(name)
+        for key, value in report.items():
+            shown = f"{value:,.2f}" if isinstance(value, float) else value
+            print(f"  {key:<16} {shown}")
+
+
+if __name__ == "__main__":
+    main()
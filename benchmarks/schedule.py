@@ -0,0 +1,60 @@
+"""Makespan and solve time of the multi-robot scheduler.
+
+Plans of increasing size are built from the sample scene and scheduled for
+one to three identical robots with the nominal skill durations from
+``config.yaml``. Sizes up to ``scheduler.exact_max_subgoals`` use the exact
+solver; the heuristic makespan is shown alongside for comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from __src.config import load_config
+from __src.planning import Scheduler, WorldModel
+from benchmarks._fixtures import SAMPLE_ENV
+from benchmarks.plan_validation import make_plans
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report multi-robot makespans.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 4, 6, 10, 20])
+    parser.add_argument("--robots", type=int, default=3)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config()
+    skills = config.skills[0].skills
+    durations = config.scheduler.skill_durations
+    world = WorldModel.from_env(SAMPLE_ENV)
+    print(
+        f"{'subgoals':>8}{'robots':>8}{'method':>11}{'makespan':>10}"
+        f"{'heuristic':>11}{'sequential':>12}{'solve_ms':>10}"
+    )
+    for size in args.sizes:
+        plan = make_plans(size)["valid"]
+        for count in range(1, args.robots + 1):
+            robots = {f"robot{i + 1}": skills for i in range(count)}
+            scheduler = Scheduler(
+                robots,
+                skill_durations=durations,
+                exact_max_subgoals=config.scheduler.exact_max_subgoals,
+            )
+            start = time.perf_counter()
+            schedule = scheduler.schedule(plan, world)
+            elapsed = (time.perf_counter() - start) * 1e3
+            heuristic = Scheduler(
+                robots, skill_durations=durations, exact_max_subgoals=0
+            ).schedule(plan, world)
+            print(
+                f"{size:>8}{count:>8}{schedule.method:>11}{schedule.makespan:>10g}"
+                f"{heuristic.makespan:>11g}{schedule.sequential_makespan:>12g}"
+                f"{elapsed:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Local load test of the HTTP service.
+
+Starts the app under uvicorn on a free local port. The planner is the
+``benchmarks/sessions.py`` graph, whose LLM nodes sleep ``--llm-latency``
+seconds. ``--users`` virtual users each open a session and send its three
+turns over real HTTP, all at once. The admission limits come from the
+flags, so a small ``--max-queue`` shows load shedding (429s) instead of
+unbounded queueing. One extra session is streamed over SSE to check the
+event flow. The report gives request throughput, latency percentiles,
+status counts and the server's admission metrics.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import socket
+import statistics
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+import uvicorn
+
+from __src.config import load_config
+from __src.runner.sessions import SessionDispatcher
+from __src.server import AdmissionController, create_app
+from benchmarks import sessions as sessions_benchmark
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+            # Queued clients may leave pooled connections idle for a while.
+            timeout_keep_alive=120,
+        )
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def _wait_ready(client: httpx.AsyncClient) -> None:
+    while (await client.get("/readyz")).status_code != 200:
+        await asyncio.sleep(0.05)
+
+
+async def _stream_events(client: httpx.AsyncClient) -> List[str]:
+    session_id = (await client.post("/sessions")).json()["session_id"]
+    events = []
+    async with client.stream(
+        "POST",
+        f"/sessions/{session_id}/messages/stream",
+        json={"message": sessions_benchmark.TURNS[0]},
+    ) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                events.append(line[len("event: ") :])
+    return events
+
+
+async def _load(base_url: str, users: int) -> Dict:
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=60.0, limits=limits
+    ) as client:
+        await _wait_ready(client)
+        events = await _stream_events(client)
+
+        async def user() -> None:
+            session_id = (await client.post("/sessions")).json()["session_id"]
+            for message in sessions_benchmark.TURNS:
+                start = time.perf_counter()
+                response = await client.post(
+                    f"/sessions/{session_id}/messages", json={"message": message}
+                )
+                statuses[response.status_code] += 1
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    # A shed request ends this user's dialogue.
+                    return
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(users)))
+        elapsed = time.perf_counter() - start
+        metrics = (await client.get("/metrics")).json()
+    latencies.sort()
+    return {
+        "elapsed_s": elapsed,
+        "ok_per_s": statuses[200] / elapsed,
+        "p50_ms": statistics.median(latencies) * 1e3 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1e3 if latencies else 0.0,
+        "statuses": dict(statuses),
+        "stream_events": dict(Counter(events)),
+        "admission": metrics["admission"],
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the HTTP service.")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--queue-timeout", type=float, default=10.0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.disable(logging.INFO)
+    graph, graph_config = sessions_benchmark.build_graph(args.llm_latency)
+    app = create_app(
+        load_config(),
+        make_dispatcher=lambda: SessionDispatcher(
+            graph, graph_config, sessions_benchmark._make_state
+        ),
+        graph_names=[],
+        get_module_graph=lambda name: None,
+        admission=AdmissionController(
+            args.max_concurrency, args.max_queue, args.queue_timeout
+        ),
+    )
+    port = _free_port()
+    server = _start_server(app, port)
+    try:
+        results = asyncio.run(_load(f"http://127.0.0.1:{port}", args.users))
+    finally:
+        server.should_exit = True
+    for key, value in results.items():
+        shown = f"{value:,.2f}" if isinstance(value, float) else value
+        print(f"{key:<14} {shown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Resident memory of many idle sessions, unbounded vs. SessionStore.
+
+Simulates a kiosk that has served ``--sessions`` conversations: each runs
+one mission turn of the ``benchmarks/sessions.py`` dialogue and then sits
+idle at ``user_input``. Every checkpointer variant runs in a fresh process
+so RSS numbers do not mix. Afterwards ``--resume`` of the oldest sessions
+get a second turn, which for the bounded store means a reload from disk.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+RSS_PAGE_KB = 4
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * RSS_PAGE_KB / 1024
+
+
+def _run(variant: str, sessions: int, resume: int, max_sessions: int, path: str):
+    logging.disable(logging.INFO)
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from __src.runner.checkpoint import SqliteCheckpointSaver
+    from __src.runner.session_store import SessionStore, get_session_store_stats
+    from __src.runner.sessions import SessionDispatcher
+    from benchmarks import sessions as sessions_benchmark
+
+    if variant == "unbounded":
+        saver = InMemorySaver()
+    else:
+        saver = SessionStore(
+            SqliteCheckpointSaver(Path(path) / "spill.sqlite"),
+            max_sessions=max_sessions,
+        )
+    graph, graph_config = sessions_benchmark.build_graph(0.0, checkpointer=saver)
+    dispatcher = SessionDispatcher(graph, graph_config, sessions_benchmark._make_state)
+    ids = [dispatcher.new_session() for _ in range(sessions)]
+    baseline_mb = _rss_mb()
+
+    async def drive() -> List[float]:
+        mission = sessions_benchmark.TURNS[0]
+        for start in range(0, sessions, 100):
+            await asyncio.gather(
+                *(dispatcher.send(i, mission) for i in ids[start : start + 100])
+            )
+        latencies = []
+        for session_id in ids[:resume]:
+            begin = time.perf_counter()
+            await dispatcher.send(session_id, sessions_benchmark.TURNS[1])
+            latencies.append(time.perf_counter() - begin)
+        return latencies
+
+    start = time.perf_counter()
+    latencies = asyncio.run(drive())
+    result = {
+        "variant": variant,
+        "elapsed_s": time.perf_counter() - start,
+        "rss_growth_mb": _rss_mb() - baseline_mb,
+        "resume_p50_ms": statistics.median(latencies) * 1e3,
+    }
+    if isinstance(saver, SessionStore):
+        result.update(saver.usage())
+        result.update(get_session_store_stats())
+        saver.close()
+    return result
+
+
+def run(sessions: int, resume: int, max_sessions: int) -> List[Dict]:
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for variant in ("unbounded", "bounded"):
+            with context.Pool(1) as pool:
+                results.append(
+                    pool.apply(_run, (variant, sessions, resume, max_sessions, tmp))
+                )
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure idle-session memory.")
+    parser.add_argument("--sessions", type=int, default=3000)
+    parser.add_argument("--resume", type=int, default=50)
+    parser.add_argument("--max-sessions", type=int, default=200)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    for result in run(args.sessions, args.resume, args.max_sessions):
+        print(result.pop("variant"))
+        for key, value in result.items():
+            shown = f"{value:,.2f}" if isinstance(value, float) else value
+            print(f"  {key:<16} {shown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Many concurrent dialogues through one graph via user_input interrupts.
+
+The supervised graph is built with its deterministic planning nodes
+(template plan, validation, action compile). The LLM nodes are replaced by
+async callables that sleep ``--llm-latency`` seconds, which stands in for
+waiting on a provider. Each session runs three turns: a mission, a
+question, and "stop". All sessions are in flight at once. The report gives
+turn throughput and per-turn latency percentiles.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Dict, List
+
+from __src.config import load_config
+from __src.planning import ActionCompiler
+from __src.prompts import planning_prompt, process_prompt
+from __src.runner import graph as graph_module
+from __src.runner.sessions import SessionDispatcher
+from __src.runner.state import StateSchema, _make_base_state
+from benchmarks._fixtures import SAMPLE_ENV, SAMPLE_INPUTS
+
+TURNS = ["사과를 아일랜드 식탁에 옮겨줘.", "? 지금 뭐 하고 있어?", "stop"]
+
+
+def _llm_node(latency: float, update):
+    async def node(state):
+        await asyncio.sleep(latency)
+        return update(state)
+
+    return node
+
+
+def _intent(state):
+    query = state["user_queries"][-1]
+    intent = "stop" if query == "stop" else "question" if query[:1] == "?" else "new"
+    return {"intent_result": {"intent": intent}}
+
+
+def build_nodes(latency: float):
+    config = load_config()
+    robot_skills = {robot.name: robot.skills for robot in config.skills}
+    nodes = {
+        "user_input": graph_module.make_user_input_node(),
+        "intent": _llm_node(latency, _intent),
+        "supervisor": _llm_node(
+            latency,
+            lambda state: {
+                "supervisor_result": {
+                    "is_feasible": True,
+                    "reasons": [],
+                    "user_final_query": state["user_queries"][-1],
+                }
+            },
+        ),
+        "feedback": _llm_node(latency, lambda state: {"feedback_result": {}}),
+        "goal_decomp": _llm_node(latency, lambda state: {"subgoals": {"subgoals": []}}),
+        "task_decomp": _llm_node(latency, lambda state: {"tasks": {"tasks": []}}),
+        "question_answer": _llm_node(
+            latency, lambda state: {"question_answers": [{"answer": "planning"}]}
+        ),
+        "template_plan": graph_module.make_template_plan_node(robot_skills),
+        "plan_validation": graph_module.make_plan_validation_node(robot_skills),
+        "task_repair": _llm_node(latency, lambda state: {}),
+        "action_compile": graph_module.make_action_compile_node(
+            ActionCompiler.from_config(config)
+        ),
+    }
+    routers = {
+        "intent": process_prompt.route_intent,
+        "supervisor": process_prompt.route_supervisor,
+        "template_plan": planning_prompt.route_template_plan,
+        "plan_validation": planning_prompt.route_plan_validation,
+    }
+    return nodes, routers
+
+
+def build_graph(latency: float, checkpointer=None):
+    nodes, routers = build_nodes(latency)
+    return graph_module.make_supervised_plan_graph(
+        StateSchema, nodes, routers, checkpointer=checkpointer
+    )
+
+
+def build_headless_graph(latency: float, end_at: str = "plan"):
+    nodes, routers = build_nodes(latency)
+    graph, _ = graph_module.make_headless_plan_graph(
+        StateSchema, nodes, routers, end_at=end_at
+    )
+    return graph
+
+
+def _make_state(session_id: str) -> Dict:
+    state = _make_base_state()
+    state["inputs"] = {**SAMPLE_INPUTS, "env": SAMPLE_ENV}
+    return state
+
+
+async def run(sessions: int, latency: float) -> Dict[str, float]:
+    graph, graph_config = build_graph(latency)
+    dispatcher = SessionDispatcher(graph, graph_config, _make_state)
+    latencies: List[float] = []
+
+    async def dialogue(session_id: str) -> None:
+        for message in TURNS:
+            start = time.perf_counter()
+            result = await dispatcher.send(session_id, message)
+            latencies.append(time.perf_counter() - start)
+            if message == TURNS[0] and not result.state.get("actions"):
+                raise RuntimeError(f"{session_id}: mission produced no actions")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(dialogue(f"session-{i}") for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "sessions": sessions,
+        "turns": dispatcher.turns,
+        "elapsed_s": elapsed,
+        "turns_per_s": dispatcher.turns / elapsed,
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1e3,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simulate concurrent sessions.")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    # Per-node INFO logs would dominate the measurement.
+    logging.disable(logging.INFO)
+    results = asyncio.run(run(args.sessions, args.llm_latency))
+    for key, value in results.items():
+        print(f"{key:<12} {value:,.2f}" if isinstance(value, float) else f"{key:<12} {value}")
+
+
+if __name__ == "__main__":
+    main()
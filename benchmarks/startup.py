@@ -0,0 +1,120 @@
+"""Cold-start benchmark: import time and time to first compiled graph.
+
+Every measurement runs in a fresh interpreter so module caches never leak
+between samples. The median of ``--repeat`` samples is compared against
+``baselines.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+from benchmarks._baseline import (
+    DEFAULT_TOLERANCE,
+    check_regressions,
+    print_report,
+    update_baselines,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SECTION = "startup"
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+_GRAPH_SNIPPETS = {
+    "first_graph.baseline": """
+from src.modules import get_graph
+get_graph("baseline")
+""",
+    "first_graph.supervised": """
+from __src.config import load_config
+from __src.runner.runner import SupervisedPlanRunner
+SupervisedPlanRunner(load_config())._ensure_graph()
+""",
+}
+
+_TIMED_SNIPPET = """
+import json, time
+start = time.perf_counter()
+{body}
+print(json.dumps({{"elapsed": time.perf_counter() - start}}))
+"""
+
+IMPORT_TARGETS = ("src.common.nodes", "src.modules", "__src.runner.runner")
+HEAVY_MODULES = ("langchain_community", "langchain_openai", "langfuse", "pandas")
+
+
+def _run_snippet(code: str) -> Dict:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark-placeholder")
+    env["PROMPT_PROVIDER_OFFLINE"] = "1"
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(repeat: int) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    for module in IMPORT_TARGETS:
+        code = _IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)
+        samples = []
+        for _ in range(repeat):
+            payload = _run_snippet(code)
+            samples.append(payload["elapsed"])
+        if payload["heavy"]:
+            print(f"note: importing {module} loaded {', '.join(payload['heavy'])}")
+        results[f"import.{module}"] = statistics.median(samples)
+
+    for name, body in _GRAPH_SNIPPETS.items():
+        code = _TIMED_SNIPPET.format(body=body.strip())
+        samples = [_run_snippet(code)["elapsed"] for _ in range(repeat)]
+        results[name] = statistics.median(samples)
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure planner cold start.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    results = measure(args.repeat)
+    print_report(SECTION, results)
+    if args.update_baseline:
+        update_baselines(SECTION, results)
+        return
+    failures = check_regressions(SECTION, results, tolerance=args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Per-step overhead of whole-state mutation vs. partial state updates.
+
+Both variants drive the same ``user_input -> intent -> supervisor ->
+feedback`` loop through LangGraph with canned node results, so the numbers
+cover only our state handling and LangGraph stepping. The legacy variant
+mirrors the old node factories: deep-copied initial state, in-place
+mutation and whole-state returns.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from __src.runner.state import StateSchema, _make_base_state
+from benchmarks._baseline import (
+    DEFAULT_TOLERANCE,
+    check_regressions,
+    print_report,
+    update_baselines,
+)
+
+SECTION = "state_updates"
+
+INPUTS = {
+    "object_text": "object_apple_0 in island_left_group\n" * 40,
+    "group_list_text": "island_left_group\n" * 10,
+    "skill_text": "from robot1.skills import GoToObject, PickObject, PlaceObject",
+}
+INTENT = {"intent": "new"}
+SUPERVISOR = {
+    "is_feasible": False,
+    "reasons": ["목표 위치가 지정되지 않았습니다."],
+    "user_final_query": "사과를 옮겨줘.",
+}
+FEEDBACK = {"suggestion": "사과를 아일랜드 식탁에 옮겨줘.", "reason": ["위치 없음"]}
+
+
+class LegacyStateSchema(TypedDict, total=False):
+    user_queries: List[str]
+    inputs: Dict[str, Any]
+    intent_result: Dict[str, Any]
+    supervisor_result: Dict[str, Any]
+    feedback_result: Dict[str, Any]
+    feedback_loop_count: int
+    subgoals: List[str]
+    tasks: List[Dict[str, Any]]
+    question_answers: List[Dict[str, Any]]
+
+
+def _legacy_nodes() -> Dict[str, Callable]:
+    def user_input(state):
+        state["user_queries"].append("사과를 옮겨줘")
+        return state
+
+    def intent(state):
+        state["intent_result"] = dict(INTENT)
+        return state
+
+    def supervisor(state):
+        state["feedback_loop_count"] = state.get("feedback_loop_count", 0) + 1
+        state["supervisor_result"] = dict(SUPERVISOR)
+        return state
+
+    def feedback(state):
+        state["feedback_result"] = dict(FEEDBACK)
+        return state
+
+    return {
+        "user_input": user_input,
+        "intent": intent,
+        "supervisor": supervisor,
+        "feedback": feedback,
+    }
+
+
+def _partial_nodes() -> Dict[str, Callable]:
+    def user_input(state):
+        return {"user_queries": ["사과를 옮겨줘"]}
+
+    def intent(state):
+        return {"intent_result": dict(INTENT)}
+
+    def supervisor(state):
+        return {
+            "supervisor_result": dict(SUPERVISOR),
+            "feedback_loop_count": state.get("feedback_loop_count", 0) + 1,
+        }
+
+    def feedback(state):
+        return {"feedback_result": dict(FEEDBACK)}
+
+    return {
+        "user_input": user_input,
+        "intent": intent,
+        "supervisor": supervisor,
+        "feedback": feedback,
+    }
+
+
+def _build_graph(state_schema, nodes: Dict[str, Callable], turns: int):
+    workflow = StateGraph(state_schema=state_schema)
+    for name, node in nodes.items():
+        workflow.add_node(name, node)
+    workflow.add_edge(START, "user_input")
+    workflow.add_edge("user_input", "intent")
+    workflow.add_edge("intent", "supervisor")
+    workflow.add_edge("supervisor", "feedback")
+    workflow.add_conditional_edges(
+        "feedback",
+        # user_queries keeps only the last MAX_STORED_TURNS; count visits.
+        lambda state: "done" if state["feedback_loop_count"] >= turns else "again",
+        {"done": END, "again": "user_input"},
+    )
+    return workflow.compile(checkpointer=None)
+
+
+def _legacy_state() -> Dict[str, Any]:
+    base = _make_base_state()
+    state = copy.deepcopy(base)
+    state["inputs"] = dict(INPUTS)
+    return state
+
+
+def _partial_state() -> StateSchema:
+    state = _make_base_state()
+    state["inputs"] = dict(INPUTS)
+    return state
+
+
+def _run(graph, make_state: Callable, turns: int) -> Dict[str, float]:
+    steps = turns * 4
+    config = {"recursion_limit": steps + 10}
+
+    start = time.perf_counter()
+    graph.invoke(make_state(), config)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    graph.invoke(make_state(), config)
+    blocks_after = sys.getallocatedblocks()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "step_us": elapsed / steps * 1e6,
+        "peak_kib": peak / 1024,
+        "retained_blocks": float(blocks_after - blocks_before),
+    }
+
+
+def _time_init(make_state: Callable, repeat: int = 2000) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        make_state()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def measure(turns: int) -> Dict[str, float]:
+    legacy_graph = _build_graph(LegacyStateSchema, _legacy_nodes(), turns)
+    partial_graph = _build_graph(StateSchema, _partial_nodes(), turns)
+    legacy = _run(legacy_graph, _legacy_state, turns)
+    partial = _run(partial_graph, _partial_state, turns)
+    results = {f"legacy.{key}": value for key, value in legacy.items()}
+    results.update({f"partial.{key}": value for key, value in partial.items()})
+    results["legacy.init_us"] = _time_init(_legacy_state)
+    results["partial.init_us"] = _time_init(_partial_state)
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure per-step state overhead.")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    results = measure(args.turns)
+    print_report(SECTION, results, unit="")
+    # Only the timings of the current implementation are gated.
+    gated = {
+        key: value
+        for key, value in results.items()
+        if key.startswith("partial.") and key.endswith("_us")
+    }
+    if args.update_baseline:
+        update_baselines(SECTION, gated)
+        return
+    failures = check_regressions(SECTION, gated, tolerance=args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Prompt tokens per node: format_instructions in the prompt vs. native schema.
+
+For every Pydantic-parsed node of the supervised planner the prompt is
+rendered with the sample state twice: once with the full
+``get_format_instructions()`` text (``output_mode: prompt``) and once with
+the one-line reminder used by the structured-output modes. The schema
+tokens sent through the provider API are reported separately, since
+providers process them alongside the prompt.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Dict, List, Tuple
+
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.prompts import PromptTemplate
+
+from __src.common.tokens import count_tokens
+from __src.prompts import planning_prompt, process_prompt
+from __src.runner.graph import STRUCTURED_OUTPUT_INSTRUCTIONS
+from benchmarks._fixtures import make_sample_state
+
+NODES: List[Tuple[str, str, object, type]] = [
+    (
+        "intent",
+        process_prompt.INTENT_NODE_PROMPT,
+        process_prompt.make_intent_node_inputs,
+        process_prompt.IntentParser,
+    ),
+    (
+        "supervisor",
+        process_prompt.SUPERVISOR_NODE_PROMPT,
+        process_prompt.make_supervisor_node_inputs,
+        process_prompt.SupervisorParser,
+    ),
+    (
+        "feedback",
+        process_prompt.FEEDBACK_NODE_PROMPT,
+        process_prompt.make_feedback_node_inputs,
+        process_prompt.FeedbackParser,
+    ),
+    (
+        "question_answer",
+        process_prompt.QUESTION_ANSWER_NODE_PROMPT,
+        process_prompt.make_question_answer_node_inputs,
+        process_prompt.QuestionAnswerParser,
+    ),
+    (
+        "goal_decomp",
+        planning_prompt.GOAL_DECOMP_NODE_PROMPT,
+        planning_prompt.make_goal_decomp_node_inputs,
+        planning_prompt.GoalDecompNodeParser,
+    ),
+    (
+        "task_decomp",
+        planning_prompt.TASK_DECOMP_NODE_PROMPT,
+        planning_prompt.make_task_decomp_node_inputs,
+        planning_prompt.TaskDecompNodeParser,
+    ),
+]
+
+
+def measure() -> Dict[str, Dict[str, int]]:
+    state = make_sample_state()
+    results: Dict[str, Dict[str, int]] = {}
+    for name, prompt_text, make_inputs, parser_output in NODES:
+        template = PromptTemplate.from_template(prompt_text)
+        parser = PydanticOutputParser(pydantic_object=parser_output)
+        inputs = make_inputs(state)
+
+        prompt_mode = template.format(
+            **inputs, format_instructions=parser.get_format_instructions()
+        )
+        structured_mode = template.format(
+            **inputs, format_instructions=STRUCTURED_OUTPUT_INSTRUCTIONS
+        )
+        schema = json.dumps(parser_output.model_json_schema(), ensure_ascii=False)
+        results[name] = {
+            "prompt_mode": count_tokens(prompt_mode),
+            "structured_mode": count_tokens(structured_mode),
+            "api_schema": count_tokens(schema),
+        }
+    return results
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args()
+    results = measure()
+    print(f"{'node':<16}{'prompt':>8}{'native':>8}{'saved':>8}{'schema':>8}")
+    total_prompt = total_structured = 0
+    for name, row in results.items():
+        saved = row["prompt_mode"] - row["structured_mode"]
+        total_prompt += row["prompt_mode"]
+        total_structured += row["structured_mode"]
+        print(
+            f"{name:<16}{row['prompt_mode']:>8}{row['structured_mode']:>8}"
+            f"{saved:>8}{row['api_schema']:>8}"
+        )
+    saved = total_prompt - total_structured
+    print(
+        f"total prompt tokens per full pass: {total_prompt} -> {total_structured} "
+        f"({saved / total_prompt:.1%} saved)"
+    )
+
+
+if __name__ == "__main__":
+    main()
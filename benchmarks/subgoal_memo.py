@@ -0,0 +1,90 @@
+"""Task_decomp calls saved by the subgoal memo.
+
+A stream of goal_decomp subgoals over the sample scene is replayed against
+an empty library. Every miss stands for one subgoal sent to task_decomp,
+whose answer (the canonical move expansion) is then learned. The report
+shows the hit rate and the cost of a lookup in a full library.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import timeit
+from typing import Dict, List
+
+from __src.planning import SubgoalLibrary, WorldModel
+from __src.planning.memo import get_memo_stats, reset_memo_stats
+from benchmarks._fixtures import SAMPLE_ENV
+
+OBJECTS = ["apple", "lemon", "fork", "cup", "plate", "bowl"]
+DESTINATIONS = {
+    "island left": "island_left_group",
+    "island right": "island_right_group",
+    "counter 1 left": "counter_1_left_group",
+}
+PHRASINGS = [
+    "Put the {obj} on the {dest} table.",
+    "Pick up the {obj} and place it on the {dest} table.",
+    "Move the {obj} to the {dest} table.",
+    "{obj_ko}을 {dest} 식탁에 옮기기",
+]
+KOREAN = {"apple": "사과", "lemon": "레몬", "fork": "포크", "cup": "컵"}
+
+
+def _expansion(obj: str, destination: str) -> List[Dict[str, str]]:
+    return [
+        {"skill": "GoToObject", "target": obj},
+        {"skill": "PickObject", "target": obj},
+        {"skill": "GoToObject", "target": destination},
+        {"skill": "PlaceObject", "target": destination},
+    ]
+
+
+def _stream():
+    for phrasing, obj, dest in itertools.product(PHRASINGS, OBJECTS, DESTINATIONS):
+        if "{obj_ko}" in phrasing and obj not in KOREAN:
+            continue
+        text = phrasing.format(obj=obj, dest=dest, obj_ko=KOREAN.get(obj))
+        yield text, f"object_{obj}_0", DESTINATIONS[dest]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report subgoal memo hit rate.")
+    parser.add_argument("--fuzzy-threshold", type=float, default=0.85)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    world = WorldModel.from_env(SAMPLE_ENV)
+    library = SubgoalLibrary(fuzzy_threshold=args.fuzzy_threshold)
+
+    reset_memo_stats()
+    subgoals = list(_stream())
+    for text, obj, destination in subgoals:
+        tasks = library.lookup(text, world)
+        if tasks is None:
+            library.learn(text, _expansion(obj, destination), world)
+        elif tasks != _expansion(obj, destination):
+            print(f"WRONG {text}: {tasks}")
+    stats = get_memo_stats()
+    hits = stats.get("exact", 0) + stats.get("fuzzy", 0)
+
+    # Worst-case miss: a full library of keys with the same slot signature.
+    for i in range(library.max_entries):
+        library.learn(
+            f"stack the plate number {i} on the island left table",
+            _expansion("object_plate_0", "island_left_group"),
+            world,
+        )
+    number = 2000
+    query = "wipe the apple on the island right table"
+    miss = timeit.timeit(lambda: library.lookup(query, world), number=number)
+    print(f"subgoals: {len(subgoals)}, task_decomp calls: {stats.get('miss', 0)}")
+    print(f"hits: {hits} ({hits / len(subgoals):.1%}), {stats}")
+    print(f"lookup miss time (full library): {miss / number * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
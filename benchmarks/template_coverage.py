@@ -0,0 +1,76 @@
+"""Coverage of the template fast path over sample supervisor missions.
+
+Each mission is a ``user_final_query`` as the supervisor would emit it.
+The report shows how many are planned without the LLM, why the others fall
+back, and the cost of a fast-path attempt.
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from __src.config import load_config
+from __src.planning import PlanSimulator, TemplatePlanner, WorldModel
+from __src.planning.template_planner import get_fast_path_stats, reset_fast_path_stats
+from benchmarks._fixtures import SAMPLE_ENV
+
+MISSIONS = [
+    "사과를 오른쪽 아일랜드 식탁에 옮겨줘.",
+    "레몬을 왼쪽 아일랜드 식탁에 옮겨줘.",
+    "포크를 그릇에 넣어줘.",
+    "컵을 카운터 1 왼쪽 위에 올려줘.",
+    "접시를 오른쪽 아일랜드 식탁에 놓아줘.",
+    "사과를 오른쪽 아일랜드 식탁에 옮기고 컵을 그릇에 놓아줘.",
+    "Bring the lemon to the right island table.",
+    "Put the fork in the bowl.",
+    "Move the cup to the right island table and put the apple on the plate.",
+    "Place the plate on the counter 2 left table.",
+    # Expected fallbacks: free-form, unknown objects, non-canonical skills.
+    "사과를 씻어서 접시에 담아줘.",
+    "Bring me a cup.",
+    "배를 아일랜드 식탁에 옮겨줘.",
+    "Set the table for two people.",
+    "포크를 식탁에 옮겨줘.",
+    "Open the fridge.",
+    # ... and destinations naming several groups (two islands, three counters).
+    "레몬을 아일랜드 식탁에 옮겨줘.",
+    "Put the apple on the counter.",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report template fast-path coverage.")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config()
+    robot_skills = {robot.name: robot.skills for robot in config.skills}
+    world = WorldModel.from_env(SAMPLE_ENV)
+    simulator = PlanSimulator(world, robot_skills)
+    planner = TemplatePlanner(
+        {skill for skills in robot_skills.values() for skill in skills}
+    )
+
+    reset_fast_path_stats()
+    for mission in MISSIONS:
+        plan = planner.plan(mission, world, simulator)
+        if args.verbose:
+            steps = sum(len(s["tasks"]) for s in plan["tasks"]) if plan else 0
+            print(f"{'HIT ' if plan else 'MISS'} {mission} ({steps} steps)")
+    stats = get_fast_path_stats()
+
+    number = 2000
+    seconds = timeit.timeit(
+        lambda: planner.plan(MISSIONS[0], world, simulator), number=number
+    )
+    print(f"fast-path coverage: {stats['hits']}/{stats['total']} ({stats['coverage']:.1%})")
+    print(f"fallback reasons: {stats['misses']}")
+    print(f"fast-path plan time: {seconds / number * 1e6:.1f}us per mission")
+
+
+if __name__ == "__main__":
+    main()
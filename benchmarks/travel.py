@@ -0,0 +1,82 @@
+"""Estimated travel saved by the plan optimizer.
+
+Sample plans mimic typical task_decomp output: subgoals listed in the
+user's order (bouncing between island and counter groups) and the odd
+redundant ``GoToObject``. Each plan is optimized with the adjacency cost
+model and, if ``--positions`` is given, with made-up group coordinates.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+from __src.planning import PlanOptimizer, WorldModel
+from benchmarks._fixtures import SAMPLE_ENV
+
+GROUP_POSITIONS = {
+    "island_left_group": (0.0, 0.0),
+    "island_right_group": (1.0, 0.0),
+    "counter_1_left_group": (4.0, 2.0),
+    "counter_1_right_group": (5.0, 2.0),
+    "counter_2_left_group": (8.0, 2.0),
+}
+
+
+def _move(obj: str, destination: str, detour: str | None = None) -> Dict:
+    tasks = [{"skill": "GoToObject", "target": detour}] if detour else []
+    tasks += [
+        {"skill": "GoToObject", "target": obj},
+        {"skill": "PickObject", "target": obj},
+        {"skill": "GoToObject", "target": destination},
+        {"skill": "PlaceObject", "target": destination},
+    ]
+    return {"subgoal": f"put {obj} on {destination}", "tasks": tasks}
+
+
+PLANS: Dict[str, List[Dict]] = {
+    "bounce": [
+        _move("object_apple_0", "counter_1_left_group"),
+        _move("object_cup_0", "island_right_group"),
+        _move("object_bowl_0", "counter_1_right_group"),
+        _move("object_plate_0", "island_left_group"),
+    ],
+    "redundant_moves": [
+        _move("object_fork_0", "island_left_group", detour="counter_1_left_group"),
+        _move("object_lemon_0", "island_right_group", detour="island_left_group"),
+    ],
+    "dependent": [
+        _move("object_apple_0", "counter_2_left_group"),
+        _move("object_cup_0", "island_left_group"),
+        _move("object_apple_0", "island_right_group"),
+        _move("object_plate_0", "counter_1_right_group"),
+    ],
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report travel saved per plan.")
+    parser.add_argument("--positions", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    env = dict(SAMPLE_ENV)
+    if args.positions:
+        env["group_positions"] = GROUP_POSITIONS
+    optimizer = PlanOptimizer(WorldModel.from_env(env))
+    print(f"{'plan':<16}{'before':>8}{'after':>8}{'saved':>8}{'dropped':>9}{'ms':>7}")
+    for name, subgoals in PLANS.items():
+        start = time.perf_counter()
+        _, report = optimizer.optimize({"tasks": subgoals})
+        elapsed = (time.perf_counter() - start) * 1e3
+        print(
+            f"{name:<16}{report.travel_before:>8g}{report.travel_after:>8g}"
+            f"{report.travel_saved:>8g}{report.dropped_moves:>9}{elapsed:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,121 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import sys
 from pathlib import Path
 
-# Ensure local src directory is importable when running as a script.
-PROJECT_ROOT = Path(__file__).resolve().parent
-SRC_DIR = PROJECT_ROOT / "src"
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
-
-from graph.runner import PlannerRunner  # type: ignore  # noqa: E402
-from common.logger import get_logger  # type: ignore  # noqa: E402
+from __src.common.logger import get_logger
+from __src.config import load_config
+from __src.runner.batch import BatchRunner, record_state_maker, resume_point
+from __src.runner.runner import SupervisedPlanRunner
+from __src.runner.state import StateMaker
 
 logger = get_logger(__name__, is_save=True)
 
 
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Run MLDT robot planner.")
-    parser.add_argument("user_query", help="User command to decompose.")
+    parser = argparse.ArgumentParser(
+        description="Run the robot planner on one command or a JSONL file."
+    )
+    parser.add_argument(
+        "user_query", nargs="?", help="User command to decompose (single run)."
+    )
     parser.add_argument(
         "--context",
-        help="Optional environment context passed to Task-level node.",
+        help="JSON file with an /env_entire snapshot used instead of the env "
+        "server (batch records may carry their own 'env').",
         default=None,
     )
     parser.add_argument(
         "--config",
-        help="Path to config.yaml (defaults to configs/config.yaml).",
+        help="Path to config.yaml (defaults to __src/config/config.yaml).",
         default=None,
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--env-url", default=None, help="Environment server for records without env."
+    )
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument(
+        "--input", help="JSONL of {'query': ..., 'env'?: ...} records to plan."
+    )
+    batch.add_argument("--output", help="JSONL file the results are appended to.")
+    batch.add_argument(
+        "--concurrency", type=int, default=8, help="Records planned at once."
+    )
+    batch.add_argument(
+        "--order",
+        choices=["input", "completion"],
+        default="input",
+        help="Write results in input order or as they finish.",
+    )
+    batch.add_argument(
+        "--offset", type=int, default=0, help="Skip the first N input records."
+    )
+    batch.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue after the records already in --output.",
+    )
+    batch.add_argument(
+        "--progress-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between throughput/latency lines on stderr.",
+    )
+    args = parser.parse_args()
+    if (args.user_query is None) == (args.input is None):
+        parser.error("give either a user_query or --input")
+    if args.input is not None and args.output is None:
+        parser.error("--input needs --output")
+    return args
+
+
+def run_batch(batch: BatchRunner, args: argparse.Namespace) -> None:
+    offset, skip = args.offset, set()
+    if args.resume:
+        done, skip = resume_point(args.output)
+        offset = max(offset, done)
+        logger.info("Resuming at record %d (%d later ones done).", offset, len(skip))
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "a", encoding="utf-8") as output:
+        stats = asyncio.run(
+            batch.run(
+                args.input,
+                output,
+                offset=offset,
+                skip=skip,
+                progress_interval=args.progress_interval,
+            )
+        )
+    logger.info("Batch finished: %s", stats.summary())
 
 
 def main() -> None:
     args = parse_args()
-    runner = PlannerRunner(config_path=args.config)
-    result = runner.run(args.user_query, context=args.context)
-    logger.info("Planner completed with %d primitive actions.", len(result["actions"]))
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    config = load_config(args.config)
+    env = None
+    if args.context is not None:
+        with open(args.context, "r", encoding="utf-8") as f:
+            env = json.load(f)
+    runner = SupervisedPlanRunner(config)
+    make_state = record_state_maker(StateMaker(config, url=args.env_url), env)
+    batch = BatchRunner.from_runner(
+        runner, make_state, concurrency=args.concurrency, order=args.order
+    )
+    try:
+        if args.input is not None:
+            run_batch(batch, args)
+            return
+        result = asyncio.run(batch.plan(0, {"query": args.user_query}))
+        print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+        if result["status"] != "ok":
+            sys.exit(1)
+        actions = result.get("actions", {}).get("records", [])
+        logger.info("Planner completed with %d primitive actions.", len(actions))
+    finally:
+        runner.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,355 @@
+"""Record/replay of LLM and environment calls, keyed by request content.
+
+A ``Cassette`` is a JSONL file (gzip when the name ends in ``.gz``) with
+one line per recorded call::
+
+    {"key": "...", "kind": "llm", "latency_s": 0.84, "response": {...}}
+
+The key is a hash of the request: for LLM calls the model name, the
+message types and contents, ``stop`` and the structured-output schema; for
+``/env_entire`` the URL. Identical requests recorded several times (the
+same prompt in two sessions, the scene before and after a step) are
+replayed in the order they were recorded, and the last one repeats once
+they run out.
+
+- ``record`` mode calls through, appends each response with its latency
+  and flushes the line, so an interrupted run keeps what it saw.
+- ``replay`` mode serves responses from the file without touching the
+  provider or the simulator. Each call waits its recorded latency divided
+  by ``speed``; ``speed=0`` answers at once. A request missing from the
+  cassette raises ``CassetteMissError``.
+
+``CassetteChatModel`` wraps a chat model (``None`` in replay mode, so no
+API key is needed). The process-wide cassette is installed with
+``set_cassette`` and is picked up by the node factories.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Type,
+)
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+CassetteMode = Literal["record", "replay"]
+
+# AIMessage fields kept on record; ids and run metadata are left out.
+_MESSAGE_FIELDS = (
+    "content",
+    "additional_kwargs",
+    "response_metadata",
+    "usage_metadata",
+    "tool_calls",
+)
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode for a request the cassette does not hold."""
+
+
+def request_key(kind: str, request: Mapping[str, Any]) -> str:
+    """Content hash identifying ``request`` within ``kind``."""
+    payload = json.dumps(
+        {"kind": kind, **request}, sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    def __init__(
+        self,
+        path: str | Path,
+        mode: CassetteMode = "replay",
+        *,
+        speed: float = 1.0,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        if speed < 0:
+            raise ValueError("speed must be >= 0")
+        self.path = Path(path)
+        self.mode = mode
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self._counts = {"recorded": 0, "replayed": 0, "missed": 0}
+        self._file = None
+        if mode == "replay":
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = _open(self.path, "a")
+
+    def _load(self) -> None:
+        with _open(self.path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = sum(len(entries) for entries in self._entries.values())
+            return {**self._counts, "entries": entries}
+
+    def record(self, kind: str, key: str, response: Any, latency: float) -> None:
+        entry = {
+            "key": key,
+            "kind": kind,
+            "latency_s": round(latency, 6),
+            "response": response,
+        }
+        # Only the file keeps recorded entries, so long recordings stay small.
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self._counts["recorded"] += 1
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def lookup(self, kind: str, key: str) -> Dict[str, Any]:
+        """Next recorded entry for ``key``; the last one repeats."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self._counts["missed"] += 1
+                raise CassetteMissError(
+                    f"No recorded {kind} response for key {key} in {self.path}"
+                )
+            index = min(self._cursors[key], len(entries) - 1)
+            self._cursors[key] = index + 1
+            self._counts["replayed"] += 1
+            return entries[index]
+
+    def delay(self, entry: Mapping[str, Any]) -> float:
+        if not self.speed:
+            return 0.0
+        return entry.get("latency_s", 0.0) / self.speed
+
+    def call(
+        self,
+        kind: str,
+        request: Mapping[str, Any],
+        fetch: Callable[[], Any],
+    ) -> Any:
+        """Return ``fetch()`` (recorded) or its replayed JSON response."""
+        key = request_key(kind, request)
+        if self.mode == "replay":
+            entry = self.lookup(kind, key)
+            delay = self.delay(entry)
+            if delay:
+                time.sleep(delay)
+            return entry["response"]
+        start = time.perf_counter()
+        response = fetch()
+        self.record(kind, key, response, time.perf_counter() - start)
+        return response
+
+    async def acall(
+        self,
+        kind: str,
+        request: Mapping[str, Any],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        key = request_key(kind, request)
+        if self.mode == "replay":
+            entry = self.lookup(kind, key)
+            delay = self.delay(entry)
+            if delay:
+                await asyncio.sleep(delay)
+            return entry["response"]
+        start = time.perf_counter()
+        response = await fetch()
+        self.record(kind, key, response, time.perf_counter() - start)
+        return response
+
+
+_cassette: Cassette | None = None
+
+
+def set_cassette(cassette: Cassette | None) -> None:
+    """Install the process-wide cassette; ``None`` turns recording off."""
+    global _cassette
+    _cassette = cassette
+
+
+def get_cassette() -> Cassette | None:
+    return _cassette
+
+
+def _llm_request(
+    model_name: str,
+    messages: List[BaseMessage],
+    stop: Optional[List[str]],
+    schema: Type[BaseModel] | None,
+) -> Dict[str, Any]:
+    return {
+        "model": model_name,
+        "messages": [[message.type, message.content] for message in messages],
+        "stop": stop,
+        "schema": schema.__name__ if schema is not None else None,
+    }
+
+
+def _dump_message(message: AIMessage) -> Dict[str, Any]:
+    return {
+        name: getattr(message, name)
+        for name in _MESSAGE_FIELDS
+        if getattr(message, name, None)
+    }
+
+
+def _structured_message(result: Mapping[str, Any]) -> AIMessage:
+    # Replays need no provider (tool calls, response_format), so the parsed
+    # object is stored as the message content.
+    raw, parsed = result["raw"], result.get("parsed")
+    if parsed is None:
+        return raw
+    return raw.model_copy(update={"content": parsed.model_dump_json()})
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model that records ``inner``'s answers or replays them."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: Optional[Any] = None
+    cassette: Cassette
+    model_name: str = "unknown"
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette-chat"
+
+    def _invoke_inner(self, messages, stop, schema, **kwargs) -> AIMessage:
+        if self.inner is None:
+            raise CassetteMissError("Cassette is recording without an inner model.")
+        if schema is None:
+            return self.inner.invoke(messages, stop=stop, **kwargs)
+        result = self.inner.with_structured_output(
+            schema, include_raw=True, **kwargs
+        ).invoke(messages, stop=stop)
+        return _structured_message(result)
+
+    async def _ainvoke_inner(self, messages, stop, schema, **kwargs) -> AIMessage:
+        if self.inner is None:
+            raise CassetteMissError("Cassette is recording without an inner model.")
+        if schema is None:
+            return await self.inner.ainvoke(messages, stop=stop, **kwargs)
+        result = await self.inner.with_structured_output(
+            schema, include_raw=True, **kwargs
+        ).ainvoke(messages, stop=stop)
+        return _structured_message(result)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        schema = kwargs.pop("schema", None)
+        payload = self.cassette.call(
+            "llm",
+            _llm_request(self.model_name, messages, stop, schema),
+            lambda: _dump_message(
+                self._invoke_inner(messages, stop, schema, **kwargs)
+            ),
+        )
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(**payload))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        schema = kwargs.pop("schema", None)
+
+        async def fetch() -> Dict[str, Any]:
+            message = await self._ainvoke_inner(messages, stop, schema, **kwargs)
+            return _dump_message(message)
+
+        payload = await self.cassette.acall(
+            "llm", _llm_request(self.model_name, messages, stop, schema), fetch
+        )
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(**payload))])
+
+    def with_structured_output(
+        self,
+        schema: Type[BaseModel],
+        *,
+        include_raw: bool = False,
+        **kwargs: Any,
+    ) -> Runnable:
+        # ``method`` and the other provider options travel to ``inner``.
+        bound = self.bind(schema=schema, **kwargs)
+
+        def parse(raw: AIMessage) -> Any:
+            if not include_raw:
+                return schema.model_validate_json(raw.content)
+            try:
+                parsed = schema.model_validate_json(raw.content)
+            except ValidationError as err:
+                return {"raw": raw, "parsed": None, "parsing_error": err}
+            return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+        return bound | RunnableLambda(parse)
+
+
+def wrap_llm(llm: Any, model_name: str, cassette: Cassette | None = None) -> Any:
+    """``llm`` behind the installed cassette, or unchanged without one."""
+    cassette = cassette or get_cassette()
+    if cassette is None:
+        return llm
+    return CassetteChatModel(inner=llm, cassette=cassette, model_name=model_name)
+
+
+__all__ = [
+    "Cassette",
+    "CassetteChatModel",
+    "CassetteMissError",
+    "get_cassette",
+    "request_key",
+    "set_cassette",
+    "wrap_llm",
+]
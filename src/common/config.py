@@ -9,6 +9,9 @@ class OpenAINodeConfig(BaseModel):
     model_name: str
     prompt_cache_key: str | None = None
     temperature: float | None = None
+    # "prompt" injects the JSON schema into the prompt text; the other modes
+    # pass it through the provider's structured-output API.
+    output_mode: Literal["prompt", "json_schema", "function_calling"] = "prompt"
 
 
 class LlamaNodeConfig(BaseModel):
@@ -21,3 +24,5 @@ class LlamaNodeConfig(BaseModel):
     n_gpu_layers: int | None = None
     n_threads: int | None = None
     verbose: bool | None = None
+    # "grammar" constrains decoding with a GBNF grammar built from the schema.
+    output_mode: Literal["prompt", "grammar"] = "prompt"
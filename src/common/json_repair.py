@@ -0,0 +1,337 @@
+"""Local repair of slightly malformed LLM JSON before any re-invocation.
+
+Repairs run in order: strip code fences and surrounding prose, convert
+single-quoted strings and Python literals, drop trailing commas, close a
+truncated string/array/object, then coerce near-miss enum values against
+the target Pydantic model. Only when that fails is the caller's
+``reprompt`` used for a "fix only the JSON" call.
+"""
+
+from __future__ import annotations
+
+import difflib
+import json
+import re
+import threading
+import typing
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+
+JSON_FIX_PROMPT = """The text below was supposed to be JSON matching the schema, but it is invalid.
+Return ONLY the corrected JSON. Do not change any values unless required by the schema.
+
+# Schema
+{schema}
+
+# Error
+{error}
+
+# Invalid output
+{output}
+"""
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+_DECODER = json.JSONDecoder()
+
+
+class JSONRepairError(ValueError):
+    """Raised when output cannot be parsed even after repair and re-prompting."""
+
+
+@dataclass
+class RepairStats:
+    ok: int = 0
+    repaired: int = 0
+    reprompted: int = 0
+    failed: int = 0
+
+
+_STATS: Dict[str, RepairStats] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _record(node_name: str, outcome: str) -> None:
+    with _STATS_LOCK:
+        stats = _STATS.setdefault(node_name, RepairStats())
+        setattr(stats, outcome, getattr(stats, outcome) + 1)
+
+
+def get_repair_stats() -> Dict[str, Dict[str, int]]:
+    """Return ok/repaired/reprompted/failed counts per node."""
+    with _STATS_LOCK:
+        return {name: asdict(stats) for name, stats in _STATS.items()}
+
+
+def reset_repair_stats() -> None:
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+# ! text repair
+def _extract_json_span(text: str) -> str:
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    if not starts:
+        return text.strip()
+    text = text[min(starts) :]
+    # Trailing prose may hold brackets of its own, so end the span where the
+    # first value ends rather than at the last closing bracket.
+    try:
+        _, end = _DECODER.raw_decode(text)
+    except ValueError:
+        return text.strip()
+    return text[:end]
+
+
+def _normalize_tokens(text: str) -> tuple[str, List[str], bool]:
+    """Rewrite quotes/literals/trailing commas; return (text, open stack, in_string).
+
+    Stops after the bracket that closes the first value; the rest is prose.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    quote: Optional[str] = None
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if quote is not None:
+            if char == "\\" and index + 1 < length:
+                nxt = text[index + 1]
+                if nxt == "'":
+                    out.append("'")
+                else:
+                    out.append(char + nxt)
+                index += 2
+                continue
+            if char == quote:
+                out.append('"')
+                quote = None
+            elif char == '"':
+                out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+            else:
+                out.append(char)
+            index += 1
+            continue
+
+        if char in "\"'":
+            quote = char
+            out.append('"')
+        elif char in "{[":
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                break
+        elif char.isalpha():
+            end = index
+            while end < length and (text[end].isalnum() or text[end] == "_"):
+                end += 1
+            word = text[index:end]
+            out.append(_PY_LITERALS.get(word, word))
+            index = end
+            continue
+        else:
+            out.append(char)
+        index += 1
+    return "".join(out), stack, quote is not None
+
+
+def _close_truncated(text: str, stack: List[str], in_string: bool) -> str:
+    if in_string:
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(":"):
+        text += " null"
+    text = text.rstrip(",").rstrip()
+    if stack and stack[-1] == "{":
+        # A dangling key without a value: `{"a": 1, "b"` -> `{"a": 1`
+        tail_start = max(text.rfind(","), text.rfind("{"))
+        tail = text[tail_start + 1 :]
+        if tail.strip() and ":" not in tail:
+            text = text[: tail_start + 1].rstrip(",").rstrip()
+    return text + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def _repair(text: str) -> tuple[str, bool]:
+    span = _extract_json_span(text)
+    normalized, stack, in_string = _normalize_tokens(span)
+    truncated = bool(stack) or in_string
+    return _close_truncated(normalized, stack, in_string), truncated
+
+
+def repair_json_text(text: str) -> str:
+    """Return ``text`` rewritten into strict JSON as far as locally possible."""
+    return _repair(text)[0]
+
+
+# ! model coercion
+def _literal_choices(annotation: Any) -> Optional[tuple]:
+    if typing.get_origin(annotation) is typing.Literal:
+        return typing.get_args(annotation)
+    return None
+
+
+def _coerce_literal(value: Any, choices: tuple) -> Any:
+    if value in choices or not isinstance(value, str):
+        return value
+    text_choices = [choice for choice in choices if isinstance(choice, str)]
+    lowered = value.strip().strip("\"'").lower()
+    for choice in text_choices:
+        if choice.lower() == lowered:
+            return choice
+    close = difflib.get_close_matches(lowered, text_choices, n=1, cutoff=0.75)
+    return close[0] if close else value
+
+
+def _coerce_value(value: Any, annotation: Any) -> Any:
+    choices = _literal_choices(annotation)
+    if choices is not None:
+        return _coerce_literal(value, choices)
+    origin = typing.get_origin(annotation)
+    if origin in (list, List) and isinstance(value, list):
+        (item_type,) = typing.get_args(annotation) or (Any,)
+        return [_coerce_value(item, item_type) for item in value]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return coerce_to_model_data(value, annotation)
+    return value
+
+
+def coerce_to_model_data(data: Any, model: Type[BaseModel]) -> Any:
+    """Nudge parsed JSON toward ``model``: wrap bare lists, fix enum spellings."""
+    fields = model.model_fields
+    if isinstance(data, list):
+        list_fields = [
+            name
+            for name, field in fields.items()
+            if typing.get_origin(field.annotation) in (list, List)
+        ]
+        if len(list_fields) == 1:
+            data = {list_fields[0]: data}
+    if not isinstance(data, dict):
+        return data
+    coerced = dict(data)
+    for name, field in fields.items():
+        if name in coerced:
+            coerced[name] = _coerce_value(coerced[name], field.annotation)
+    return coerced
+
+
+# ! entry point
+def _message_text(output: Any) -> str:
+    content = getattr(output, "content", output)
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return str(content)
+
+
+def _drop_incomplete_tail(data: Any, error: ValidationError) -> bool:
+    """Remove the last list item named by ``error`` (a cut-off element)."""
+    for detail in error.errors():
+        location = detail["loc"]
+        for depth in range(len(location) - 1, -1, -1):
+            if not isinstance(location[depth], int):
+                continue
+            container = data
+            try:
+                for key in location[:depth]:
+                    container = container[key]
+            except (KeyError, IndexError, TypeError):
+                break
+            if isinstance(container, list) and location[depth] == len(container) - 1:
+                container.pop()
+                return True
+            break
+    return False
+
+
+def _try_repair(text: str, model: Type[BaseModel]) -> BaseModel:
+    repaired, truncated = _repair(text)
+    data = coerce_to_model_data(json.loads(repaired), model)
+    while True:
+        try:
+            return model.model_validate(data)
+        except ValidationError as error:
+            # Truncated output usually ends in a half-written list item.
+            if not truncated or not _drop_incomplete_tail(data, error):
+                raise
+
+
+def parse_with_repair(
+    output: Any,
+    model: Type[BaseModel],
+    *,
+    node_name: str = "NODE",
+    reprompt: Callable[[str], Any] | None = None,
+) -> BaseModel:
+    """Parse ``output`` into ``model``, repairing locally before re-prompting.
+
+    ``reprompt`` receives a ready "fix only the JSON" prompt and returns the
+    new model output; it is called at most once.
+    """
+    text = _message_text(output)
+    try:
+        parsed = model.model_validate_json(text)
+        _record(node_name, "ok")
+        return parsed
+    except ValidationError as error:
+        first_error = error
+
+    try:
+        parsed = _try_repair(text, model)
+        _record(node_name, "repaired")
+        logger.info(f"{node_name}: repaired malformed JSON output locally.")
+        return parsed
+    except (ValueError, ValidationError) as error:
+        repair_error: Exception = error
+
+    if reprompt is not None:
+        prompt = JSON_FIX_PROMPT.format(
+            schema=json.dumps(model.model_json_schema(), ensure_ascii=False),
+            error=str(repair_error or first_error)[:500],
+            output=text,
+        )
+        fixed_text = _message_text(reprompt(prompt))
+        try:
+            parsed = _try_repair(fixed_text, model)
+            _record(node_name, "reprompted")
+            logger.warning(f"{node_name}: JSON fixed by re-prompting.")
+            return parsed
+        except (ValueError, ValidationError) as error:
+            repair_error = error
+
+    _record(node_name, "failed")
+    raise JSONRepairError(
+        f"{node_name}: could not parse output as {model.__name__}: {repair_error}"
+    )
+
+
+__all__ = [
+    "JSON_FIX_PROMPT",
+    "JSONRepairError",
+    "RepairStats",
+    "coerce_to_model_data",
+    "get_repair_stats",
+    "parse_with_repair",
+    "repair_json_text",
+    "reset_repair_stats",
+]
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+import sys
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -14,31 +16,43 @@ from typing import (
     Union,
 )
 
-from langchain_community.llms import LlamaCpp
-from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
-from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
-from langfuse.langchain import CallbackHandler
-from langfuse.model import TextPromptClient
-
-# from langgraph.graph import END, START, StateGraph
-from loguru import logger
-
-from ..utils.enums import ModelNames
+from .enums import ModelNames
 
+# LLM backends, Langfuse, LangChain, loguru and the repair/metrics/prompt
+# helpers (pydantic) are imported on first use so that importing this module
+# (e.g. for an OpenAI-only graph) stays cheap.
 if TYPE_CHECKING:
+    from langfuse.model import TextPromptClient
+
     from .config import LlamaNodeConfig, OpenAINodeConfig
+    from .node_metrics import NodeTimer
+    from .prompts import PromptHandle
 
 StateCallable = Callable[[Any], Any]
-ChainBuild = Tuple[Any, Optional[Any], Optional[str]]
+ChainBuild = Tuple[Any, Optional[Any], Optional[str], Any]
+
+# Replaces the full JSON schema in {format_instructions} when the schema is
+# enforced by the provider API or by grammar-constrained decoding.
+STRUCTURED_OUTPUT_INSTRUCTIONS = (
+    "Respond only with the structured output defined by the response schema."
+)
 
 
-def _create_llm(llm_node_config: Union["OpenAINodeConfig", "LlamaNodeConfig"]):
+def _create_llm(
+    llm_node_config: Union["OpenAINodeConfig", "LlamaNodeConfig"],
+    output_schema: Any = None,
+):
+    """Create the node LLM; ``output_schema`` enables llama.cpp grammar decoding."""
     if llm_node_config.model_type == "openai":
         if llm_node_config.model_name not in ModelNames._value2member_map_:
             raise ValueError(f"Invalid model name: {llm_node_config.model_name}")
 
         model = ModelNames(llm_node_config.model_name).value
+        from .cassette import get_cassette, wrap_llm
+
+        cassette = get_cassette()
+        if cassette is not None and cassette.mode == "replay":
+            return wrap_llm(None, model, cassette)
         llm_kwargs: Dict[str, Any] = {"model": model}
         if llm_node_config.temperature is not None:
             llm_kwargs["temperature"] = llm_node_config.temperature
@@ -46,7 +60,9 @@ def _create_llm(llm_node_config: Union["OpenAINodeConfig", "LlamaNodeConfig"]):
             llm_kwargs["extra_body"] = {
                 "prompt_cache_key": llm_node_config.prompt_cache_key
             }
-        return ChatOpenAI(**llm_kwargs)
+        from langchain_openai import ChatOpenAI
+
+        return wrap_llm(ChatOpenAI(**llm_kwargs), model, cassette)
     if llm_node_config.model_type == "llama":
         llama_kwargs: Dict[str, Any] = {"model_path": llm_node_config.model_path}
         if llm_node_config.temperature is not None:
@@ -59,69 +75,172 @@ def _create_llm(llm_node_config: Union["OpenAINodeConfig", "LlamaNodeConfig"]):
             llama_kwargs["n_threads"] = llm_node_config.n_threads
         if llm_node_config.verbose is not None:
             llama_kwargs["verbose"] = llm_node_config.verbose
+        if output_schema is not None:
+            from llama_cpp import LlamaGrammar
+
+            llama_kwargs["grammar"] = LlamaGrammar.from_json_schema(
+                json.dumps(output_schema.model_json_schema())
+            )
+        from langchain_community.llms import LlamaCpp
+
         return LlamaCpp(**llama_kwargs)
     raise ValueError(f"Unsupported model_type: {llm_node_config.model_type}")
 
 
+def _is_langfuse_prompt(prompt_input: Any) -> bool:
+    # A TextPromptClient can only exist once langfuse.model has been imported.
+    model_module = sys.modules.get("langfuse.model")
+    return model_module is not None and isinstance(
+        prompt_input, model_module.TextPromptClient
+    )
+
+
 def _build_llm_chain(
     *,
     llm_node_config: "OpenAINodeConfig | LlamaNodeConfig",
-    prompt_input: str | TextPromptClient,
+    prompt_input: "str | TextPromptClient | PromptHandle",
     output_format=None,
 ) -> ChainBuild:
-    llm = _create_llm(llm_node_config)
-    if isinstance(prompt_input, TextPromptClient):
+    from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+
+    from .prompts import PromptHandle
+
+    output_mode = getattr(llm_node_config, "output_mode", "prompt")
+    structured = output_format not in (None, "str") and output_mode != "prompt"
+
+    use_grammar = structured and output_mode == "grammar"
+    llm = _create_llm(
+        llm_node_config, output_schema=output_format if use_grammar else None
+    )
+    if isinstance(prompt_input, PromptHandle):
+        prompt_input = prompt_input.current()
+    if _is_langfuse_prompt(prompt_input):
         prompt = PromptTemplate.from_template(
             prompt_input.get_langchain_prompt(),
             metadata={"langfuse_prompt": prompt_input},
         )
+    elif hasattr(prompt_input, "get_langchain_prompt"):
+        prompt = PromptTemplate.from_template(prompt_input.get_langchain_prompt())
     else:
         prompt = PromptTemplate.from_template(prompt_input)
+
+    if structured and not use_grammar:
+        # Provider-side JSON schema / tool calling returns the model instance;
+        # include_raw keeps the message so a parsing error can be repaired.
+        structured_llm = llm.with_structured_output(
+            output_format, method=output_mode, include_raw=True
+        )
+        return prompt | structured_llm, None, STRUCTURED_OUTPUT_INSTRUCTIONS, llm
+
     if output_format == "str":
         parser: Optional[Any] = StrOutputParser()
         format_instructions = None
     elif output_format is not None:
         parser = PydanticOutputParser(pydantic_object=output_format)
-        format_instructions = parser.get_format_instructions()
+        format_instructions = (
+            STRUCTURED_OUTPUT_INSTRUCTIONS
+            if structured
+            else parser.get_format_instructions()
+        )
     else:
         parser = None
         format_instructions = None
 
     chain = prompt | llm
-    if parser is not None:
+    # Pydantic output is parsed by the node itself so malformed JSON can be
+    # repaired locally (see json_repair) instead of failing the chain.
+    if parser is not None and output_format == "str":
         chain = chain | parser
-    return chain, parser, format_instructions
+    return chain, parser, format_instructions, llm
+
 
+def _unpack_structured(
+    result: Dict[str, Any], output_format: Any, *, node_name: str, reprompt: Callable
+) -> Any:
+    from loguru import logger
 
-def _apply_result_to_state(
+    from .json_repair import parse_with_repair
+
+    # with_structured_output(include_raw=True) returns raw/parsed/parsing_error.
+    parsed = result.get("parsed")
+    if result.get("parsing_error") is None and parsed is not None:
+        return parsed
+    logger.warning(
+        f"{node_name}: structured output failed to parse "
+        f"({result.get('parsing_error')}); trying repair."
+    )
+    return parse_with_repair(
+        result.get("raw"), output_format, node_name=node_name, reprompt=reprompt
+    )
+
+
+def _invoke_timed(chain: Any, inputs: Dict[str, Any], config: Any, timer: NodeTimer):
+    """``chain.invoke`` with the prompt step timed as render, the rest as llm.
+
+    Mirrors ``RunnableSequence.invoke``: one parent run with a child per
+    step, so callbacks (Langfuse) see the same trace as before.
+    """
+    from langchain_core.runnables.config import (
+        ensure_config,
+        get_callback_manager_for_config,
+        patch_config,
+    )
+
+    config = ensure_config(config)
+    run_manager = get_callback_manager_for_config(config).on_chain_start(
+        None, inputs, name=config.get("run_name") or chain.get_name()
+    )
+    value = inputs
+    try:
+        for index, step in enumerate(chain.steps):
+            step_config = patch_config(
+                config, callbacks=run_manager.get_child(f"seq:step:{index + 1}")
+            )
+            with timer.phase("render" if index == 0 else "llm"):
+                value = step.invoke(value, step_config)
+    except BaseException as err:
+        run_manager.on_chain_error(err)
+        raise
+    run_manager.on_chain_end(value)
+    return value
+
+
+def _make_state_update(
     *,
     state: Dict[str, Any],
     result: Any,
     state_type: Literal["dict", "list", "str"],
     state_dict_key: str | None,
     state_return_key: str,
-) -> None:
+) -> Dict[str, Any]:
+    """Return the partial update for ``result`` without touching ``state``.
+
+    ``"list"`` updates hold only the new item, so the state key must be
+    declared with an ``operator.add`` reducer in the graph's state schema.
+    """
     if state_type == "str":
-        state[state_return_key] = result
-        return
+        return {state_return_key: result}
     if state_type == "list":
-        state[state_return_key].append(result)
-        return
+        return {state_return_key: [result]}
     if state_type == "dict":
         if state_dict_key is None:
             raise ValueError("dict_key must be provided when state_type is 'dict'")
+        from loguru import logger
+
         logger.info(
-            "Updating state[%s][%s] with result.", state_return_key, state_dict_key
+            "Updating state[{}][{}] with result.", state_return_key, state_dict_key
         )
-        state[state_return_key][state_dict_key] = result
-        return
+        merged = dict(state.get(state_return_key) or {})
+        merged[state_dict_key] = result
+        return {state_return_key: merged}
     raise ValueError(f"Unsupported state_type: {state_type}")
 
 
 def make_llm_node(
     llm_node_config: "OpenAINodeConfig | LlamaNodeConfig",
     *,
-    prompt_input: str | TextPromptClient,
+    prompt_input: "str | TextPromptClient | PromptHandle",
     make_inputs: Callable,
     output_format=None,
     state_type: Literal["dict", "list", "str"] = "str",
@@ -131,41 +250,92 @@ def make_llm_node(
     on_langfuse: bool = True,
     langfuse_metadata: Dict | None = None,
 ) -> StateCallable:
+    from loguru import logger
+
+    from .json_repair import parse_with_repair
+    from .node_metrics import NodeTimer
+    from .prompts import PromptHandle
+
     if not hasattr(llm_node_config, "prompt_cache_key"):
         raise ValueError("llm_node_config must have prompt_cache_key attribute")
 
-    chain, parser, format_instructions = _build_llm_chain(
+    chain, parser, format_instructions, llm = _build_llm_chain(
         llm_node_config=llm_node_config,
         prompt_input=prompt_input,
         output_format=output_format,
     )
+    # A PromptHandle may be swapped by the prompt provider at any time; the
+    # chain is rebuilt on the next call whenever its revision moves.
+    built_revision = (
+        prompt_input.revision if isinstance(prompt_input, PromptHandle) else None
+    )
+
+    if on_langfuse:
+        from langfuse.langchain import CallbackHandler
 
-    langfuse_handler = CallbackHandler() if on_langfuse else None
+        langfuse_handler = CallbackHandler()
+    else:
+        langfuse_handler = None
+    returns_pydantic = output_format not in (None, "str")
 
     def node(state):
+        nonlocal chain, parser, format_instructions, llm, built_revision
         logger.info(f"============= {node_name} ==============")
-        inputs = make_inputs(state)
-        if format_instructions:
-            inputs["format_instructions"] = format_instructions
+        if (
+            isinstance(prompt_input, PromptHandle)
+            and prompt_input.revision != built_revision
+        ):
+            built_revision = prompt_input.revision
+            chain, parser, format_instructions, llm = _build_llm_chain(
+                llm_node_config=llm_node_config,
+                prompt_input=prompt_input,
+                output_format=output_format,
+            )
+            logger.info(
+                f"{node_name}: prompt {prompt_input.name!r} swapped to "
+                f"version {prompt_input.version}"
+            )
+        with NodeTimer(node_name) as timer:
+            with timer.phase("inputs"):
+                inputs = make_inputs(state)
+                if format_instructions:
+                    inputs["format_instructions"] = format_instructions
 
-        result = chain.invoke(
-            inputs,
-            config={"callbacks": [langfuse_handler], "metadata": langfuse_metadata},
-        )
+            callbacks = [langfuse_handler] if langfuse_handler is not None else []
+            result = _invoke_timed(
+                chain,
+                inputs,
+                {"callbacks": callbacks, "metadata": langfuse_metadata},
+                timer,
+            )
 
-        if isinstance(parser, PydanticOutputParser):
-            result = result.model_dump()
+            with timer.phase("parse"):
+                # The bare LLM serves a single "fix the JSON" call.
+                if returns_pydantic and parser is not None:
+                    result = parse_with_repair(
+                        result,
+                        output_format,
+                        node_name=node_name,
+                        reprompt=llm.invoke,
+                    )
+                elif returns_pydantic:
+                    result = _unpack_structured(
+                        result, output_format, node_name=node_name, reprompt=llm.invoke
+                    )
+                if returns_pydantic:
+                    result = result.model_dump()
 
-        _apply_result_to_state(
-            state=state,
-            result=result,
-            state_type=state_type,
-            state_dict_key=state_dict_key,
-            state_return_key=state_return_key,
-        )
+            with timer.phase("apply"):
+                update = _make_state_update(
+                    state=state,
+                    result=result,
+                    state_type=state_type,
+                    state_dict_key=state_dict_key,
+                    state_return_key=state_return_key,
+                )
 
         logger.info(f"AI Answer:\n{result}\n")
 
-        return state
+        return update
 
     return node
@@ -0,0 +1,392 @@
+"""Prompt provider backed by Langfuse with a versioned on-disk snapshot."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+DEFAULT_SNAPSHOT_DIR = Path("data") / "prompt_snapshots"
+DEFAULT_REFRESH_INTERVAL_S = 300.0
+DEFAULT_MAX_VERSIONS = 5
+
+
+@dataclass(frozen=True)
+class PromptSnapshot:
+    """One stored version of a remote prompt, already in LangChain format."""
+
+    name: str
+    version: int
+    template: str
+    labels: Tuple[str, ...] = ()
+    config: Dict[str, Any] = field(default_factory=dict)
+    fetched_at: float = 0.0
+
+    def get_langchain_prompt(self) -> str:
+        return self.template
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload = asdict(self)
+        payload["labels"] = list(self.labels)
+        return payload
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "PromptSnapshot":
+        return cls(
+            name=payload["name"],
+            version=int(payload["version"]),
+            template=payload["template"],
+            labels=tuple(payload.get("labels") or ()),
+            config=dict(payload.get("config") or {}),
+            fetched_at=float(payload.get("fetched_at", 0.0)),
+        )
+
+
+class PromptSnapshotStore:
+    """JSON file per prompt name holding the last few fetched versions."""
+
+    def __init__(
+        self,
+        root: str | Path = DEFAULT_SNAPSHOT_DIR,
+        *,
+        max_versions: int = DEFAULT_MAX_VERSIONS,
+    ) -> None:
+        self.root = Path(root)
+        self.max_versions = max_versions
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> Path:
+        safe_name = name.replace("/", "_")
+        return self.root / f"{safe_name}.json"
+
+    def _read(self, name: str) -> Dict[str, Any]:
+        path = self.path(name)
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f"Ignoring unreadable prompt snapshot {path}")
+            return {}
+
+    def load(self, name: str, version: int | None = None) -> PromptSnapshot | None:
+        payload = self._read(name)
+        versions = payload.get("versions") or {}
+        if not versions:
+            return None
+        key = str(version if version is not None else payload.get("latest"))
+        if key not in versions:
+            return None
+        return PromptSnapshot.from_dict(versions[key])
+
+    def save(self, snapshot: PromptSnapshot) -> None:
+        with self._lock:
+            payload = self._read(snapshot.name)
+            versions = payload.get("versions") or {}
+            versions[str(snapshot.version)] = snapshot.to_dict()
+            kept = sorted(versions, key=int)[-self.max_versions :]
+            payload = {
+                "name": snapshot.name,
+                "latest": max(int(key) for key in kept),
+                "versions": {key: versions[key] for key in kept},
+            }
+            path = self.path(snapshot.name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+
+
+class LocalPromptSource:
+    """In-process stand-in for Langfuse used offline and in tests.
+
+    ``prompts`` maps a prompt name to a template or to a list of templates,
+    where list position ``i`` is version ``i + 1``.
+    """
+
+    def __init__(self, prompts: Dict[str, str | List[str]] | None = None) -> None:
+        self._prompts: Dict[str, List[str]] = {}
+        for name, templates in (prompts or {}).items():
+            self.set_prompt(name, templates)
+
+    def set_prompt(self, name: str, templates: str | List[str]) -> None:
+        if isinstance(templates, str):
+            templates = [templates]
+        self._prompts[name] = list(templates)
+
+    def add_version(self, name: str, template: str) -> int:
+        self._prompts.setdefault(name, []).append(template)
+        return len(self._prompts[name])
+
+    def fetch(
+        self, name: str, *, version: int | None = None, label: str | None = None
+    ) -> Tuple[PromptSnapshot, Any]:
+        templates = self._prompts.get(name)
+        if not templates:
+            raise KeyError(f"Unknown prompt: {name!r}")
+        resolved = version if version is not None else len(templates)
+        if not 1 <= resolved <= len(templates):
+            raise KeyError(f"Unknown version {resolved} for prompt {name!r}")
+        snapshot = PromptSnapshot(
+            name=name,
+            version=resolved,
+            template=templates[resolved - 1],
+            labels=(label,) if label else (),
+            fetched_at=time.time(),
+        )
+        return snapshot, None
+
+
+class LangfusePromptSource:
+    """Fetch prompts from Langfuse; the client is created on first use."""
+
+    def __init__(
+        self,
+        client: Any = None,
+        *,
+        fetch_timeout_s: int = 5,
+        max_retries: int = 1,
+    ) -> None:
+        self._client = client
+        self.fetch_timeout_s = fetch_timeout_s
+        self.max_retries = max_retries
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            from langfuse import get_client
+
+            self._client = get_client()
+        return self._client
+
+    def fetch(
+        self, name: str, *, version: int | None = None, label: str | None = None
+    ) -> Tuple[PromptSnapshot, Any]:
+        kwargs: Dict[str, Any] = {
+            "cache_ttl_seconds": 0,
+            "fetch_timeout_seconds": self.fetch_timeout_s,
+            "max_retries": self.max_retries,
+        }
+        if version is not None:
+            kwargs["version"] = version
+        elif label is not None:
+            kwargs["label"] = label
+        client = self._get_client().get_prompt(name, **kwargs)
+        snapshot = PromptSnapshot(
+            name=name,
+            version=int(client.version),
+            template=client.get_langchain_prompt(),
+            labels=tuple(client.labels or ()),
+            config=dict(client.config or {}),
+            fetched_at=time.time(),
+        )
+        return snapshot, client
+
+
+class PromptHandle:
+    """Current prompt for one name; swapped in place when a new version lands.
+
+    ``revision`` increases on every swap so chain builders can cheaply detect
+    that they have to recompile.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        fallback: str | None = None,
+        version: int | None = None,
+        label: str | None = None,
+    ) -> None:
+        self.name = name
+        self.fallback = fallback
+        self.pinned_version = version
+        self.label = label
+        self.revision = 0
+        self._snapshot: PromptSnapshot | None = None
+        self._client: Any = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[["PromptHandle"], None]] = []
+
+    @property
+    def version(self) -> int | None:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def current(self) -> Any:
+        """Return the best prompt input available right now."""
+        if self._client is not None:
+            return self._client
+        if self._snapshot is not None:
+            return self._snapshot
+        if self.fallback is not None:
+            return self.fallback
+        raise KeyError(
+            f"Prompt {self.name!r} has no snapshot, remote copy or local fallback."
+        )
+
+    def subscribe(self, listener: Callable[["PromptHandle"], None]) -> None:
+        self._listeners.append(listener)
+
+    def swap(self, snapshot: PromptSnapshot, client: Any = None) -> bool:
+        """Install ``snapshot``; return False if it is not newer than the current one."""
+        with self._lock:
+            current = self._snapshot
+            if current is not None:
+                if self.pinned_version is not None:
+                    if current.version == self.pinned_version and client is None:
+                        return False
+                elif snapshot.version < current.version:
+                    return False
+                elif snapshot.version == current.version and (
+                    client is None or self._client is not None
+                ):
+                    return False
+            self._snapshot = snapshot
+            self._client = client
+            self.revision += 1
+        for listener in list(self._listeners):
+            try:
+                listener(self)
+            except Exception:
+                logger.exception(f"Prompt listener failed for {self.name!r}")
+        return True
+
+
+class PromptProvider:
+    """Serve prompts from the local snapshot and refresh them in the background."""
+
+    def __init__(
+        self,
+        store: PromptSnapshotStore | None = None,
+        source: Any = None,
+        *,
+        offline: bool = False,
+        refresh_interval_s: float = DEFAULT_REFRESH_INTERVAL_S,
+    ) -> None:
+        self.store = store or PromptSnapshotStore()
+        self.offline = offline
+        self.source = None if offline else (source or LangfusePromptSource())
+        self.refresh_interval_s = refresh_interval_s
+        self._handles: Dict[Tuple[str, int | None, str | None], PromptHandle] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def get(
+        self,
+        name: str,
+        *,
+        fallback: str | None = None,
+        version: int | None = None,
+        label: str | None = None,
+    ) -> PromptHandle:
+        """Return a handle served from disk immediately; never blocks on the network."""
+        key = (name, version, label)
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                return handle
+            handle = PromptHandle(name, fallback=fallback, version=version, label=label)
+            snapshot = self.store.load(name, version=version)
+            if snapshot is not None:
+                handle.swap(snapshot)
+            self._handles[key] = handle
+
+        if self.source is not None:
+            self.start()
+            threading.Thread(
+                target=self._refresh_handle,
+                args=(handle,),
+                name=f"prompt-refresh-{name}",
+                daemon=True,
+            ).start()
+        return handle
+
+    def _refresh_handle(self, handle: PromptHandle) -> bool:
+        if self.source is None:
+            return False
+        if handle.pinned_version is not None and handle._client is not None:
+            return False
+        try:
+            snapshot, client = self.source.fetch(
+                handle.name, version=handle.pinned_version, label=handle.label
+            )
+        except Exception as error:
+            logger.warning(f"Prompt refresh failed for {handle.name!r}: {error}")
+            return False
+        swapped = handle.swap(snapshot, client)
+        if swapped:
+            self.store.save(snapshot)
+            logger.info(f"Prompt {handle.name!r} now at version {snapshot.version}")
+        return swapped
+
+    def refresh(self) -> int:
+        """Refresh every handle synchronously; return how many were swapped."""
+        with self._lock:
+            handles = list(self._handles.values())
+        return sum(self._refresh_handle(handle) for handle in handles)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.refresh_interval_s):
+            self.refresh()
+
+    def start(self) -> None:
+        if self.source is None or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="prompt-provider", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+
+_DEFAULT_PROVIDER: Optional[PromptProvider] = None
+
+
+def get_prompt_provider() -> PromptProvider:
+    """Return the process-wide provider configured from the environment.
+
+    ``PROMPT_SNAPSHOT_DIR`` overrides the snapshot location and
+    ``PROMPT_PROVIDER_OFFLINE=1`` disables every remote fetch.
+    """
+    global _DEFAULT_PROVIDER
+    if _DEFAULT_PROVIDER is None:
+        _DEFAULT_PROVIDER = PromptProvider(
+            PromptSnapshotStore(os.getenv("PROMPT_SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)),
+            offline=os.getenv("PROMPT_PROVIDER_OFFLINE", "0") == "1",
+        )
+    return _DEFAULT_PROVIDER
+
+
+def set_prompt_provider(provider: PromptProvider | None) -> None:
+    """Install ``provider`` as the process-wide default (``None`` resets it)."""
+    global _DEFAULT_PROVIDER
+    if _DEFAULT_PROVIDER is not None and _DEFAULT_PROVIDER is not provider:
+        _DEFAULT_PROVIDER.stop()
+    _DEFAULT_PROVIDER = provider
+
+
+__all__ = [
+    "PromptSnapshot",
+    "PromptSnapshotStore",
+    "LocalPromptSource",
+    "LangfusePromptSource",
+    "PromptHandle",
+    "PromptProvider",
+    "get_prompt_provider",
+    "set_prompt_provider",
+]
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import pkgutil
 from importlib import import_module
+from pathlib import Path
 from typing import Any, Callable
 
 
@@ -25,15 +27,28 @@ def get_make_state(graph_name: str) -> Callable[..., Any]:
     return state_func
 
 
-def get_graph(graph_name: str) -> Any:
-    """Return compiled graph for a named graph package."""
+def get_graph(graph_name: str, **kwargs: Any) -> Any:
+    """Return compiled graph for a named graph package.
+
+    Keyword arguments (e.g. ``checkpointer``) are passed to create_graph().
+    """
     _, graph_module = _load_graph_modules(graph_name)
 
     create_graph = getattr(graph_module, "create_graph", None)
     if not callable(create_graph):
         raise ValueError(f"Graph {graph_name!r} is missing create_graph().")
 
-    return create_graph()
+    return create_graph(**kwargs)
+
+
+def list_graphs() -> list[str]:
+    """Names of the graph packages that provide a graph module."""
+    root = Path(__file__).parent
+    return sorted(
+        module.name
+        for module in pkgutil.iter_modules([str(root)])
+        if module.ispkg and (root / module.name / "graph.py").exists()
+    )
 
 
-__all__ = ["get_make_state", "get_graph"]
+__all__ = ["get_make_state", "get_graph", "list_graphs"]
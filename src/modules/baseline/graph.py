@@ -1,25 +1,30 @@
-from langfuse import get_client
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, START, StateGraph
 
 from ...common.nodes import make_llm_node
+from ...common.prompts import get_prompt_provider
+from . import prompt
 from .config import config
 from .state import StateSchema
 
 
 def make_coach_node_input(state):
+    # The remote prompt reads `data_dict`, the local fallback `input_dict`.
     return {
         "data_dict": state["input_dict"],
+        "input_dict": state["input_dict"],
     }
 
 
-def create_graph():
+def create_graph(checkpointer: BaseCheckpointSaver | None = None):
 
     # * nodes -------------------------------------------------
-    langfuse = get_client()
+    coach_prompt = get_prompt_provider().get(
+        "report_node", fallback=prompt.COACH_NODE_PROMPT
+    )
     coach_node = make_llm_node(
         llm_node_config=config.coach_node,
-        # prompt_input=prompt.COACH_NODE_PROMPT,
-        prompt_input=langfuse.get_prompt("report_node"),
+        prompt_input=coach_prompt,
         make_inputs=make_coach_node_input,
         output_format="str",
         state_type="str",
@@ -39,5 +44,7 @@ def create_graph():
     workflow.add_edge(START, "coach_node")
     workflow.add_edge("coach_node", END)
 
-    graph = workflow.compile(checkpointer=None)
+    # Pass a durable saver (e.g. SqliteCheckpointSaver) to keep runs across
+    # restarts; None runs without persistence.
+    graph = workflow.compile(checkpointer=checkpointer)
     return graph
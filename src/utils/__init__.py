@@ -25,15 +25,18 @@ def get_make_state(graph_name: str) -> Callable[..., Any]:
     return state_func
 
 
-def get_graph(graph_name: str) -> Any:
-    """Return compiled graph for a named graph package."""
+def get_graph(graph_name: str, **kwargs: Any) -> Any:
+    """Return compiled graph for a named graph package.
+
+    Keyword arguments (e.g. ``checkpointer``) are passed to create_graph().
+    """
     _, graph_module = _load_graph_modules(graph_name)
 
     create_graph = getattr(graph_module, "create_graph", None)
     if not callable(create_graph):
         raise ValueError(f"Graph {graph_name!r} is missing create_graph().")
 
-    return create_graph()
+    return create_graph(**kwargs)
 
 
 __all__ = ["get_make_state", "get_graph"]
@@ -0,0 +1,102 @@
+import pytest
+
+from __src.planning import ActionCompiler, ActionTable, decode_actions
+from __src.planning.actions import (
+    Action,
+    ActionCompileError,
+    ActionTemplate,
+    compile_task_templates,
+)
+
+TASKS = {
+    "GoToObject": {"template": "GoToObject <robot><object>"},
+    "OpenObject": {"template": "OpenObject <robot><object>"},
+    "PickObject": {"template": "PickObject <robot><object>"},
+    "PlaceObject": {"template": "PlaceObject <robot><object><receptacleObject>"},
+}
+PLAN = {
+    "tasks": [
+        {
+            "subgoal": "put the apple in the bowl",
+            "tasks": [
+                {"skill": "GoToObject", "target": "object_apple_0"},
+                {"skill": "PickObject", "target": "object_apple_0"},
+                {"skill": "GoToObject", "target": "object_bowl_0"},
+                {"skill": "PlaceObject", "target": "object_bowl_0"},
+            ],
+        }
+    ]
+}
+
+
+@pytest.fixture
+def compiler():
+    return ActionCompiler(compile_task_templates(TASKS), default_robot="robot1")
+
+
+def test_template_slots_are_parsed():
+    template = ActionTemplate.parse("PlaceObject", TASKS["PlaceObject"])
+    assert template.slots == ("robot", "object", "receptacleObject")
+    assert template.takes_receptacle
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {"template": "MoveAhead <robot><object>"},
+        {"template": "PlaceObject <robot><distance>"},
+    ],
+)
+def test_bad_templates_are_rejected(spec):
+    with pytest.raises(ActionCompileError):
+        ActionTemplate.parse("PlaceObject", spec)
+
+
+def test_place_binds_the_held_object_and_the_receptacle(compiler):
+    table = compiler.compile(PLAN)
+    assert len(table) == 4
+    assert table[-1] == Action(
+        "PlaceObject", "robot1", "object_apple_0", "object_bowl_0", 0, 3
+    )
+    commands = [
+        action.command(compiler.templates[action.skill]) for action in table
+    ]
+    assert commands == [
+        "GoToObject robot1 object_apple_0",
+        "PickObject robot1 object_apple_0",
+        "GoToObject robot1 object_bowl_0",
+        "PlaceObject robot1 object_apple_0 object_bowl_0",
+    ]
+
+
+def test_skill_without_template_is_rejected(compiler):
+    plan = {"tasks": [{"subgoal": "s", "tasks": [{"skill": "Teleport"}]}]}
+    with pytest.raises(ActionCompileError):
+        compiler.compile(plan)
+
+
+def test_symbols_are_interned_once(compiler):
+    table = compiler.compile(PLAN)
+    assert sorted(table.symbols) == sorted(
+        {
+            "GoToObject",
+            "PickObject",
+            "PlaceObject",
+            "robot1",
+            "object_apple_0",
+            "object_bowl_0",
+        }
+    )
+    assert table.row(0)[2] == table.row(1)[2]
+
+
+def test_state_and_bytes_round_trip(compiler):
+    table = compiler.compile(PLAN)
+    assert decode_actions(table.to_state()) == list(table)
+    assert list(ActionTable.from_bytes(table.to_bytes())) == list(table)
+    assert list(ActionTable.from_bytes(ActionTable().to_bytes())) == []
+
+
+def test_unknown_record_layout_is_rejected():
+    with pytest.raises(ActionCompileError):
+        ActionTable.from_state({"fields": ["skill"], "records": []})
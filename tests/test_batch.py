@@ -0,0 +1,110 @@
+import asyncio
+import io
+import json
+
+from __src.runner.batch import BatchRunner, resume_point
+
+
+class SlowGraph:
+    """Headless graph stand-in whose runs wait until ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.started = 0
+
+    async def ainvoke(self, state):
+        self.started += 1
+        await self.release.wait()
+        return {"tasks": [state["user_queries"][0]]}
+
+
+class Output(io.StringIO):
+    """Output that counts write attempts, including ones after close."""
+
+    attempts = 0
+
+    def write(self, text):
+        self.attempts += 1
+        return super().write(text)
+
+
+def write_records(path, count):
+    path.write_text(
+        "".join(json.dumps({"query": f"q{i}"}) + "\n" for i in range(count)),
+        encoding="utf-8",
+    )
+
+
+def test_cancelled_run_cancels_in_flight_plans(tmp_path):
+    input_path = tmp_path / "in.jsonl"
+    write_records(input_path, 4)
+    output = Output()
+
+    async def main():
+        graph = SlowGraph()
+        runner = BatchRunner(graph, lambda record: {}, concurrency=2)
+        run = asyncio.create_task(
+            runner.run(input_path, output, progress_interval=None)
+        )
+        while graph.started < 2:
+            await asyncio.sleep(0.01)
+        run.cancel()
+        try:
+            await run
+        except asyncio.CancelledError:
+            pass
+        output.close()
+        # Plans left running would now write to the closed output.
+        graph.release.set()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+    assert output.attempts == 0
+
+
+def write_output(path, indices, tail=b""):
+    path.write_bytes(
+        b"".join(json.dumps({"index": i}).encode() + b"\n" for i in indices) + tail
+    )
+
+
+def test_resume_point_of_a_missing_output(tmp_path):
+    assert resume_point(tmp_path / "out.jsonl") == (0, set())
+
+
+def test_resume_point_keeps_out_of_order_indices(tmp_path):
+    path = tmp_path / "out.jsonl"
+    write_output(path, [0, 2, 1, 5, 4])
+    assert resume_point(path) == (3, {4, 5})
+
+
+def test_resume_point_truncates_a_partial_last_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    write_output(path, [0, 1], tail=b'{"index": 2, "sta')
+    assert resume_point(path) == (2, set())
+    assert path.read_bytes().endswith(b'{"index": 1}\n')
+
+
+class EchoGraph:
+    async def ainvoke(self, state):
+        return {"tasks": state["user_queries"]}
+
+
+def test_resumed_run_skips_done_records(tmp_path):
+    input_path = tmp_path / "in.jsonl"
+    output_path = tmp_path / "out.jsonl"
+    write_records(input_path, 5)
+    write_output(output_path, [0, 2])
+
+    offset, skip = resume_point(output_path)
+    runner = BatchRunner(EchoGraph(), lambda record: {})
+    with open(output_path, "a", encoding="utf-8") as output:
+        stats = asyncio.run(
+            runner.run(
+                input_path, output, offset=offset, skip=skip, progress_interval=None
+            )
+        )
+    lines = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert stats.done == 3
+    assert [line["index"] for line in lines] == [0, 2, 1, 3, 4]
+    assert lines[-1]["tasks"] == ["q4"]
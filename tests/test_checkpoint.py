@@ -0,0 +1,80 @@
+import sqlite3
+import time
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from __src.runner.checkpoint import SqliteCheckpointSaver
+
+
+class FailingCommit:
+    """Connection proxy whose next ``failures`` COMMITs raise."""
+
+    def __init__(self, conn: sqlite3.Connection, failures: int = 1) -> None:
+        self._conn = conn
+        self.failures = failures
+
+    def execute(self, sql, *args):
+        if sql == "COMMIT" and self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def put(saver: SqliteCheckpointSaver, thread_id: str) -> None:
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"user_query": thread_id}
+    checkpoint["channel_versions"] = {"user_query": 1}
+    saver.put(
+        {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}},
+        checkpoint,
+        {},
+        {"user_query": 1},
+    )
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_failed_flush_requeues_rows(tmp_path):
+    # A long interval keeps the background writer out of the way.
+    saver = SqliteCheckpointSaver(tmp_path / "cp.sqlite", flush_interval=60)
+    try:
+        saver._conn = FailingCommit(saver._conn)
+        put(saver, "t1")
+        queued = list(saver._queue)
+        try:
+            saver.flush()
+        except sqlite3.OperationalError:
+            pass
+        else:
+            raise AssertionError("flush did not raise the commit error")
+        assert saver._queue == queued
+        assert saver._pending["t1"] == len(queued)
+        assert saver.get_tuple({"configurable": {"thread_id": "t1"}}) is not None
+    finally:
+        saver.close()
+
+
+def test_writer_survives_failed_commit(tmp_path):
+    saver = SqliteCheckpointSaver(tmp_path / "cp.sqlite", flush_interval=0.01)
+    try:
+        conn = saver._conn = FailingCommit(saver._conn)
+        put(saver, "t1")
+        assert wait_for(lambda: not conn.failures and not saver._pending)
+        assert saver._writer.is_alive()
+        assert saver.thread_rows("t1")
+
+        put(saver, "t2")
+        assert wait_for(lambda: not saver._pending)
+        assert saver.thread_rows("t2")
+    finally:
+        saver.close()
@@ -0,0 +1,95 @@
+from typing import List, Literal
+
+import pytest
+from pydantic import BaseModel
+
+from __src.common.json_repair import (
+    JSONRepairError,
+    get_repair_stats,
+    parse_with_repair,
+    repair_json_text,
+    reset_repair_stats,
+)
+
+
+class Intent(BaseModel):
+    intent: Literal["accept", "reject"]
+
+
+class Steps(BaseModel):
+    steps: List[str]
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_repair_stats()
+    yield
+    reset_repair_stats()
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"intent": "accept"} then {x}',
+        'Sure: {"intent": "accept"}. Note: use [brackets]',
+        "Sure: {'intent': 'accept',}. Note: use [brackets]",
+        '```json\n{"intent": "accept"}\n``` and {y}',
+    ],
+)
+def test_prose_after_json_is_ignored(text):
+    assert parse_with_repair(text, Intent, node_name="n").intent == "accept"
+    assert get_repair_stats()["n"]["repaired"] == 1
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("{'a': True, 'b': None}", '{"a": true, "b": null}'),
+        ('{"a": [1, 2,],}', '{"a": [1, 2]}'),
+        ('{"a": [1, 2, {"b": "x', '{"a": [1, 2, {"b": "x"}]}'),
+        ('{"a": 1, "b"', '{"a": 1}'),
+    ],
+)
+def test_repair_json_text(text, expected):
+    assert repair_json_text(text) == expected
+
+
+def test_valid_json_is_not_repaired():
+    parse_with_repair('{"intent": "reject"}', Intent, node_name="n")
+    assert get_repair_stats()["n"] == {
+        "ok": 1,
+        "repaired": 0,
+        "reprompted": 0,
+        "failed": 0,
+    }
+
+
+def test_enum_spelling_and_bare_list_are_coerced():
+    assert parse_with_repair('{"intent": "Accept"}', Intent).intent == "accept"
+    assert parse_with_repair('["a", "b"]', Steps).steps == ["a", "b"]
+
+
+def test_truncated_list_drops_the_cut_off_item():
+    parsed = parse_with_repair('{"steps": ["a", "b", {"c', Steps)
+    assert parsed.steps == ["a", "b"]
+
+
+def test_reprompt_is_called_once_when_repair_fails():
+    prompts = []
+
+    def reprompt(prompt):
+        prompts.append(prompt)
+        return '{"intent": "reject"}'
+
+    parsed = parse_with_repair(
+        "no json here", Intent, node_name="n", reprompt=reprompt
+    )
+    assert parsed.intent == "reject"
+    assert len(prompts) == 1
+    assert get_repair_stats()["n"]["reprompted"] == 1
+
+
+def test_unrepairable_output_raises():
+    with pytest.raises(JSONRepairError):
+        parse_with_repair("no json here", Intent, node_name="n")
+    assert get_repair_stats()["n"]["failed"] == 1
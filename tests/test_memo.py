@@ -0,0 +1,114 @@
+import pytest
+
+from __src.planning import SubgoalLibrary, WorldModel
+from __src.planning.memo import canonicalize, get_memo_stats, reset_memo_stats
+
+ENV = {
+    "objects_by_group": {
+        "island_left_group": ["object_apple_0", "object_bowl_0"],
+        "island_right_group": ["object_fork_0"],
+        "counter_1_left_group": ["object_lemon_0", "object_plate_0"],
+    }
+}
+
+MOVE_FORK = [
+    {"skill": "GoToObject", "target": "object_fork_0"},
+    {"skill": "PickObject", "target": "object_fork_0"},
+    {"skill": "GoToObject", "target": "object_bowl_0"},
+    {"skill": "PlaceObject", "target": "object_bowl_0"},
+]
+
+
+@pytest.fixture
+def world():
+    return WorldModel.from_env(ENV)
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_memo_stats()
+    yield
+    reset_memo_stats()
+
+
+def test_canonicalize_replaces_mentions_with_slots(world):
+    canonical = canonicalize("put the fork in the bowl", world)
+    assert canonical.key == "put <object0> in <object1>"
+    assert canonical.bindings == ("object_fork_0", "object_bowl_0")
+
+
+def test_exact_hit_rebinds_slots_to_new_objects(world):
+    library = SubgoalLibrary()
+    assert library.learn("put the fork in the bowl", MOVE_FORK, world)
+    tasks = library.lookup("put the lemon in the plate", world)
+    assert [task["target"] for task in tasks] == [
+        "object_lemon_0",
+        "object_lemon_0",
+        "object_plate_0",
+        "object_plate_0",
+    ]
+    assert get_memo_stats()["exact"] == 1
+
+
+def test_fuzzy_hit_when_only_filler_words_differ(world):
+    library = SubgoalLibrary()
+    library.learn("put the fork in the bowl", MOVE_FORK, world)
+    assert library.lookup("please put the fork in the bowl", world) == MOVE_FORK
+    assert get_memo_stats()["fuzzy"] == 1
+
+
+def test_fuzzy_lookup_never_swaps_a_verb(world):
+    library = SubgoalLibrary()
+    library.learn(
+        "go to the fork then pick up the fork and then open the plate",
+        [
+            {"skill": "GoToObject", "target": "object_fork_0"},
+            {"skill": "PickObject", "target": "object_fork_0"},
+            {"skill": "OpenObject", "target": "object_plate_0"},
+        ],
+        world,
+    )
+    closing = "go to the fork then pick up the fork and then close the plate"
+    assert library.lookup(closing, world) is None
+    assert get_memo_stats()["miss"] == 1
+
+
+def test_learn_rejects_targets_missing_from_the_subgoal(world):
+    library = SubgoalLibrary()
+    tasks = [{"skill": "PickObject", "target": "object_apple_0"}]
+    assert not library.learn("pick up the fork", tasks, world)
+    assert len(library) == 0
+
+
+def test_lru_evicts_the_oldest_entry(world):
+    library = SubgoalLibrary(max_entries=1)
+    library.learn("put the fork in the bowl", MOVE_FORK, world)
+    library.learn("carry the fork to the bowl", MOVE_FORK, world)
+    assert len(library) == 1
+    assert library.lookup("put the fork in the bowl", world) is None
+
+
+def test_lookups_only_reorder_and_save_with_order(tmp_path, world):
+    path = tmp_path / "memo.json"
+    library = SubgoalLibrary(path)
+    library.learn("put the fork in the bowl", MOVE_FORK, world)
+    library.save()
+    saved = path.stat().st_mtime_ns
+
+    library.lookup("put the fork in the bowl", world)
+    library.save()
+    assert path.stat().st_mtime_ns == saved
+
+    library.save(order=True)
+    reloaded = SubgoalLibrary(path)
+    assert reloaded.lookup("put the fork in the bowl", world) == MOVE_FORK
+
+
+def test_mention_of_several_groups_stays_unbound(world):
+    canonical = canonicalize("put the fork on the island", world)
+    assert canonical.key == "put <object0> on island"
+    assert canonical.bindings == ("object_fork_0",)
+    assert canonicalize("put the fork on the island left", world).bindings == (
+        "object_fork_0",
+        "island_left_group",
+    )
@@ -0,0 +1,38 @@
+from __src.common.tokens import count_tokens
+from __src.config.config import MemoryConfig
+from __src.runner.memory import (
+    SUMMARY_MARKER,
+    make_bounded_queries_text,
+    select_recent_queries,
+)
+
+MEMORY = MemoryConfig(max_raw_turns=2, max_query_tokens=64, max_summary_tokens=16)
+
+
+def test_only_the_newest_turns_within_budget_are_kept():
+    queries = [f"q{i}" for i in range(5)]
+    assert select_recent_queries(queries, MEMORY) == ["q3", "q4"]
+
+
+def test_an_oversized_newest_query_is_truncated_and_kept_alone():
+    tight = MemoryConfig(max_raw_turns=2, max_query_tokens=4)
+    (kept,) = select_recent_queries(["old", "new " * 50], tight)
+    assert kept.startswith("new") and count_tokens(kept) <= 4
+
+
+def test_lines_are_numbered_by_prompt_position_past_the_cap():
+    # keep_last(64) caps user_queries, so its length is not the turn index.
+    state = {
+        "user_queries": [f"q{i}" for i in range(64)],
+        "conversation_summary": "merged mission",
+    }
+    assert make_bounded_queries_text(state, MEMORY).splitlines() == [
+        f"{SUMMARY_MARKER} merged mission",
+        "1. q62",
+        "2. q63",
+    ]
+
+
+def test_summary_is_left_out_while_every_turn_fits():
+    state = {"user_queries": ["q0", "q1"], "conversation_summary": "merged"}
+    assert make_bounded_queries_text(state, MEMORY) == "1. q0\n2. q1"
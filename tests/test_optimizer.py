@@ -0,0 +1,103 @@
+from __src.planning import PlanOptimizer, WorldModel
+from __src.planning.optimizer import (
+    OTHER_AREA_COST,
+    SAME_FIXTURE_COST,
+    TravelCostModel,
+    drop_redundant_moves,
+)
+
+ENV = {
+    "objects_by_group": {
+        "island_left_group": ["object_apple_0", "object_bowl_0"],
+        "island_right_group": ["object_fork_0"],
+        "counter_1_left_group": ["object_lemon_0", "object_plate_0"],
+    }
+}
+
+
+def goto(target):
+    return {"skill": "GoToObject", "target": target}
+
+
+def move(obj, destination):
+    return {
+        "subgoal": f"{obj} -> {destination}",
+        "tasks": [
+            goto(obj),
+            {"skill": "PickObject", "target": obj},
+            goto(destination),
+            {"skill": "PlaceObject", "target": destination},
+        ],
+    }
+
+
+def test_redundant_moves_are_dropped():
+    tasks = [
+        goto("object_apple_0"),
+        goto("object_bowl_0"),
+        {"skill": "PickObject", "target": "object_bowl_0"},
+        goto("object_bowl_0"),
+        {"skill": "PlaceObject", "target": "object_bowl_0"},
+    ]
+    assert drop_redundant_moves(tasks) == [tasks[1], tasks[2], tasks[4]]
+
+
+def test_adjacency_costs_without_positions():
+    costs = TravelCostModel(WorldModel.from_env(ENV))
+    assert costs.cost(None, "object_apple_0") == 0.0
+    assert costs.cost("object_apple_0", "object_bowl_0") == 0.0
+    assert costs.cost("object_apple_0", "object_fork_0") == SAME_FIXTURE_COST
+    assert costs.cost("object_apple_0", "object_lemon_0") == OTHER_AREA_COST
+
+
+def test_group_positions_take_precedence():
+    env = {
+        **ENV,
+        "group_positions": {
+            "island_left_group": [0.0, 0.0],
+            "counter_1_left_group": [3.0, 4.0],
+        },
+    }
+    costs = TravelCostModel(WorldModel.from_env(env))
+    assert costs.cost("object_apple_0", "object_lemon_0") == 5.0
+
+
+def test_independent_subgoals_are_reordered_to_save_travel():
+    # island -> counter, island, counter: the two island moves belong together.
+    plan = {
+        "tasks": [
+            move("object_apple_0", "counter_1_left_group"),
+            move("object_lemon_0", "island_left_group"),
+            move("object_fork_0", "island_left_group"),
+        ]
+    }
+    optimized, report = PlanOptimizer(WorldModel.from_env(ENV)).optimize(plan)
+    assert report.method == "exact"
+    assert report.travel_after < report.travel_before
+    assert sorted(report.order) == [0, 1, 2]
+    assert [plan["tasks"][i] for i in report.order] == optimized["tasks"]
+
+
+def test_subgoals_sharing_an_object_keep_their_order():
+    plan = {
+        "tasks": [
+            move("object_apple_0", "counter_1_left_group"),
+            move("object_lemon_0", "island_left_group"),
+            move("object_apple_0", "island_right_group"),
+        ]
+    }
+    for exact_max_subgoals in (8, 1):
+        optimizer = PlanOptimizer(
+            WorldModel.from_env(ENV), exact_max_subgoals=exact_max_subgoals
+        )
+        _, report = optimizer.optimize(plan)
+        assert report.order.index(0) < report.order.index(2)
+        assert report.travel_after <= report.travel_before
+
+
+def test_single_subgoal_is_left_alone():
+    plan = {"tasks": [move("object_apple_0", "counter_1_left_group")]}
+    optimized, report = PlanOptimizer(WorldModel.from_env(ENV)).optimize(plan)
+    assert optimized == plan
+    assert report.method == "none"
+    assert report.dropped_moves == 0
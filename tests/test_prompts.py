@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from src.common.prompts import (
+    LocalPromptSource,
+    PromptHandle,
+    PromptProvider,
+    PromptSnapshot,
+    PromptSnapshotStore,
+)
+
+
+def snapshot(version, template=None):
+    return PromptSnapshot("intent", version, template or f"v{version}")
+
+
+def wait_for_version(handle, version, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while handle.version != version and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return handle.version
+
+
+def test_store_keeps_the_newest_versions(tmp_path):
+    store = PromptSnapshotStore(tmp_path, max_versions=2)
+    for version in (1, 3, 2):
+        store.save(snapshot(version))
+    assert store.load("intent").version == 3
+    assert store.load("intent", version=2).template == "v2"
+    assert store.load("intent", version=1) is None
+    assert store.load("missing") is None
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path):
+    store = PromptSnapshotStore(tmp_path)
+    store.path("intent").write_text("{not json", encoding="utf-8")
+    assert store.load("intent") is None
+
+
+def test_handle_only_swaps_to_newer_versions():
+    handle = PromptHandle("intent", fallback="local")
+    assert handle.current() == "local"
+    seen = []
+    handle.subscribe(lambda h: seen.append(h.version))
+
+    assert handle.swap(snapshot(2))
+    assert not handle.swap(snapshot(1))
+    assert not handle.swap(snapshot(2))
+    assert handle.swap(snapshot(3))
+    assert seen == [2, 3]
+    assert handle.revision == 2
+    assert handle.current().get_langchain_prompt() == "v3"
+
+
+def test_handle_without_any_prompt_raises():
+    with pytest.raises(KeyError):
+        PromptHandle("intent").current()
+
+
+def test_offline_provider_serves_the_snapshot(tmp_path):
+    store = PromptSnapshotStore(tmp_path)
+    store.save(snapshot(4))
+    provider = PromptProvider(store, offline=True)
+    handle = provider.get("intent", fallback="local")
+    assert handle.version == 4
+    assert provider.get("intent") is handle
+    assert provider.refresh() == 0
+
+
+def test_refresh_swaps_in_and_stores_new_versions(tmp_path):
+    store = PromptSnapshotStore(tmp_path)
+    source = LocalPromptSource({"intent": ["v1"]})
+    provider = PromptProvider(store, source, refresh_interval_s=3600)
+    try:
+        handle = provider.get("intent")
+        assert wait_for_version(handle, 1) == 1
+
+        source.add_version("intent", "v2")
+        assert provider.refresh() == 1
+        assert handle.current().get_langchain_prompt() == "v2"
+        assert store.load("intent").version == 2
+    finally:
+        provider.stop()
+
+
+def test_pinned_version_is_not_upgraded(tmp_path):
+    store = PromptSnapshotStore(tmp_path)
+    source = LocalPromptSource({"intent": ["v1", "v2"]})
+    provider = PromptProvider(store, source, refresh_interval_s=3600)
+    try:
+        handle = provider.get("intent", version=1)
+        assert wait_for_version(handle, 1) == 1
+        source.add_version("intent", "v3")
+        provider.refresh()
+        assert handle.version == 1
+    finally:
+        provider.stop()
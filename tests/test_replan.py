@@ -0,0 +1,101 @@
+import pytest
+
+from __src.planning import IncrementalReplanner, TemplatePlanner, WorldModel
+from __src.planning.replan import get_replan_stats, record_replan, reset_replan_stats
+
+ENV = {
+    "objects_by_group": {
+        "island_left_group": ["object_apple_0", "object_bowl_0"],
+        "island_right_group": ["object_fork_0"],
+        "counter_1_left_group": ["object_lemon_0", "object_plate_0"],
+    }
+}
+SKILLS = {"GoToObject", "PickObject", "PlaceObject", "OpenObject", "CloseObject"}
+OLD = "Put the apple in the bowl."
+TWO = "Put the apple in the bowl and put the fork on the plate."
+
+
+@pytest.fixture
+def world():
+    return WorldModel.from_env(ENV)
+
+
+@pytest.fixture
+def planner():
+    return TemplatePlanner(SKILLS)
+
+
+@pytest.fixture
+def replanner(planner):
+    return IncrementalReplanner(planner)
+
+
+def targets(plan):
+    return [task["target"] for subgoal in plan["tasks"] for task in subgoal["tasks"]]
+
+
+def test_replaced_object_becomes_a_substitution(planner, replanner, world):
+    plan_diff = replanner.diff(OLD, "Put the lemon in the bowl.", world)
+    assert plan_diff.kind == "patch"
+    assert plan_diff.substitutions == [("object_apple_0", "object_lemon_0")]
+
+    patched = replanner.patch(planner.plan(OLD, world), plan_diff, world)
+    assert targets(patched) == targets(
+        planner.plan("Put the lemon in the bowl.", world)
+    )
+    assert patched["tasks"][0]["subgoal"] == "Put the lemon in the bowl"
+
+
+def test_added_clause_is_appended(planner, replanner, world):
+    plan_diff = replanner.diff(OLD, TWO, world)
+    assert plan_diff.added_clauses == ["put the fork on the plate"]
+
+    patched = replanner.patch(planner.plan(OLD, world), plan_diff, world)
+    assert len(patched["tasks"]) == 2
+    assert targets(patched)[4:] == [
+        "object_fork_0",
+        "object_fork_0",
+        "object_plate_0",
+        "object_plate_0",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("old", "new", "reason"),
+    [
+        (TWO, OLD, "clause_delete"),
+        (OLD, "Put the pear in the bowl.", "unresolved_target"),
+        (OLD, "Put the red apple in the bowl.", "word_insert_or_delete"),
+    ],
+)
+def test_unsupported_edits_are_reported(replanner, world, old, new, reason):
+    plan_diff = replanner.diff(old, new, world)
+    assert plan_diff.kind == "unsupported"
+    assert plan_diff.reason == reason
+    assert replanner.patch({"tasks": []}, plan_diff, world) is None
+
+
+def test_unchanged_mission_keeps_the_plan(planner, replanner, world):
+    plan = planner.plan(OLD, world)
+    plan_diff = replanner.diff(OLD, OLD, world)
+    assert plan_diff.kind == "unchanged"
+    assert plan_diff.change_ratio == 0.0
+    assert replanner.patch(plan, plan_diff, world) == plan
+
+
+def test_substitution_missing_from_the_plan_is_not_applied(
+    planner, replanner, world
+):
+    plan_diff = replanner.diff(OLD, "Put the lemon in the bowl.", world)
+    unrelated = planner.plan("Put the fork on the plate.", world)
+    assert replanner.patch(unrelated, plan_diff, world) is None
+
+
+def test_replan_stats_count_outcomes():
+    reset_replan_stats()
+    record_replan("patched")
+    record_replan("patched")
+    record_replan("full")
+    assert get_replan_stats() == {"patched": 2, "full": 1}
+    reset_replan_stats()
+    assert get_replan_stats() == {}
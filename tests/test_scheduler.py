@@ -0,0 +1,102 @@
+import pytest
+
+from __src.planning import Scheduler, WorldModel
+from __src.planning.scheduler import apply_schedule, build_jobs
+
+ARM = ["GoToObject", "PickObject", "PlaceObject"]
+ENV = {
+    "objects_by_group": {
+        "island_left_group": ["object_apple_0", "object_bowl_0"],
+        "counter_1_left_group": ["object_lemon_0", "object_plate_0"],
+    }
+}
+
+
+def move(obj, destination):
+    return {
+        "subgoal": f"{obj} -> {destination}",
+        "tasks": [
+            {"skill": "GoToObject", "target": obj},
+            {"skill": "PickObject", "target": obj},
+            {"skill": "GoToObject", "target": destination},
+            {"skill": "PlaceObject", "target": destination},
+        ],
+    }
+
+
+def plan(*subgoals):
+    return {"tasks": list(subgoals)}
+
+
+INDEPENDENT = plan(
+    move("object_apple_0", "counter_1_left_group"),
+    move("object_lemon_0", "island_left_group"),
+)
+
+
+def test_shared_objects_create_dependencies():
+    jobs = build_jobs(
+        plan(
+            move("object_apple_0", "counter_1_left_group"),
+            move("object_lemon_0", "object_plate_0"),
+            move("object_apple_0", "object_bowl_0"),
+        ),
+        {},
+        WorldModel.from_env(ENV),
+    )
+    assert [job.depends_on for job in jobs] == [(), (), (0,)]
+    assert jobs[0].objects == {"object_apple_0"}
+    assert jobs[0].duration == 4.0
+
+
+def test_independent_subgoals_run_in_parallel():
+    schedule = Scheduler({"robot1": ARM, "robot2": ARM}).schedule(INDEPENDENT)
+    assert schedule.method == "exact"
+    assert schedule.makespan == 4.0
+    assert schedule.sequential_makespan == 8.0
+    assert set(schedule.assignments.values()) == {"robot1", "robot2"}
+
+
+def test_dependent_subgoals_keep_plan_order():
+    tasks = plan(
+        move("object_apple_0", "counter_1_left_group"),
+        move("object_apple_0", "island_left_group"),
+    )
+    schedule = Scheduler({"robot1": ARM, "robot2": ARM}).schedule(tasks)
+    first, second = schedule.jobs
+    assert (first.subgoal_index, second.subgoal_index) == (0, 1)
+    assert second.start >= first.end
+    assert schedule.dependencies == {1: (0,)}
+
+
+def test_only_capable_robots_are_assigned():
+    schedule = Scheduler({"camera": ["GoToObject"], "robot1": ARM}).schedule(
+        INDEPENDENT
+    )
+    assert set(schedule.assignments.values()) == {"robot1"}
+    assert schedule.makespan == 8.0
+
+
+def test_large_plans_use_the_heuristic():
+    tasks = plan(*(move("object_apple_0", "island_left_group") for _ in range(3)))
+    scheduler = Scheduler({"robot1": ARM, "robot2": ARM}, exact_max_subgoals=2)
+    assert scheduler.schedule(tasks).method == "heuristic"
+
+
+def test_skill_durations_weight_jobs():
+    scheduler = Scheduler({"robot1": ARM}, skill_durations={"GoToObject": 3.0})
+    assert scheduler.schedule(INDEPENDENT).makespan == 16.0
+
+
+def test_apply_schedule_binds_tasks_to_robots():
+    schedule = Scheduler({"robot1": ARM, "robot2": ARM}).schedule(INDEPENDENT)
+    bound = apply_schedule(INDEPENDENT, schedule)
+    for index, subgoal in enumerate(bound["tasks"]):
+        robots = {task["robot"] for task in subgoal["tasks"]}
+        assert robots == {schedule.assignments[index]}
+    assert "robot" not in INDEPENDENT["tasks"][0]["tasks"][0]
+
+
+def test_needs_a_robot():
+    with pytest.raises(ValueError):
+        Scheduler({})
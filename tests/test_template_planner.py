@@ -0,0 +1,117 @@
+import pytest
+
+from __src.planning import PlanSimulator, TemplatePlanner, WorldModel
+from __src.planning.template_planner import (
+    FastPathMiss,
+    get_fast_path_stats,
+    reset_fast_path_stats,
+)
+
+ENV = {
+    "objects_by_group": {
+        "island_left_group": ["object_apple_0", "object_bowl_0"],
+        "island_right_group": ["object_fork_0"],
+        "counter_1_left_group": ["object_lemon_0", "object_plate_0"],
+        "counter_1_right_group": ["object_cup_0"],
+        "counter_2_left_group": [],
+    }
+}
+SKILLS = {
+    "GoToObject",
+    "PickObject",
+    "PlaceObject",
+    "OpenObject",
+    "CloseObject",
+}
+
+
+@pytest.fixture
+def world():
+    return WorldModel.from_env(ENV)
+
+
+@pytest.fixture
+def planner():
+    return TemplatePlanner(SKILLS)
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_fast_path_stats()
+    yield
+    reset_fast_path_stats()
+
+
+def targets(plan):
+    return [task["target"] for subgoal in plan["tasks"] for task in subgoal["tasks"]]
+
+
+@pytest.mark.parametrize(
+    ("query", "destination"),
+    [
+        ("사과를 오른쪽 아일랜드 식탁에 옮겨줘.", "island_right_group"),
+        ("Bring the apple to the right island table.", "island_right_group"),
+        ("Put the fork in the bowl.", "object_bowl_0"),
+        ("Place the plate on the counter 2 left table.", "counter_2_left_group"),
+    ],
+)
+def test_move_expands_to_goto_pick_goto_place(planner, world, query, destination):
+    plan = planner.plan(query, world)
+    assert [task["skill"] for task in plan["tasks"][0]["tasks"]] == [
+        "GoToObject",
+        "PickObject",
+        "GoToObject",
+        "PlaceObject",
+    ]
+    assert targets(plan)[-1] == destination
+
+
+def test_clauses_become_separate_subgoals(planner, world):
+    plan = planner.plan("사과를 오른쪽 아일랜드 식탁에 옮기고 컵을 그릇에 놓아줘.", world)
+    assert len(plan["tasks"]) == 2
+    assert targets(plan)[4:6] == ["object_cup_0", "object_cup_0"]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Put the apple on the counter.",
+        "사과를 아일랜드 식탁에 옮겨줘.",
+    ],
+)
+def test_mention_of_several_groups_is_ambiguous(planner, world, query):
+    assert planner.plan(query, world) is None
+    assert get_fast_path_stats()["misses"] == {"ambiguous_target": 1}
+
+
+def test_resolve_reports_the_miss_reason(world):
+    with pytest.raises(FastPathMiss) as miss:
+        TemplatePlanner.resolve("counter", world)
+    assert miss.value.reason == "ambiguous_target"
+    with pytest.raises(FastPathMiss) as miss:
+        TemplatePlanner.resolve("pear", world)
+    assert miss.value.reason == "unresolved_target"
+
+
+@pytest.mark.parametrize(
+    ("query", "reason"),
+    [
+        ("Set the table for two people.", "no_pattern"),
+        ("배를 아일랜드 식탁에 옮겨줘.", "unresolved_target"),
+    ],
+)
+def test_non_canonical_missions_fall_back(planner, world, query, reason):
+    assert planner.plan(query, world) is None
+    assert get_fast_path_stats()["misses"] == {reason: 1}
+
+
+def test_missing_skill_falls_back(world):
+    planner = TemplatePlanner({"GoToObject", "PickObject"})
+    assert planner.plan("Put the fork in the bowl.", world) is None
+    assert get_fast_path_stats()["misses"] == {"missing_skill": 1}
+
+
+def test_plan_must_pass_the_simulator(planner, world):
+    simulator = PlanSimulator(world, {"robot1": sorted(SKILLS)})
+    assert planner.plan("Put the fork in the bowl.", world, simulator) is not None
+    assert get_fast_path_stats()["hits"] == 1
@@ -0,0 +1,128 @@
+import pytest
+
+from __src.planning import PlanSimulator, WorldModel
+
+SKILLS = ["GoToObject", "PickObject", "PlaceObject", "OpenObject", "CloseObject"]
+ENV = {
+    "objects_by_group": {
+        "island_left_group": ["object_apple_0", "object_cereal_box_0"],
+        "counter_1_left_group": ["object_fridge_0"],
+    }
+}
+
+
+def plan(*tasks):
+    return {"tasks": [{"subgoal": "s", "tasks": [dict(t) for t in tasks]}]}
+
+
+def step(skill, target, **extra):
+    return {"skill": skill, "target": target, **extra}
+
+
+MOVE_APPLE_INTO_BOX = plan(
+    step("GoToObject", "object_apple_0"),
+    step("PickObject", "object_apple_0"),
+    step("GoToObject", "object_cereal_box_0"),
+    step("PlaceObject", "object_cereal_box_0"),
+)
+
+
+def simulator(env=ENV, skills=SKILLS):
+    return PlanSimulator(WorldModel.from_env(env), {"robot1": skills})
+
+
+def test_valid_move_passes():
+    result = simulator().validate(
+        plan(
+            step("GoToObject", "object_apple_0"),
+            step("PickObject", "object_apple_0"),
+            step("GoToObject", "counter_1_left_group"),
+            step("PlaceObject", "counter_1_left_group"),
+        )
+    )
+    assert result.ok
+    assert result.steps_checked == 4
+    assert result.final_state.object_location["object_apple_0"] == (
+        "counter_1_left_group"
+    )
+
+
+@pytest.mark.parametrize(
+    ("tasks", "code"),
+    [
+        ([step("PickObject", "object_apple_0")], "not_at_target"),
+        ([step("GoToObject", "object_pear_0")], "unknown_target"),
+        ([step("PlaceObject", "island_left_group")], "hand_empty"),
+        ([step("Teleport", "object_apple_0")], "unknown_skill"),
+        ([step("GoToObject", "object_apple_0", robot="robot9")], "unknown_robot"),
+        (
+            [
+                step("GoToObject", "island_left_group"),
+                step("PickObject", "island_left_group"),
+            ],
+            "not_graspable",
+        ),
+    ],
+)
+def test_first_failing_step_is_reported(tasks, code):
+    result = simulator().validate(plan(*tasks))
+    assert not result.ok
+    assert result.issue.code == code
+    assert result.issue.step.index == len(tasks) - 1
+
+
+def test_missing_skill_is_reported():
+    result = simulator(skills=["GoToObject"]).validate(
+        plan(step("GoToObject", "object_apple_0"), step("PickObject", "object_apple_0"))
+    )
+    assert result.issue.code == "skill_not_available"
+
+
+def test_unlisted_openable_objects_need_no_opening():
+    # Without openable_objects nothing is guessed openable from its name.
+    world = WorldModel.from_env(ENV)
+    assert not world.openable_known
+    assert world.openable == frozenset()
+    assert simulator().validate(MOVE_APPLE_INTO_BOX).ok
+
+
+def test_open_steps_are_accepted_when_openability_is_unknown():
+    opened = plan(
+        step("GoToObject", "object_fridge_0"), step("OpenObject", "object_fridge_0")
+    )
+    assert simulator().validate(opened).ok
+
+
+def test_listed_closed_receptacle_must_be_opened():
+    env = {**ENV, "openable_objects": ["object_cereal_box_0"]}
+    result = simulator(env).validate(MOVE_APPLE_INTO_BOX)
+    assert result.issue.code == "target_closed"
+
+    opened = plan(
+        step("GoToObject", "object_cereal_box_0"),
+        step("OpenObject", "object_cereal_box_0"),
+        *MOVE_APPLE_INTO_BOX["tasks"][0]["tasks"],
+    )
+    assert simulator(env).validate(opened).ok
+
+
+def test_listed_world_rejects_opening_other_objects():
+    env = {**ENV, "openable_objects": ["object_cereal_box_0"]}
+    result = simulator(env).validate(
+        plan(step("GoToObject", "object_apple_0"), step("OpenObject", "object_apple_0"))
+    )
+    assert result.issue.code == "not_openable"
+
+
+def test_failure_keeps_the_state_before_the_failing_subgoal():
+    tasks = {
+        "tasks": [
+            {"subgoal": "go", "tasks": [step("GoToObject", "object_apple_0")]},
+            {"subgoal": "bad", "tasks": [step("PlaceObject", "object_apple_0")]},
+        ]
+    }
+    result = simulator().validate(tasks)
+    assert result.issue.step.subgoal_index == 1
+    assert result.state_before_subgoal["robot_location"] == {
+        "robot1": "object_apple_0"
+    }